@@ -43,6 +43,8 @@ from .utils.network import (
     bili_simple_download,
 )
 from .utils.AsyncEvent import AsyncEvent
+from .utils.event_sink import EventSink
+from .utils.paginate import Paginator
 from .utils.geetest import Geetest, GeetestMeta, GeetestType
 from .exceptions import (
     ApiException,
@@ -83,6 +85,7 @@ from . import (
     comment,
     creative_center,
     dynamic,
+    dynamic_feed,
     emoji,
     favorite_list,
     festival,
@@ -155,6 +158,7 @@ __all__ = [
     "DmFontSize",
     "DmMode",
     "DynamicExceedImagesException",
+    "EventSink",
     "ExClimbWuzhiException",
     "Geetest",
     "GeetestException",
@@ -164,6 +168,7 @@ __all__ = [
     "LiveException",
     "LoginError",
     "NetworkException",
+    "Paginator",
     "Picture",
     "ResourceType",
     "ResponseCodeException",
@@ -190,6 +195,7 @@ __all__ = [
     "comment",
     "creative_center",
     "dynamic",
+    "dynamic_feed",
     "emoji",
     "favorite_list",
     "festival",
@@ -6,20 +6,22 @@ bilibili_api.article
 
 import re
 import json
+import asyncio
 from copy import copy
 from enum import Enum
 from html import unescape
 from datetime import datetime
 from urllib.parse import unquote
-from typing import List, Union, TypeVar, overload
+from typing import Dict, List, Union, TypeVar, Optional, overload
 
 import yaml
+from lxml import etree
 from yarl import URL
-from bs4 import BeautifulSoup, element
 
 from .utils.initial_state import get_initial_state
 from .utils.utils import get_api, raise_for_statement
 from .utils.network import Api, Credential
+from .utils.picture import Picture
 from .exceptions.NetworkException import ApiException, NetworkException
 from .utils import cache_pool
 
@@ -285,279 +287,90 @@ class Article:
 
         resp = await self.get_all()
 
-        document = BeautifulSoup(f"<div>{resp['readInfo']['content']}</div>", "lxml")
+        # 流式解析，边解析边构建节点树
+        target = _ArticleContentTarget()
+        parser = etree.HTMLParser(target=target)
+        parser.feed(f"<div>{resp['readInfo']['content']}</div>")
+        children = parser.close()
 
-        async def parse(el: BeautifulSoup):
-            node_list = []
+        if target.links:
+            # 空的站内链接需要解析为卡片，统一并发解析
+            from .utils.parse_link import ResourceType, parse_link
 
-            for e in el.contents:  # type: ignore
-                if type(e) == element.NavigableString:
-                    # 文本节点
-                    node = TextNode(e)  # type: ignore
-                    node_list.append(node)
-                    continue
-
-                e: BeautifulSoup = e
-                if e.name == "p":
-                    # 段落
-                    node = ParagraphNode()
-                    node_list.append(node)
-
-                    if "style" in e.attrs:
-                        if "text-align: center" in e.attrs["style"]:
-                            node.align = "center"
-
-                        elif "text-align: right" in e.attrs["style"]:
-                            node.align = "right"
-
-                        else:
-                            node.align = "left"
-
-                    node.children = await parse(e)
-
-                elif e.name == "h1":
-                    # 标题
-                    node = HeadingNode()
-                    node_list.append(node)
-
-                    node.children = await parse(e)
-
-                elif e.name == "strong":
-                    # 粗体
-                    node = BoldNode()
-                    node_list.append(node)
-
-                    node.children = await parse(e)
-
-                elif e.name == "span":
-                    # 各种样式
-                    if "style" in e.attrs:
-                        style = e.attrs["style"]
-
-                        if "text-decoration: line-through" in style:
-                            # 删除线
-                            node = DelNode()
-                            node_list.append(node)
-
-                            node.children = await parse(e)
-                        if e.text != "":
-                            node_list += await parse(e)
-
-                    elif "class" in e.attrs:
-                        className = e.attrs["class"][0]
-
-                        if "font-size" in className:
-                            # 字体大小
-                            node = FontSizeNode()
-                            node_list.append(node)
-
-                            node.size = int(re.search(r"font-size-(\d\d)", className)[1])  # type: ignore
-                            node.children = await parse(e)
-
-                        elif "color" in className:
-                            # 字体颜色
-                            node = ColorNode()
-                            node_list.append(node)
-
-                            color_text = re.search("color-(.*);?", className)[1]  # type: ignore
-                            node.color = ARTICLE_COLOR_MAP[color_text]
-
-                            node.children = await parse(e)
-                        else:
-                            if e.text != "":
-                                node_list += await parse(e)
-
-                elif e.name == "blockquote":
-                    # 引用块
-                    # print(e.text)
-                    node = BlockquoteNode()
-                    node_list.append(node)
-                    node.children = await parse(e)
-
-                elif e.name == "figure":
-                    if "class" in e.attrs:
-                        className = e.attrs["class"]
-
-                        if "img-box" in className:
-                            img_el: BeautifulSoup = e.find("img")  # type: ignore
-                            if img_el == None:
-                                pass
-                            elif "class" in img_el.attrs:
-                                className = img_el.attrs["class"]
-
-                                if "cut-off" in className:
-                                    # 分割线
-                                    node = SeparatorNode()
-                                    node_list.append(node)
-
-                                if "aid" in img_el.attrs:
-                                    # 各种卡片
-                                    aid = img_el.attrs["aid"]
-
-                                    if "video-card" in className:
-                                        # 视频卡片，考虑有两列视频
-                                        for a in aid.split(","):
-                                            node = VideoCardNode()
-                                            node_list.append(node)
-
-                                            node.aid = int(a)
-
-                                    elif "article-card" in className:
-                                        # 文章卡片
-                                        node = ArticleCardNode()
-                                        node_list.append(node)
-
-                                        node.cvid = int(aid)
-
-                                    elif "fanju-card" in className:
-                                        # 番剧卡片
-                                        node = BangumiCardNode()
-                                        node_list.append(node)
-
-                                        node.epid = int(aid[2:])
-
-                                    elif "music-card" in className:
-                                        # 音乐卡片
-                                        node = MusicCardNode()
-                                        node_list.append(node)
-
-                                        node.auid = int(aid[2:])
-
-                                    elif "shop-card" in className:
-                                        # 会员购卡片
-                                        node = ShopCardNode()
-                                        node_list.append(node)
-
-                                        node.pwid = int(aid[2:])
-
-                                    elif "caricature-card" in className:
-                                        # 漫画卡片，考虑有两列
-
-                                        for i in aid.split(","):
-                                            node = ComicCardNode()
-                                            node_list.append(node)
-
-                                            node.mcid = int(i)
-
-                                    elif "live-card" in className:
-                                        # 直播卡片
-                                        node = LiveCardNode()
-                                        node_list.append(node)
-
-                                        node.room_id = int(aid)
-
-                                if "seamless" in className:
-                                    # 图片节点
-                                    node = ImageNode()
-                                    node_list.append(node)
-
-                                    node.url = e.find("img").attrs["data-src"]  # type: ignore
-
-                                    figcaption_el: BeautifulSoup = e.find("figcaption")  # type: ignore
-
-                                    if figcaption_el:
-                                        if figcaption_el.contents:
-                                            node.alt = figcaption_el.contents[0]  # type: ignore
-                            else:
-                                # 图片节点
-                                node = ImageNode()
-                                node_list.append(node)
-
-                                node.url = e.find("img").attrs["data-src"]  # type: ignore
-
-                                figcaption_el: BeautifulSoup = e.find("figcaption")  # type: ignore
-
-                                if figcaption_el:
-                                    if figcaption_el.contents:
-                                        node.alt = figcaption_el.contents[0]  # type: ignore
-
-                        elif "code-box" in className:
-                            # 代码块
-                            node = CodeNode()
-                            node_list.append(node)
-
-                            pre_el: BeautifulSoup = e.find("pre")  # type: ignore
-                            node.lang = pre_el.attrs["data-lang"].split("@")[0].lower()
-                            node.code = unquote(pre_el.attrs["codecontent"])
+            results = await asyncio.gather(
+                *[parse_link(link.href) for link in target.links]
+            )
+            cards = {}
+            for link, parse_link_res in zip(target.links, results):
+                node = None
+                if parse_link_res[1] == ResourceType.VIDEO:
+                    node = VideoCardNode()
+                    node.aid = parse_link_res[0].get_aid()
+                elif parse_link_res[1] == ResourceType.AUDIO:
+                    node = MusicCardNode()
+                    node.auid = parse_link_res[0].get_auid()
+                elif parse_link_res[1] == ResourceType.LIVE:
+                    node = LiveCardNode()
+                    node.room_id = parse_link_res[0].room_display_id
+                elif parse_link_res[1] == ResourceType.ARTICLE:
+                    node = ArticleCardNode()
+                    node.cvid = parse_link_res[0].get_cvid()
+                # XXX: 暂不支持其他的站内链接
+                cards[id(link)] = node
+
+            def replace_links(nodes: List[Node]) -> List[Node]:
+                result = []
+                for node in nodes:
+                    if isinstance(node, _LinkPlaceholderNode):
+                        node = cards[id(node)]
+                        if node is None:
+                            continue
+                    elif hasattr(node, "children"):
+                        node.children = replace_links(node.children)
+                    result.append(node)
+                return result
+
+            children = replace_links(children)
 
-                elif e.name == "ol":
-                    # 有序列表
-                    node = OlNode()
-                    node_list.append(node)
+        # 文章元数据
+        self.__meta = copy(resp["readInfo"])
+        del self.__meta["content"]
 
-                    node.children = await parse(e)
+        self.__children = children
+        self.__has_parsed = True
 
-                elif e.name == "li":
-                    # 列表元素
-                    node = LiNode()
-                    node_list.append(node)
+    async def get_images_raw_info(self) -> List[dict]:
+        """
+        获取专栏所有图片原始信息
 
-                    node.children = await parse(e)
+        未调用 fetch_content() 时将自动调用。
 
-                elif e.name == "ul":
-                    # 无序列表
-                    node = UlNode()
-                    node_list.append(node)
+        Returns:
+            List[dict]: 图片信息
+        """
+        if not self.__has_parsed:
+            await self.fetch_content()
 
-                    node.children = await parse(e)
+        result = []
 
-                elif e.name == "a":
-                    # 超链接
-                    if len(e.contents) == 0:
-                        from .utils.parse_link import ResourceType, parse_link
+        def walk(nodes: List["Node"]) -> None:
+            for node in nodes:
+                if isinstance(node, ImageNode):
+                    result.append(node.json())
+                walk(getattr(node, "children", []))
 
-                        parse_link_res = await parse_link(e.attrs["href"])
-                        if parse_link_res[1] == ResourceType.VIDEO:
-                            node = VideoCardNode()
-                            node.aid = parse_link_res[0].get_aid()
-                            node_list.append(node)
-                        elif parse_link_res[1] == ResourceType.AUDIO:
-                            node = MusicCardNode()
-                            node.auid = parse_link_res[0].get_auid()
-                            node_list.append(node)
-                        elif parse_link_res[1] == ResourceType.LIVE:
-                            node = LiveCardNode()
-                            node.room_id = parse_link_res[0].room_display_id
-                            node_list.append(node)
-                        elif parse_link_res[1] == ResourceType.ARTICLE:
-                            node = ArticleCardNode()
-                            node.cvid = parse_link_res[0].get_cvid()
-                            node_list.append(node)
-                        else:
-                            # XXX: 暂不支持其他的站内链接
-                            pass
-                    else:
-                        node = AnchorNode()
-                        node_list.append(node)
-
-                        node.url = e.attrs["href"]
-                        node.text = e.contents[0]  # type: ignore
-
-                elif e.name == "img":
-                    className = e.attrs.get("class")
-
-                    if "latex" in className:
-                        # 公式
-                        node = LatexNode()
-                        node.code = unquote(e["alt"])  # type: ignore
-                        node_list.append(node)
-                    else:
-                        # 图片
-                        node = ImageNode()
-                        node.url = e.attrs.get("data-src")  # type: ignore
-                        node_list.append(node)
-
-                elif e.name == "div":
-                    node_list += await parse(e)
-
-            return node_list
+        walk(self.__children)
+        return result
 
-        # 文章元数据
-        self.__meta = copy(resp["readInfo"])
-        del self.__meta["content"]
+    async def get_images(self) -> List["Picture"]:
+        """
+        获取专栏所有图片并转为 Picture 类
 
-        self.__children = await parse(document.find("div"))
-        self.__has_parsed = True
+        Returns:
+            List[Picture]: 图片列表
+        """
+        images_raw_info = await self.get_images_raw_info()
+        return await Picture.load_many([image["url"] for image in images_raw_info])
 
     async def get_info(self) -> dict:
         """
@@ -586,17 +399,17 @@ class Article:
                     f"https://www.bilibili.com/read/cv{self.__cvid}/?jump_opus=1"
                 )
             )[0]
-            cache_pool.article2dynamic[self.__cvid] = self.__get_all_data["readInfo"][
-                "dyn_id_str"
-            ]
-            cache_pool.dynamic2article[cache_pool.article2dynamic[self.__cvid]] = (
-                self.__cvid
-            )
-            cache_pool.dynamic_is_article[cache_pool.article2dynamic[self.__cvid]] = True
-            cache_pool.dynamic_is_opus[cache_pool.article2dynamic[self.__cvid]] = True
-            cache_pool.article_is_note[self.get_cvid()] = self.__get_all_data["readInfo"][
-                "category"
-            ]["id"] in [41, 42]
+        cache_pool.article2dynamic[self.__cvid] = self.__get_all_data["readInfo"][
+            "dyn_id_str"
+        ]
+        cache_pool.dynamic2article[cache_pool.article2dynamic[self.__cvid]] = (
+            self.__cvid
+        )
+        cache_pool.dynamic_is_article[cache_pool.article2dynamic[self.__cvid]] = True
+        cache_pool.dynamic_is_opus[cache_pool.article2dynamic[self.__cvid]] = True
+        cache_pool.article_is_note[self.get_cvid()] = self.__get_all_data["readInfo"][
+            "category"
+        ]["id"] in [41, 42]
         return self.__get_all_data
 
     async def set_like(self, status: bool = True) -> dict:
@@ -1030,3 +843,296 @@ class SeparatorNode(Node):
 
     def json(self):
         return {"type": "SeparatorNode"}
+
+
+# 解析
+
+
+class _LinkPlaceholderNode(Node):
+    """
+    空的站内链接占位节点，解析结束后被替换为对应卡片
+    """
+
+    def __init__(self, href: str):
+        self.href = href
+
+
+def _find(el: list, tag: str) -> Optional[list]:
+    for child in el[2]:
+        if isinstance(child, list):
+            if child[0] == tag:
+                return child
+            found = _find(child, tag)
+            if found is not None:
+                return found
+    return None
+
+
+def _text(el: Union[list, str]) -> str:
+    if isinstance(el, str):
+        return el
+    return "".join(_text(child) for child in el[2])
+
+
+class _ArticleContentTarget:
+    """
+    专栏内容的 lxml 解析器事件目标 (target parser)。
+
+    不构建 DOM 树，在标签闭合时直接生成对应节点。
+
+    只有 figure 与 a 这类很小的子树会被暂存为 `[标签, 属性, 子元素]` 形式后再处理。
+    """
+
+    BUILD_TAGS = {
+        "html",
+        "body",
+        "div",
+        "p",
+        "h1",
+        "strong",
+        "span",
+        "blockquote",
+        "ol",
+        "li",
+        "ul",
+        "img",
+    }
+    CAPTURE_TAGS = {"figure", "a"}
+    CHILDREN_NODES = {
+        "h1": HeadingNode,
+        "strong": BoldNode,
+        "blockquote": BlockquoteNode,
+        "ol": OlNode,
+        "li": LiNode,
+        "ul": UlNode,
+    }
+
+    def __init__(self) -> None:
+        self.links: List[_LinkPlaceholderNode] = []
+        # [标签, 属性, 子节点, 子树中是否有文字]
+        self.__stack: List[list] = [["", {}, [], False]]
+        self.__skip_depth = 0
+        self.__capture: List[list] = []
+        self.__last_text: Optional[TextNode] = None
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        self.__last_text = None
+        if self.__skip_depth:
+            self.__skip_depth += 1
+        elif self.__capture or tag in self.CAPTURE_TAGS:
+            el = [tag, dict(attrib), []]
+            if self.__capture:
+                self.__capture[-1][2].append(el)
+            self.__capture.append(el)
+        elif tag in self.BUILD_TAGS:
+            self.__stack.append([tag, dict(attrib), [], False])
+        else:
+            # 不支持的标签，整个子树忽略
+            self.__skip_depth = 1
+
+    def data(self, data: str) -> None:
+        if not data:
+            return
+        self.__stack[-1][3] = True
+        if self.__skip_depth:
+            return
+        if self.__capture:
+            contents = self.__capture[-1][2]
+            if contents and isinstance(contents[-1], str):
+                contents[-1] += data
+            else:
+                contents.append(data)
+            return
+        if self.__last_text is not None:
+            self.__last_text.text += data
+        else:
+            self.__last_text = TextNode(data)
+            self.__stack[-1][2].append(self.__last_text)
+
+    def comment(self, text: str) -> None:
+        self.__last_text = None
+
+    def end(self, tag: str) -> None:
+        self.__last_text = None
+        if self.__skip_depth:
+            self.__skip_depth -= 1
+            return
+        if self.__capture:
+            el = self.__capture.pop()
+            if not self.__capture:
+                parent = self.__stack[-1][2]
+                if el[0] == "figure":
+                    self.__end_figure(el, parent)
+                else:
+                    self.__end_anchor(el, parent)
+            return
+        tag, attrs, children, has_text = self.__stack.pop()
+        parent = self.__stack[-1][2]
+        if has_text:
+            self.__stack[-1][3] = True
+
+        if tag == "p":
+            # 段落
+            node = ParagraphNode()
+            if "style" in attrs:
+                if "text-align: center" in attrs["style"]:
+                    node.align = "center"
+                elif "text-align: right" in attrs["style"]:
+                    node.align = "right"
+                else:
+                    node.align = "left"
+            node.children = children
+            parent.append(node)
+
+        elif tag in self.CHILDREN_NODES:
+            # 标题、粗体、引用块、列表
+            node = self.CHILDREN_NODES[tag]()
+            node.children = children
+            parent.append(node)
+
+        elif tag == "span":
+            # 各种样式
+            if "style" in attrs:
+                if "text-decoration: line-through" in attrs["style"]:
+                    # 删除线
+                    node = DelNode()
+                    node.children = children
+                    parent.append(node)
+                if has_text:
+                    parent.extend(children)
+
+            elif "class" in attrs:
+                className = (attrs["class"].split() or [""])[0]
+
+                if "font-size" in className:
+                    # 字体大小
+                    node = FontSizeNode()
+                    node.size = int(re.search(r"font-size-(\d\d)", className)[1])  # type: ignore
+                    node.children = children
+                    parent.append(node)
+
+                elif "color" in className:
+                    # 字体颜色
+                    node = ColorNode()
+                    color_text = re.search("color-(.*);?", className)[1]  # type: ignore
+                    node.color = ARTICLE_COLOR_MAP[color_text]
+                    node.children = children
+                    parent.append(node)
+
+                elif has_text:
+                    parent.extend(children)
+
+        elif tag == "img":
+            if "latex" in attrs.get("class", "").split():
+                # 公式
+                node = LatexNode()
+                node.code = unquote(attrs["alt"])
+            else:
+                # 图片
+                node = ImageNode()
+                node.url = attrs.get("data-src")  # type: ignore
+            parent.append(node)
+
+        else:
+            # div, body, html
+            parent.extend(children)
+
+    def close(self) -> List[Node]:
+        return self.__stack[0][2]
+
+    def __end_figure(self, el: list, parent: List[Node]) -> None:
+        if "class" not in el[1]:
+            return
+        className = el[1]["class"].split()
+
+        if "img-box" in className:
+            img_el = _find(el, "img")
+            if img_el is None:
+                return
+            img_attrs = img_el[1]
+            if "class" in img_attrs:
+                className = img_attrs["class"].split()
+
+                if "cut-off" in className:
+                    # 分割线
+                    parent.append(SeparatorNode())
+
+                if "aid" in img_attrs:
+                    # 各种卡片
+                    aid = img_attrs["aid"]
+
+                    if "video-card" in className:
+                        # 视频卡片，考虑有两列视频
+                        for a in aid.split(","):
+                            node = VideoCardNode()
+                            node.aid = int(a)
+                            parent.append(node)
+
+                    elif "article-card" in className:
+                        # 文章卡片
+                        node = ArticleCardNode()
+                        node.cvid = int(aid)
+                        parent.append(node)
+
+                    elif "fanju-card" in className:
+                        # 番剧卡片
+                        node = BangumiCardNode()
+                        node.epid = int(aid[2:])
+                        parent.append(node)
+
+                    elif "music-card" in className:
+                        # 音乐卡片
+                        node = MusicCardNode()
+                        node.auid = int(aid[2:])
+                        parent.append(node)
+
+                    elif "shop-card" in className:
+                        # 会员购卡片
+                        node = ShopCardNode()
+                        node.pwid = int(aid[2:])
+                        parent.append(node)
+
+                    elif "caricature-card" in className:
+                        # 漫画卡片，考虑有两列
+                        for i in aid.split(","):
+                            node = ComicCardNode()
+                            node.mcid = int(i)
+                            parent.append(node)
+
+                    elif "live-card" in className:
+                        # 直播卡片
+                        node = LiveCardNode()
+                        node.room_id = int(aid)
+                        parent.append(node)
+
+                if "seamless" not in className:
+                    return
+
+            # 图片节点
+            node = ImageNode()
+            node.url = img_attrs.get("data-src", "")
+            figcaption_el = _find(el, "figcaption")
+            if figcaption_el and figcaption_el[2]:
+                node.alt = _text(figcaption_el[2][0])
+            parent.append(node)
+
+        elif "code-box" in className:
+            # 代码块
+            pre_el = _find(el, "pre")
+            node = CodeNode()
+            node.lang = pre_el[1]["data-lang"].split("@")[0].lower()  # type: ignore
+            node.code = unquote(pre_el[1]["codecontent"])  # type: ignore
+            parent.append(node)
+
+    def __end_anchor(self, el: list, parent: List[Node]) -> None:
+        if len(el[2]) == 0:
+            # 站内链接卡片，稍后统一解析
+            node = _LinkPlaceholderNode(el[1]["href"])
+            self.links.append(node)
+            parent.append(node)
+        else:
+            # 超链接
+            node = AnchorNode()
+            node.url = el[1]["href"]
+            node.text = _text(el[2][0])
+            parent.append(node)
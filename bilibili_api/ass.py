@@ -217,7 +217,8 @@ async def make_ass_file_danmakus_protobuf(
                 # type: ignore
                 cid = await v._Video__get_cid_by_index(page)
         try:
-            info = await v.get_info()
+            pages = await v._Video__get_pages_cached()  # type: ignore
+            info = next((p for p in pages if p["cid"] == cid), pages[0])
         except:
             info = {"dimension": {"width": 1440, "height": 1080}}
         width = info["dimension"]["width"]
@@ -298,7 +299,8 @@ async def make_ass_file_danmakus_xml(
                     raise ArgsException("page_index 和 cid 至少提供一个。")
                 cid = await v._Video__get_cid_by_index(page)  # type: ignore
         try:
-            info = await v.get_info()
+            pages = await v._Video__get_pages_cached()  # type: ignore
+            info = next((p for p in pages if p["cid"] == cid), pages[0])
         except:
             info = {"dimension": {"width": 1440, "height": 1080}}
         width = info["dimension"]["width"]
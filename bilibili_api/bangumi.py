@@ -18,6 +18,7 @@ from .video import Video
 from .utils.aid_bvid_transformer import aid2bvid, bvid2aid
 from .utils.danmaku import Danmaku
 from .utils.utils import get_api, raise_for_statement
+from .utils import cache_pool
 from .utils.network import Api, Credential
 from .utils.initial_state import (
     get_initial_state,
@@ -1460,9 +1461,13 @@ class Episode(Video):
         Returns:
             int: cid
         """
-        return (await self.get_download_url())["play_view_business_info"][
-            "episode_info"
-        ]["cid"]
+        cid = cache_pool.episode_cid.get(self.__epid)
+        if cid is None:
+            cid = (await self.get_download_url())["play_view_business_info"][
+                "episode_info"
+            ]["cid"]
+            cache_pool.episode_cid[self.__epid] = cid
+        return cid
 
     async def get_bangumi(self) -> "Bangumi":
         """
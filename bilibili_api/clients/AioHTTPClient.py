@@ -183,23 +183,26 @@ class AioHTTPClient(BiliAPIClient):
             )
             self.__need_update_session = False
         self.__download_cnt += 1
+        cnt = self.__download_cnt
         request_log.dispatch(
             "DWN_CREATE",
             "开始下载",
             {
-                "id": self.__download_cnt,
+                "id": cnt,
                 "url": url,
                 "headers": headers,
             },
         )
-        self.__downloads[self.__download_cnt] = await self.__session.get(
+        self.__downloads[cnt] = await self.__session.get(
             url=url, headers=headers
         )
-        return self.__download_cnt
+        return cnt
 
-    async def download_chunk(self, cnt: int) -> bytes:
+    async def download_chunk(self, cnt: int, size: int = 4096) -> bytes:
         resp = self.__downloads[cnt]
-        data = await anext(resp.content.iter_chunked(4096))
+        data = await resp.content.read(size)
+        if not data:
+            raise StopAsyncIteration
         request_log.dispatch(
             "DWN_PART",
             "收到部分下载数据",
@@ -211,6 +214,19 @@ class AioHTTPClient(BiliAPIClient):
         resp = self.__downloads[cnt]
         return int(resp.headers.get("content-length", "0"))
 
+    def download_status(self, cnt: int) -> int:
+        resp = self.__downloads[cnt]
+        return resp.status
+
+    def download_headers(self, cnt: int) -> dict:
+        resp = self.__downloads[cnt]
+        return {key.lower(): item for key, item in resp.headers.items()}
+
+    async def download_close(self, cnt: int) -> None:
+        resp = self.__downloads.pop(cnt, None)
+        if resp is not None:
+            resp.release()
+
     async def ws_create(
         self, url: str = "", params: dict = {}, headers: dict = {}
     ) -> int:
@@ -223,20 +239,21 @@ class AioHTTPClient(BiliAPIClient):
             )
             self.__need_update_session = False
         self.__ws_cnt += 1
+        cnt = self.__ws_cnt
         request_log.dispatch(
             "WS_CREATE",
             "开始 WebSocket 连接",
             {
-                "id": self.__ws_cnt,
+                "id": cnt,
                 "url": url,
                 "params": params,
                 "headers": headers,
             },
         )
-        self.__wss[self.__ws_cnt] = await self.__session.ws_connect(
+        self.__wss[cnt] = await self.__session.ws_connect(
             url=url, params=params, headers=headers
         )
-        return self.__ws_cnt
+        return cnt
 
     async def ws_recv(self, cnt: int) -> Tuple[bytes, BiliWsMsgType]:
         msg = await self.__wss[cnt].receive()
@@ -276,6 +293,9 @@ class AioHTTPClient(BiliAPIClient):
     download_create.__doc__ = BiliAPIClient.download_create.__doc__
     download_chunk.__doc__ = BiliAPIClient.download_chunk.__doc__
     download_content_length.__doc__ = BiliAPIClient.download_content_length.__doc__
+    download_status.__doc__ = BiliAPIClient.download_status.__doc__
+    download_headers.__doc__ = BiliAPIClient.download_headers.__doc__
+    download_close.__doc__ = BiliAPIClient.download_close.__doc__
     ws_create.__doc__ = BiliAPIClient.ws_create.__doc__
     ws_recv.__doc__ = BiliAPIClient.ws_recv.__doc__
     ws_send.__doc__ = BiliAPIClient.ws_send.__doc__
@@ -189,21 +189,23 @@ class CurlCFFIClient(BiliAPIClient):
         if headers.get("user-agent") and self.__session.impersonate != "":
             headers.pop("user-agent")
         self.__download_cnt += 1
+        cnt = self.__download_cnt
         request_log.dispatch(
             "DWN_CREATE",
             "开始下载",
             {
-                "id": self.__download_cnt,
+                "id": cnt,
                 "url": url,
                 "headers": headers,
             },
         )
-        self.__downloads[self.__download_cnt] = await self.__session.get(
+        self.__downloads[cnt] = await self.__session.get(
             url=url, headers=headers, stream=True
         )
-        return self.__download_cnt
+        return cnt
 
-    async def download_chunk(self, cnt: int) -> bytes:
+    async def download_chunk(self, cnt: int, size: int = 4096) -> bytes:
+        # curl_cffi 按收到的数据块返回，不受 size 限制
         resp = self.__downloads[cnt]
         data = await anext(resp.aiter_content())
         request_log.dispatch(
@@ -217,6 +219,19 @@ class CurlCFFIClient(BiliAPIClient):
         resp = self.__downloads[cnt]
         return int(resp.headers.get("content-length", "0"))
 
+    def download_status(self, cnt: int) -> int:
+        resp = self.__downloads[cnt]
+        return resp.status_code
+
+    def download_headers(self, cnt: int) -> dict:
+        resp = self.__downloads[cnt]
+        return {key.lower(): item for key, item in resp.headers.multi_items()}
+
+    async def download_close(self, cnt: int) -> None:
+        resp = self.__downloads.pop(cnt, None)
+        if resp is not None:
+            await resp.aclose()
+
     async def ws_create(
         self, url: str = "", params: dict = {}, headers: dict = {}
     ) -> int:
@@ -225,21 +240,22 @@ class CurlCFFIClient(BiliAPIClient):
         if headers.get("user-agent") and self.__session.impersonate != "":
             headers.pop("user-agent")
         self.__ws_cnt += 1
+        cnt = self.__ws_cnt
         request_log.dispatch(
             "WS_CREATE",
             "开始 WebSocket 连接",
             {
-                "id": self.__ws_cnt,
+                "id": cnt,
                 "url": url,
                 "params": params,
                 "headers": headers,
             },
         )
         ws = await self.__session.ws_connect(url, params=params, headers=headers)
-        self.__ws[self.__ws_cnt] = ws
-        self.__ws_is_closed[self.__ws_cnt] = False
-        self.__ws_need_close[self.__ws_cnt] = False
-        return self.__ws_cnt
+        self.__ws[cnt] = ws
+        self.__ws_is_closed[cnt] = False
+        self.__ws_need_close[cnt] = False
+        return cnt
 
     async def ws_send(self, cnt: int, data: bytes) -> None:
         if self.__ws_need_close[cnt] or self.__ws_is_closed[cnt]:
@@ -312,6 +328,9 @@ class CurlCFFIClient(BiliAPIClient):
     download_create.__doc__ = BiliAPIClient.download_create.__doc__
     download_chunk.__doc__ = BiliAPIClient.download_chunk.__doc__
     download_content_length.__doc__ = BiliAPIClient.download_content_length.__doc__
+    download_status.__doc__ = BiliAPIClient.download_status.__doc__
+    download_headers.__doc__ = BiliAPIClient.download_headers.__doc__
+    download_close.__doc__ = BiliAPIClient.download_close.__doc__
     ws_create.__doc__ = BiliAPIClient.ws_create.__doc__
     ws_recv.__doc__ = BiliAPIClient.ws_recv.__doc__
     ws_send.__doc__ = BiliAPIClient.ws_send.__doc__
@@ -178,26 +178,26 @@ class HTTPXClient(BiliAPIClient):
         headers: dict = {},
     ) -> int:
         self.__download_cnt += 1
+        cnt = self.__download_cnt
         request_log.dispatch(
             "DWN_CREATE",
             "开始下载",
             {
-                "id": self.__download_cnt,
+                "id": cnt,
                 "url": url,
                 "headers": headers,
             },
         )
         req = self.__session.build_request(method="GET", url=url, headers=headers)
-        self.__downloads[self.__download_cnt] = await self.__session.send(
-            req, stream=True
-        )
-        self.__download_iter[self.__download_cnt] = self.__downloads[
-            self.__download_cnt
-        ].aiter_bytes(4096)
-        return self.__download_cnt
+        self.__downloads[cnt] = await self.__session.send(req, stream=True)
+        return cnt
 
-    async def download_chunk(self, cnt: int) -> bytes:
-        iter = self.__download_iter[cnt]
+    async def download_chunk(self, cnt: int, size: int = 4096) -> bytes:
+        iter = self.__download_iter.get(cnt)
+        if iter is None:
+            # 按收到的数据块返回，不等待攒满 size
+            iter = self.__downloads[cnt].aiter_bytes()
+            self.__download_iter[cnt] = iter
         data = await anext(iter)
         request_log.dispatch(
             "DWN_PART",
@@ -210,6 +210,20 @@ class HTTPXClient(BiliAPIClient):
         resp = self.__downloads[cnt]
         return int(resp.headers.get("content-length", "0"))
 
+    def download_status(self, cnt: int) -> int:
+        resp = self.__downloads[cnt]
+        return resp.status_code
+
+    def download_headers(self, cnt: int) -> dict:
+        resp = self.__downloads[cnt]
+        return {key.lower(): item for key, item in resp.headers.multi_items()}
+
+    async def download_close(self, cnt: int) -> None:
+        self.__download_iter.pop(cnt, None)
+        resp = self.__downloads.pop(cnt, None)
+        if resp is not None:
+            await resp.aclose()
+
     async def ws_create(self, *args, **kwargs) -> None:
         """
         httpx 库暂未实现 WebSocket。相关讨论：<https://github.com/encode/httpx/issues/304>
@@ -254,4 +268,7 @@ class HTTPXClient(BiliAPIClient):
     download_create.__doc__ = BiliAPIClient.download_create.__doc__
     download_chunk.__doc__ = BiliAPIClient.download_chunk.__doc__
     download_content_length.__doc__ = BiliAPIClient.download_content_length.__doc__
+    download_status.__doc__ = BiliAPIClient.download_status.__doc__
+    download_headers.__doc__ = BiliAPIClient.download_headers.__doc__
+    download_close.__doc__ = BiliAPIClient.download_close.__doc__
     close.__doc__ = BiliAPIClient.close.__doc__
@@ -16,11 +16,14 @@ bilibili_api.comment
 + 活动: {16279} `await get_activity_aid()`
 """
 
+import asyncio
 from enum import Enum
-from typing import Union, Optional
+from collections import deque
+from typing import Any, AsyncIterator, Deque, List, Tuple, Union, Optional
 
 from .utils.utils import get_api
 from .utils.network import Api, Credential
+from .utils.paginate import Paginator, PageAdapter, CursorAdapter, paginate
 from .exceptions.ArgsException import ArgsException
 
 API = get_api("common")
@@ -288,6 +291,42 @@ class Comment:
             await Api(**api, credential=self.credential).update_params(**params).result
         )
 
+    def iter_sub_comments(
+        self,
+        page_size: int = 20,
+        max_items: Optional[int] = None,
+        resume: Optional[dict] = None,
+        concurrency: int = 4,
+    ) -> Paginator:
+        """
+        逐条获取子评论。首页返回总数后并发获取之后的页。
+
+        Args:
+            page_size   (int, optional)        : 每页评论数，最大 20. Defaults to 20.
+
+            max_items   (int | None, optional) : 最多获取的数量. Defaults to None.
+
+            resume      (dict | None, optional): 从 `Paginator.checkpoint()` 返回的位置继续. Defaults to None.
+
+            concurrency (int, optional)        : 同时获取的页数. Defaults to 4.
+
+        Returns:
+            Paginator: 异步迭代器，每一项为 `get_sub_comments` 返回的 `["replies"]` 中的一项
+        """
+        adapter = PageAdapter(
+            fetch=lambda pn: self.get_sub_comments(pn, page_size),
+            items=lambda data: data.get("replies"),
+            total=lambda data: data.get("page", {}).get("count"),
+            page_size=min(page_size, 20),
+        )
+        return paginate(
+            adapter,
+            concurrency=concurrency,
+            max_items=max_items,
+            resume=resume,
+            key=lambda reply: reply["rpid"],
+        )
+
     async def report(
         self, report_reason: ReportReason, content: Optional[str] = None
     ) -> dict:
@@ -478,3 +517,257 @@ async def get_comments_lazy(
         "web_location": "1315875",
     }
     return await Api(**api, credential=credential).update_params(**params).result
+
+
+def iter_comments(
+    oid: int,
+    type_: CommentResourceType,
+    order: OrderType = OrderType.TIME,
+    credential: Union[Credential, None] = None,
+    max_items: Optional[int] = None,
+    resume: Optional[dict] = None,
+) -> Paginator:
+    """
+    逐条获取资源评论（不含子评论），使用 `get_comments_lazy` 按偏移量翻页。
+
+    Args:
+        oid        (int)                  : 资源 ID。
+
+        type_      (CommentResourceType)  : 资源类枚举。
+
+        order      (OrderType, optional)  : 排序方式枚举. Defaults to OrderType.TIME.
+
+        credential (Credential, optional) : 凭据。Defaults to None.
+
+        max_items  (int | None, optional) : 最多获取的数量. Defaults to None.
+
+        resume     (dict | None, optional): 从 `Paginator.checkpoint()` 返回的位置继续. Defaults to None.
+
+    Returns:
+        Paginator: 异步迭代器，每一项为 `get_comments_lazy` 返回的 `["replies"]` 中的一项
+    """
+    adapter = CursorAdapter(
+        fetch=lambda offset: get_comments_lazy(oid, type_, offset, order, credential),
+        items=lambda data: data.get("replies"),
+        next_cursor=lambda data: data["cursor"]
+        .get("pagination_reply", {})
+        .get("next_offset"),
+        has_more=lambda data: not data["cursor"].get("is_end", True),
+    )
+    return paginate(
+        adapter, max_items=max_items, resume=resume, key=lambda reply: reply["rpid"]
+    )
+
+
+def compact_comment(reply: dict) -> dict:
+    """
+    将评论转换为只包含常用字段的记录。
+
+    Args:
+        reply (dict): 接口返回的评论
+
+    Returns:
+        dict: rpid, root, parent, mid, uname, level, message, like, rcount, ctime
+    """
+    member = reply.get("member") or {}
+    return {
+        "rpid": reply.get("rpid"),
+        "root": reply.get("root", 0),
+        "parent": reply.get("parent", 0),
+        "mid": reply.get("mid") or int(member.get("mid") or 0),
+        "uname": member.get("uname", ""),
+        "level": (member.get("level_info") or {}).get("current_level", 0),
+        "message": (reply.get("content") or {}).get("message", ""),
+        "like": reply.get("like", 0),
+        "rcount": reply.get("rcount", 0),
+        "ctime": reply.get("ctime", 0),
+    }
+
+
+class CommentStream:
+    """
+    资源全部评论（含子评论）的异步迭代器，由 `iter_all_comments` 创建。
+
+    按偏移量逐页获取根评论，同时展开之后若干条根评论的子评论，
+    每条根评论之后紧接着产出它的全部子评论。
+
+    `checkpoint()` 返回当前根评论的位置，继续时会重新产出该根评论及其子评论。
+    """
+
+    def __init__(
+        self,
+        oid: int,
+        type_: CommentResourceType,
+        order: OrderType = OrderType.TIME,
+        credential: Union[Credential, None] = None,
+        concurrency: int = 4,
+        compact: bool = False,
+        expand: bool = True,
+        max_items: Optional[int] = None,
+        resume: Optional[dict] = None,
+    ) -> None:
+        """
+        Args:
+            参数见 `iter_all_comments`。
+        """
+        self.__oid = oid
+        self.__type = type_
+        self.__credential = credential
+        self.__concurrency = max(concurrency, 1)
+        self.__compact = compact
+        self.__expand = expand
+        self.__max_items = max_items
+        self.__roots = iter_comments(oid, type_, order, credential, resume=resume)
+        self.__position = self.__roots.checkpoint()
+        self.__semaphore: Optional[asyncio.Semaphore] = None
+        self.__iterator: Optional[AsyncIterator[dict]] = None
+
+    def checkpoint(self) -> dict:
+        """
+        获取当前位置，可以被 json 序列化。
+
+        Returns:
+            dict: 位置，`done` 为 True 时表示已经全部获取
+        """
+        return dict(self.__position)
+
+    def __aiter__(self) -> AsyncIterator[dict]:
+        if self.__iterator is None:
+            self.__iterator = self.__items()
+        return self.__iterator
+
+    async def __anext__(self) -> dict:
+        return await self.__aiter__().__anext__()
+
+    async def aclose(self) -> None:
+        """
+        提前结束迭代，取消正在进行的请求。
+        """
+        if self.__iterator is not None:
+            await self.__iterator.aclose()
+
+    async def collect(self) -> List[dict]:
+        """
+        获取全部评论。
+
+        Returns:
+            List[dict]: 所有评论
+        """
+        return [reply async for reply in self]
+
+    async def __items(self) -> AsyncIterator[dict]:
+        if self.__position.get("done"):
+            return
+        seen = set()
+        count = 0
+        # (根评论位置, 根评论, 展开子评论的任务)
+        window: Deque[Tuple[dict, dict, asyncio.Future]] = deque()
+        roots = self.__roots.__aiter__()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(window) < self.__concurrency:
+                    try:
+                        root = await roots.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    window.append(
+                        (
+                            self.__roots.checkpoint(),
+                            root,
+                            asyncio.ensure_future(self.__expand_replies(root)),
+                        )
+                    )
+                if not window:
+                    break
+                position, root, task = window.popleft()
+                self.__position = position
+                replies = await task
+                records = [self.__record(root)] + replies
+                for record in records:
+                    if record["rpid"] in seen:
+                        continue
+                    if self.__max_items is not None and count >= self.__max_items:
+                        return
+                    seen.add(record["rpid"])
+                    count += 1
+                    yield record
+            self.__position = self.__roots.checkpoint()
+        finally:
+            for _, _, task in window:
+                task.cancel()
+                if task.done() and not task.cancelled():
+                    task.exception()
+            await self.__roots.aclose()
+
+    def __record(self, reply: dict) -> dict:
+        return compact_comment(reply) if self.__compact else reply
+
+    async def __expand_replies(self, root: dict) -> List[dict]:
+        inline = root.get("replies") or []
+        if not self.__expand or root.get("rcount", 0) <= len(inline):
+            return [self.__record(reply) for reply in inline]
+
+        cmt = Comment(self.__oid, self.__type, root["rpid"], self.__credential)
+        adapter = PageAdapter(
+            fetch=lambda pn: self.__limited(cmt.get_sub_comments(pn, 20)),
+            items=lambda data: data.get("replies"),
+            total=lambda data: data.get("page", {}).get("count"),
+            page_size=20,
+        )
+        return [
+            self.__record(reply)
+            async for reply in paginate(adapter, concurrency=self.__concurrency)
+        ]
+
+    async def __limited(self, coro: Any) -> dict:
+        # 所有根评论的子评论请求共享并发上限
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.__concurrency)
+        async with self.__semaphore:
+            return await coro
+
+
+def iter_all_comments(
+    oid: int,
+    type_: CommentResourceType,
+    order: OrderType = OrderType.TIME,
+    credential: Union[Credential, None] = None,
+    concurrency: int = 4,
+    compact: bool = False,
+    expand: bool = True,
+    max_items: Optional[int] = None,
+    resume: Optional[dict] = None,
+) -> CommentStream:
+    """
+    逐条获取资源的全部评论，包括每条根评论下的全部子评论。
+
+    根评论按偏移量逐页获取，之后 `concurrency` 条根评论的子评论并发展开，
+    子评论请求共享 `concurrency` 的并发上限。评论按 rpid 去重。
+
+    Args:
+        oid         (int)                  : 资源 ID。
+
+        type_       (CommentResourceType)  : 资源类枚举。
+
+        order       (OrderType, optional)  : 根评论排序方式枚举. Defaults to OrderType.TIME.
+
+        credential  (Credential, optional) : 凭据。Defaults to None.
+
+        concurrency (int, optional)        : 同时展开的根评论数和子评论请求数. Defaults to 4.
+
+        compact     (bool, optional)       : 产出 `compact_comment` 的精简记录，而不是接口返回的完整评论. Defaults to False.
+
+        expand      (bool, optional)       : 是否请求全部子评论，否则只产出根评论自带的几条. Defaults to True.
+
+        max_items   (int | None, optional) : 最多获取的评论数（含子评论）. Defaults to None.
+
+        resume      (dict | None, optional): 从 `CommentStream.checkpoint()` 返回的位置继续. Defaults to None.
+
+    Returns:
+        CommentStream: 异步迭代器，根评论之后紧接着它的子评论
+    """
+    return CommentStream(
+        oid, type_, order, credential, concurrency, compact, expand, max_items, resume
+    )
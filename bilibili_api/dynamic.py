@@ -23,14 +23,12 @@ from .exceptions import ArgsException
 from .article import Article
 from .opus import Opus
 from .utils import cache_pool
+from .utils.paginate import Paginator, PageAdapter, CursorAdapter, paginate
 
 API = utils.get_api("dynamic")
 API_opus = utils.get_api("opus")
 raise_for_statement = utils.raise_for_statement
 
-uid2uname = {}
-uname2uid = {}
-
 
 class DynamicType(Enum):
     """
@@ -77,27 +75,6 @@ class DynamicContentType(Enum):
     VOTE = 4
 
 
-async def _name2uid(uname: str, credential: Credential) -> int:
-    global uname2uid
-    if uname2uid.get(uname) is None:
-        resp = (await user.name2uid(uname, credential=credential))["uid_list"]
-        if len(resp) == 0:
-            return 0
-        if resp[0]["name"] != uname:
-            return 0
-        uname2uid[uname] = resp[0]["uid"]
-    return uname2uid[uname]
-
-
-async def _uid2name(uid: int, credential: Credential) -> str:
-    global uid2uname
-    if uid2uname.get(uid) is None:
-        uid2uname[uid] = (await user.User(uid, credential=credential).get_user_info())[
-            "name"
-        ]
-    return uid2uname[uid]
-
-
 async def _parse_at(text: str, credential: Credential) -> Tuple[str, str, str]:
     """
     @人格式：“@用户名 ”(注意最后有空格）
@@ -111,12 +88,12 @@ async def _parse_at(text: str, credential: Credential) -> Tuple[str, str, str]:
     """
     text += " "
     pattern = re.compile(r"(?<=@).*?(?=\s)")
-    match_result = re.finditer(pattern, text)
+    match_result = [match.group() for match in re.finditer(pattern, text)]
+    uids = await user.resolve_names(match_result, credential=credential)
     uid_list = []
     names = []
-    for match in match_result:
-        uname = match.group()
-        uid = await _name2uid(uname, credential=credential)
+    for uname in match_result:
+        uid = uids[uname]
         if uid == 0:
             continue
         uid_list.append(str(uid))
@@ -521,6 +498,28 @@ class BuildDynamic:
             list: 动态内容
         """
         contents = self.contents
+        # 一次解析所有 @ 的用户名和 UID
+        at_contents = [
+            content
+            for content in contents
+            if content["type"] == DynamicContentType.AT.value
+        ]
+        uids = await user.resolve_names(
+            [
+                content["raw_text"][1:]
+                for content in at_contents
+                if content["biz_id"] == 0 and content["raw_text"] != "@"
+            ],
+            credential=credential,
+        )
+        names = await user.resolve_uids(
+            [
+                content["biz_id"]
+                for content in at_contents
+                if content["biz_id"] != 0 and content["raw_text"] == "@"
+            ],
+            credential=credential,
+        )
         for idx, content in enumerate(contents):
             if content["type"] == DynamicContentType.AT.value:
                 if content["biz_id"] == 0:
@@ -531,7 +530,7 @@ class BuildDynamic:
                             "raw_text": "@",
                         }
                         continue
-                    uid = await _name2uid(content["raw_text"][1:], credential)
+                    uid = uids[content["raw_text"][1:]]
                     if uid == 0:
                         contents[idx] = {
                             "biz_id": "",
@@ -541,8 +540,8 @@ class BuildDynamic:
                     else:
                         contents[idx]["biz_id"] = str(uid)
                 elif content["raw_text"] == "@":
-                    contents[idx]["raw_text"] = "@" + await _uid2name(
-                        content["biz_id"], credential=credential
+                    contents[idx]["raw_text"] = "@" + (
+                        names[int(content["biz_id"])] or ""
                     )
             if content["type"] == DynamicContentType.VOTE.value:
                 contents[idx]["raw_text"] = (
@@ -757,23 +756,23 @@ class Dynamic:
                 .update_params(**params)
                 .result
             )
-            cache_pool.dynamic_is_article[self.__dynamic_id] = (
-                self.__detail["item"]["basic"]["comment_type"] == 12
+        cache_pool.dynamic_is_article[self.__dynamic_id] = (
+            self.__detail["item"]["basic"]["comment_type"] == 12
+        )
+        if cache_pool.dynamic_is_article[self.__dynamic_id]:
+            cache_pool.dynamic2article[self.__dynamic_id] = int(
+                self.__detail["item"]["basic"]["rid_str"]
+            )
+            cache_pool.article2dynamic[
+                cache_pool.dynamic2article[self.__dynamic_id]
+            ] = self.__dynamic_id
+        module_dynamic = self.__detail["item"]["modules"]["module_dynamic"]
+        if module_dynamic.get("major") is None:
+            cache_pool.dynamic_is_opus[self.__dynamic_id] = False
+        else:
+            cache_pool.dynamic_is_opus[self.__dynamic_id] = (
+                module_dynamic["major"]["type"] == "MAJOR_TYPE_OPUS"
             )
-            if cache_pool.dynamic_is_article[self.__dynamic_id]:
-                cache_pool.dynamic2article[self.__dynamic_id] = int(
-                    self.__detail["item"]["basic"]["rid_str"]
-                )
-                cache_pool.article2dynamic[
-                    cache_pool.dynamic2article[self.__dynamic_id]
-                ] = self.__dynamic_id
-            module_dynamic = self.__detail["item"]["modules"]["module_dynamic"]
-            if module_dynamic.get("major") is None:
-                cache_pool.dynamic_is_opus[self.__dynamic_id] = False
-            else:
-                cache_pool.dynamic_is_opus[self.__dynamic_id] = (
-                    module_dynamic["major"]["type"] == "MAJOR_TYPE_OPUS"
-                )
         return self.__detail
 
     async def is_article(self) -> bool:
@@ -941,6 +940,28 @@ class Dynamic:
             await Api(**api, credential=self.credential).update_params(**params).result
         )
 
+    def iter_reaction(
+        self, max_items: Optional[int] = None, resume: Optional[dict] = None
+    ) -> Paginator:
+        """
+        逐个获取点赞、转发
+
+        Args:
+            max_items (int | None, optional) : 最多获取的数量. Defaults to None.
+
+            resume    (dict | None, optional): 从 `Paginator.checkpoint()` 返回的位置继续. Defaults to None.
+
+        Returns:
+            Paginator: 异步迭代器，每一项为 `get_reaction` 返回的 `["items"]` 中的一项
+        """
+        adapter = CursorAdapter(
+            fetch=self.get_reaction,
+            items=lambda data: data.get("items"),
+            next_cursor=lambda data: data.get("offset"),
+            has_more=lambda data: data.get("has_more", False),
+        )
+        return paginate(adapter, max_items=max_items, resume=resume)
+
     async def get_reposts(self, offset: str = "0") -> dict:
         """
         获取动态转发列表
@@ -959,6 +980,29 @@ class Dynamic:
             await Api(**api, credential=self.credential).update_params(**params).result
         )
 
+    def iter_reposts(
+        self, max_items: Optional[int] = None, resume: Optional[dict] = None
+    ) -> Paginator:
+        """
+        逐条获取动态转发
+
+        Args:
+            max_items (int | None, optional) : 最多获取的数量. Defaults to None.
+
+            resume    (dict | None, optional): 从 `Paginator.checkpoint()` 返回的位置继续. Defaults to None.
+
+        Returns:
+            Paginator: 异步迭代器，每一项为 `get_reposts` 返回的 `["items"]` 中的一项
+        """
+        adapter = CursorAdapter(
+            fetch=self.get_reposts,
+            items=lambda data: data.get("items"),
+            next_cursor=lambda data: data.get("offset"),
+            has_more=lambda data: bool(data.get("has_more")),
+            start="0",
+        )
+        return paginate(adapter, max_items=max_items, resume=resume)
+
     async def get_rid(self) -> int:
         """
         获取 rid，以传入 `comment.get_comments_lazy` 等函数 oid 参数对评论区进行操作
@@ -986,6 +1030,43 @@ class Dynamic:
             await Api(**api, credential=self.credential).update_params(**params).result
         )
 
+    def iter_likes(
+        self,
+        ps: int = 30,
+        max_items: Optional[int] = None,
+        resume: Optional[dict] = None,
+        concurrency: int = 4,
+    ) -> Paginator:
+        """
+        逐个获取动态点赞。首页返回总数后并发获取之后的页。
+
+        Args:
+            ps          (int, optional)        : 每页大小. Defaults to 30.
+
+            max_items   (int | None, optional) : 最多获取的数量. Defaults to None.
+
+            resume      (dict | None, optional): 从 `Paginator.checkpoint()` 返回的位置继续. Defaults to None.
+
+            concurrency (int, optional)        : 同时获取的页数. Defaults to 4.
+
+        Returns:
+            Paginator: 异步迭代器，每一项为 `get_likes` 返回的 `["item_likes"]` 中的一项
+        """
+        adapter = PageAdapter(
+            fetch=lambda pn: self.get_likes(pn, ps),
+            items=lambda data: data.get("item_likes"),
+            total=lambda data: data.get("total_count"),
+            page_size=ps,
+            has_more=lambda data: bool(data.get("has_more")),
+        )
+        return paginate(
+            adapter,
+            concurrency=concurrency,
+            max_items=max_items,
+            resume=resume,
+            key=lambda like: like["uid"],
+        )
+
     async def set_like(self, status: bool = True) -> dict:
         """
         设置动态点赞状态
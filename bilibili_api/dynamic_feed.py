@@ -0,0 +1,385 @@
+"""
+bilibili_api.dynamic_feed
+
+多个用户动态的增量同步。
+"""
+
+import os
+import json
+import time
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .user import User
+from .utils.network import Credential
+from .utils.AsyncEvent import AsyncEvent
+from .utils.scheduler import DeadlineScheduler
+
+# 调度器中表示定期调用 store.flush() 的键
+_FLUSH = object()
+
+
+class FeedStore(ABC):
+    """
+    动态同步状态存储的抽象类，继承并实现 `get` / `set` 即可使用其他存储方式。
+
+    每个用户的状态是可以被 json 序列化的 dict，包含：
+
+    + id_str    : 已获取的最新动态 ID
+    + pub_ts    : 已获取的最新动态发布时间
+    + gap       : 估计的平均发布间隔（秒）
+    + interval  : 当前轮询间隔（秒）
+    + next_poll : 下次轮询的时间戳
+    """
+
+    @abstractmethod
+    async def get(self, uid: int) -> Optional[dict]:
+        """
+        获取用户的同步状态。
+
+        Args:
+            uid (int): 用户 UID
+
+        Returns:
+            dict | None: 状态，没有时返回 None
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, uid: int, state: dict) -> None:
+        """
+        保存用户的同步状态。
+
+        Args:
+            uid   (int) : 用户 UID
+
+            state (dict): 状态
+        """
+        raise NotImplementedError
+
+    async def flush(self) -> None:
+        """
+        将状态写入持久存储。`DynamicFeed` 会定期以及停止时调用。
+        """
+
+
+class MemoryFeedStore(FeedStore):
+    """
+    保存在内存中的同步状态。
+    """
+
+    def __init__(self, states: Optional[Dict[int, dict]] = None) -> None:
+        """
+        Args:
+            states (Dict[int, dict] | None, optional): 初始状态. Defaults to None.
+        """
+        self.states: Dict[int, dict] = dict(states or {})
+
+    async def get(self, uid: int) -> Optional[dict]:
+        return self.states.get(uid)
+
+    async def set(self, uid: int, state: dict) -> None:
+        self.states[uid] = state
+
+
+class JsonFeedStore(MemoryFeedStore):
+    """
+    保存在 json 文件中的同步状态，`flush` 时整体写入。
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): 文件路径，不存在时会在写入时创建
+        """
+        self.__path = path
+        states = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                states = {int(uid): state for uid, state in json.load(f).items()}
+        super().__init__(states)
+        self.__dirty = False
+
+    async def set(self, uid: int, state: dict) -> None:
+        await super().set(uid, state)
+        self.__dirty = True
+
+    async def flush(self) -> None:
+        if not self.__dirty:
+            return
+        tmp = self.__path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.states, f, ensure_ascii=False)
+        os.replace(tmp, self.__path)
+        self.__dirty = False
+
+
+class DynamicFeed(AsyncEvent):
+    """
+    多个用户动态的增量同步。
+
+    为每个用户记录已获取的最新动态（高水位），轮询时从第一页开始翻页，
+    遇到不晚于高水位的动态即停止，只产出新动态。
+    每个用户的轮询间隔按其发布频率调整：发布越频繁轮询越频繁，
+    没有新动态时逐渐放慢，范围为 `min_interval` 到 `max_interval`。
+
+    新动态按各用户的发布顺序产出，可以通过 `stream()` 异步迭代，
+    也可以监听事件：
+
+    + DYNAMIC: 新动态，参数为 `{"uid": int, "id_str": str, "pub_ts": int, "item": dict}`
+    + ERROR  : 获取失败，参数为 `{"uid": int, "exception": Exception}`，之后按当前间隔重试
+
+    ``` python
+    feed = DynamicFeed([660303135, 1033942996], store=JsonFeedStore("feed.json"))
+    async for event in feed.stream():
+        print(event["uid"], event["id_str"])
+    ```
+    """
+
+    def __init__(
+        self,
+        uids: Iterable[int] = (),
+        credential: Union[Credential, None] = None,
+        store: Optional[FeedStore] = None,
+        concurrency: int = 4,
+        min_interval: float = 60,
+        max_interval: float = 3600,
+        max_pages: int = 5,
+        emit_initial: bool = False,
+        flush_interval: float = 60,
+    ) -> None:
+        """
+        Args:
+            uids           (Iterable[int], optional)     : 用户 UID 列表. Defaults to ().
+
+            credential     (Credential | None, optional) : 凭据类. Defaults to None.
+
+            store          (FeedStore | None, optional)  : 同步状态存储. Defaults to MemoryFeedStore().
+
+            concurrency    (int, optional)               : 同时轮询的用户数. Defaults to 4.
+
+            min_interval   (float, optional)             : 最短轮询间隔（秒）. Defaults to 60.
+
+            max_interval   (float, optional)             : 最长轮询间隔（秒）. Defaults to 3600.
+
+            max_pages      (int, optional)               : 每次轮询最多翻的页数. Defaults to 5.
+
+            emit_initial   (bool, optional)              : 首次同步用户时是否产出第一页的动态，否则只记录高水位. Defaults to False.
+
+            flush_interval (float, optional)             : 调用 `store.flush()` 的间隔（秒）. Defaults to 60.
+        """
+        super().__init__()
+        self.credential: Credential = credential if credential else Credential()
+        self.store: FeedStore = store if store is not None else MemoryFeedStore()
+        self.__uids: Set[int] = set(uids)
+        self.__min_interval = min_interval
+        self.__max_interval = max(max_interval, min_interval)
+        self.__max_pages = max(max_pages, 1)
+        self.__emit_initial = emit_initial
+        self.__flush_interval = flush_interval
+        self.__streams: List[Tuple[asyncio.Queue, asyncio.Event]] = []
+        self.__scheduler = DeadlineScheduler(
+            self.__poll, concurrency=concurrency, clock=time.time
+        )
+        self.__running = False
+
+    def get_uids(self) -> List[int]:
+        """
+        获取同步的用户列表。
+
+        Returns:
+            List[int]: 用户 UID 列表
+        """
+        return list(self.__uids)
+
+    def add_uid(self, uid: int) -> None:
+        """
+        添加用户，运行中添加时立即轮询一次。
+
+        Args:
+            uid (int): 用户 UID
+        """
+        if uid in self.__uids:
+            return
+        self.__uids.add(uid)
+        if self.__running:
+            self.__scheduler.schedule(uid)
+
+    def remove_uid(self, uid: int) -> None:
+        """
+        移除用户，状态仍然保留在存储中。
+
+        Args:
+            uid (int): 用户 UID
+        """
+        self.__uids.discard(uid)
+        self.__scheduler.cancel(uid)
+
+    async def poll(self, uid: int) -> List[dict]:
+        """
+        同步一个用户的新动态，更新存储中的状态。
+
+        Args:
+            uid (int): 用户 UID
+
+        Returns:
+            List[dict]: 新动态，按发布顺序（旧的在前），每一项为 `User.get_dynamics_new` 返回的 `["items"]` 中的一项
+        """
+        state = dict(await self.store.get(uid) or {})
+        high = int(state.get("id_str") or 0)
+        user = User(uid, credential=self.credential)
+
+        new: List[dict] = []
+        offset = ""
+        for _ in range(self.__max_pages):
+            data = await user.get_dynamics_new(offset)
+            reached = False
+            for item in data.get("items") or []:
+                if int(item.get("id_str") or 0) <= high:
+                    # 置顶动态可能早于高水位，需要跳过而不是停止
+                    if _is_pinned(item):
+                        continue
+                    reached = True
+                    break
+                new.append(item)
+            # 首次同步只读取第一页
+            if reached or not high or not data.get("has_more") or not data.get("offset"):
+                break
+            offset = data["offset"]
+
+        new.sort(key=lambda item: int(item["id_str"]))
+        self.__update_state(state, new)
+        await self.store.set(uid, state)
+        return new if high or self.__emit_initial else []
+
+    def __update_state(self, state: dict, new: List[dict]) -> None:
+        now = time.time()
+        times = sorted(_pub_ts(item) for item in new if not _is_pinned(item))
+        if state.get("pub_ts"):
+            times.insert(0, state["pub_ts"])
+        interval = state.get("interval", self.__min_interval)
+        if len(times) >= 2 and times[-1] > times[0]:
+            gap = (times[-1] - times[0]) / (len(times) - 1)
+            if state.get("gap"):
+                gap = (gap + state["gap"]) / 2
+            state["gap"] = gap
+            interval = gap / 2
+        elif not new:
+            interval *= 1.5
+        interval = min(max(interval, self.__min_interval), self.__max_interval)
+
+        if new:
+            latest = new[-1]
+            state["id_str"] = latest["id_str"]
+            state["pub_ts"] = max(state.get("pub_ts") or 0, _pub_ts(latest))
+        state.setdefault("id_str", "0")
+        state["interval"] = interval
+        state["next_poll"] = now + interval
+
+    async def run(self) -> None:
+        """
+        开始轮询，直到调用 `stop()`。
+        """
+        self.__running = True
+        self.__scheduler.clear()
+        try:
+            for uid in self.__uids:
+                state = await self.store.get(uid) or {}
+                self.__scheduler.schedule(uid, state.get("next_poll", 0))
+            self.__scheduler.schedule(_FLUSH, time.time() + self.__flush_interval)
+            if self.__running:
+                await self.__scheduler.run()
+        finally:
+            self.__running = False
+            # 通知所有 stream() 取完已有的动态后结束
+            for _, closed in self.__streams:
+                closed.set()
+            await self.store.flush()
+
+    async def __poll(self, uid: Any) -> float:
+        if uid is _FLUSH:
+            await self.store.flush()
+            return time.time() + self.__flush_interval
+        try:
+            new = await self.poll(uid)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.dispatch("ERROR", {"uid": uid, "exception": e})
+            state = await self.store.get(uid) or {}
+            return time.time() + state.get("interval", self.__min_interval)
+        for item in new:
+            event = {
+                "uid": uid,
+                "id_str": item["id_str"],
+                "pub_ts": _pub_ts(item),
+                "item": item,
+            }
+            await self.emit("DYNAMIC", event)
+            for queue, _ in self.__streams:
+                await queue.put(event)
+        return (await self.store.get(uid) or {}).get("next_poll", 0)
+
+    def stop(self) -> None:
+        """
+        停止轮询。
+        """
+        self.__running = False
+        self.__scheduler.stop()
+
+    async def stream(self, maxsize: int = 1000) -> AsyncIterator[dict]:
+        """
+        异步迭代新动态，未运行时会开始轮询，迭代结束时停止。
+
+        队列已满时暂停产出新动态，直到被取出。轮询停止后（包括由其他调用者开始的轮询），
+        取完已有的动态即结束迭代。
+
+        Args:
+            maxsize (int, optional): 缓存的动态数. Defaults to 1000.
+
+        Returns:
+            AsyncIterator[dict]: 每一项与 DYNAMIC 事件的参数相同
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize)
+        closed = asyncio.Event()
+        stream = (queue, closed)
+        self.__streams.append(stream)
+        runner = None if self.__running else asyncio.create_task(self.run())
+        try:
+            while True:
+                if not queue.empty():
+                    yield queue.get_nowait()
+                    continue
+                if closed.is_set() or (runner is not None and runner.done()):
+                    break
+                getter = asyncio.ensure_future(queue.get())
+                closer = asyncio.ensure_future(closed.wait())
+                waits: List[Any] = [getter, closer] + ([runner] if runner else [])
+                try:
+                    await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    closer.cancel()
+                    if not getter.done():
+                        getter.cancel()
+                if getter.done() and not getter.cancelled():
+                    yield getter.result()
+            if runner is not None:
+                # 轮询异常结束时抛出异常
+                await runner
+        finally:
+            self.__streams.remove(stream)
+            if runner is not None:
+                self.stop()
+                if not runner.done():
+                    await asyncio.gather(runner, return_exceptions=True)
+
+
+def _pub_ts(item: dict) -> int:
+    return int(
+        ((item.get("modules") or {}).get("module_author") or {}).get("pub_ts") or 0
+    )
+
+
+def _is_pinned(item: dict) -> bool:
+    return ((item.get("modules") or {}).get("module_tag") or {}).get("text") == "置顶"
@@ -5,12 +5,13 @@ bilibili_api.favorite_list
 """
 
 from enum import Enum
-from typing import List, Union, Optional
+from typing import AsyncIterator, List, Union, Optional
 
 from . import user
 from .video import Video
 from .utils.utils import join, get_api, raise_for_statement
 from .utils.network import Api, Credential
+from .utils.paginate import Paginator, PageAdapter, paginate
 from .exceptions.ArgsException import ArgsException
 
 API = get_api("favorite-list")
@@ -165,6 +166,58 @@ class FavoriteList:
             credential=self.credential,
         )
 
+    def iter_content_video(
+        self,
+        keyword: Union[str, None] = None,
+        order: FavoriteListContentOrder = FavoriteListContentOrder.MTIME,
+        mode: SearchFavoriteListMode = SearchFavoriteListMode.ONLY,
+        tid: int = 0,
+        max_items: Optional[int] = None,
+        resume: Optional[dict] = None,
+        concurrency: int = 4,
+    ) -> Paginator:
+        """
+        逐个获取视频收藏夹内容。不搜索时首页返回总数后并发获取之后的页。
+
+        Args:
+            keyword     (str | None, optional)              : 搜索关键词. Defaults to None.
+
+            order       (FavoriteListContentOrder, optional): 排序方式. Defaults to FavoriteListContentOrder.MTIME.
+
+            mode        (SearchFavoriteListMode, optional)  : 搜索模式，默认仅当前收藏夹.
+
+            tid         (int, optional)                     : 分区 ID. Defaults to 0.
+
+            max_items   (int | None, optional)              : 最多获取的数量. Defaults to None.
+
+            resume      (dict | None, optional)             : 从 `Paginator.checkpoint()` 返回的位置继续. Defaults to None.
+
+            concurrency (int, optional)                     : 同时获取的页数. Defaults to 4.
+
+        Returns:
+            Paginator: 异步迭代器，每一项为 `get_content_video` 返回的 `["medias"]` 中的一项
+        """
+        raise_for_statement(
+            self.__type == FavoriteListType.VIDEO, "此函数仅在收藏夹为视频收藏家时可用"
+        )
+        raise_for_statement(self.__media_id != None, "视频收藏夹需要 media_id")
+
+        adapter = PageAdapter(
+            fetch=lambda page: self.get_content_video(page, keyword, order, mode, tid),
+            items=lambda data: data.get("medias"),
+            # 搜索时 media_count 仍为收藏夹总数
+            total=None if keyword else lambda data: data["info"]["media_count"],
+            page_size=20,
+            has_more=lambda data: data.get("has_more", False),
+        )
+        return paginate(
+            adapter,
+            concurrency=concurrency,
+            max_items=max_items,
+            resume=resume,
+            key=lambda media: media["id"],
+        )
+
     async def get_content(self, page: int = 1) -> dict:
         """
         获取收藏夹内容。
@@ -208,6 +261,185 @@ class FavoriteList:
             await Api(**api, credential=self.credential).update_params(**params).result
         )
 
+    async def get_content_info(self, ids: List[dict]) -> List[dict]:
+        """
+        批量获取收藏夹内容的信息。
+
+        Args:
+            ids (List[dict]): `get_content_ids_info` 返回的列表中的项，需要包含 id 和 type。建议每次不超过 20 个
+
+        Returns:
+            List[dict]: 调用 API 返回的结果，每一项与 `get_content_video` 返回的 `["medias"]` 中的一项格式相同
+        """
+        raise_for_statement(self.__media_id != None, "视频收藏夹需要 media_id")
+
+        api = API["info"]["list_content_info"]
+        params = {
+            "resources": ",".join(f"{item['id']}:{item['type']}" for item in ids),
+            "folder_id": self.__media_id,
+            "platform": "web",
+        }
+
+        return (
+            await Api(**api, credential=self.credential).update_params(**params).result
+        ) or []
+
+    def export_content(
+        self,
+        chunk_size: int = 20,
+        concurrency: int = 4,
+        state: Optional[dict] = None,
+    ) -> "FavoriteListExport":
+        """
+        导出收藏夹全部内容。
+
+        先一次获取所有内容的 ID，再分批并发获取内容信息，按收藏顺序逐项产出。
+
+        提供上次导出后 `FavoriteListExport.get_state()` 返回的状态时只获取新增的内容。
+
+        Args:
+            chunk_size  (int, optional)        : 每次请求获取的内容数. Defaults to 20.
+
+            concurrency (int, optional)        : 同时进行的请求数. Defaults to 4.
+
+            state       (dict | None, optional): 上次导出的状态. Defaults to None.
+
+        Returns:
+            FavoriteListExport: 异步迭代器
+        """
+        raise_for_statement(
+            self.__type == FavoriteListType.VIDEO, "此函数仅在收藏夹为视频收藏家时可用"
+        )
+        raise_for_statement(self.__media_id != None, "视频收藏夹需要 media_id")
+        return FavoriteListExport(self, chunk_size, concurrency, state)
+
+
+class FavoriteListExport:
+    """
+    收藏夹内容导出，由 `FavoriteList.export_content` 创建，异步迭代产出内容信息。
+
+    状态 `get_state()` 包含收藏夹内所有内容的 ID 和最新的收藏时间，可以被 json 序列化。
+    下次导出时传入该状态：有 ID 列表时只获取不在列表中的内容；只有收藏时间 `fav_time`
+    时按收藏顺序获取，遇到收藏时间不晚于它的内容即停止。
+
+    ``` python
+    export = fl.export_content(state=last_state)
+    async for media in export:
+        ...
+    last_state = export.get_state()
+    ```
+    """
+
+    def __init__(
+        self,
+        favorite_list: FavoriteList,
+        chunk_size: int = 20,
+        concurrency: int = 4,
+        state: Optional[dict] = None,
+    ) -> None:
+        """
+        Args:
+            参数见 `FavoriteList.export_content`。
+        """
+        self.__favorite_list = favorite_list
+        self.__chunk_size = max(chunk_size, 1)
+        self.__concurrency = concurrency
+        state = state or {}
+        self.__known = set(state["ids"]) if "ids" in state else None
+        self.__since: Optional[int] = state.get("fav_time")
+        self.__fav_time = self.__since
+        self.__ids: List[str] = list(state.get("ids", []))
+        self.__removed: List[str] = []
+        self.__iterator: Optional[AsyncIterator[dict]] = None
+
+    def get_state(self) -> dict:
+        """
+        获取导出状态。未导出完成时只包含已经产出的内容。
+
+        Returns:
+            dict: 状态
+        """
+        return {
+            "media_id": self.__favorite_list.get_media_id(),
+            "fav_time": self.__fav_time,
+            "ids": list(self.__ids),
+        }
+
+    def get_removed(self) -> List[str]:
+        """
+        获取上次导出后被移出收藏夹的内容，导出完成后可用。
+
+        Returns:
+            List[str]: 内容 ID，格式为 id:type
+        """
+        return list(self.__removed)
+
+    def __aiter__(self) -> AsyncIterator[dict]:
+        if self.__iterator is None:
+            self.__iterator = self.__items()
+        return self.__iterator
+
+    async def __anext__(self) -> dict:
+        return await self.__aiter__().__anext__()
+
+    async def aclose(self) -> None:
+        """
+        提前结束导出，取消正在进行的请求。
+        """
+        if self.__iterator is not None:
+            await self.__iterator.aclose()
+
+    async def collect(self) -> List[dict]:
+        """
+        导出全部内容。
+
+        Returns:
+            List[dict]: 所有内容信息
+        """
+        return [media async for media in self]
+
+    async def __items(self) -> AsyncIterator[dict]:
+        data = await self.__favorite_list.get_content_ids_info()
+        ids = data or []
+        keys = [f"{item['id']}:{item['type']}" for item in ids]
+        if self.__known is not None:
+            targets = [item for item, key in zip(ids, keys) if key not in self.__known]
+        else:
+            targets = ids
+        chunks = [
+            targets[i : i + self.__chunk_size]
+            for i in range(0, len(targets), self.__chunk_size)
+        ]
+
+        adapter = PageAdapter(
+            fetch=lambda page: self.__favorite_list.get_content_info(chunks[page - 1]),
+            items=lambda medias: medias,
+            total=lambda _: len(targets),
+            page_size=self.__chunk_size,
+            has_more=lambda _: True,
+        )
+        pager = paginate(
+            adapter, concurrency=self.__concurrency, max_pages=len(chunks)
+        )
+        # 只有收藏时间时，遇到不晚于它的内容即停止
+        stop_at = self.__since if self.__known is None else None
+        try:
+            if chunks:
+                async for media in pager:
+                    fav_time = media.get("fav_time", 0)
+                    if stop_at is not None and fav_time <= stop_at:
+                        break
+                    self.__fav_time = max(self.__fav_time or 0, fav_time)
+                    self.__ids.append(f"{media['id']}:{media['type']}")
+                    yield media
+        finally:
+            await pager.aclose()
+
+        current = set(keys)
+        if self.__known is not None:
+            self.__removed = [key for key in self.__known if key not in current]
+        self.__ids = keys
+
 
 async def get_video_favorite_list(
     uid: int,
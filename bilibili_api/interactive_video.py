@@ -15,8 +15,9 @@ import shutil
 import zipfile
 from urllib import parse
 from random import randint as rand
+import asyncio
 from asyncio import CancelledError, create_task
-from typing import List, Tuple, Union, Coroutine
+from typing import List, Tuple, Union, Callable, Coroutine
 
 from .exceptions import ApiException
 
@@ -811,6 +812,7 @@ class InteractiveVideoDownloader(AsyncEvent):
         downloader_mode: InteractiveVideoDownloaderMode = InteractiveVideoDownloaderMode.IVI,
         stream_detecting_params: dict = {},
         fetching_nodes_retry_times: int = 3,
+        fetching_nodes_concurrency: int = 8,
     ):
         """
         Args:
@@ -826,6 +828,8 @@ class InteractiveVideoDownloader(AsyncEvent):
 
             fetching_nodes_retry_times (int)                   : 获取节点时的最大重试次数
 
+            fetching_nodes_concurrency (int)                   : 获取节点时的最大并发数. Defaults to 8.
+
         `self_download_func` 函数应接受两个参数（第一个是下载 URL，第二个是输出地址（精确至文件名））
 
         为保证视频能被成功下载，请在自定义下载函数请求的时候加入 `bilibili_api.HEADERS` 头部。
@@ -840,6 +844,7 @@ class InteractiveVideoDownloader(AsyncEvent):
         self.__mode = downloader_mode
         self.__detect_params = stream_detecting_params
         self.__fetching_nodes_retry_times = fetching_nodes_retry_times
+        self.__fetching_nodes_concurrency = fetching_nodes_concurrency
 
     async def __download(self, url: str, out: str) -> None:
         dwn_id = await get_client().download_create(url=url, headers=HEADERS)
@@ -873,28 +878,147 @@ class InteractiveVideoDownloader(AsyncEvent):
 
         self.dispatch("DOWNLOAD_SUCCESS")
 
-    async def __main(self) -> None:
-        # 初始化
-        self.dispatch("START")
-        if self.__out == "":
-            self.__out = self.__video.get_bvid() + ".ivi"
-        if self.__out.endswith(".ivi"):
-            self.__out = self.__out.rstrip(".ivi")
-        if os.path.exists(self.__out + ".ivi"):
-            os.remove(self.__out + ".ivi")
-        tmp_dir_name = self.__out + ".tmp"
-        if not os.path.exists(tmp_dir_name):
-            os.mkdir(tmp_dir_name)
+    async def __fetch_node(
+        self, node: InteractiveNode, semaphore: asyncio.Semaphore
+    ) -> Tuple[dict, List[InteractiveNode]]:
+        """
+        获取顶点信息及所有可达顶点，失败时以指数退避重试
+        """
+        retry = 0
+        while True:
+            try:
+                async with semaphore:
+                    return await node.get_info(), await node.get_children()
+            except Exception as e:
+                retry += 1
+                if retry > self.__fetching_nodes_retry_times:
+                    raise ApiException("重试达到最大次数") from e
+                await asyncio.sleep(min(0.5 * 2 ** (retry - 1), 8))
+
+    async def __fetch_level(
+        self, level: List[InteractiveNode], semaphore: asyncio.Semaphore
+    ) -> List[Tuple[dict, List[InteractiveNode]]]:
+        """
+        并发获取同一层的所有顶点，任一顶点失败时取消其余请求
+        """
+        tasks = [create_task(self.__fetch_node(n, semaphore)) for n in level]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def __crawl_graph(
+        self,
+        root: InteractiveNode,
+        on_fetched: Callable[[InteractiveNode, dict, List[InteractiveNode]], None],
+    ) -> None:
+        """
+        按层并发遍历剧情图，每获取到一个顶点即调用 `on_fetched(顶点, 顶点信息, 可达顶点)`
+
+        同一 edge_id 只会获取一次。
+        """
+        semaphore = asyncio.Semaphore(self.__fetching_nodes_concurrency)
+        visited = {root.get_node_id()}
+        level = [root]
+        while level:
+            next_level = []
+            for now_node, (node, subs) in zip(
+                level, await self.__fetch_level(level, semaphore)
+            ):
+                on_fetched(now_node, node, subs)
+                for n in subs:
+                    if n.get_node_id() not in visited:
+                        visited.add(n.get_node_id())
+                        next_level.append(n)
+            level = next_level
+
+    async def __download_worker(self, queue: asyncio.Queue) -> None:
+        """
+        依次下载队列中的节点视频，队列中为 None 时结束
+        """
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            cid, out = item
+            self.dispatch("PREPARE_DOWNLOAD", {"cid": cid})
+            url = await self.__video.get_download_url(cid=cid)
+            streams = VideoDownloadURLDataDetecter(url).detect_best_streams(
+                **self.__detect_params
+            )
+            await self.__download_func(streams[0].url, out + ".video.mp4")  # type: ignore
+            await self.__download_func(streams[1].url, out + ".audio.mp4")  # type: ignore
+
+    async def __crawl_and_download(
+        self,
+        root: InteractiveNode,
+        on_fetched: Callable[[InteractiveNode, dict, List[InteractiveNode]], None],
+        get_out: Callable[[int, str], str],
+    ) -> None:
+        """
+        遍历剧情图，同时下载已获取到的顶点的视频 (每个 cid 只下载一次)
+
+        Args:
+            root       (InteractiveNode): 根顶点
+            on_fetched (Callable)       : 获取到顶点时的回调
+            get_out    (Callable)       : 根据 cid 与顶点标题生成输出地址 (不含后缀)
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        worker = create_task(self.__download_worker(queue))
+        cid_set = set()
+
+        def on_node(now_node: InteractiveNode, node: dict, subs: list) -> None:
+            on_fetched(now_node, node, subs)
+            if worker.done():
+                # 下载出错时尽早结束遍历
+                worker.result()
+            cid = now_node.get_cid()
+            if cid not in cid_set:
+                cid_set.add(cid)
+                queue.put_nowait((cid, get_out(cid, node["title"])))
+
+        try:
+            await self.__crawl_graph(root, on_node)
+            queue.put_nowait(None)
+            await worker
+        finally:
+            worker.cancel()
+
+    def __edges_collector(
+        self, edges_info: dict, root: InteractiveNode, with_jumping: bool
+    ) -> Callable[[InteractiveNode, dict, List[InteractiveNode]], None]:
+        """
+        生成将顶点信息写入 edges_info 的回调
+
+        Args:
+            edges_info   (dict)           : 存储顶点信息
+            root         (InteractiveNode): 根顶点
+            with_jumping (bool)           : 是否记录跳转信息及变量 (ivi 文件格式)
+        """
 
         def createEdge(edge_id: int):
             """
             创建节点信息到 edges_info
             """
-            edges_info[edge_id] = {
-                "title": None,
-                "cid": None,
-                "sub": [],
-            }
+            if with_jumping:
+                edges_info[edge_id] = {
+                    "title": None,
+                    "cid": None,
+                    "sub": [],
+                }
+            else:
+                edges_info[edge_id] = {
+                    "title": None,
+                    "cid": None,
+                    "button": None,
+                    "condition": None,
+                    "jump_type": None,
+                    "is_default": None,
+                    "command": None,
+                    "sub": [],
+                }
 
         def var2dict(var: InteractiveVariable):
             return {
@@ -905,52 +1029,25 @@ class InteractiveVideoDownloader(AsyncEvent):
                 "random": var.is_random(),
             }
 
-        # 存储顶点信息
-        edges_info = {}
-
-        # 使用队列来遍历剧情图，初始为 None 是为了从初始顶点开始
-        queue: List[InteractiveNode] = [
-            await (await self.__video.get_graph()).get_root_node()
-        ]
-
         # 设置初始顶点
-        n = await (await self.__video.get_graph()).get_root_node()
-        if n.get_node_id() not in edges_info:
-            createEdge(n.get_node_id())
-        edges_info[n.get_node_id()]["cid"] = n.get_cid()
-        edges_info[n.get_node_id()]["vars"] = [var2dict(var) for var in n.get_vars()]
-
-        while queue:
-            # 出队
-            now_node = queue.pop()
-
-            if (
-                now_node.get_node_id() in edges_info
-                and edges_info[now_node.get_node_id()]["title"] is not None
-                and edges_info[now_node.get_node_id()]["cid"] is not None
-            ):
-                # 该情况为已获取到所有信息，说明是跳转到之前已处理的顶点，不作处理
-                continue
-
-            # 获取顶点信息，最大重试 3 次
-            retry = self.__fetching_nodes_retry_times
-            while True:
-                try:
-                    node = await now_node.get_info()
-                    subs = await now_node.get_children()
-                    self.dispatch(
-                        "GET",
-                        {
-                            "title": node["title"],
-                            "node_id": node["edge_id"],
-                            "cid": now_node.get_cid(),
-                        },
-                    )
-                    break
-                except Exception as e:
-                    retry -= 1
-                    if retry < 0:
-                        raise ApiException("重试达到最大次数")
+        createEdge(root.get_node_id())
+        edges_info[root.get_node_id()]["cid"] = root.get_cid()
+        if with_jumping:
+            edges_info[root.get_node_id()]["vars"] = [
+                var2dict(var) for var in root.get_vars()
+            ]
+
+        def collect(
+            now_node: InteractiveNode, node: dict, subs: List[InteractiveNode]
+        ) -> None:
+            self.dispatch(
+                "GET",
+                {
+                    "title": node["title"],
+                    "node_id": now_node.get_node_id(),
+                    "cid": now_node.get_cid(),
+                },
+            )
 
             # 检查节顶点是否在 edges_info 中，本次步骤得到 title 信息
             if node["edge_id"] not in edges_info:
@@ -962,7 +1059,7 @@ class InteractiveVideoDownloader(AsyncEvent):
 
             # 无可达顶点，即不能再往下走了，类似树的叶子节点
             if "questions" not in node["edges"]:
-                continue
+                return
 
             # 遍历所有可达顶点
             for n in subs:
@@ -970,6 +1067,8 @@ class InteractiveVideoDownloader(AsyncEvent):
                 if n.get_node_id() not in edges_info:
                     createEdge(n.get_node_id())
                 edges_info[n.get_node_id()]["cid"] = n.get_cid()
+                if not with_jumping:
+                    continue
                 edges_info[now_node.get_node_id()]["sub"].append(
                     {
                         "id": n.get_node_id(),
@@ -977,13 +1076,37 @@ class InteractiveVideoDownloader(AsyncEvent):
                         "align": n.get_self_button().get_align(),
                         "pos": n.get_self_button().get_pos(),
                         "condition": n.get_jumping_condition().get_condition(),  # type: ignore
-                        "jump_type": await now_node.get_jumping_type(),
+                        "jump_type": node["edges"]["questions"][0]["type"],
                         "is_default": n.is_default(),
                         "command": n.get_jumping_command().get_command(),  # type: ignore
                     }
                 )
-                # # 所有可达顶点 ID 入队
-                queue.insert(0, n)
+
+        return collect
+
+    async def __main(self) -> None:
+        # 初始化
+        self.dispatch("START")
+        if self.__out == "":
+            self.__out = self.__video.get_bvid() + ".ivi"
+        if self.__out.endswith(".ivi"):
+            self.__out = self.__out.rstrip(".ivi")
+        if os.path.exists(self.__out + ".ivi"):
+            os.remove(self.__out + ".ivi")
+        tmp_dir_name = self.__out + ".tmp"
+        if not os.path.exists(tmp_dir_name):
+            os.mkdir(tmp_dir_name)
+
+        # 存储顶点信息
+        edges_info = {}
+        root = await (await self.__video.get_graph()).get_root_node()
+
+        # 遍历剧情图的同时下载已获取到的顶点视频
+        await self.__crawl_and_download(
+            root,
+            self.__edges_collector(edges_info, root, with_jumping=True),
+            lambda cid, title: tmp_dir_name + "/" + str(cid),
+        )
 
         json.dump(
             edges_info,
@@ -994,33 +1117,12 @@ class InteractiveVideoDownloader(AsyncEvent):
             {
                 "bvid": self.__video.get_bvid(),
                 "title": (await self.__video.get_info())["title"],
-                "root_id": (
-                    await (await self.__video.get_graph()).get_root_node()
-                ).get_node_id(),
+                "root_id": root.get_node_id(),
             },
             open(tmp_dir_name + "/bilivideo.json", "w+", encoding="utf-8"),
             indent=2,
         )
 
-        cid_set = set()
-        for key, item in edges_info.items():
-            cid = item["cid"]
-            if not cid in cid_set:
-                self.dispatch("PREPARE_DOWNLOAD", {"cid": item["cid"]})
-                cid_set.add(cid)
-                url = await self.__video.get_download_url(cid=cid)
-                streams = VideoDownloadURLDataDetecter(url).detect_best_streams(
-                    **self.__detect_params
-                )
-                await self.__download_func(
-                    streams[0].url,
-                    tmp_dir_name + "/" + str(cid) + ".video.mp4",
-                )  # type: ignore
-                await self.__download_func(
-                    streams[1].url,
-                    tmp_dir_name + "/" + str(cid) + ".audio.mp4",
-                )  # type: ignore
-
         self.dispatch("PACKAGING")
         zip = zipfile.ZipFile(
             open(self.__out + ".ivi", "wb+"), mode="w", compression=zipfile.ZIP_DEFLATED
@@ -1042,111 +1144,16 @@ class InteractiveVideoDownloader(AsyncEvent):
         if not os.path.exists(tmp_dir_name):
             os.mkdir(tmp_dir_name)
 
-        def createEdge(edge_id: int):
-            """
-            创建节点信息到 edges_info
-            """
-            edges_info[edge_id] = {
-                "title": None,
-                "cid": None,
-                "button": None,
-                "condition": None,
-                "jump_type": None,
-                "is_default": None,
-                "command": None,
-                "sub": [],
-            }
-
-        def var2dict(var: InteractiveVariable):
-            return {
-                "name": var.get_name(),
-                "id": var.get_id(),
-                "value": var.get_value(),
-                "show": var.is_show(),
-                "random": var.is_random(),
-            }
-
         # 存储顶点信息
         edges_info = {}
+        root = await (await self.__video.get_graph()).get_root_node()
 
-        # 使用队列来遍历剧情图，初始为 None 是为了从初始顶点开始
-        queue: List[InteractiveNode] = [
-            await (await self.__video.get_graph()).get_root_node()
-        ]
-
-        # 设置初始顶点
-        n = await (await self.__video.get_graph()).get_root_node()
-        if n.get_node_id() not in edges_info:
-            createEdge(n.get_node_id())
-        edges_info[n.get_node_id()]["cid"] = n.get_cid()
-
-        while queue:
-            # 出队
-            now_node = queue.pop()
-
-            if (
-                now_node.get_node_id() in edges_info
-                and edges_info[now_node.get_node_id()]["title"] is not None
-                and edges_info[now_node.get_node_id()]["cid"] is not None
-            ):
-                # 该情况为已获取到所有信息，说明是跳转到之前已处理的顶点，不作处理
-                continue
-
-            # 获取顶点信息，最大重试 3 次
-            retry = self.__fetching_nodes_retry_times
-            while True:
-                try:
-                    node = await now_node.get_info()
-                    subs = await now_node.get_children()
-                    self.dispatch(
-                        "GET",
-                        {"title": node["title"], "node_id": now_node.get_node_id()},
-                    )
-                    break
-                except Exception as e:
-                    retry -= 1
-                    if retry < 0:
-                        raise ApiException("重试达到最大次数")
-
-            # 检查节顶点是否在 edges_info 中，本次步骤得到 title 信息
-            if node["edge_id"] not in edges_info:
-                # 不在，新建
-                createEdge(node["edge_id"])
-
-            # 设置 title
-            edges_info[node["edge_id"]]["title"] = node["title"]
-
-            # 无可达顶点，即不能再往下走了，类似树的叶子节点
-            if "questions" not in node["edges"]:
-                continue
-
-            # 遍历所有可达顶点
-            for n in subs:
-                # 该步骤获取顶点的 cid（视频分 P 的 ID）
-                if n.get_node_id() not in edges_info:
-                    createEdge(n.get_node_id())
-                edges_info[n.get_node_id()]["cid"] = n.get_cid()
-                # 所有可达顶点 ID 入队
-                queue.insert(0, n)
-
-        cid_set = set()
-        for key, item in edges_info.items():
-            cid = item["cid"]
-            if not cid in cid_set:
-                self.dispatch("PREPARE_DOWNLOAD", {"cid": item["cid"]})
-                cid_set.add(cid)
-                url = await self.__video.get_download_url(cid=cid)
-                streams = VideoDownloadURLDataDetecter(url).detect_best_streams(
-                    **self.__detect_params
-                )
-                await self.__download_func(
-                    streams[0].url,
-                    tmp_dir_name + "/" + str(cid) + " " + item["title"] + ".video.mp4",
-                )  # type: ignore
-                await self.__download_func(
-                    streams[1].url,
-                    tmp_dir_name + "/" + str(cid) + " " + item["title"] + ".audio.mp4",
-                )  # type: ignore
+        # 遍历剧情图的同时下载已获取到的顶点视频
+        await self.__crawl_and_download(
+            root,
+            self.__edges_collector(edges_info, root, with_jumping=False),
+            lambda cid, title: tmp_dir_name + "/" + str(cid) + " " + title,
+        )
 
         self.dispatch("SUCCESS")
 
@@ -1180,13 +1187,16 @@ class InteractiveVideoDownloader(AsyncEvent):
         node_info_dict = {}
         scripts = []
         graph = await self.__video.get_graph()
+        semaphore = asyncio.Semaphore(self.__fetching_nodes_concurrency)
         queue: List[InteractiveNode] = [await graph.get_root_node()]
         while queue:
             queue_backup = copy.copy(queue)
             queue = []
-            for cur_node in queue_backup:
-                cur_node_info = await cur_node.get_info()
-                cur_node_children = await cur_node.get_children()
+            # 同一层的顶点并发获取，再按顺序处理
+            fetched = await self.__fetch_level(queue_backup, semaphore)
+            for cur_node, (cur_node_info, cur_node_children) in zip(
+                queue_backup, fetched
+            ):
                 self.dispatch(
                     "GET",
                     {
@@ -1264,100 +1274,16 @@ class InteractiveVideoDownloader(AsyncEvent):
         if not os.path.exists(tmp_dir_name):
             os.mkdir(tmp_dir_name)
 
-        def createEdge(edge_id: int):
-            """
-            创建节点信息到 edges_info
-            """
-            edges_info[edge_id] = {
-                "title": None,
-                "cid": None,
-                "sub": [],
-            }
-
-        def var2dict(var: InteractiveVariable):
-            return {
-                "name": var.get_name(),
-                "id": var.get_id(),
-                "value": var.get_value(),
-                "show": var.is_show(),
-                "random": var.is_random(),
-            }
-
         # 存储顶点信息
         edges_info = {}
+        root = await (await self.__video.get_graph()).get_root_node()
 
-        # 使用队列来遍历剧情图，初始为 None 是为了从初始顶点开始
-        queue: List[InteractiveNode] = [
-            await (await self.__video.get_graph()).get_root_node()
-        ]
-
-        # 设置初始顶点
-        n = await (await self.__video.get_graph()).get_root_node()
-        if n.get_node_id() not in edges_info:
-            createEdge(n.get_node_id())
-        edges_info[n.get_node_id()]["cid"] = n.get_cid()
-        edges_info[n.get_node_id()]["vars"] = [var2dict(var) for var in n.get_vars()]
-
-        while queue:
-            # 出队
-            now_node = queue.pop()
-
-            if (
-                now_node.get_node_id() in edges_info
-                and edges_info[now_node.get_node_id()]["title"] is not None
-                and edges_info[now_node.get_node_id()]["cid"] is not None
-            ):
-                # 该情况为已获取到所有信息，说明是跳转到之前已处理的顶点，不作处理
-                continue
-
-            # 获取顶点信息，最大重试 3 次
-            retry = self.__fetching_nodes_retry_times
-            while True:
-                try:
-                    node = await now_node.get_info()
-                    subs = await now_node.get_children()
-                    self.dispatch(
-                        "GET",
-                        {"title": node["title"], "node_id": now_node.get_node_id()},
-                    )
-                    break
-                except Exception as e:
-                    retry -= 1
-                    if retry < 0:
-                        raise ApiException("重试达到最大次数")
-
-            # 检查节顶点是否在 edges_info 中，本次步骤得到 title 信息
-            if node["edge_id"] not in edges_info:
-                # 不在，新建
-                createEdge(node["edge_id"])
-
-            # 设置 title
-            edges_info[node["edge_id"]]["title"] = node["title"]
-
-            # 无可达顶点，即不能再往下走了，类似树的叶子节点
-            if "questions" not in node["edges"]:
-                continue
-
-            # 遍历所有可达顶点
-            for n in subs:
-                # 该步骤获取顶点的 cid（视频分 P 的 ID）
-                if n.get_node_id() not in edges_info:
-                    createEdge(n.get_node_id())
-                edges_info[n.get_node_id()]["cid"] = n.get_cid()
-                edges_info[now_node.get_node_id()]["sub"].append(
-                    {
-                        "id": n.get_node_id(),
-                        "text": n.get_self_button().get_text(),
-                        "align": n.get_self_button().get_align(),
-                        "pos": n.get_self_button().get_pos(),
-                        "condition": n.get_jumping_condition().get_condition(),  # type: ignore
-                        "jump_type": await now_node.get_jumping_type(),
-                        "is_default": n.is_default(),
-                        "command": n.get_jumping_command().get_command(),  # type: ignore
-                    }
-                )
-                # # 所有可达顶点 ID 入队
-                queue.insert(0, n)
+        # 遍历剧情图的同时下载已获取到的顶点视频
+        await self.__crawl_and_download(
+            root,
+            self.__edges_collector(edges_info, root, with_jumping=True),
+            lambda cid, title: tmp_dir_name + "/" + str(cid),
+        )
 
         json.dump(
             edges_info,
@@ -1368,33 +1294,12 @@ class InteractiveVideoDownloader(AsyncEvent):
             {
                 "bvid": self.__video.get_bvid(),
                 "title": (await self.__video.get_info())["title"],
-                "root_id": (
-                    await (await self.__video.get_graph()).get_root_node()
-                ).get_node_id(),
+                "root_id": root.get_node_id(),
             },
             open(tmp_dir_name + "/bilivideo.json", "w+", encoding="utf-8"),
             indent=2,
         )
 
-        cid_set = set()
-        for key, item in edges_info.items():
-            cid = item["cid"]
-            if not cid in cid_set:
-                self.dispatch("PREPARE_DOWNLOAD", {"cid": item["cid"]})
-                cid_set.add(cid)
-                url = await self.__video.get_download_url(cid=cid)
-                streams = VideoDownloadURLDataDetecter(url).detect_best_streams(
-                    **self.__detect_params
-                )
-                await self.__download_func(
-                    streams[0].url,
-                    tmp_dir_name + "/" + str(cid) + ".video.mp4",
-                )  # type: ignore
-                await self.__download_func(
-                    streams[1].url,
-                    tmp_dir_name + "/" + str(cid) + ".audio.mp4",
-                )  # type: ignore
-
         self.dispatch("SUCCESS")
 
     async def start(self) -> None:
@@ -4,6 +4,7 @@ bilibili_api.live
 直播相关
 """
 
+import re
 import json
 import time
 import base64
@@ -11,7 +12,7 @@ import struct
 import asyncio
 import logging
 from enum import Enum
-from typing import Any, List, Union
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 import brotli
 
@@ -19,10 +20,19 @@ from .utils.utils import get_api, raise_for_statement
 from .utils.danmaku import Danmaku
 from .utils.network import Credential, Api, HEADERS, get_client, BiliWsMsgType
 from .utils.AsyncEvent import AsyncEvent
+from .utils.cache_pool import CachePool
+from .utils.event_sink import EventSink
+from .utils.scheduler import DeadlineScheduler
 from .exceptions.LiveException import LiveException
 
 API = get_api("live")
 
+HEARTBEAT_INTERVAL = 30
+"弹幕连接心跳包间隔，同时也是等待心跳响应的超时时间，单位秒"
+
+CMD_PATTERN = re.compile(rb'\s*\{\s*"cmd"\s*:\s*"([^"\\]*)"')
+"不解码 json 时取出直播间消息类型，只匹配对象开头的 cmd，否则需要解码"
+
 
 class ScreenResolution(Enum):
     """
@@ -960,7 +970,11 @@ class LiveDanmaku(AsyncEvent):
         self.__ws = None
         self.__tasks = []
         self.__debug = debug
-        self.__heartbeat_timer = 60.0
+        self.__hub: Optional["LiveDanmakuHub"] = None
+        self.__sinks: List[EventSink] = []
+        # 下次发送心跳包的时间 / 已发送但未收到响应的心跳包的发送时间
+        self.__next_heartbeat = 0.0
+        self.__heartbeat_sent: Optional[float] = None
         self.err_reason: str = ""
 
         # logging
@@ -986,6 +1000,78 @@ class LiveDanmaku(AsyncEvent):
         """
         return self.__status
 
+    def dispatch(self, name: str, *args, **kwargs) -> None:
+        super().dispatch(name, *args, **kwargs)
+        # 同时在 LiveDanmakuHub 上发布，__ALL__ 由 LiveDanmakuHub 自行发布
+        if self.__hub is not None and name.upper() != "__ALL__":
+            self.__hub.dispatch(name, *args, **kwargs)
+
+    async def emit(self, name: str, *args, **kwargs) -> None:
+        await super().emit(name, *args, **kwargs)
+        # 不依次等待时 dispatch 已经在 LiveDanmakuHub 上发布
+        if self.__hub is not None and self.is_inline() and name.upper() != "__ALL__":
+            await self.__hub.emit(name, *args, **kwargs)
+
+    def add_sink(self, sink: EventSink) -> None:
+        """
+        添加事件队列，之后的事件会放入队列，已关闭的队列会自动移除
+
+        Args:
+            sink (EventSink): 事件队列
+        """
+        if sink not in self.__sinks:
+            self.__sinks.append(sink)
+
+    def remove_sink(self, sink: EventSink) -> None:
+        """
+        移除事件队列
+
+        Args:
+            sink (EventSink): 事件队列
+        """
+        if sink in self.__sinks:
+            self.__sinks.remove(sink)
+
+    def stream(
+        self,
+        cmds: Optional[Iterable[str]] = None,
+        maxsize: int = 10000,
+        policy: str = "block",
+        raw: bool = False,
+    ) -> EventSink:
+        """
+        创建并添加事件队列，可以异步迭代逐个取出事件，也可以通过 `batches()` 批量取出。
+
+        每个事件与 ALL 事件的参数相同。没有监听函数与队列需要的消息不会被解码。
+
+        ``` python
+        sink = room.stream(["DANMU_MSG"], policy="drop_oldest")
+        async for batch in sink.batches(100, 0.05):
+            ...
+        ```
+
+        Args:
+            cmds    (Iterable[str] | None, optional) : 只接收这些类型的事件，None 表示接收所有事件. Defaults to None.
+
+            maxsize (int, optional)                  : 队列容量. Defaults to 10000.
+
+            policy  (str, optional)                  : 队列满时的处理策略，可选 block（暂停接收数据）/ drop / drop_oldest / spill（写入临时文件）. Defaults to "block".
+
+            raw     (bool, optional)                 : 直播间消息的 data 是否为未解码的 json 字节串. Defaults to False.
+
+        Returns:
+            EventSink: 事件队列，调用 `close()` 后不再接收事件
+        """
+        sink = EventSink(maxsize, policy, cmds, raw)
+        self.add_sink(sink)
+        return sink
+
+    def _bind_hub(self, hub: "LiveDanmakuHub") -> None:
+        """
+        由 LiveDanmakuHub 管理连接，心跳、直播间信息与主机选择均交由 LiveDanmakuHub 处理
+        """
+        self.__hub = hub
+
     async def connect(self) -> None:
         """
         连接直播间
@@ -999,7 +1085,11 @@ class LiveDanmaku(AsyncEvent):
         if self.get_status() == self.STATUS_CLOSING:
             raise LiveException("正在关闭连接，不可调用")
 
-        await self.__main()
+        try:
+            await self.__main()
+        finally:
+            if self.__hub is not None:
+                self.__hub._release_host(self)
 
     async def disconnect(self) -> None:
         """
@@ -1026,23 +1116,28 @@ class LiveDanmaku(AsyncEvent):
         """
         self.__status = self.STATUS_CONNECTING
 
-        room = LiveRoom(self.room_display_id, self.credential)
         self.logger.info(f"准备连接直播间 {self.room_display_id}")
-        # 获取真实房间号
-        self.logger.debug("正在获取真实房间号")
-        info = await room.get_room_play_info()
-        self.__room_real_id = info["room_id"]
-        self.logger.debug(f"获取成功，真实房间号：{self.__room_real_id}")
-
-        # 获取直播服务器配置
-        self.logger.debug("正在获取聊天服务器配置")
-        conf = await room.get_danmu_info()
-        self.logger.debug("聊天服务器配置获取成功")
+        if self.__hub is not None:
+            self.__room_real_id, conf = await self.__hub._get_room_conf(
+                self.room_display_id
+            )
+        else:
+            room = LiveRoom(self.room_display_id, self.credential)
+            # 获取真实房间号
+            self.logger.debug("正在获取真实房间号")
+            info = await room.get_room_play_info()
+            self.__room_real_id = info["room_id"]
+            self.logger.debug(f"获取成功，真实房间号：{self.__room_real_id}")
+
+            # 获取直播服务器配置
+            self.logger.debug("正在获取聊天服务器配置")
+            conf = await room.get_danmu_info()
+            self.logger.debug("聊天服务器配置获取成功")
 
         # 连接直播间
         self.logger.debug("准备连接直播间")
         self.__client = get_client()
-        available_hosts: List[dict] = conf["host_list"]
+        available_hosts: List[dict] = list(conf["host_list"])
         retry = self.max_retry
         host = None
 
@@ -1052,16 +1147,32 @@ class LiveDanmaku(AsyncEvent):
             self.err_reason = "心跳响应超时"
             await self.__client.ws_close(self.__ws)  # type: ignore
 
+        @self.on("VERIFICATION_SUCCESSFUL")
+        async def on_verification_successful(data):
+            # 新建心跳任务
+            while len(self.__tasks) > 0:
+                self.__tasks.pop().cancel()
+            self.__next_heartbeat = time.monotonic()
+            self.__heartbeat_sent = None
+            if self.__hub is not None:
+                self.__hub._add_heartbeat(self)
+            else:
+                self.__tasks.append(asyncio.create_task(self.__heartbeat()))
+
         while True:
             self.err_reason = ""
-            # 重置心跳计时器
-            self.__heartbeat_timer = 0
             if not available_hosts:
                 self.err_reason = "已尝试所有主机但仍无法连接"
                 break
 
             if host is None or retry <= 0:
-                host = available_hosts.pop()
+                if self.__hub is not None:
+                    host = self.__hub._acquire_host(self, available_hosts)
+                    if host is None:
+                        self.err_reason = "所有主机连接数已满"
+                        break
+                else:
+                    host = available_hosts.pop()
                 retry = self.max_retry
 
             port = host["wss_port"]
@@ -1073,13 +1184,6 @@ class LiveDanmaku(AsyncEvent):
             try:
                 self.__ws = await self.__client.ws_create(uri, headers=HEADERS.copy())
 
-                @self.on("VERIFICATION_SUCCESSFUL")
-                async def on_verification_successful(data):
-                    # 新建心跳任务
-                    while len(self.__tasks) > 0:
-                        self.__tasks.pop().cancel()
-                    self.__tasks.append(asyncio.create_task(self.__heartbeat()))
-
                 self.logger.debug("连接主机成功, 准备发送认证信息")
                 await self.__send_verify_data(conf["token"])
 
@@ -1131,10 +1235,6 @@ class LiveDanmaku(AsyncEvent):
         self.logger.debug(f"收到信息：{data}")
 
         for info in data:
-            callback_info = {
-                "room_display_id": self.room_display_id,
-                "room_real_id": self.__room_real_id,
-            }
             # 依次处理并调用用户指定函数
             if (
                 info["datapack_type"]
@@ -1145,37 +1245,77 @@ class LiveDanmaku(AsyncEvent):
                     # 认证成功反馈
                     self.logger.info("连接服务器并认证成功")
                     self.__status = self.STATUS_ESTABLISHED
-                    callback_info["type"] = "VERIFICATION_SUCCESSFUL"
-                    callback_info["data"] = None
-                    self.dispatch("VERIFICATION_SUCCESSFUL", callback_info)
-                    self.dispatch("ALL", callback_info)
+                    await self.__publish("VERIFICATION_SUCCESSFUL", None)
 
             elif info["datapack_type"] == LiveDanmaku.DATAPACK_TYPE_HEARTBEAT_RESPONSE:
                 # 心跳包反馈，返回直播间人气
                 self.logger.debug("收到心跳包反馈")
-                # 重置心跳计时器
-                self.__heartbeat_timer = 30.0
-                callback_info["type"] = "VIEW"
-                callback_info["data"] = info["data"]["view"]
-                self.dispatch("VIEW", callback_info)
-                self.dispatch("ALL", callback_info)
+                # 收到响应后间隔一段时间再发送下一个心跳包
+                self.__heartbeat_sent = None
+                self.__next_heartbeat = time.monotonic() + HEARTBEAT_INTERVAL
+                await self.__publish("VIEW", info["data"]["view"])
 
             elif info["datapack_type"] == LiveDanmaku.DATAPACK_TYPE_NOTICE:
-                # 直播间弹幕、礼物等信息
-                callback_info["type"] = info["data"]["cmd"]
+                # 直播间弹幕、礼物等信息，先不解码 json 取出类型
+                raw = info["data"]
+                match = CMD_PATTERN.match(raw)
+                cmd = match.group(1).decode() if match else json.loads(raw)["cmd"]
 
                 # DANMU_MSG 事件名特殊：DANMU_MSG:4:0:2:2:2:0，需取出事件名，暂不知格式
-                if callback_info["type"].find("DANMU_MSG") > -1:
-                    callback_info["type"] = "DANMU_MSG"
-                    info["data"]["cmd"] = "DANMU_MSG"
-
-                callback_info["data"] = info["data"]
-                self.dispatch(callback_info["type"], callback_info)
-                self.dispatch("ALL", callback_info)
+                if cmd.find("DANMU_MSG") > -1:
+                    cmd = "DANMU_MSG"
+                await self.__publish(cmd, None, raw)
 
             else:
                 self.logger.warning("检测到未知的数据包类型，无法处理")
 
+    def __listened(self, name: str) -> bool:
+        """
+        发布事件时是否有监听函数会被调用
+        """
+        if self.has_event_listener(name) or self.has_event_listener("ALL"):
+            return True
+        hub = self.__hub
+        return hub is not None and (
+            hub.has_event_listener(name) or hub.has_event_listener("ALL")
+        )
+
+    async def __publish(self, type_: str, data: Any, raw: Optional[bytes] = None) -> None:
+        """
+        发布事件并放入事件队列，raw 为直播间消息未解码的 json，只在需要时解码
+        """
+        sinks = None
+        if self.__sinks:
+            if any(sink.closed() for sink in self.__sinks):
+                self.__sinks = [sink for sink in self.__sinks if not sink.closed()]
+            sinks = [sink for sink in self.__sinks if sink.wants(type_)]
+        listened = self.__listened(type_)
+        if not sinks and not listened:
+            return
+
+        callback_info = {
+            "room_display_id": self.room_display_id,
+            "room_real_id": self.__room_real_id,
+            "type": type_,
+            "data": data,
+        }
+        if raw is not None and (listened or any(not sink.raw for sink in sinks)):  # type: ignore
+            data = json.loads(raw)
+            data["cmd"] = type_
+            callback_info["data"] = data
+        if listened:
+            await self.emit(type_, callback_info)
+            await self.emit("ALL", callback_info)
+        if sinks:
+            raw_info = None
+            for sink in sinks:
+                if sink.raw and raw is not None:
+                    if raw_info is None:
+                        raw_info = dict(callback_info, data=raw)
+                    await sink.put(raw_info)
+                else:
+                    await sink.put(callback_info)
+
     async def __send_verify_data(self, token: str) -> None:
         # 没传入 dedeuserid 可以试图 live.get_self_info
         if not self.credential.has_dedeuserid():
@@ -1202,33 +1342,47 @@ class LiveDanmaku(AsyncEvent):
         """
         定时发送心跳包
         """
-        HEARTBEAT = self.__pack(
+        while True:
+            wake = await self._heartbeat()
+            if wake is None:
+                break
+            await asyncio.sleep(max(wake - time.monotonic(), 0))
+
+    async def _heartbeat(self, web: bool = True) -> Optional[float]:
+        """
+        到时间时发送心跳包，心跳响应超时时发布 TIMEOUT 事件
+
+        Args:
+            web (bool, optional): 发送心跳包时是否同时发送网页端心跳请求. Defaults to True.
+
+        Returns:
+            float | None: 下次需要调用的时间（`time.monotonic()`），None 表示不再需要发送心跳包
+        """
+        if self.__status != self.STATUS_ESTABLISHED:
+            return None
+        now = time.monotonic()
+        if self.__heartbeat_sent is not None:
+            if now - self.__heartbeat_sent < HEARTBEAT_INTERVAL:
+                return self.__heartbeat_sent + HEARTBEAT_INTERVAL
+            # 视为已异常断开连接，发布 TIMEOUT 事件
+            self.dispatch("TIMEOUT")
+            return None
+        if now < self.__next_heartbeat:
+            return self.__next_heartbeat
+
+        self.logger.debug("发送心跳包")
+        self.__heartbeat_sent = now
+        await self.__send(
             b"[object Object]",
             self.PROTOCOL_VERSION_HEARTBEAT,
             self.DATAPACK_TYPE_HEARTBEAT,
         )
-        while True:
-            if self.__heartbeat_timer == 0:
-                self.logger.debug("发送心跳包")
-                await self.__client.ws_send(self.__ws, HEARTBEAT)
-                heartbeat_url = "https://live-trace.bilibili.com/xlive/rdata-interface/v1/heartbeat/webHeartBeat?pf=web&hb="
-                hb = str(
-                    base64.b64encode(f"60|{self.room_display_id}|1|0".encode("utf-8")),
-                    "utf-8",
-                )
-                await Api(
-                    method="GET",
-                    url=heartbeat_url,
-                    json_body=True,
-                    comment="[直播心跳包]",
-                ).update_params(**{"hb": hb, "pf": "web"}).result
-            elif self.__heartbeat_timer <= -30:
-                # 视为已异常断开连接，发布 TIMEOUT 事件
-                self.dispatch("TIMEOUT")
-                break
-
-            await asyncio.sleep(1.0)
-            self.__heartbeat_timer -= 1
+        if web:
+            try:
+                await _send_web_heartbeat(self.room_display_id)
+            except Exception as e:
+                self.logger.debug(f"网页端心跳请求失败：{e}")
+        return now + HEARTBEAT_INTERVAL
 
     async def __send(
         self,
@@ -1299,10 +1453,9 @@ class LiveDanmaku(AsyncEvent):
                 "data": None,
             }
             chunkData = realData[(offset + 16) : (offset + length)]
-            if header[2] == 0:
-                recvData["data"] = json.loads(chunkData.decode())
-            elif header[2] == 2:
-                recvData["data"] = json.loads(chunkData.decode())
+            if header[2] == 0 or header[2] == 2:
+                # 直播间消息在需要时才解码
+                recvData["data"] = chunkData
             elif header[2] == 1:
                 if header[3] == LiveDanmaku.DATAPACK_TYPE_HEARTBEAT_RESPONSE:
                     recvData["data"] = {"view": struct.unpack(">I", chunkData)[0]}
@@ -1313,6 +1466,438 @@ class LiveDanmaku(AsyncEvent):
         return ret
 
 
+async def _send_web_heartbeat(room_display_id: int) -> None:
+    """
+    发送网页端直播心跳请求
+    """
+    heartbeat_url = "https://live-trace.bilibili.com/xlive/rdata-interface/v1/heartbeat/webHeartBeat?pf=web&hb="
+    hb = str(
+        base64.b64encode(f"60|{room_display_id}|1|0".encode("utf-8")),
+        "utf-8",
+    )
+    await Api(
+        method="GET",
+        url=heartbeat_url,
+        json_body=True,
+        comment="[直播心跳包]",
+    ).update_params(**{"hb": hb, "pf": "web"}).result
+
+
+class LiveDanmakuHub(AsyncEvent):
+    """
+    在一个事件循环中管理多个直播间的弹幕连接
+
+    Extends: AsyncEvent
+
+    + 所有直播间共用一个心跳任务，每个直播间只在需要发送心跳包时被唤醒
+    + 连接前并发预取直播间信息，重连时复用
+    + 依次间隔 `connect_interval` 秒开始连接，避免同时建立大量连接
+    + 优先连接当前连接数最少的主机，每个主机的连接数不超过 `max_per_host`
+    + 所有直播间的事件同时在 LiveDanmakuHub 上发布，通过参数中的 `room_display_id` 区分
+
+    ``` python
+    hub = LiveDanmakuHub([22544798, 21452505])
+
+    @hub.on("DANMU_MSG")
+    async def on_danmaku(event):
+        print(event["room_display_id"], event["data"]["info"][1])
+
+    await hub.connect()
+    ```
+    """
+
+    def __init__(
+        self,
+        room_display_ids: Iterable[int] = (),
+        credential: Union[Credential, None] = None,
+        debug: bool = False,
+        max_retry: int = 5,
+        retry_after: float = 1,
+        prefetch_concurrency: int = 8,
+        connect_interval: float = 0.1,
+        max_per_host: Optional[int] = None,
+        web_heartbeat: bool = True,
+        web_heartbeat_interval: float = 60,
+        web_heartbeat_concurrency: int = 8,
+        conf_ttl: float = 300,
+    ):
+        """
+        Args:
+            room_display_ids          (Iterable[int], optional)     : 房间展示 ID 列表. Defaults to ().
+
+            credential                (Credential | None, optional) : 凭据. Defaults to None.
+
+            debug                     (bool, optional)              : 调试模式，将输出更多信息。. Defaults to False.
+
+            max_retry                 (int, optional)               : 连接出错后最大重试次数. Defaults to 5
+
+            retry_after               (float, optional)             : 连接出错后重试间隔时间（秒）. Defaults to 1
+
+            prefetch_concurrency      (int, optional)               : 同时获取直播间信息的数量. Defaults to 8.
+
+            connect_interval          (float, optional)             : 相邻两个直播间开始连接的间隔（秒）. Defaults to 0.1.
+
+            max_per_host              (int | None, optional)        : 每个主机的最大连接数，None 表示不限制. Defaults to None.
+
+            web_heartbeat             (bool, optional)              : 是否发送网页端心跳请求. Defaults to True.
+
+            web_heartbeat_interval    (float, optional)             : 每个直播间网页端心跳请求的间隔（秒）. Defaults to 60.
+
+            web_heartbeat_concurrency (int, optional)               : 同时进行的网页端心跳请求数. Defaults to 8.
+
+            conf_ttl                  (float, optional)             : 直播间信息的缓存时间（秒）. Defaults to 300.
+        """
+        super().__init__()
+        self.credential: Credential = (
+            credential if credential is not None else Credential()
+        )
+        self.__debug = debug
+        self.__max_retry = max_retry
+        self.__retry_after = retry_after
+        self.__prefetch_concurrency = max(prefetch_concurrency, 1)
+        self.__prefetch_semaphore: Optional[asyncio.Semaphore] = None
+        self.__connect_interval = connect_interval
+        self.__max_per_host = max_per_host
+        self.__web_heartbeat = web_heartbeat
+        self.__web_heartbeat_interval = web_heartbeat_interval
+        self.__web_heartbeat_concurrency = max(web_heartbeat_concurrency, 1)
+
+        self.__rooms: Dict[int, LiveDanmaku] = {}
+        self.__sinks: List[EventSink] = []
+        self.__confs = CachePool(maxsize=0, ttl=conf_ttl)
+        self.__room_tasks: Dict[int, asyncio.Task] = {}
+        self.__next_connect = 0.0
+        self.__hosts: Dict[LiveDanmaku, str] = {}
+        self.__host_counts: Dict[str, int] = {}
+        # 心跳包耗时很短，直接在调度循环中发送
+        self.__heartbeats = DeadlineScheduler(self.__heartbeat, inline=True)
+        self.__last_web_heartbeat: Dict[LiveDanmaku, float] = {}
+        self.__web_tasks: Set[asyncio.Task] = set()
+        self.__web_semaphore: Optional[asyncio.Semaphore] = None
+        self.__stopped: Optional[asyncio.Event] = None
+        self.__running = False
+
+        self.logger = logging.getLogger("LiveDanmakuHub")
+        self.logger.setLevel(logging.DEBUG if debug else logging.INFO)
+
+        for room_display_id in room_display_ids:
+            self.add_room(room_display_id)
+
+    def get_rooms(self) -> List[LiveDanmaku]:
+        """
+        获取管理的直播间连接
+
+        Returns:
+            List[LiveDanmaku]: 直播间连接列表
+        """
+        return list(self.__rooms.values())
+
+    def get_room(self, room_display_id: int) -> Optional[LiveDanmaku]:
+        """
+        获取直播间连接
+
+        Args:
+            room_display_id (int): 房间展示 ID
+
+        Returns:
+            LiveDanmaku | None: 直播间连接，不存在时返回 None
+        """
+        return self.__rooms.get(room_display_id)
+
+    def get_stats(self) -> dict:
+        """
+        获取连接统计
+
+        Returns:
+            dict: rooms 直播间数，established 已连接数，heartbeats 心跳调度中的直播间数，hosts 各主机连接数
+        """
+        return {
+            "rooms": len(self.__rooms),
+            "established": sum(
+                1
+                for danmaku in self.__rooms.values()
+                if danmaku.get_status() == LiveDanmaku.STATUS_ESTABLISHED
+            ),
+            "heartbeats": len(self.__heartbeats),
+            "hosts": dict(self.__host_counts),
+        }
+
+    def add_room(self, room_display_id: int) -> LiveDanmaku:
+        """
+        添加直播间，运行中添加时会排队开始连接
+
+        Args:
+            room_display_id (int): 房间展示 ID
+
+        Returns:
+            LiveDanmaku: 直播间连接
+        """
+        danmaku = self.__rooms.get(room_display_id)
+        if danmaku is not None:
+            return danmaku
+        danmaku = LiveDanmaku(
+            room_display_id,
+            debug=self.__debug,
+            credential=self.credential,
+            max_retry=self.__max_retry,
+            retry_after=self.__retry_after,
+        )
+        danmaku._bind_hub(self)
+        danmaku.set_inline(self.is_inline())
+        for sink in self.__sinks:
+            if not sink.closed():
+                danmaku.add_sink(sink)
+        self.__rooms[room_display_id] = danmaku
+        if self.__running:
+            self.__start_room(danmaku)
+        return danmaku
+
+    async def remove_room(self, room_display_id: int) -> None:
+        """
+        断开并移除直播间
+
+        Args:
+            room_display_id (int): 房间展示 ID
+        """
+        danmaku = self.__rooms.pop(room_display_id, None)
+        if danmaku is None:
+            return
+        await self.__close_room(danmaku)
+
+    def set_inline(self, inline: bool) -> None:
+        """
+        设置通过 `emit()` 发布事件时是否依次等待监听器运行完毕，同时应用于所有直播间（包括之后添加的）。
+
+        Args:
+            inline (bool): 是否依次等待。
+        """
+        super().set_inline(inline)
+        for danmaku in self.__rooms.values():
+            danmaku.set_inline(inline)
+
+    def add_sink(self, sink: EventSink) -> None:
+        """
+        为所有直播间（包括之后添加的）添加事件队列
+
+        Args:
+            sink (EventSink): 事件队列
+        """
+        self.__sinks = [s for s in self.__sinks if not s.closed()]
+        if sink in self.__sinks:
+            return
+        self.__sinks.append(sink)
+        for danmaku in self.__rooms.values():
+            danmaku.add_sink(sink)
+
+    def remove_sink(self, sink: EventSink) -> None:
+        """
+        从所有直播间移除事件队列
+
+        Args:
+            sink (EventSink): 事件队列
+        """
+        if sink in self.__sinks:
+            self.__sinks.remove(sink)
+        for danmaku in self.__rooms.values():
+            danmaku.remove_sink(sink)
+
+    def stream(
+        self,
+        cmds: Optional[Iterable[str]] = None,
+        maxsize: int = 10000,
+        policy: str = "block",
+        raw: bool = False,
+    ) -> EventSink:
+        """
+        创建所有直播间共用的事件队列，参数同 `LiveDanmaku.stream()`
+
+        Args:
+            cmds    (Iterable[str] | None, optional) : 只接收这些类型的事件，None 表示接收所有事件. Defaults to None.
+
+            maxsize (int, optional)                  : 队列容量. Defaults to 10000.
+
+            policy  (str, optional)                  : 队列满时的处理策略，可选 block（暂停接收数据）/ drop / drop_oldest / spill（写入临时文件）. Defaults to "block".
+
+            raw     (bool, optional)                 : 直播间消息的 data 是否为未解码的 json 字节串. Defaults to False.
+
+        Returns:
+            EventSink: 事件队列，调用 `close()` 后不再接收事件
+        """
+        sink = EventSink(maxsize, policy, cmds, raw)
+        self.add_sink(sink)
+        return sink
+
+    async def prefetch(self, room_display_ids: Optional[Iterable[int]] = None) -> None:
+        """
+        并发获取直播间信息（真实房间号与聊天服务器配置）并缓存，获取失败的直播间会在连接时重试
+
+        Args:
+            room_display_ids (Iterable[int] | None, optional): 房间展示 ID 列表，None 表示所有直播间. Defaults to None.
+        """
+        if room_display_ids is None:
+            room_display_ids = list(self.__rooms)
+        await asyncio.gather(
+            *[
+                self._get_room_conf(room_display_id)
+                for room_display_id in room_display_ids
+                if room_display_id not in self.__confs
+            ],
+            return_exceptions=True,
+        )
+
+    async def connect(self) -> None:
+        """
+        连接所有直播间，直到调用 `disconnect()`
+        """
+        if self.__running:
+            raise LiveException("连接已建立，不可重复调用")
+        self.__running = True
+        self.__web_semaphore = asyncio.Semaphore(self.__web_heartbeat_concurrency)
+        self.__stopped = asyncio.Event()
+        heartbeat_task = asyncio.create_task(self.__heartbeats.run())
+        try:
+            await self.prefetch()
+            self.__next_connect = time.monotonic()
+            for danmaku in list(self.__rooms.values()):
+                self.__start_room(danmaku)
+            await self.__stopped.wait()
+        finally:
+            self.__running = False
+            heartbeat_task.cancel()
+            rooms = list(self.__rooms.values())
+            await asyncio.gather(
+                *[self.__close_room(danmaku) for danmaku in rooms],
+                return_exceptions=True,
+            )
+            await asyncio.gather(heartbeat_task, return_exceptions=True)
+            for task in list(self.__web_tasks):
+                task.cancel()
+            await asyncio.gather(*self.__web_tasks, return_exceptions=True)
+
+    async def disconnect(self) -> None:
+        """
+        断开所有直播间
+        """
+        if not self.__running:
+            raise LiveException("尚未连接服务器")
+        self.__stopped.set()  # type: ignore
+
+    def __start_room(self, danmaku: LiveDanmaku) -> None:
+        now = time.monotonic()
+        delay = max(self.__next_connect - now, 0)
+        self.__next_connect = now + delay + self.__connect_interval
+        self.__room_tasks[danmaku.room_display_id] = asyncio.create_task(
+            self.__run_room(danmaku, delay)
+        )
+
+    async def __run_room(self, danmaku: LiveDanmaku, delay: float) -> None:
+        await asyncio.sleep(delay)
+        try:
+            await danmaku.connect()
+        except Exception as e:
+            danmaku.err_reason = danmaku.err_reason or str(e)
+            self.logger.warning(f"直播间 {danmaku.room_display_id} 连接失败：{e}")
+
+    async def __close_room(self, danmaku: LiveDanmaku) -> None:
+        if danmaku.get_status() == LiveDanmaku.STATUS_ESTABLISHED:
+            await danmaku.disconnect()
+        task = self.__room_tasks.pop(danmaku.room_display_id, None)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self.__heartbeats.cancel(danmaku)
+        self.__last_web_heartbeat.pop(danmaku, None)
+
+    async def _get_room_conf(self, room_display_id: int) -> Tuple[int, dict]:
+        """
+        获取真实房间号与聊天服务器配置，优先使用缓存
+        """
+        conf = self.__confs.get(room_display_id)
+        if conf is not None:
+            return conf
+        if self.__prefetch_semaphore is None:
+            self.__prefetch_semaphore = asyncio.Semaphore(self.__prefetch_concurrency)
+        async with self.__prefetch_semaphore:
+            room = LiveRoom(room_display_id, self.credential)
+            info, danmu_info = await asyncio.gather(
+                room.get_room_play_info(), room.get_danmu_info()
+            )
+        conf = (info["room_id"], danmu_info)
+        self.__confs[room_display_id] = conf
+        return conf
+
+    def _acquire_host(
+        self, danmaku: LiveDanmaku, available_hosts: List[dict]
+    ) -> Optional[dict]:
+        """
+        从可用主机中取出连接数最少且未满的主机，并计入连接数
+        """
+        self._release_host(danmaku)
+        candidates = [
+            host
+            for host in available_hosts
+            if self.__max_per_host is None
+            or self.__host_counts.get(host["host"], 0) < self.__max_per_host
+        ]
+        if not candidates:
+            return None
+        # 连接数相同时与原来一样优先使用列表末尾的主机
+        host = min(
+            reversed(candidates), key=lambda h: self.__host_counts.get(h["host"], 0)
+        )
+        available_hosts.remove(host)
+        self.__hosts[danmaku] = host["host"]
+        self.__host_counts[host["host"]] = self.__host_counts.get(host["host"], 0) + 1
+        return host
+
+    def _release_host(self, danmaku: LiveDanmaku) -> None:
+        """
+        不再使用主机，减少连接数
+        """
+        name = self.__hosts.pop(danmaku, None)
+        if name is None:
+            return
+        self.__host_counts[name] -= 1
+        if self.__host_counts[name] <= 0:
+            del self.__host_counts[name]
+
+    def _add_heartbeat(self, danmaku: LiveDanmaku) -> None:
+        """
+        开始为直播间发送心跳包，之前的调度失效
+        """
+        self.__heartbeats.schedule(danmaku)
+
+    async def __heartbeat(self, danmaku: LiveDanmaku) -> Optional[float]:
+        try:
+            wake = await danmaku._heartbeat(web=False)
+        except Exception as e:
+            # 连接已断开，由接收数据的循环处理重连
+            self.logger.debug(f"直播间 {danmaku.room_display_id} 发送心跳包失败：{e}")
+            return None
+        if wake is None:
+            return None
+
+        now = time.monotonic()
+        if self.__web_heartbeat and (
+            now - self.__last_web_heartbeat.get(danmaku, -self.__web_heartbeat_interval)
+            >= self.__web_heartbeat_interval
+        ):
+            self.__last_web_heartbeat[danmaku] = now
+            task = asyncio.create_task(self.__send_web_heartbeat(danmaku))
+            self.__web_tasks.add(task)
+            task.add_done_callback(self.__web_tasks.discard)
+        return wake
+
+    async def __send_web_heartbeat(self, danmaku: LiveDanmaku) -> None:
+        async with self.__web_semaphore:  # type: ignore
+            try:
+                await _send_web_heartbeat(danmaku.room_display_id)
+            except Exception as e:
+                self.logger.debug(
+                    f"直播间 {danmaku.room_display_id} 网页端心跳请求失败：{e}"
+                )
+
+
 async def get_self_info(credential: Credential) -> dict:
     """
     获取自己直播等级、排行等信息
@@ -233,11 +233,10 @@ class Note:
             list: 图片信息
         """
 
-        result = []
         images_raw_info = await self.get_images_raw_info()
-        for image in images_raw_info:
-            result.append(await Picture().load_url(url=img_auto_scheme(image["url"])))
-        return result
+        return await Picture.load_many(
+            [img_auto_scheme(image["url"]) for image in images_raw_info]
+        )
 
     async def get_all(self) -> dict:
         """
@@ -211,11 +211,10 @@ class Opus:
         Returns:
             list: 图片信息
         """
-        result = []
         images_raw_info = await self.get_images_raw_info()
-        for image in images_raw_info:
-            result.append(await Picture().load_url(url=img_auto_scheme(image["url"])))
-        return result
+        return await Picture.load_many(
+            [img_auto_scheme(image["url"]) for image in images_raw_info]
+        )
 
     async def set_like(self, status: bool) -> dict:
         """
@@ -6,25 +6,32 @@ bilibili_api.session
 
 import json
 import time
+import random
 import asyncio
 import logging
-import datetime
 from enum import Enum
-from typing import Union, Optional
+from typing import List, Union, Optional
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-
-from bilibili_api.exceptions import ApiException
+from bilibili_api.exceptions import (
+    ApiException,
+    NetworkException,
+    ResponseCodeException,
+)
 
 from .video import Video
 from .user import get_self_info
 from .utils.utils import get_api, raise_for_statement
 from .utils.picture import Picture
 from .utils.AsyncEvent import AsyncEvent
+from .utils.cache_pool import CachePool
+from .utils.scheduler import DeadlineScheduler
 from .utils.network import Api, Credential
 
 API = get_api("session")
 
+RATE_LIMIT_CODES = (-412, -509, -799)
+"表示请求过于频繁的错误码"
+
 
 async def fetch_session_msgs(
     talker_id: int, credential: Credential, session_type: int = 1, begin_seqno: int = 0
@@ -437,9 +444,49 @@ async def send_msg(
 class Session(AsyncEvent):
     """
     会话类，用来开启消息监听。
+
+    轮询间隔自适应：收到新消息后缩短到 `min_interval`，没有新消息时逐渐放慢到 `max_interval`，
+    请求过于频繁时暂停 `max_interval` 的两倍，每次间隔都加入随机抖动。
+
+    多个账号可以共用一个 `SessionPoller`：
+
+    ``` python
+    poller = SessionPoller()
+    for credential in credentials:
+        await Session(credential).run(poller=poller)
+    await poller.run()
+    ```
     """
 
-    def __init__(self, credential: Credential, debug=False):
+    def __init__(
+        self,
+        credential: Credential,
+        debug: bool = False,
+        min_interval: float = 4,
+        max_interval: float = 60,
+        backoff: float = 1.5,
+        jitter: float = 0.1,
+        events_maxsize: int = 4096,
+        events_ttl: Optional[float] = 86400,
+    ):
+        """
+        Args:
+            credential     (Credential)            : 凭据类
+
+            debug          (bool, optional)        : 是否输出调试信息. Defaults to False.
+
+            min_interval   (float, optional)       : 最短轮询间隔（秒）. Defaults to 4.
+
+            max_interval   (float, optional)       : 最长轮询间隔（秒）. Defaults to 60.
+
+            backoff        (float, optional)       : 没有新消息时间隔的增长倍数. Defaults to 1.5.
+
+            jitter         (float, optional)       : 间隔随机抖动的比例. Defaults to 0.1.
+
+            events_maxsize (int, optional)         : 保留的事件数，用于撤回时找回. Defaults to 4096.
+
+            events_ttl     (float | None, optional): 事件保留时间（秒），None 表示不过期. Defaults to 86400.
+        """
         super().__init__()
         # 会话状态
         self.__status = 0
@@ -453,11 +500,20 @@ class Session(AsyncEvent):
         # 凭证
         self.credential: Credential = credential
 
-        # 异步定时任务框架
-        self.sched = AsyncIOScheduler(timezone="Asia/Shanghai")
+        # 最近接收的事件 用于撤回时找回
+        self.events = CachePool(maxsize=events_maxsize, ttl=events_ttl)
 
-        # 已接收的所有事件 用于撤回时找回
-        self.events = dict()
+        # 轮询间隔 之前设置 3 秒询一次 跑了一小时给我账号冻结了
+        self.__min_interval = min_interval
+        self.__max_interval = max(max_interval, min_interval)
+        self.__backoff = max(backoff, 1)
+        self.__jitter = jitter
+        self.__interval = min(max(6, self.__min_interval), self.__max_interval)
+
+        self.__prepared = False
+        self.__exclude_self = True
+        self.__poller: Optional[SessionPoller] = None
+        self.__poller_task: Optional[asyncio.Task] = None
 
         # logging
         self.logger = logging.getLogger("Session")
@@ -489,14 +545,16 @@ class Session(AsyncEvent):
         """
         return self.__status
 
-    async def run(self, exclude_self: bool = True) -> None:
+    def get_interval(self) -> float:
         """
-        非阻塞异步爬虫 定时发送请求获取消息
+        获取距下次轮询的间隔，已加入随机抖动
 
-        Args:
-            exclude_self (bool): 是否排除自己发出的消息，默认排除
+        Returns:
+            float: 间隔（秒）
         """
+        return self.__interval * random.uniform(1 - self.__jitter, 1 + self.__jitter)
 
+    async def __prepare(self) -> None:
         # 获取自身UID 用于后续判断消息是发送还是接收
         self_info = await get_self_info(self.credential)
         self.uid = self_info["mid"]
@@ -507,65 +565,113 @@ class Session(AsyncEvent):
             _session["talker_id"]: _session["max_seqno"]
             for _session in js.get("session_list", [])
         }
+        self.__prepared = True
+
+    async def poll(self) -> int:
+        """
+        轮询一次新消息并发布事件，同时调整轮询间隔。
+
+        `SessionPoller` 会定时调用，一般不需要手动调用。
+
+        Returns:
+            int: 新消息数
+        """
+        try:
+            if not self.__prepared:
+                await self.__prepare()
+            count = await self.__query()
+        except Exception as e:
+            if _is_rate_limited(e):
+                # 暂停较长时间 之后从最长间隔开始
+                self.__interval = self.__max_interval * 2
+                self.logger.warning(f"请求过于频繁，{self.__interval} 秒后重试: {e}")
+            else:
+                self.__interval = min(
+                    self.__interval * self.__backoff, self.__max_interval
+                )
+                self.logger.warning(f"轮询失败: {e}")
+            raise
 
-        # 间隔 6 秒轮询消息列表 之前设置 3 秒询一次 跑了一小时给我账号冻结了
-        @self.sched.scheduled_job(
-            "interval",
-            id="query",
-            seconds=6,
-            max_instances=3,
-            next_run_time=datetime.datetime.now(),
+        if count:
+            self.__interval = self.__min_interval
+        else:
+            self.__interval = min(self.__interval * self.__backoff, self.__max_interval)
+        self.logger.debug(f"maxTs = {self.maxTs}, interval = {self.__interval}")
+        return count
+
+    async def __query(self) -> int:
+        js: dict = await new_sessions(self.credential, self.maxTs)
+        if js.get("session_list") is None:
+            return 0
+
+        sessions = js["session_list"]
+        results = await asyncio.gather(
+            *[
+                fetch_session_msgs(
+                    session["talker_id"],
+                    self.credential,
+                    session["session_type"],
+                    self.maxSeqno.get(session["talker_id"]),  # type: ignore
+                )
+                for session in sessions
+            ],
+            return_exceptions=True,
         )
-        async def qurey():
-            js: dict = await new_sessions(self.credential, self.maxTs)
-            if js.get("session_list") is None:
-                return
-
-            pending = set()
-            for session in js["session_list"]:
-                self.maxTs = max(self.maxTs, session["session_ts"])
-                pending.add(
-                    asyncio.create_task(
-                        fetch_session_msgs(
-                            session["talker_id"],
-                            self.credential,
-                            session["session_type"],
-                            self.maxSeqno.get(session["talker_id"]),  # type: ignore
-                        )
+
+        count = 0
+        error: Optional[BaseException] = None
+        for session, result in zip(sessions, results):
+            if isinstance(result, BaseException):
+                error = error or result
+                continue
+            self.maxSeqno[session["talker_id"]] = session["max_seqno"]
+            if result is None or result.get("messages") is None:
+                continue
+            for message in result.get("messages", [])[::-1]:
+                event = Event(message, self.uid)
+                if event.msg_type == EventType.WITHDRAW.value:
+                    self.logger.info(
+                        str(self.events.get(event.content, f"key={event.content}"))
+                        + f" 被撤回({event.timestamp})"
                     )
-                )
-                self.maxSeqno[session["talker_id"]] = session["max_seqno"]
-
-            while pending:
-                done, pending = await asyncio.wait(pending)
-                for done_task in done:
-                    result: dict = await done_task
-                    if result is None or result.get("messages") is None:
-                        continue
-                    for message in result.get("messages", [])[::-1]:
-                        event = Event(message, self.uid)
-                        if event.msg_type == EventType.WITHDRAW.value:
-                            self.logger.info(
-                                str(
-                                    self.events.get(
-                                        event.content, f"key={event.content}"
-                                    )
-                                )
-                                + f" 被撤回({event.timestamp})"
-                            )
-                        else:
-                            self.logger.info(event)
-
-                        # 自己发出的消息不发布任务
-                        if event.sender_uid != self.uid or not exclude_self:
-                            self.dispatch(str(event.msg_type), event)
-
-                        self.events[str(event.msg_key)] = event
-
-            self.logger.debug(f"maxTs = {self.maxTs}")
+                else:
+                    self.logger.info(event)
+
+                # 自己发出的消息不发布任务
+                if event.sender_uid != self.uid or not self.__exclude_self:
+                    await self.emit(str(event.msg_type), event)
+
+                self.events[str(event.msg_key)] = event
+                count += 1
+
+        if error is not None:
+            # 不更新 maxTs 下次重新获取失败的会话 已获取的部分由 maxSeqno 去重
+            raise error
+        for session in sessions:
+            self.maxTs = max(self.maxTs, session["session_ts"])
+        return count
+
+    async def run(
+        self, exclude_self: bool = True, poller: Optional["SessionPoller"] = None
+    ) -> None:
+        """
+        非阻塞异步爬虫 定时发送请求获取消息
+
+        Args:
+            exclude_self (bool, optional)         : 是否排除自己发出的消息，默认排除. Defaults to True.
+
+            poller       (SessionPoller, optional): 共用的轮询调度器，需要另外调用 `poller.run()`。不提供时自动创建并开始运行. Defaults to None.
+        """
+        self.__exclude_self = exclude_self
+        await self.__prepare()
+
+        if poller is None:
+            poller = SessionPoller(concurrency=1)
+            self.__poller_task = asyncio.create_task(poller.run())
+        self.__poller = poller
+        poller.add(self)
 
         self.__status = 1
-        self.sched.start()
         self.logger.info("开始轮询")
 
     async def start(self, exclude_self: bool = True) -> None:
@@ -607,6 +713,88 @@ class Session(AsyncEvent):
     def close(self) -> None:
         """结束轮询"""
 
-        self.sched.remove_job("query")
+        if self.__poller is not None:
+            self.__poller.remove(self)
+            if self.__poller_task is not None:
+                self.__poller.stop()
+                self.__poller_task = None
+            self.__poller = None
         self.__status = 2
         self.logger.info("结束轮询")
+
+
+class SessionPoller:
+    """
+    多个会话共用的轮询调度器。
+
+    所有会话在一个任务中按各自的间隔轮询，同时轮询的会话数不超过 `concurrency`，
+    适合一个进程中运行大量账号。
+    """
+
+    def __init__(self, concurrency: int = 8) -> None:
+        """
+        Args:
+            concurrency (int, optional): 同时轮询的会话数. Defaults to 8.
+        """
+        self.__scheduler = DeadlineScheduler(self.__poll, concurrency=concurrency)
+
+    def get_sessions(self) -> List[Session]:
+        """
+        获取轮询的会话列表。
+
+        Returns:
+            List[Session]: 会话列表
+        """
+        return self.__scheduler.get_keys()
+
+    def add(self, session: Session, delay: float = 0) -> None:
+        """
+        添加会话。
+
+        Args:
+            session (Session)        : 会话
+
+            delay   (float, optional): 首次轮询前等待的时间（秒）. Defaults to 0.
+        """
+        if session in self.__scheduler:
+            return
+        self.__scheduler.schedule(session, time.monotonic() + delay)
+
+    def remove(self, session: Session) -> None:
+        """
+        移除会话。
+
+        Args:
+            session (Session): 会话
+        """
+        self.__scheduler.cancel(session)
+
+    async def run(self) -> None:
+        """
+        开始轮询，直到调用 `stop()`。
+        """
+        await self.__scheduler.run()
+
+    async def __poll(self, session: Session) -> float:
+        try:
+            await session.poll()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Session.poll 已记录日志并延长间隔
+            pass
+        return time.monotonic() + session.get_interval()
+
+    def stop(self) -> None:
+        """
+        停止轮询。
+        """
+        self.__scheduler.stop()
+
+
+def _is_rate_limited(e: Exception) -> bool:
+    if isinstance(e, ResponseCodeException):
+        return e.code in RATE_LIMIT_CODES
+    if isinstance(e, NetworkException):
+        return e.status in (412, 429)
+    return False
@@ -7,14 +7,18 @@ bilibili_api.user
 import json
 import random
 import time
+import asyncio
 from enum import Enum
-from typing import List, Union, Tuple
+from typing import Dict, List, Union, Tuple, Optional
 
 import jwt
 
 from .utils.utils import get_api, join, raise_for_statement
 from .utils.user_render_data import get_user_dynamic_render_data
-from .exceptions import ResponseCodeException
+from .utils.paginate import Paginator, PageAdapter, CursorAdapter, paginate
+from .utils.batch_loader import BatchLoader
+from .utils import cache_pool
+from .exceptions import NetworkException, ResponseCodeException
 from .utils.network import Api, HEADERS, Credential
 from .channel_series import ChannelOrder, ChannelSeries, ChannelSeriesType
 
@@ -238,6 +242,121 @@ async def name2uid(names: Union[str, List[str]], credential: Credential = None):
     )
 
 
+NAME_BATCH_SIZE = 20
+"每次 name2uid 请求的最大用户名数"
+
+UID_BATCH_SIZE = 50
+"每次批量获取用户卡片的最大 UID 数"
+
+MISSING_TTL = 600
+"不存在的用户名 / UID 的缓存时间，单位秒"
+
+LOADER_TTL = 600
+"按 SESSDATA 复用批量查询器的时间，单位秒，过期后不再持有其凭据"
+
+# 键为 SESSDATA，name2uid 需要登录
+_name_loaders: cache_pool.CachePool = cache_pool.CachePool(maxsize=64, ttl=LOADER_TTL)
+_uid_loaders: cache_pool.CachePool = cache_pool.CachePool(maxsize=64, ttl=LOADER_TTL)
+
+
+async def resolve_names(
+    names: List[str], credential: Union[Credential, None] = None
+) -> Dict[str, int]:
+    """
+    批量将用户名转为 uid。
+
+    同时进行的查询会合并为一次 `name2uid` 请求，结果与 `resolve_uids` 共用缓存。
+
+    Args:
+        names      (List[str])                  : 用户名列表
+
+        credential (Credential | None, optional): 凭据类，需要 SESSDATA. Defaults to None.
+
+    Returns:
+        Dict[str, int]: 用户名到 uid 的映射，不存在的用户名为 0
+    """
+    credential = credential if credential else Credential()
+    credential.raise_for_no_sessdata()
+
+    loader = _name_loaders.get(credential.sessdata)
+    if loader is None:
+
+        async def load(batch: List[str]) -> Dict[str, int]:
+            data = await name2uid(batch, credential=credential)
+            result = {}
+            for item in data.get("uid_list") or []:
+                # 只接受名称完全一致的结果
+                if item["name"] in batch:
+                    result[item["name"]] = int(item["uid"])
+                    cache_pool.user_uid2name.set(int(item["uid"]), item["name"])
+            return result
+
+        loader = BatchLoader(
+            load,
+            cache_pool.user_name2uid,
+            max_batch=NAME_BATCH_SIZE,
+            default=0,
+            missing_ttl=MISSING_TTL,
+        )
+        _name_loaders.set(credential.sessdata, loader)
+    return await loader.load_many(names)
+
+
+async def resolve_uids(
+    uids: List[int], credential: Union[Credential, None] = None
+) -> Dict[int, Union[str, None]]:
+    """
+    批量将 uid 转为用户名。
+
+    同时进行的查询会合并为一次批量请求，结果与 `resolve_names` 共用缓存。
+
+    Args:
+        uids       (List[int])                  : uid 列表
+
+        credential (Credential | None, optional): 凭据类. Defaults to None.
+
+    Returns:
+        Dict[int, str | None]: uid 到用户名的映射，不存在的 uid 为 None
+    """
+    credential = credential if credential else Credential()
+    uids = [int(uid) for uid in uids]
+
+    loader = _uid_loaders.get(credential.sessdata)
+    if loader is None:
+
+        async def load(batch: List[int]) -> Dict[int, str]:
+            try:
+                data = await (
+                    Api(**API["info"]["user_cards"], credential=credential)
+                    .update_params(uids=",".join(map(str, batch)))
+                    .result
+                )
+                cards = {int(card["mid"]): card["name"] for card in data or []}
+            except (ResponseCodeException, NetworkException):
+                # 批量接口不可用时逐个获取
+                infos = await asyncio.gather(
+                    *[User(uid, credential).get_user_info() for uid in batch],
+                    return_exceptions=True,
+                )
+                cards = {
+                    uid: info["name"]
+                    for uid, info in zip(batch, infos)
+                    if isinstance(info, dict)
+                }
+            for uid, name in cards.items():
+                cache_pool.user_name2uid.set(name, uid)
+            return cards
+
+        loader = BatchLoader(
+            load,
+            cache_pool.user_uid2name,
+            max_batch=UID_BATCH_SIZE,
+            missing_ttl=MISSING_TTL,
+        )
+        _uid_loaders.set(credential.sessdata, loader)
+    return await loader.load_many(uids)
+
+
 class User:
     """
     用户相关
@@ -466,6 +585,51 @@ class User:
             await Api(**api, credential=self.credential).update_params(**params).result
         )
 
+    def iter_videos(
+        self,
+        tid: int = 0,
+        ps: int = 30,
+        keyword: str = "",
+        order: VideoOrder = VideoOrder.PUBDATE,
+        max_items: Optional[int] = None,
+        resume: Optional[dict] = None,
+        concurrency: int = 4,
+    ) -> Paginator:
+        """
+        逐个获取用户投稿视频。首页返回总数后并发获取之后的页。
+
+        Args:
+            tid         (int, optional)          : 分区 ID. Defaults to 0（全部）.
+
+            ps          (int, optional)          : 每一页的视频数. Defaults to 30.
+
+            keyword     (str, optional)          : 搜索关键词. Defaults to "".
+
+            order       (VideoOrder, optional)   : 排序方式. Defaults to VideoOrder.PUBDATE
+
+            max_items   (int | None, optional)   : 最多获取的视频数. Defaults to None.
+
+            resume      (dict | None, optional)  : 从 `Paginator.checkpoint()` 返回的位置继续. Defaults to None.
+
+            concurrency (int, optional)          : 同时获取的页数. Defaults to 4.
+
+        Returns:
+            Paginator: 异步迭代器，每一项为 `get_videos` 返回的 `["list"]["vlist"]` 中的一项
+        """
+        adapter = PageAdapter(
+            fetch=lambda pn: self.get_videos(tid, pn, ps, keyword, order),
+            items=lambda data: data["list"]["vlist"],
+            total=lambda data: data["page"]["count"],
+            page_size=ps,
+        )
+        return paginate(
+            adapter,
+            concurrency=concurrency,
+            max_items=max_items,
+            resume=resume,
+            key=lambda video: video["bvid"],
+        )
+
     async def get_media_list(
         self,
         oid: Union[int, None] = None,
@@ -651,6 +815,28 @@ class User:
         )
         return data
 
+    def iter_dynamics(
+        self, max_items: Optional[int] = None, resume: Optional[dict] = None
+    ) -> Paginator:
+        """
+        逐条获取用户动态。
+
+        Args:
+            max_items (int | None, optional) : 最多获取的动态数. Defaults to None.
+
+            resume    (dict | None, optional): 从 `Paginator.checkpoint()` 返回的位置继续. Defaults to None.
+
+        Returns:
+            Paginator: 异步迭代器，每一项为 `get_dynamics_new` 返回的 `["items"]` 中的一项
+        """
+        adapter = CursorAdapter(
+            fetch=self.get_dynamics_new,
+            items=lambda data: data.get("items"),
+            next_cursor=lambda data: data.get("offset"),
+            has_more=lambda data: data.get("has_more", False),
+        )
+        return paginate(adapter, max_items=max_items, resume=resume)
+
     async def get_subscribed_bangumi(
         self,
         type_: BangumiType = BangumiType.BANGUMI,
@@ -719,6 +905,49 @@ class User:
             await Api(**api, credential=self.credential).update_params(**params).result
         )
 
+    def iter_followings(
+        self,
+        ps: int = 50,
+        attention: bool = False,
+        order: OrderType = OrderType.desc,
+        max_items: Optional[int] = None,
+        resume: Optional[dict] = None,
+        concurrency: int = 4,
+    ) -> Paginator:
+        """
+        逐个获取用户关注列表（不是自己只获取前 5 页）
+
+        Args:
+            ps          (int, optional)        : 每页的数据量. Defaults to 50.
+
+            attention   (bool, optional)       : 是否采用“最常访问”排序，否则为“关注顺序”排序. Defaults to False.
+
+            order       (OrderType, optional)  : 排序方式. Defaults to OrderType.desc.
+
+            max_items   (int | None, optional) : 最多获取的数量. Defaults to None.
+
+            resume      (dict | None, optional): 从 `Paginator.checkpoint()` 返回的位置继续. Defaults to None.
+
+            concurrency (int, optional)        : 同时获取的页数. Defaults to 4.
+
+        Returns:
+            Paginator: 异步迭代器，每一项为 `get_followings` 返回的 `["list"]` 中的一项
+        """
+        adapter = PageAdapter(
+            fetch=lambda pn: self.get_followings(pn, ps, attention, order),
+            items=lambda data: data.get("list"),
+            total=lambda data: data.get("total"),
+            page_size=ps,
+        )
+        return paginate(
+            adapter,
+            concurrency=concurrency,
+            max_items=max_items,
+            max_pages=self.__relation_max_pages(),
+            resume=resume,
+            key=lambda user: user["mid"],
+        )
+
     async def get_all_followings(self) -> dict:
         """
         获取所有的关注列表。（如果用户设置保密会没有任何数据）
@@ -758,6 +987,52 @@ class User:
             await Api(**api, credential=self.credential).update_params(**params).result
         )
 
+    def iter_followers(
+        self,
+        ps: int = 50,
+        desc: bool = True,
+        max_items: Optional[int] = None,
+        resume: Optional[dict] = None,
+        concurrency: int = 4,
+    ) -> Paginator:
+        """
+        逐个获取用户粉丝列表（不是自己只获取前 5 页）
+
+        Args:
+            ps          (int, optional)        : 每页的数据量. Defaults to 50.
+
+            desc        (bool, optional)       : 倒序排序. Defaults to True.
+
+            max_items   (int | None, optional) : 最多获取的数量. Defaults to None.
+
+            resume      (dict | None, optional): 从 `Paginator.checkpoint()` 返回的位置继续. Defaults to None.
+
+            concurrency (int, optional)        : 同时获取的页数. Defaults to 4.
+
+        Returns:
+            Paginator: 异步迭代器，每一项为 `get_followers` 返回的 `["list"]` 中的一项
+        """
+        adapter = PageAdapter(
+            fetch=lambda pn: self.get_followers(pn, ps, desc),
+            items=lambda data: data.get("list"),
+            total=lambda data: data.get("total"),
+            page_size=ps,
+        )
+        return paginate(
+            adapter,
+            concurrency=concurrency,
+            max_items=max_items,
+            max_pages=self.__relation_max_pages(),
+            resume=resume,
+            key=lambda user: user["mid"],
+        )
+
+    def __relation_max_pages(self) -> Optional[int]:
+        # 不是自己只能访问前 5 页
+        if str(self.credential.dedeuserid) == str(self.__uid):
+            return None
+        return 5
+
     async def get_self_same_followers(self, pn: int = 1, ps: int = 50) -> dict:
         """
         获取用户与自己共同关注的 up 主
@@ -1055,10 +1330,12 @@ class User:
 
     async def get_access_id(self) -> str:
         """
-        获取用户 access_id (w_webid) 如未过期直接从本地获取 防止重复请求
+        获取用户 access_id (w_webid) 如未过期直接从缓存获取 防止重复请求
+
+        w_webid 不绑定用户时所有用户共用，页面中没有 w_webid 时返回 None 并缓存 10 分钟。
 
         Returns:
-            str: access_id
+            str | None: access_id
         """
         return await get_user_dynamic_render_data(self.__uid)
 
@@ -5,7 +5,21 @@ bilibili_api.utils.AsyncEvent
 """
 
 import asyncio
-from typing import Callable, Coroutine, Union
+import inspect
+from typing import Callable, Coroutine, Dict, List, Set, Tuple, Union
+
+# 事件名到大写事件名的缓存，避免每次发布事件都转换
+_NAMES: Dict[str, str] = {}
+_NAMES_MAXSIZE = 4096
+
+
+def _upper(name: str) -> str:
+    key = _NAMES.get(name)
+    if key is None:
+        key = name.upper()
+        if len(_NAMES) < _NAMES_MAXSIZE:
+            _NAMES[name] = key
+    return key
 
 
 class AsyncEvent:
@@ -13,11 +27,27 @@ class AsyncEvent:
     发布-订阅模式异步事件类支持。
 
     特殊事件：__ALL__ 所有事件均触发
+
+    协程函数的监听器默认在新任务中运行，任务中的异常交由事件循环的异常处理函数报告。
+    调用 `set_inline(True)` 后，通过 `emit()` 发布的事件会依次等待监听器运行完毕。
     """
 
     def __init__(self):
-        self.__handlers = {}
-        self.__ignore_events = []
+        self.__handlers: Dict[str, List[Callable]] = {}
+        # 事件名到 (监听器, 是否为协程函数) 的预先计算的表
+        self.__table: Dict[str, Tuple[Tuple[Callable, bool], ...]] = {}
+        self.__ignore_events: Set[str] = set()
+        self.__tasks: Set[asyncio.Future] = set()
+        self.__inline = False
+
+    def __update(self, name: str) -> None:
+        handlers = self.__handlers.get(name)
+        if handlers:
+            self.__table[name] = tuple(
+                (handler, inspect.iscoroutinefunction(handler)) for handler in handlers
+            )
+        else:
+            self.__table.pop(name, None)
 
     def add_event_listener(self, name: str, handler: Union[Callable, Coroutine]) -> None:
         """
@@ -31,6 +61,7 @@ class AsyncEvent:
         if name not in self.__handlers:
             self.__handlers[name] = []
         self.__handlers[name].append(handler)
+        self.__update(name)
 
     def on(self, event_name: str) -> Callable:
         """
@@ -51,6 +82,7 @@ class AsyncEvent:
         移除所有事件监听函数
         """
         self.__handlers = {}
+        self.__table = {}
 
     def remove_event_listener(self, name: str, handler: Union[Callable, Coroutine]) -> bool:
         """
@@ -67,9 +99,25 @@ class AsyncEvent:
         if name in self.__handlers:
             if handler in self.__handlers[name]:
                 self.__handlers[name].remove(handler)
+                self.__update(name)
                 return True
         return False
 
+    def has_event_listener(self, name: str) -> bool:
+        """
+        发布指定事件时是否有监听函数会被调用（包括 __ALL__ 的监听函数）。
+
+        Args:
+            name (str): 事件名。
+
+        Returns:
+            bool: 是否有监听函数。
+        """
+        name = _upper(name)
+        if name in self.__ignore_events:
+            return False
+        return name in self.__table or "__ALL__" in self.__table
+
     def ignore_event(self, name: str) -> None:
         """
         忽略指定事件
@@ -78,13 +126,33 @@ class AsyncEvent:
             name (str): 事件名。
         """
         name = name.upper()
-        self.__ignore_events.append(name)
+        self.__ignore_events.add(name)
 
     def remove_ignore_events(self) -> None:
         """
         移除所有忽略事件
         """
-        self.__ignore_events = []
+        self.__ignore_events = set()
+
+    def set_inline(self, inline: bool) -> None:
+        """
+        设置通过 `emit()` 发布事件时是否依次等待监听器运行完毕，而不是为协程创建新任务。
+
+        依次等待时监听器按注册顺序运行，事件的发布者会因此暂停，没有任务创建的开销。
+
+        Args:
+            inline (bool): 是否依次等待。
+        """
+        self.__inline = inline
+
+    def is_inline(self) -> bool:
+        """
+        获取通过 `emit()` 发布事件时是否依次等待监听器运行完毕。
+
+        Returns:
+            bool: 是否依次等待。
+        """
+        return self.__inline
 
     def dispatch(self, name: str, *args, **kwargs) -> None:
         """
@@ -94,18 +162,82 @@ class AsyncEvent:
             name (str):       事件名。
             *args, **kwargs (Any):  要传递给函数的参数。
         """
-        if len(args) == 0 and len(kwargs.keys()) == 0:
-            args = [{}]
-        if name.upper() in self.__ignore_events:
+        if not args and not kwargs:
+            args = [{}]  # type: ignore
+        name = _upper(name)
+        if self.__ignore_events and name in self.__ignore_events:
             return
 
-        name = name.upper()
-        if name in self.__handlers:
-            for callableorcoroutine in self.__handlers[name]:
-                obj = callableorcoroutine(*args, **kwargs)
-                if isinstance(obj, Coroutine):
-                    asyncio.create_task(obj)
-
-        if name != "__ALL__":
-            kwargs.update({"name": name, "data": args})
-            self.dispatch("__ALL__", kwargs)
+        handlers = self.__table.get(name)
+        if handlers:
+            for handler, is_coroutine in handlers:
+                obj = handler(*args, **kwargs)
+                if is_coroutine or (obj is not None and isinstance(obj, Coroutine)):
+                    self.__spawn(obj)
+
+        if name != "__ALL__" and "__ALL__" in self.__table:
+            self.dispatch("__ALL__", dict(kwargs, name=name, data=args))
+
+    async def emit(self, name: str, *args, **kwargs) -> None:
+        """
+        发布事件。未调用 `set_inline(True)` 时与 `dispatch()` 相同，否则依次等待监听器运行完毕。
+
+        协程中的异常交由事件循环的异常处理函数报告，不会中断发布。
+
+        Args:
+            name (str):       事件名。
+            *args, **kwargs (Any):  要传递给函数的参数。
+        """
+        if not self.__inline:
+            self.dispatch(name, *args, **kwargs)
+            return
+        if not args and not kwargs:
+            args = [{}]  # type: ignore
+        name = _upper(name)
+        if self.__ignore_events and name in self.__ignore_events:
+            return
+
+        handlers = self.__table.get(name)
+        if handlers:
+            for handler, is_coroutine in handlers:
+                obj = handler(*args, **kwargs)
+                if is_coroutine or (obj is not None and isinstance(obj, Coroutine)):
+                    try:
+                        await obj
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        self.__report(e)
+
+        if name != "__ALL__" and "__ALL__" in self.__table:
+            await self.emit("__ALL__", dict(kwargs, name=name, data=args))
+
+    def get_pending_tasks(self) -> List[asyncio.Future]:
+        """
+        获取正在运行的监听器任务。
+
+        Returns:
+            List[asyncio.Future]: 任务列表。
+        """
+        return list(self.__tasks)
+
+    def __spawn(self, coroutine: Coroutine) -> None:
+        # 保留任务的引用，避免任务在运行中被回收
+        task = asyncio.ensure_future(coroutine)
+        self.__tasks.add(task)
+        task.add_done_callback(self.__on_task_done)
+
+    def __on_task_done(self, task: asyncio.Future) -> None:
+        self.__tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.__report(task.exception(), task)  # type: ignore
+
+    def __report(self, exception: BaseException, task=None) -> None:
+        context = {
+            "message": f"{type(self).__name__} 事件监听器出错",
+            "exception": exception,
+        }
+        if task is not None:
+            context["task"] = task
+        loop = task.get_loop() if task is not None else asyncio.get_running_loop()
+        loop.call_exception_handler(context)
@@ -0,0 +1,155 @@
+"""
+bilibili_api.utils.batch_loader
+
+将短时间内的多次单项查询合并为批量查询。
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+from .cache_pool import CachePool
+
+_MISSING = object()
+
+
+class BatchLoader:
+    """
+    将 `window` 秒内的查询合并为一次批量查询，结果写入缓存池。
+
+    同一个键正在查询时不会重复查询。批量查询结果中没有的键视为不存在，
+    以 `default` 缓存 `missing_ttl` 秒。
+
+    ``` python
+    loader = BatchLoader(load_names, cache_pool.user_name2uid, max_batch=20)
+    uids = await asyncio.gather(loader.load("a"), loader.load("b"))  # 一次请求
+    ```
+    """
+
+    def __init__(
+        self,
+        load: Callable[[List[Any]], Awaitable[Dict[Any, Any]]],
+        cache: Optional[CachePool] = None,
+        window: float = 0.01,
+        max_batch: int = 50,
+        default: Any = None,
+        missing_ttl: Optional[float] = None,
+    ) -> None:
+        """
+        Args:
+            load        (Callable[[List[Any]], Awaitable[Dict[Any, Any]]]): 批量查询函数，返回键到结果的映射
+
+            cache       (CachePool | None, optional) : 缓存池. Defaults to None.
+
+            window      (float, optional)            : 合并查询的等待时间（秒）. Defaults to 0.01.
+
+            max_batch   (int, optional)              : 每次批量查询的最大键数. Defaults to 50.
+
+            default     (Any, optional)              : 不存在的键的结果. Defaults to None.
+
+            missing_ttl (float | None, optional)     : 不存在的键的缓存时间（秒），None 表示使用缓存池默认值. Defaults to None.
+        """
+        self.__load = load
+        self.__cache = cache
+        self.__window = window
+        self.__max_batch = max(max_batch, 1)
+        self.__default = default
+        self.__missing_ttl = missing_ttl
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__queue: Dict[Hashable, asyncio.Future] = {}
+        self.__inflight: Dict[Hashable, asyncio.Future] = {}
+        self.__timer: Optional[asyncio.TimerHandle] = None
+        self.__tasks: Set[asyncio.Future] = set()
+
+    async def load(self, key: Hashable) -> Any:
+        """
+        查询单个键。
+
+        Args:
+            key (Hashable): 键
+
+        Returns:
+            Any: 结果
+        """
+        return (await self.load_many([key]))[key]
+
+    async def load_many(self, keys: Iterable[Hashable]) -> Dict[Any, Any]:
+        """
+        查询多个键。
+
+        Args:
+            keys (Iterable[Hashable]): 键
+
+        Returns:
+            Dict[Any, Any]: 键到结果的映射
+        """
+        loop = asyncio.get_running_loop()
+        if self.__loop is not loop:
+            # 不同事件循环之间不能共享 Future
+            self.__loop = loop
+            self.__queue = {}
+            self.__inflight = {}
+            self.__timer = None
+
+        result: Dict[Any, Any] = {}
+        futures: Dict[Any, asyncio.Future] = {}
+        for key in dict.fromkeys(keys):
+            if self.__cache is not None:
+                value = self.__cache.get(key, _MISSING)
+                if value is not _MISSING:
+                    result[key] = value
+                    continue
+            future = self.__queue.get(key) or self.__inflight.get(key)
+            if future is None:
+                future = loop.create_future()
+                self.__queue[key] = future
+            futures[key] = future
+
+        if len(self.__queue) >= self.__max_batch:
+            self.__flush()
+        elif self.__queue and self.__timer is None:
+            self.__timer = loop.call_later(self.__window, self.__flush)
+
+        for key, future in futures.items():
+            result[key] = await asyncio.shield(future)
+        return result
+
+    def __flush(self) -> None:
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        queue, self.__queue = self.__queue, {}
+        keys = list(queue)
+        for i in range(0, len(keys), self.__max_batch):
+            batch = {key: queue[key] for key in keys[i : i + self.__max_batch]}
+            self.__inflight.update(batch)
+            # 保留任务的引用，避免任务在运行中被回收
+            task = asyncio.ensure_future(self.__run(batch))
+            self.__tasks.add(task)
+            task.add_done_callback(self.__tasks.discard)
+
+    async def __run(self, batch: Dict[Any, asyncio.Future]) -> None:
+        try:
+            values = await self.__load(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # 没有等待者时不报告异常
+                    future.exception()
+        else:
+            for key, future in batch.items():
+                value = values.get(key, _MISSING)
+                if self.__cache is not None:
+                    if value is _MISSING:
+                        if self.__missing_ttl is None:
+                            self.__cache.set(key, self.__default)
+                        else:
+                            self.__cache.set(key, self.__default, ttl=self.__missing_ttl)
+                    else:
+                        self.__cache.set(key, value)
+                if not future.done():
+                    future.set_result(self.__default if value is _MISSING else value)
+        finally:
+            for key, future in batch.items():
+                if self.__inflight.get(key) is future:
+                    del self.__inflight[key]
@@ -1,5 +1,382 @@
-article2dynamic: dict = {}
-dynamic2article: dict = {}
-article_is_note: dict = {}
-dynamic_is_article: dict = {}
-dynamic_is_opus: dict = {}
+"""
+bilibili_api.utils.cache_pool
+
+模块内部使用的缓存池，支持容量上限、过期时间 (TTL)、淘汰统计以及可选的持久化。
+"""
+
+import json
+import atexit
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_MISSING = object()
+
+COMMIT_INTERVAL = 1.0
+"持久化时合并提交写入的最长间隔，单位秒"
+
+COMMIT_BATCH = 256
+"持久化时未提交的写入达到该数量立即提交"
+
+
+class CachePool:
+    """
+    有容量上限与过期时间的 LRU 缓存池。
+
+    用法与 `dict` 基本一致（`get`, `[]`, `in`, `pop` 等），超出容量时淘汰最久未使用的项。
+
+    可通过 `persist` 参数指定 sqlite 数据库路径，将缓存持久化，以便进程重启后继续使用。
+    持久化的键与值需要能被 json 序列化。写入会合并提交（见 `COMMIT_INTERVAL`、`COMMIT_BATCH`），
+    进程退出时自动提交，也可以调用 `flush()` 立即提交。被淘汰的项同时从数据库中删除，
+    过期的项在提交时删除。
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        maxsize: int = 4096,
+        ttl: Optional[float] = None,
+        persist: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            name    (str, optional)          : 缓存池名称，持久化时作为表名. Defaults to "".
+            maxsize (int, optional)          : 最大缓存项数，小于等于 0 表示不限制. Defaults to 4096.
+            ttl     (float | None, optional) : 默认过期时间，单位秒，None 表示不过期. Defaults to None.
+            persist (str | None, optional)   : 持久化 sqlite 数据库路径，None 表示不持久化. Defaults to None.
+        """
+        self.name = name
+        self.__maxsize = maxsize
+        self.__ttl = ttl
+        self.__data: "OrderedDict[Any, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self.__lock = threading.RLock()
+        self.__stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        self.__db: Optional[sqlite3.Connection] = None
+        self.__pending = 0
+        self.__last_commit = 0.0
+        if persist is not None:
+            self.set_persist(persist)
+        if name:
+            caches[name] = self
+
+    def get_maxsize(self) -> int:
+        """
+        获取最大缓存项数
+
+        Returns:
+            int: 最大缓存项数
+        """
+        return self.__maxsize
+
+    def set_maxsize(self, maxsize: int) -> None:
+        """
+        设置最大缓存项数，超出部分立即淘汰
+
+        Args:
+            maxsize (int): 最大缓存项数，小于等于 0 表示不限制
+        """
+        with self.__lock:
+            self.__maxsize = maxsize
+            self.__evict()
+
+    def get_ttl(self) -> Optional[float]:
+        """
+        获取默认过期时间
+
+        Returns:
+            float | None: 默认过期时间，单位秒
+        """
+        return self.__ttl
+
+    def set_ttl(self, ttl: Optional[float]) -> None:
+        """
+        设置默认过期时间，仅对之后写入的项生效
+
+        Args:
+            ttl (float | None): 默认过期时间，单位秒，None 表示不过期
+        """
+        self.__ttl = ttl
+
+    def set_persist(self, path: Optional[str]) -> None:
+        """
+        设置持久化 sqlite 数据库路径
+
+        Args:
+            path (str | None): 数据库路径，None 表示关闭持久化
+        """
+        with self.__lock:
+            if self.__db is not None:
+                self.flush()
+                self.__db.close()
+                self.__db = None
+            if path is None:
+                return
+            self.__db = sqlite3.connect(path, check_same_thread=False)
+            self.__db.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self.__table()}" '
+                "(key TEXT PRIMARY KEY, value TEXT, expire REAL)"
+            )
+            self.__db.execute(
+                f'CREATE INDEX IF NOT EXISTS "{self.__table()}_expire" '
+                f'ON "{self.__table()}" (expire)'
+            )
+            self.__commit()
+            if self not in _persisted:
+                _persisted.append(self)
+
+    def flush(self) -> None:
+        """
+        立即提交尚未提交的持久化写入
+        """
+        with self.__lock:
+            if self.__db is not None and self.__pending:
+                self.__commit()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """
+        获取缓存项
+
+        Args:
+            key     (Any)          : 键
+            default (Any, optional): 不存在或已过期时返回的值. Defaults to None.
+
+        Returns:
+            Any: 缓存的值
+        """
+        with self.__lock:
+            item = self.__data.get(key, _MISSING)
+            if item is _MISSING and self.__db is not None:
+                item = self.__load(key)
+            if item is not _MISSING:
+                value, expire = item
+                if not _expired(expire, time.time()):
+                    self.__data[key] = item
+                    self.__data.move_to_end(key)
+                    self.__evict()
+                    self.__stats["hits"] += 1
+                    return value
+                self.__stats["expirations"] += 1
+                self.__discard(key)
+            self.__stats["misses"] += 1
+            return default
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = _MISSING) -> None:
+        """
+        写入缓存项
+
+        Args:
+            key   (Any)                   : 键
+            value (Any)                   : 值
+            ttl   (float | None, optional): 本项的过期时间，单位秒，不传入则使用默认过期时间
+        """
+        if ttl is _MISSING:
+            ttl = self.__ttl
+        expire = None if ttl is None else time.time() + ttl
+        with self.__lock:
+            self.__data[key] = (value, expire)
+            self.__data.move_to_end(key)
+            if self.__db is not None:
+                self.__db.execute(
+                    f'REPLACE INTO "{self.__table()}" VALUES (?, ?, ?)',
+                    (json.dumps(key), json.dumps(value, ensure_ascii=False), expire),
+                )
+                self.__pending += 1
+            self.__evict()
+            self.__maybe_commit()
+
+    def pop(self, key: Any, default: Any = _MISSING) -> Any:
+        """
+        移除并返回缓存项
+
+        Args:
+            key     (Any)          : 键
+            default (Any, optional): 不存在时返回的值，不传入则报 KeyError
+
+        Returns:
+            Any: 缓存的值
+        """
+        with self.__lock:
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                if default is _MISSING:
+                    raise KeyError(key)
+                return default
+            self.__discard(key)
+            return value
+
+    def clear(self) -> None:
+        """
+        清空缓存池（包括持久化的数据）
+        """
+        with self.__lock:
+            self.__data.clear()
+            if self.__db is not None:
+                self.__db.execute(f'DELETE FROM "{self.__table()}"')
+                self.__commit()
+
+    def get_stats(self) -> dict:
+        """
+        获取缓存池统计信息
+
+        Returns:
+            dict: 包含 size, maxsize, hits, misses, evictions, expirations
+        """
+        with self.__lock:
+            return {
+                "size": len(self),
+                "maxsize": self.__maxsize,
+                **self.__stats,
+            }
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        self.pop(key)
+
+    def __contains__(self, key: Any) -> bool:
+        # 不计入命中统计，也不改变淘汰顺序
+        with self.__lock:
+            item = self.__data.get(key, _MISSING)
+            if item is _MISSING and self.__db is not None:
+                item = self.__load(key)
+            return item is not _MISSING and not _expired(item[1], time.time())
+
+    def __len__(self) -> int:
+        with self.__lock:
+            now = time.time()
+            return sum(1 for _, expire in self.__data.values() if not _expired(expire, now))
+
+    def __iter__(self) -> Iterator[Any]:
+        with self.__lock:
+            now = time.time()
+            return iter(
+                [key for key, (_, expire) in self.__data.items() if not _expired(expire, now)]
+            )
+
+    def __repr__(self) -> str:
+        return f"CachePool(name='{self.name}', size={len(self.__data)}, maxsize={self.__maxsize}, ttl={self.__ttl})"
+
+    def __table(self) -> str:
+        return "cache_" + (self.name or "default").replace('"', "")
+
+    def __load(self, key: Any) -> Any:
+        row = self.__db.execute(
+            f'SELECT value, expire FROM "{self.__table()}" WHERE key = ?',
+            (json.dumps(key),),
+        ).fetchone()
+        if row is None:
+            return _MISSING
+        return (json.loads(row[0]), row[1])
+
+    def __discard(self, key: Any) -> None:
+        self.__data.pop(key, None)
+        if self.__db is not None:
+            self.__db.execute(
+                f'DELETE FROM "{self.__table()}" WHERE key = ?', (json.dumps(key),)
+            )
+            self.__pending += 1
+            self.__maybe_commit()
+
+    def __evict(self) -> None:
+        if self.__maxsize <= 0:
+            return
+        evicted = []
+        while len(self.__data) > self.__maxsize:
+            evicted.append(self.__data.popitem(last=False)[0])
+            self.__stats["evictions"] += 1
+        if evicted and self.__db is not None:
+            self.__db.executemany(
+                f'DELETE FROM "{self.__table()}" WHERE key = ?',
+                [(json.dumps(key),) for key in evicted],
+            )
+            self.__pending += len(evicted)
+
+    def __maybe_commit(self) -> None:
+        if self.__db is not None and (
+            self.__pending >= COMMIT_BATCH
+            or time.time() - self.__last_commit >= COMMIT_INTERVAL
+        ):
+            self.__commit()
+
+    def __commit(self) -> None:
+        # 顺便删除已过期的项，未再次读取的过期项不会一直留在数据库中
+        self.__db.execute(
+            f'DELETE FROM "{self.__table()}" WHERE expire IS NOT NULL AND expire <= ?',
+            (time.time(),),
+        )
+        self.__db.commit()
+        self.__pending = 0
+        self.__last_commit = time.time()
+
+
+def _expired(expire: Optional[float], now: float) -> bool:
+    return expire is not None and expire <= now
+
+
+caches: Dict[str, CachePool] = {}
+"所有具名缓存池，键为名称"
+
+_persisted: List[CachePool] = []
+
+
+@atexit.register
+def _flush_persisted() -> None:
+    for pool in _persisted:
+        pool.flush()
+
+
+def get_cache_pool(name: str) -> CachePool:
+    """
+    获取具名缓存池
+
+    Args:
+        name (str): 缓存池名称
+
+    Returns:
+        CachePool: 缓存池
+    """
+    return caches[name]
+
+
+def get_all_stats() -> Dict[str, dict]:
+    """
+    获取所有具名缓存池的统计信息
+
+    Returns:
+        Dict[str, dict]: 键为缓存池名称，值为统计信息
+    """
+    return {name: pool.get_stats() for name, pool in caches.items()}
+
+
+def clear_all() -> None:
+    """
+    清空所有具名缓存池
+    """
+    for pool in caches.values():
+        pool.clear()
+
+
+article2dynamic: CachePool = CachePool("article2dynamic", maxsize=8192, ttl=86400)
+dynamic2article: CachePool = CachePool("dynamic2article", maxsize=8192, ttl=86400)
+article_is_note: CachePool = CachePool("article_is_note", maxsize=8192, ttl=86400)
+dynamic_is_article: CachePool = CachePool("dynamic_is_article", maxsize=8192, ttl=86400)
+dynamic_is_opus: CachePool = CachePool("dynamic_is_opus", maxsize=8192, ttl=86400)
+video_pages: CachePool = CachePool("video_pages", maxsize=8192, ttl=3600)
+"aid -> 分 P 信息列表 (含 cid, duration, dimension 等)"
+episode_cid: CachePool = CachePool("episode_cid", maxsize=8192, ttl=3600)
+"epid -> cid"
+user_access_id: CachePool = CachePool("user_access_id", maxsize=65536, ttl=600)
+"uid -> w_webid (None 表示页面中没有)，w_webid 不绑定用户时键为 *"
+user_name2uid: CachePool = CachePool("user_name2uid", maxsize=65536, ttl=21600)
+"用户名 -> uid (0 表示不存在)"
+user_uid2name: CachePool = CachePool("user_uid2name", maxsize=65536, ttl=21600)
+"uid -> 用户名 (None 表示不存在)"
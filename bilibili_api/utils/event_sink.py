@@ -0,0 +1,307 @@
+"""
+bilibili_api.utils.event_sink
+
+有容量上限的事件队列，支持批量取出与队列满时的处理策略。
+"""
+
+import pickle
+import asyncio
+import tempfile
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Iterable, List, Optional, Set, IO
+
+POLICIES = ("block", "drop", "drop_oldest", "spill")
+"队列满时的处理策略"
+
+
+class EventSink:
+    """
+    有容量上限的事件队列，可以异步迭代逐个取出，也可以通过 `batches()` 批量取出。
+
+    队列满时按 `policy` 处理新事件：
+
+    + block      : 等待队列有空位，生产者会因此暂停（例如暂停读取 websocket 数据）
+    + drop       : 丢弃新事件
+    + drop_oldest: 丢弃最早的事件
+    + spill      : 写入临时文件，取出时按顺序读回，不丢弃也不暂停
+
+    ``` python
+    sink = EventSink(maxsize=10000, policy="drop_oldest", cmds=["DANMU_MSG"])
+    async for batch in sink.batches(100, 0.05):
+        ...
+    ```
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        policy: str = "block",
+        cmds: Optional[Iterable[str]] = None,
+        raw: bool = False,
+    ) -> None:
+        """
+        Args:
+            maxsize (int, optional)                  : 内存中最多保存的事件数. Defaults to 10000.
+
+            policy  (str, optional)                  : 队列满时的处理策略，可选 block / drop / drop_oldest / spill. Defaults to "block".
+
+            cmds    (Iterable[str] | None, optional) : 只接收这些类型的事件，None 表示接收所有事件. Defaults to None.
+
+            raw     (bool, optional)                 : 生产者是否提供未解码的原始数据. Defaults to False.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"policy 只能是 {', '.join(POLICIES)} 之一")
+        self.maxsize = max(maxsize, 1)
+        self.policy = policy
+        self.cmds: Optional[Set[str]] = (
+            None if cmds is None else {cmd.upper() for cmd in cmds}
+        )
+        self.raw = raw
+        self.__queue: Deque[Any] = deque()
+        self.__spill: Optional[IO[bytes]] = None
+        self.__spill_read = 0
+        self.__spill_count = 0
+        self.__getters: Deque[asyncio.Future] = deque()
+        self.__putters: Deque[asyncio.Future] = deque()
+        self.__closed = False
+        self.__stats = {"received": 0, "dropped": 0, "spilled": 0}
+
+    def wants(self, cmd: str) -> bool:
+        """
+        是否接收指定类型的事件
+
+        Args:
+            cmd (str): 事件类型
+
+        Returns:
+            bool: 是否接收
+        """
+        return not self.__closed and (self.cmds is None or cmd in self.cmds)
+
+    def closed(self) -> bool:
+        """
+        是否已关闭
+
+        Returns:
+            bool: 是否已关闭
+        """
+        return self.__closed
+
+    def qsize(self) -> int:
+        """
+        获取待取出的事件数，包括写入临时文件的事件
+
+        Returns:
+            int: 事件数
+        """
+        return len(self.__queue) + self.__spill_count
+
+    def get_stats(self) -> dict:
+        """
+        获取统计信息
+
+        Returns:
+            dict: received 收到的事件数，dropped 丢弃的事件数，spilled 写入临时文件的事件数，queued 待取出的事件数
+        """
+        return dict(self.__stats, queued=self.qsize())
+
+    async def put(self, item: Any) -> None:
+        """
+        放入事件，`block` 策略下队列满时等待
+
+        Args:
+            item (Any): 事件
+        """
+        if self.policy == "block":
+            while not self.__closed and len(self.__queue) >= self.maxsize:
+                putter = asyncio.get_running_loop().create_future()
+                self.__putters.append(putter)
+                try:
+                    await putter
+                finally:
+                    if putter in self.__putters:
+                        self.__putters.remove(putter)
+        self.put_nowait(item)
+
+    def put_nowait(self, item: Any) -> bool:
+        """
+        放入事件，不等待，`block` 策略下队列满时也会放入
+
+        Args:
+            item (Any): 事件
+
+        Returns:
+            bool: 是否放入，被丢弃或已关闭时为 False
+        """
+        if self.__closed:
+            return False
+        self.__stats["received"] += 1
+        if self.__spill_count or len(self.__queue) >= self.maxsize:
+            if self.policy == "drop":
+                self.__stats["dropped"] += 1
+                return False
+            if self.policy == "drop_oldest":
+                self.__queue.popleft()
+                self.__stats["dropped"] += 1
+            elif self.policy == "spill":
+                # 已有事件写入临时文件时，之后的事件也写入临时文件以保持顺序
+                self.__spill_write(item)
+                self.__wake_getter()
+                return True
+        self.__queue.append(item)
+        self.__wake_getter()
+        return True
+
+    def get_nowait(self) -> Any:
+        """
+        取出一个事件，不等待
+
+        Returns:
+            Any: 事件
+
+        Raises:
+            asyncio.QueueEmpty: 没有事件
+        """
+        if not self.__queue and self.__spill_count:
+            self.__spill_load()
+        if not self.__queue:
+            raise asyncio.QueueEmpty()
+        item = self.__queue.popleft()
+        self.__wake_putters()
+        return item
+
+    async def get(self) -> Any:
+        """
+        取出一个事件，没有事件时等待
+
+        Returns:
+            Any: 事件
+
+        Raises:
+            StopAsyncIteration: 已关闭且没有剩余事件
+        """
+        while not self.qsize():
+            if self.__closed:
+                raise StopAsyncIteration
+            await self.__wait(None)
+        return self.get_nowait()
+
+    async def get_batch(self, max_size: int = 100, timeout: float = 0) -> List[Any]:
+        """
+        批量取出事件：等待至少一个事件，之后最多再等待 `timeout` 秒凑满 `max_size` 个
+
+        Args:
+            max_size (int, optional)  : 每批最多的事件数. Defaults to 100.
+
+            timeout  (float, optional): 凑满一批的最长等待时间（秒）. Defaults to 0.
+
+        Returns:
+            List[Any]: 事件列表
+
+        Raises:
+            StopAsyncIteration: 已关闭且没有剩余事件
+        """
+        batch = [await self.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while len(batch) < max_size:
+            if self.qsize():
+                batch.append(self.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0 or self.__closed:
+                break
+            await self.__wait(remaining)
+        return batch
+
+    async def batches(
+        self, max_size: int = 100, timeout: float = 0
+    ) -> AsyncIterator[List[Any]]:
+        """
+        异步迭代批量取出的事件，参数同 `get_batch()`
+
+        Args:
+            max_size (int, optional)  : 每批最多的事件数. Defaults to 100.
+
+            timeout  (float, optional): 凑满一批的最长等待时间（秒）. Defaults to 0.
+
+        Returns:
+            AsyncIterator[List[Any]]: 每次产出一批事件
+        """
+        while True:
+            try:
+                batch = await self.get_batch(max_size, timeout)
+            except StopAsyncIteration:
+                return
+            yield batch
+
+    def __aiter__(self) -> "EventSink":
+        return self
+
+    async def __anext__(self) -> Any:
+        return await self.get()
+
+    def close(self) -> None:
+        """
+        关闭队列，不再接收新事件，已有的事件仍可取出，取完后删除临时文件
+        """
+        self.__closed = True
+        if not self.__spill_count:
+            self.__spill_close()
+        self.__wake_getter()
+        self.__wake_putters(all_=True)
+
+    async def __wait(self, timeout: Optional[float]) -> None:
+        getter = asyncio.get_running_loop().create_future()
+        self.__getters.append(getter)
+        try:
+            await asyncio.wait([getter], timeout=timeout)
+        finally:
+            if getter in self.__getters:
+                self.__getters.remove(getter)
+            getter.cancel()
+
+    def __wake_getter(self) -> None:
+        while self.__getters:
+            getter = self.__getters.popleft()
+            if not getter.done():
+                getter.set_result(None)
+
+    def __wake_putters(self, all_: bool = False) -> None:
+        while self.__putters and (all_ or len(self.__queue) < self.maxsize):
+            putter = self.__putters.popleft()
+            if not putter.done():
+                putter.set_result(None)
+                if not all_:
+                    break
+
+    def __spill_write(self, item: Any) -> None:
+        if self.__spill is None:
+            self.__spill = tempfile.TemporaryFile()
+        self.__spill.seek(0, 2)
+        pickle.dump(item, self.__spill, pickle.HIGHEST_PROTOCOL)
+        self.__spill_count += 1
+        self.__stats["spilled"] += 1
+
+    def __spill_load(self) -> None:
+        # 读回最多 maxsize 个事件
+        assert self.__spill is not None
+        self.__spill.seek(self.__spill_read)
+        while self.__spill_count and len(self.__queue) < self.maxsize:
+            self.__queue.append(pickle.load(self.__spill))
+            self.__spill_count -= 1
+        self.__spill_read = self.__spill.tell()
+        if not self.__spill_count:
+            if self.__closed:
+                self.__spill_close()
+                return
+            self.__spill.seek(0)
+            self.__spill.truncate()
+            self.__spill_read = 0
+
+    def __spill_close(self) -> None:
+        # 已关闭且取完时不会再写入，删除临时文件
+        if self.__spill is not None:
+            self.__spill.close()
+            self.__spill = None
+            self.__spill_read = 0
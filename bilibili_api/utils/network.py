@@ -71,7 +71,6 @@ class RequestLog(AsyncEvent):
             "WS_CLOSE",
         ]
         self.__ignore_events: List[str] = []
-        self.add_event_listener("__ALL__", self.__handle_events)
 
     def get_on_events(self) -> List[str]:
         """
@@ -125,6 +124,11 @@ class RequestLog(AsyncEvent):
         Args:
             status (bool): 是否启用
         """
+        # 不启用时不注册监听器，没有其他监听器时发布事件几乎没有开销
+        if status and not self.__on:
+            self.add_event_listener("__ALL__", self.__handle_events)
+        elif not status and self.__on:
+            self.remove_event_listener("__ALL__", self.__handle_events)
         self.__on = status
 
     def __handle_events(self, data: dict) -> None:
@@ -638,12 +642,14 @@ class BiliAPIClient(ABC):
             raise NotImplementedError
 
         @abstractmethod
-        async def download_chunk(self, cnt: int) -> bytes:
+        async def download_chunk(self, cnt: int, size: int = 4096) -> bytes:
             """
             下载部分文件
 
             Args:
-                cnt    (int): 下载编号
+                cnt    (int)          : 下载编号
+
+                size   (int, optional): 每次最多读取的字节数，部分客户端按收到的数据块返回. Defaults to 4096.
 
             Returns:
                 bytes: 字节
@@ -663,6 +669,39 @@ class BiliAPIClient(ABC):
             """
             raise NotImplementedError
 
+        def download_status(self, cnt: int) -> int:
+            """
+            获取下载响应的状态码。未实现时返回 200。
+
+            Args:
+                cnt    (int): 下载编号
+
+            Returns:
+                int: 状态码
+            """
+            return 200
+
+        def download_headers(self, cnt: int) -> dict:
+            """
+            获取下载响应头，键为小写。未实现时只包含 content-length。
+
+            Args:
+                cnt    (int): 下载编号
+
+            Returns:
+                dict: 响应头
+            """
+            return {"content-length": str(self.download_content_length(cnt))}
+
+        async def download_close(self, cnt: int) -> None:
+            """
+            结束下载并释放连接。未实现时不做任何操作。
+
+            Args:
+                cnt    (int): 下载编号
+            """
+            return
+
         @abstractmethod
         async def ws_create(
             self, url: str = "", params: dict = {}, headers: dict = {}
@@ -847,12 +886,14 @@ class BiliAPIClient(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def download_chunk(self, cnt: int) -> bytes:
+    async def download_chunk(self, cnt: int, size: int = 4096) -> bytes:
         """
         下载部分文件
 
         Args:
-            cnt    (int): 下载编号
+            cnt    (int)          : 下载编号
+
+            size   (int, optional): 每次最多读取的字节数，部分客户端按收到的数据块返回. Defaults to 4096.
 
         Returns:
             bytes: 字节
@@ -872,6 +913,39 @@ class BiliAPIClient(ABC):
         """
         raise NotImplementedError
 
+    def download_status(self, cnt: int) -> int:
+        """
+        获取下载响应的状态码。未实现时返回 200。
+
+        Args:
+            cnt    (int): 下载编号
+
+        Returns:
+            int: 状态码
+        """
+        return 200
+
+    def download_headers(self, cnt: int) -> dict:
+        """
+        获取下载响应头，键为小写。未实现时只包含 content-length。
+
+        Args:
+            cnt    (int): 下载编号
+
+        Returns:
+            dict: 响应头
+        """
+        return {"content-length": str(self.download_content_length(cnt))}
+
+    async def download_close(self, cnt: int) -> None:
+        """
+        结束下载并释放连接。未实现时不做任何操作。
+
+        Args:
+            cnt    (int): 下载编号
+        """
+        return
+
     @abstractmethod
     async def ws_create(
         self, url: str = "", params: dict = {}, headers: dict = {}
@@ -0,0 +1,321 @@
+"""
+bilibili_api.utils.paginate
+
+分页接口的通用异步迭代器。
+"""
+
+import math
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+
+class PageAdapter:
+    """
+    页码分页接口的适配器。
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[int], Awaitable[dict]],
+        items: Callable[[dict], List[Any]],
+        total: Optional[Callable[[dict], Optional[int]]] = None,
+        page_size: Optional[int] = None,
+        has_more: Optional[Callable[[dict], bool]] = None,
+        start: int = 1,
+    ) -> None:
+        """
+        Args:
+            fetch     (Callable[[int], Awaitable[dict]])       : 获取指定页码的数据。
+
+            items     (Callable[[dict], List[Any]])            : 从返回数据中取出本页列表。
+
+            total     (Callable[[dict], int | None], optional) : 从返回数据中取出总数。提供总数和每页数量后会并发获取之后的页. Defaults to None.
+
+            page_size (int | None, optional)                   : 每页数量. Defaults to None.
+
+            has_more  (Callable[[dict], bool], optional)       : 是否还有下一页，不提供时以返回空列表为结束. Defaults to None.
+
+            start     (int, optional)                          : 第一页的页码. Defaults to 1.
+        """
+        self.fetch = fetch
+        self.items = items
+        self.total = total
+        self.page_size = page_size
+        self.has_more = has_more
+        self.start = start
+
+
+class CursorAdapter:
+    """
+    游标（偏移量）分页接口的适配器，下一页的游标由上一页返回。
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Any], Awaitable[dict]],
+        items: Callable[[dict], List[Any]],
+        next_cursor: Callable[[dict], Any],
+        has_more: Optional[Callable[[dict], bool]] = None,
+        start: Any = "",
+    ) -> None:
+        """
+        Args:
+            fetch       (Callable[[Any], Awaitable[dict]]) : 获取指定游标的数据。
+
+            items       (Callable[[dict], List[Any]])      : 从返回数据中取出本页列表。
+
+            next_cursor (Callable[[dict], Any])            : 从返回数据中取出下一页的游标。
+
+            has_more    (Callable[[dict], bool], optional) : 是否还有下一页，不提供时以返回空列表或游标不变为结束. Defaults to None.
+
+            start       (Any, optional)                    : 第一页的游标. Defaults to "".
+        """
+        self.fetch = fetch
+        self.items = items
+        self.next_cursor = next_cursor
+        self.has_more = has_more
+        self.start = start
+
+
+class Paginator:
+    """
+    分页接口的异步迭代器，逐项产出每一页列表中的内容。
+
+    页码分页接口在处理当前页时会预取之后的页，首页返回总数后按总页数并发获取，
+    但产出顺序与页码顺序一致；游标分页接口只能逐页获取。
+
+    `checkpoint()` 返回当前位置，之后可通过 `resume` 参数从该位置继续。
+    正在处理的项不计入已完成，继续时会重新产出。
+
+    ``` python
+    pager = paginate(adapter, max_items=100)
+    async for item in pager:
+        ...
+    token = pager.checkpoint()
+    ```
+    """
+
+    def __init__(
+        self,
+        adapter: Union[PageAdapter, CursorAdapter],
+        prefetch: int = 1,
+        concurrency: int = 4,
+        max_items: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        resume: Optional[dict] = None,
+        key: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        """
+        Args:
+            adapter     (PageAdapter | CursorAdapter)  : 接口适配器。
+
+            prefetch    (int, optional)                : 总数未知时预取的页数. Defaults to 1.
+
+            concurrency (int, optional)                : 总数已知时同时获取的页数. Defaults to 4.
+
+            max_items   (int | None, optional)         : 最多产出的项数. Defaults to None.
+
+            max_pages   (int | None, optional)         : 最多获取的页数. Defaults to None.
+
+            resume      (dict | None, optional)        : `checkpoint()` 返回的位置. Defaults to None.
+
+            key         (Callable[[Any], Any], optional): 去重键，翻页期间列表变化导致的重复项只产出一次. Defaults to None.
+        """
+        self.__adapter = adapter
+        self.__prefetch = max(prefetch, 0)
+        self.__concurrency = max(concurrency, 1)
+        self.__max_items = max_items
+        self.__max_pages = max_pages
+        self.__key = key
+        self.__seen: set = set()
+        self.__total: Optional[int] = None
+        self.__iterator: Optional[AsyncIterator[Any]] = None
+        if resume is not None:
+            self.__position = dict(resume)
+        elif isinstance(adapter, PageAdapter):
+            self.__position = {"page": adapter.start, "index": 0, "done": False}
+        else:
+            self.__position = {"cursor": adapter.start, "index": 0, "done": False}
+
+    def checkpoint(self) -> dict:
+        """
+        获取当前位置，可以被 json 序列化。
+
+        Returns:
+            dict: 位置，`done` 为 True 时表示已经全部获取
+        """
+        return dict(self.__position)
+
+    def get_total(self) -> Optional[int]:
+        """
+        获取接口返回的总数，首页返回前或接口不提供时为 None。
+
+        Returns:
+            int | None: 总数
+        """
+        return self.__total
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        if self.__iterator is None:
+            self.__iterator = self.__items()
+        return self.__iterator
+
+    async def __anext__(self) -> Any:
+        return await self.__aiter__().__anext__()
+
+    async def aclose(self) -> None:
+        """
+        提前结束迭代，取消正在获取的页。
+        """
+        if self.__iterator is not None:
+            await self.__iterator.aclose()
+
+    async def collect(self) -> List[Any]:
+        """
+        获取全部内容。
+
+        Returns:
+            List[Any]: 所有项
+        """
+        return [item async for item in self]
+
+    async def __items(self) -> AsyncIterator[Any]:
+        if self.__position.get("done"):
+            return
+        count = 0
+        skip = self.__position.get("index", 0)
+        pages = (
+            self.__page_number_pages()
+            if isinstance(self.__adapter, PageAdapter)
+            else self.__cursor_pages()
+        )
+        try:
+            async for position, items, next_position in pages:
+                for i in range(skip, len(items)):
+                    if self.__max_items is not None and count >= self.__max_items:
+                        return
+                    item = items[i]
+                    self.__position = dict(position, index=i, done=False)
+                    if self.__key is not None:
+                        k = self.__key(item)
+                        if k in self.__seen:
+                            continue
+                        self.__seen.add(k)
+                    count += 1
+                    yield item
+                    # 请求下一项时当前项已处理完毕
+                    self.__position = dict(position, index=i + 1, done=False)
+                skip = 0
+                self.__position = next_position
+        finally:
+            await pages.aclose()
+
+    async def __page_number_pages(
+        self,
+    ) -> AsyncIterator[Tuple[dict, List[Any], dict]]:
+        adapter: PageAdapter = self.__adapter  # type: ignore
+        page = self.__position["page"]
+        # 从第一页开始计算，继续迭代时也不会超出
+        last = None if self.__max_pages is None else adapter.start + self.__max_pages - 1
+        total_known = False
+        tasks: Dict[int, asyncio.Future] = {}
+        next_page = page
+        try:
+            while last is None or page <= last:
+                window = self.__concurrency if total_known else self.__prefetch + 1
+                while len(tasks) < window and (last is None or next_page <= last):
+                    tasks[next_page] = asyncio.ensure_future(adapter.fetch(next_page))
+                    next_page += 1
+                data = await tasks.pop(page)
+
+                if not total_known and adapter.total is not None:
+                    total = adapter.total(data)
+                    if total is not None:
+                        self.__total = total
+                        if adapter.page_size:
+                            total_known = True
+                            end = adapter.start + max(math.ceil(total / adapter.page_size), 1) - 1
+                            last = end if last is None else min(last, end)
+                            for p in [p for p in tasks if p > last]:
+                                _cancel(tasks.pop(p))
+
+                items = adapter.items(data) or []
+                finished = (
+                    (not adapter.has_more(data) if adapter.has_more else not items)
+                    or (last is not None and page >= last)
+                )
+                yield (
+                    {"page": page},
+                    items,
+                    {"page": page + 1, "index": 0, "done": finished},
+                )
+                if finished:
+                    break
+                page += 1
+        finally:
+            for task in tasks.values():
+                _cancel(task)
+
+    async def __cursor_pages(self) -> AsyncIterator[Tuple[dict, List[Any], dict]]:
+        adapter: CursorAdapter = self.__adapter  # type: ignore
+        cursor = self.__position["cursor"]
+        pages = 0
+        while True:
+            data = await adapter.fetch(cursor)
+            pages += 1
+            items = adapter.items(data) or []
+            next_cursor = adapter.next_cursor(data)
+            finished = (
+                not items
+                or next_cursor in (None, "", cursor)
+                or (adapter.has_more is not None and not adapter.has_more(data))
+                or (self.__max_pages is not None and pages >= self.__max_pages)
+            )
+            yield (
+                {"cursor": cursor},
+                items,
+                {"cursor": next_cursor, "index": 0, "done": finished},
+            )
+            if finished:
+                break
+            cursor = next_cursor
+
+
+def _cancel(task: asyncio.Future) -> None:
+    task.cancel()
+    if task.done() and not task.cancelled():
+        # 已经失败的预取页不需要报告异常
+        task.exception()
+
+
+def paginate(
+    adapter: Union[PageAdapter, CursorAdapter],
+    prefetch: int = 1,
+    concurrency: int = 4,
+    max_items: Optional[int] = None,
+    max_pages: Optional[int] = None,
+    resume: Optional[dict] = None,
+    key: Optional[Callable[[Any], Any]] = None,
+) -> Paginator:
+    """
+    创建分页接口的异步迭代器。
+
+    Args:
+        adapter     (PageAdapter | CursorAdapter)  : 接口适配器。
+
+        prefetch    (int, optional)                : 总数未知时预取的页数. Defaults to 1.
+
+        concurrency (int, optional)                : 总数已知时同时获取的页数. Defaults to 4.
+
+        max_items   (int | None, optional)         : 最多产出的项数. Defaults to None.
+
+        max_pages   (int | None, optional)         : 最多获取的页数. Defaults to None.
+
+        resume      (dict | None, optional)        : `Paginator.checkpoint()` 返回的位置. Defaults to None.
+
+        key         (Callable[[Any], Any], optional): 去重键. Defaults to None.
+
+    Returns:
+        Paginator: 异步迭代器
+    """
+    return Paginator(adapter, prefetch, concurrency, max_items, max_pages, resume, key)
@@ -1,12 +1,20 @@
+import io
 import os
+import asyncio
+import hashlib
 import tempfile
-from typing import Any
+from typing import Any, List, Optional
 from dataclasses import dataclass
 
 from yarl import URL
 from PIL import Image
 
 from .network import Credential, get_client, BiliAPIFile
+from ..exceptions import ResponseException
+
+PICTURE_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36 Edg/116.0.1938.54",
+}
 
 @dataclass
 class Picture:
@@ -46,46 +54,111 @@ class Picture:
         return f"Picture(height='{self.height}', width='{self.width}', imageType='{self.imageType}', size={self.size}, url='{self.url}')"
 
     def __set_picture_meta_from_bytes(self, imgtype: str) -> None:
-        tmp_dir = tempfile.gettempdir()
-        img_path = os.path.join(tmp_dir, "test." + imgtype)
-        with open(img_path, "wb+") as file:
-            file.write(self.content)
-        img = Image.open(img_path)
-        self.size = int(round(os.path.getsize(img_path) / 1024, 0))
+        img = Image.open(io.BytesIO(self.content))
+        self.size = int(round(len(self.content) / 1024, 0))
         self.height = img.height
         self.width = img.width
         self.imageType = imgtype
 
     @staticmethod
-    async def load_url(url: str) -> "Picture":
+    async def __fetch(url: str, max_size: Optional[int]) -> bytes:
+        client = get_client()
+        headers = {**PICTURE_HEADERS, "Referer": url}
+        if max_size is None:
+            resp = await client.request(method="GET", url=url, headers=headers)
+            return resp.raw
+        # 有大小限制时流式下载，超出限制立即中断
+        dwn_id = await client.download_create(url, headers)
+        try:
+            total = client.download_content_length(dwn_id)
+            if total > max_size:
+                raise ResponseException(f"图片大小 {total} 字节超过限制 {max_size} 字节: {url}")
+            content = bytearray()
+            while total == 0 or len(content) < total:
+                try:
+                    chunk = await client.download_chunk(dwn_id)
+                except StopAsyncIteration:
+                    break
+                if not chunk:
+                    break
+                content += chunk
+                if len(content) > max_size:
+                    raise ResponseException(f"图片大小超过限制 {max_size} 字节: {url}")
+        finally:
+            await client.download_close(dwn_id)
+        return bytes(content)
+
+    @staticmethod
+    async def load_url(
+        url: str, max_size: Optional[int] = None, cache_dir: Optional[str] = None
+    ) -> "Picture":
         """
         加载网络图片。(async 方法)
 
         Args:
-            url (str): 图片链接
+            url       (str)                 : 图片链接
+
+            max_size  (int | None, optional): 图片大小上限，单位字节，超出时报错并中断下载. Defaults to None.
+
+            cache_dir (str | None, optional): 图片缓存目录，以链接的哈希值命名，已缓存的图片不再下载. Defaults to None.
 
         Returns:
             Picture: 加载后的图片对象
         """
         if URL(url).scheme == "":
             url = "https:" + url
+        imgtype = url.split("/")[-1].split(".")[-1].split("?")[0]
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = os.path.join(
+                cache_dir, hashlib.sha256(url.encode()).hexdigest() + "." + imgtype
+            )
         obj = Picture()
-        session = get_client()
-        resp = await session.request(
-            method="GET",
-            url=url,
-            headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36 Edg/116.0.1938.54",
-                "Referer": url,
-            },
-        )
-        obj.content = resp.raw
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path, "rb") as file:
+                obj.content = file.read()
+        else:
+            obj.content = await Picture.__fetch(url, max_size)
+            if cache_path is not None:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as file:
+                    file.write(obj.content)
+                os.replace(tmp_path, cache_path)
         obj.url = url
-        obj.__set_picture_meta_from_bytes(
-            url.split("/")[-1].split(".")[-1].split("?")[0]
-        )
+        obj.__set_picture_meta_from_bytes(imgtype)
         return obj
 
+    @staticmethod
+    async def load_many(
+        urls: List[str],
+        concurrency: int = 8,
+        max_size: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+    ) -> List["Picture"]:
+        """
+        并发加载多张网络图片。(async 方法)
+
+        Args:
+            urls        (List[str])           : 图片链接列表
+
+            concurrency (int, optional)       : 最大同时下载数. Defaults to 8.
+
+            max_size    (int | None, optional): 单张图片大小上限，单位字节. Defaults to None.
+
+            cache_dir   (str | None, optional): 图片缓存目录，见 `load_url`. Defaults to None.
+
+        Returns:
+            List[Picture]: 加载后的图片对象，顺序与 `urls` 一致
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def load(url: str) -> "Picture":
+            async with semaphore:
+                return await Picture.load_url(url, max_size=max_size, cache_dir=cache_dir)
+
+        return list(await asyncio.gather(*[load(url) for url in urls]))
+
     @staticmethod
     def from_file(path: str) -> "Picture":
         """
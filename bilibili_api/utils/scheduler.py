@@ -0,0 +1,197 @@
+"""
+bilibili_api.utils.scheduler
+
+按截止时间调度重复执行的任务。
+"""
+
+import time
+import heapq
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+
+class DeadlineScheduler:
+    """
+    按截止时间调度的任务队列。
+
+    每个键同时只有一个有效的调度，重新调度或取消都会让旧的调度失效，
+    已经在执行的 `handler` 结束后也不会再按旧的调度重新加入队列。
+    到期的键交给 `handler` 处理，`handler` 返回下次执行的时间，返回 None 时不再调度。
+
+    ``` python
+    async def poll(session):
+        await session.poll()
+        return time.monotonic() + 6
+
+    scheduler = DeadlineScheduler(poll, concurrency=8)
+    scheduler.schedule(session)
+    await scheduler.run()
+    ```
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Hashable], Awaitable[Optional[float]]],
+        concurrency: int = 1,
+        inline: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            handler     (Callable[[Hashable], Awaitable[float | None]]): 处理到期的键，返回下次执行的时间
+
+            concurrency (int, optional)              : 同时执行的 handler 数. Defaults to 1.
+
+            inline      (bool, optional)             : 是否在调度循环中直接等待 handler，适合耗时很短的 handler. Defaults to False.
+
+            clock       (Callable[[], float], optional): 时间函数，调度时间与其返回值使用同一基准. Defaults to time.monotonic.
+        """
+        self.clock = clock
+        self.__handler = handler
+        self.__concurrency = max(concurrency, 1)
+        self.__inline = inline
+        self.__heap: List[Tuple[float, int, Hashable]] = []
+        self.__generations: Dict[Hashable, int] = {}
+        self.__counter = 0
+        self.__tasks: Set[asyncio.Task] = set()
+        self.__wakeup: Optional[asyncio.Event] = None
+        self.__running = False
+
+    def schedule(self, key: Hashable, when: Optional[float] = None) -> None:
+        """
+        调度一个键，覆盖该键之前的调度。
+
+        Args:
+            key  (Hashable)               : 键
+
+            when (float | None, optional) : 执行时间，None 表示立即执行. Defaults to None.
+        """
+        self.__counter += 1
+        self.__generations[key] = self.__counter
+        heapq.heappush(
+            self.__heap,
+            (self.clock() if when is None else when, self.__counter, key),
+        )
+        self.__wake()
+
+    def cancel(self, key: Hashable) -> None:
+        """
+        取消一个键的调度。
+
+        Args:
+            key (Hashable): 键
+        """
+        self.__generations.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        取消所有调度。
+        """
+        self.__generations.clear()
+        self.__heap.clear()
+
+    def get_keys(self) -> List[Hashable]:
+        """
+        获取已调度的键。
+
+        Returns:
+            List[Hashable]: 键
+        """
+        return list(self.__generations)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__generations
+
+    def __len__(self) -> int:
+        return len(self.__generations)
+
+    def is_running(self) -> bool:
+        """
+        调度循环是否正在运行。
+
+        Returns:
+            bool: 是否正在运行
+        """
+        return self.__running
+
+    async def run(self) -> None:
+        """
+        运行调度循环，直到调用 `stop()`。退出时取消正在执行的 handler。
+        """
+        self.__running = True
+        self.__wakeup = asyncio.Event()
+        semaphore = asyncio.Semaphore(self.__concurrency)
+        try:
+            while self.__running:
+                while self.__heap and not self.__is_current(
+                    self.__heap[0][2], self.__heap[0][1]
+                ):
+                    heapq.heappop(self.__heap)
+                delay = self.__heap[0][0] - self.clock() if self.__heap else None
+                if delay is None or delay > 0:
+                    self.__wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self.__wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                _, generation, key = heapq.heappop(self.__heap)
+                if self.__inline:
+                    await self.__call(key, generation)
+                    continue
+                await semaphore.acquire()
+                if not self.__running or not self.__is_current(key, generation):
+                    semaphore.release()
+                    continue
+                task = asyncio.create_task(self.__call(key, generation, semaphore))
+                self.__tasks.add(task)
+                task.add_done_callback(self.__tasks.discard)
+        finally:
+            self.__running = False
+            tasks = list(self.__tasks)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.__wakeup = None
+
+    def stop(self) -> None:
+        """
+        停止调度循环，保留尚未执行的调度。
+        """
+        self.__running = False
+        self.__wake()
+
+    def __is_current(self, key: Hashable, generation: int) -> bool:
+        return self.__generations.get(key) == generation
+
+    def __wake(self) -> None:
+        if self.__wakeup is not None:
+            self.__wakeup.set()
+
+    async def __call(
+        self,
+        key: Hashable,
+        generation: int,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> None:
+        try:
+            try:
+                when = await self.__handler(key)
+            except asyncio.CancelledError:
+                if self.__is_current(key, generation):
+                    heapq.heappush(self.__heap, (self.clock(), generation, key))
+                raise
+            except Exception as e:
+                asyncio.get_running_loop().call_exception_handler(
+                    {"message": "DeadlineScheduler handler 出错", "exception": e}
+                )
+                when = None
+            if self.__is_current(key, generation):
+                if when is None:
+                    del self.__generations[key]
+                else:
+                    heapq.heappush(self.__heap, (when, generation, key))
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+            self.__wake()
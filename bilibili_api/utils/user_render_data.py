@@ -1,11 +1,13 @@
+import asyncio
 import json
-from re import Match, Pattern, compile
+from re import Pattern, compile
 import time
-from typing import Any
+from typing import Dict, Optional
 from urllib.parse import unquote
 
 from ..exceptions import ApiException, NetworkException
 from .network import HEADERS, get_client
+from .cache_pool import user_access_id
 
 import jwt
 
@@ -13,39 +15,129 @@ RENDER_DATA_PATTERN: Pattern[str] = compile(
     r"<script id=\"__RENDER_DATA__\" type=\"application/json\">(.*?)</script>"
 )
 
-access_ids = {}
-last_timestamp = {}
+RENDER_DATA_START = b'<script id="__RENDER_DATA__" type="application/json">'
+RENDER_DATA_END = b"</script>"
 
+SHARED_KEY = "*"
+"w_webid 不绑定用户时，在缓存池中使用的键"
 
-async def get_user_dynamic_render_data(uid: int) -> dict[str, Any]:
+UID_CLAIMS = ("mid", "uid", "host_mid")
+"w_webid 中表示绑定用户的字段"
+
+EXPIRE_MARGIN = 60
+"w_webid 提前过期的秒数"
+
+NEGATIVE_TTL = 600
+"页面中没有 w_webid 时的缓存时间，单位秒"
+
+_MISSING = object()
+
+# 正在获取 w_webid 的任务，键为用户 ID
+_pending: Dict[int, asyncio.Task] = {}
+
+# w_webid 是否不绑定用户，None 表示尚未获取过
+_shared: Optional[bool] = None
+
+
+async def get_user_dynamic_render_data(uid: int) -> Optional[str]:
     """
-    获取用户动态页面加载静态渲染数据 获取部分接口需要的 w_webid 关键参数
+    获取用户动态页面加载静态渲染数据中的 w_webid 关键参数
+
+    w_webid 不绑定用户时所有用户共用一个，页面中没有 w_webid 的结果也会缓存一段时间。
 
     :param uid: 用户ID 示例参数: 208259
-    :return: 用户动态页面服务端渲染提取数据结构
+    :return: w_webid，页面中没有时返回 None
     """
-    if access_ids.get(uid) and last_timestamp[uid] > int(time.time()):
-        return access_ids[uid]
+    value = _cached(uid)
+    if value is not _MISSING:
+        return value
 
-    dynamic_url: str = "https://space.bilibili.com/{}/dynamic".format(uid)
+    loop = asyncio.get_running_loop()
+    task = _pending.get(uid)
+    if task is None or task.get_loop() is not loop:
+        # 其他用户的 w_webid 正在获取，可能可以共用；已知绑定用户时不必等待
+        other = None
+        if _shared is not False:
+            other = next((t for t in _pending.values() if t.get_loop() is loop), None)
+        if other is not None:
+            try:
+                await asyncio.shield(other)
+            except Exception:
+                pass
+            value = _cached(uid)
+            if value is not _MISSING:
+                return value
+        task = _pending.get(uid)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(_fetch_access_id(uid))
+            _pending[uid] = task
+            task.add_done_callback(
+                lambda t: _pending.pop(uid) if _pending.get(uid) is t else None
+            )
+    return await asyncio.shield(task)
 
-    session = get_client()
-    response = await session.request(method="GET", url=dynamic_url, headers=HEADERS)
-    if response.code != 200:
-        raise NetworkException(response.code, "")
 
-    response_content_text: str = response.utf8_text()
-    match: Match = RENDER_DATA_PATTERN.search(response_content_text)
-    if match is None:
+def _cached(uid: int):
+    value = user_access_id.get(uid, _MISSING)
+    if value is _MISSING:
+        value = user_access_id.get(SHARED_KEY, _MISSING)
+    return value
+
+
+async def _fetch_access_id(uid: int) -> Optional[str]:
+    global _shared
+    script_render_data = await _scan_render_data(
+        "https://space.bilibili.com/{}/dynamic".format(uid)
+    )
+    if script_render_data is None:
+        user_access_id.set(uid, None, ttl=NEGATIVE_TTL)
         return None # 有的时候无需 w_webid
 
-    script_render_data: str = match.group(1)
     try:
-        access_ids[uid] = json.loads(unquote(script_render_data))["access_id"]
-        payload = jwt.decode(jwt=access_ids[uid], options={"verify_signature": False})
-        created_at: int = payload["iat"]
-        ttl: int = payload["ttl"]
-        last_timestamp[uid] = created_at + ttl
-        return access_ids[uid]
+        access_id: str = json.loads(unquote(script_render_data))["access_id"]
     except json.JSONDecodeError as e:
         raise ApiException("序列化用户动态页渲染数据异常" + str(e))
+    payload = jwt.decode(jwt=access_id, options={"verify_signature": False})
+    ttl = payload["iat"] + payload["ttl"] - EXPIRE_MARGIN - time.time()
+    shared = not any(claim in payload for claim in UID_CLAIMS)
+    _shared = shared
+    if ttl > 0:
+        user_access_id.set(SHARED_KEY if shared else uid, access_id, ttl=ttl)
+    return access_id
+
+
+async def _scan_render_data(url: str) -> Optional[str]:
+    """
+    流式读取页面，读到渲染数据的 script 标签结束后立即停止
+
+    Returns:
+        str | None: script 标签内容，页面中没有时返回 None
+    """
+    client = get_client()
+    dwn_id = await client.download_create(url, HEADERS)
+    try:
+        status = client.download_status(dwn_id)
+        if status != 200:
+            raise NetworkException(status, "")
+        buffer = b""
+        found = False
+        searched = 0
+        while True:
+            try:
+                buffer += await client.download_chunk(dwn_id)
+            except StopAsyncIteration:
+                return None
+            if not found:
+                start = buffer.find(RENDER_DATA_START)
+                if start < 0:
+                    # 只保留可能是开始标记一部分的结尾
+                    buffer = buffer[-(len(RENDER_DATA_START) - 1) :]
+                    continue
+                buffer = buffer[start + len(RENDER_DATA_START) :]
+                found = True
+            end = buffer.find(RENDER_DATA_END, searched)
+            if end >= 0:
+                return buffer[:end].decode("utf-8")
+            searched = max(0, len(buffer) - len(RENDER_DATA_END) + 1)
+    finally:
+        await client.download_close(dwn_id)
@@ -16,13 +16,14 @@ import datetime
 from enum import Enum
 from inspect import iscoroutine, isfunction
 from functools import cmp_to_key
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, List, Union, Optional, Type
 
 from yarl import URL
 
 from .utils.aid_bvid_transformer import bvid2aid, aid2bvid
 from .utils.utils import get_api, raise_for_statement
+from .utils import cache_pool
 from .utils.AsyncEvent import AsyncEvent
 from .utils.BytesReader import BytesReader
 from .utils.danmaku import Danmaku, SpecialDanmaku
@@ -49,6 +50,52 @@ async def get_cid_info(cid: int):
     return await Api(**api).update_params(**params).result
 
 
+def prefill_pages_cache(items: List[dict]) -> int:
+    """
+    使用已获取的视频列表数据批量预填分 P 缓存，之后新建的 `Video` 获取 cid 等信息时无需再次请求。
+
+    支持的数据：
+
+    - 视频详细信息（含 `pages` 字段，如 `get_info` 或 `get_detail` 中的 `View`）
+    - 收藏夹内容（含 `ugc.first_cid` 字段的单 P 视频）
+    - 其他含有 `cid` 与 `duration` 字段的单 P 视频数据（如热门、排行榜）
+
+    无法确定分 P 信息的项（如搜索结果）会被跳过。
+
+    Args:
+        items (List[dict]): 视频数据列表
+
+    Returns:
+        int: 成功写入缓存的视频数量
+    """
+    count = 0
+    for item in items:
+        if item.get("bvid"):
+            aid = bvid2aid(item["bvid"])
+        elif item.get("aid"):
+            aid = int(item["aid"])
+        else:
+            continue
+        pages = item.get("pages")
+        if not pages:
+            cid = item.get("cid") or (item.get("ugc") or {}).get("first_cid")
+            page_count = item.get("videos", item.get("page", 1))
+            if not cid or page_count != 1 or not isinstance(item.get("duration"), int):
+                continue
+            pages = [
+                {
+                    "cid": cid,
+                    "page": 1,
+                    "part": item.get("title", ""),
+                    "duration": item["duration"],
+                    "dimension": item.get("dimension", {"width": 0, "height": 0}),
+                }
+            ]
+        cache_pool.video_pages[aid] = pages
+        count += 1
+    return count
+
+
 class DanmakuOperatorType(Enum):
     """
     弹幕操作枚举
@@ -247,6 +294,8 @@ class Video:
         )
         # 存入 self.__info 中以备后续调用
         self.__info = resp
+        if resp.get("pages"):
+            cache_pool.video_pages[resp["aid"]] = resp["pages"]
         return resp
 
     async def is_episode(self) -> bool:
@@ -295,9 +344,15 @@ class Video:
             "need_operation_card": 0,
             "need_elec": 0,
         }
-        return (
+        resp = (
             await Api(**api, credential=self.credential).update_params(**params).result
         )
+        # View 与 get_info 返回的结果一致，存入 self.__info 中以备后续调用
+        if resp.get("View"):
+            self.__info = resp["View"]
+        if resp.get("View", {}).get("pages"):
+            cache_pool.video_pages[resp["View"]["aid"]] = resp["View"]["pages"]
+        return resp
 
     async def __get_info_cached(self) -> dict:
         """
@@ -387,11 +442,28 @@ class Video:
         Returns:
             dict: 调用 API 返回的结果。
         """
+        aid = await self.__get_aid()
         api = API["info"]["pages"]
-        params = {"aid": await self.__get_aid(), "bvid": await self.__get_bvid()}
-        return (
+        params = {"aid": aid, "bvid": await self.__get_bvid()}
+        pages = (
             await Api(**api, credential=self.credential).update_params(**params).result
         )
+        cache_pool.video_pages[aid] = pages
+        return pages
+
+    async def __get_pages_cached(self) -> List[dict]:
+        """
+        获取分 P 信息，优先使用已获取的视频信息或全局缓存池，没有则重新获取。
+
+        Returns:
+            List[dict]: 分 P 信息。
+        """
+        if self.__info is not None and self.__info.get("pages"):
+            return self.__info["pages"]
+        pages = cache_pool.video_pages.get(await self.__get_aid())
+        if pages is None:
+            pages = await self.get_pages()
+        return pages
 
     async def __get_cid_by_index(self, page_index: int) -> int:
         """
@@ -406,8 +478,7 @@ class Video:
         if page_index < 0:
             raise ArgsException("分 p 号必须大于或等于 0。")
 
-        info = await self.__get_info_cached()
-        pages = info["pages"]
+        pages = await self.__get_pages_cached()
 
         if len(pages) <= page_index:
             raise ArgsException("不存在该分 p。")
@@ -933,8 +1004,7 @@ class Video:
             if from_seg == None:
                 from_seg = 0
             if to_seg == None:
-                info = await self.__get_info_cached()
-                for p in info["pages"]:
+                for p in await self.__get_pages_cached():
                     if p["cid"] == cid:
                         to_seg = p["duration"] // 360 + 1
 
@@ -1892,10 +1962,7 @@ class VideoOnlineMonitor(AsyncEvent):
         入口。
         """
         # 获取分 P id
-        pages = await self.__video.get_pages()
-        if self.__page_index >= len(pages):
-            raise ArgsException("不存在该分 P。")
-        cid = pages[self.__page_index]["cid"]
+        cid = await self.__video.get_cid(self.__page_index)
 
         # 获取服务器信息
         bvid = self.__video.get_bvid()
@@ -1966,7 +2033,7 @@ class VideoOnlineMonitor(AsyncEvent):
                 # 心跳包反馈，同时包含在线人数。
                 self.logger.debug(f'收到服务器心跳包反馈，编号：{d["number"]}')
                 self.logger.info(f'实时观看人数：{d["data"]["data"]["room"]["online"]}')
-                self.dispatch("ONLINE", d["data"])
+                await self.emit("ONLINE", d["data"])
 
             elif d["type"] == VideoOnlineMonitor.Datapack.DANMAKU.value:
                 # 实时弹幕。
@@ -1987,7 +2054,7 @@ class VideoOnlineMonitor(AsyncEvent):
                     text=text,
                 )
                 self.logger.info(f"收到实时弹幕：{dm.text}")
-                self.dispatch("DANMAKU", dm)
+                await self.emit("DANMAKU", dm)
 
             else:
                 # 未知类型数据包
@@ -2160,11 +2227,13 @@ class VideoStreamDownloadURL:
         url           (str)         : 视频流 url
         video_quality (VideoQuality): 视频流清晰度
         video_codecs  (VideoCodecs) : 视频流编码
+        backup_urls   (List[str])   : 备用 url
     """
 
     url: str
     video_quality: VideoQuality
     video_codecs: VideoCodecs
+    backup_urls: List[str] = field(default_factory=list)
 
 
 @dataclass
@@ -2177,10 +2246,12 @@ class AudioStreamDownloadURL:
     Attributes:
         url           (str)         : 音频流 url
         audio_quality (AudioQuality): 音频流清晰度
+        backup_urls   (List[str])   : 备用 url
     """
 
     url: str
     audio_quality: AudioQuality
+    backup_urls: List[str] = field(default_factory=list)
 
 
 @dataclass
@@ -2191,10 +2262,12 @@ class FLVStreamDownloadURL:
     FLV 视频流
 
     Attributes:
-        url           (str): FLV 流 url
+        url           (str)      : FLV 流 url
+        backup_urls   (List[str]): 备用 url
     """
 
     url: str
+    backup_urls: List[str] = field(default_factory=list)
 
 
 @dataclass
@@ -2205,10 +2278,19 @@ class MP4StreamDownloadURL:
     MP4 视频流
 
     Attributes:
-        url           (str): HTML5 mp4 视频流
+        url           (str)      : HTML5 mp4 视频流
+        backup_urls   (List[str]): 备用 url
     """
 
     url: str
+    backup_urls: List[str] = field(default_factory=list)
+
+
+def _get_backup_urls(stream_data: dict) -> List[str]:
+    """
+    获取 dash 流数据中的备用 url
+    """
+    return stream_data.get("backupUrl") or stream_data.get("backup_url") or []
 
 
 class VideoDownloadURLDataDetecter:
@@ -2328,10 +2410,20 @@ class VideoDownloadURLDataDetecter:
         if "durl" in self.__data.keys():
             if self.__data["format"].startswith("flv"):
                 # FLV 视频流
-                return [FLVStreamDownloadURL(url=self.__data["durl"][0]["url"])]
+                return [
+                    FLVStreamDownloadURL(
+                        url=self.__data["durl"][0]["url"],
+                        backup_urls=self.__data["durl"][0].get("backup_url") or [],
+                    )
+                ]
             else:
                 # MP4 视频流
-                return [MP4StreamDownloadURL(url=self.__data["durl"][0]["url"])]
+                return [
+                    MP4StreamDownloadURL(
+                        url=self.__data["durl"][0]["url"],
+                        backup_urls=self.__data["durl"][0].get("backup_url") or [],
+                    )
+                ]
         else:
             # 正常情况
             streams = []
@@ -2379,6 +2471,7 @@ class VideoDownloadURLDataDetecter:
                     url=video_stream_url,
                     video_quality=video_stream_quality,
                     video_codecs=video_stream_codecs,  # type: ignore
+                    backup_urls=_get_backup_urls(video_data),
                 )
                 streams.append(video_stream)
             if audios_data:
@@ -2395,7 +2488,9 @@ class VideoDownloadURLDataDetecter:
                     if not audio_stream_quality in audio_accepted_qualities:
                         continue
                     audio_stream = AudioStreamDownloadURL(
-                        url=audio_stream_url, audio_quality=audio_stream_quality
+                        url=audio_stream_url,
+                        audio_quality=audio_stream_quality,
+                        backup_urls=_get_backup_urls(audio_data),
                     )
                     streams.append(audio_stream)
             if flac_data and (not no_hires):
@@ -2403,7 +2498,9 @@ class VideoDownloadURLDataDetecter:
                     flac_stream_url = flac_data["audio"]["base_url"]
                     flac_stream_quality = AudioQuality(flac_data["audio"]["id"])
                     flac_stream = AudioStreamDownloadURL(
-                        url=flac_stream_url, audio_quality=flac_stream_quality
+                        url=flac_stream_url,
+                        audio_quality=flac_stream_quality,
+                        backup_urls=_get_backup_urls(flac_data["audio"]),
                     )
                     streams.append(flac_stream)
             if dolby_data and (not no_dolby_audio):
@@ -2412,7 +2509,9 @@ class VideoDownloadURLDataDetecter:
                     dolby_stream_url = dolby_stream_data["base_url"]
                     dolby_stream_quality = AudioQuality(dolby_stream_data["id"])
                     dolby_stream = AudioStreamDownloadURL(
-                        url=dolby_stream_url, audio_quality=dolby_stream_quality
+                        url=dolby_stream_url,
+                        audio_quality=dolby_stream_quality,
+                        backup_urls=_get_backup_urls(dolby_stream_data),
                     )
                     streams.append(dolby_stream)
             return streams
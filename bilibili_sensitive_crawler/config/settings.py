@@ -76,8 +76,14 @@ DEFAULT_CONFIG = {
         "concurrent_limit": 3,               # 并发下载数量
         "retry_times": 3,                    # 下载失败重试次数
         "timeout": 60,                       # 下载超时时间(秒)
-        "chunk_size": 1048576,               # 分块下载大小(字节，默认1MB)
+        "chunk_size": 1048576,               # 分块写入大小(字节，默认1MB)
+        "read_size": 262144,                 # 每次读取的最大字节数(默认256KB)
+        "progress_interval": 5,              # 下载进度日志的最小间隔(秒)
+        "progress_bytes": 16777216,          # 每下载多少字节至少输出一次进度
         "filename_format": "{bvid}.mp4", # 文件命名格式
+        "merge_method": "native",            # 音视频合并方式: native=直接封装, ffmpeg=调用FFmpeg
+        "ffmpeg_path": "ffmpeg",             # FFmpeg可执行文件路径
+        "ffmpeg_concurrency": 2,             # 同时运行的FFmpeg进程数
         "max_size_gb": 800,                  # 存储空间上限(GB)
         "max_filename_length": 80            # 最大文件名长度
     },
@@ -85,6 +91,13 @@ DEFAULT_CONFIG = {
     # 数据集相关配置
     "dataset": {
         "index_file": "data/json/index.json", # 数据集索引文件
+        "index_backend": "jsonl",            # 索引后端: json / jsonl / sqlite
+        "search_index": True,                # 维护全文检索索引
+        "file_manifest": True,               # 使用文件清单代替遍历目录
+        "manifest_watch": False,             # 通过inotify监听目录变化(仅Linux)
+        "metadata_backend": None,            # 视频信息存储: files / shards，None 时已有分片则使用分片
+        "metadata_codec": "zstd",            # 分片压缩格式: zstd / gzip，未安装zstandard时使用gzip
+        "metadata_shard_size": 64 * 1024 * 1024, # 单个分片的最大字节数
         "json_filename_format": "{bvid}.json", # JSON文件命名格式
         "video_filename_format": "{bvid}.mp4", # 视频文件命名格式
         "max_videos": 1000,                  # 最大视频数量
@@ -94,6 +107,14 @@ DEFAULT_CONFIG = {
         "version": "0.1.0"                   # 数据集版本
     },
     
+    # 流水线相关配置
+    "pipeline": {
+        "queue_size": 100,                   # 阶段之间队列的容量
+        "metadata_workers": 2,               # 信息爬取并发数
+        "download_workers": 3,               # 下载并发数
+        "progress_interval": 30              # 进度日志间隔(秒)，0表示不输出
+    },
+    
     # 代理设置
     "proxy": {
         "use_proxy": False,                  # 是否使用代理
@@ -42,6 +42,7 @@ from utils.downloader import BiliDownloader
 from utils.dataset import DatasetManager
 from utils.video_filter import VideoFilter
 from utils.file_analyzer import FileAnalyzer
+from utils.pipeline import CrawlPipeline
 from config.settings import load_config, save_config, generate_default_config
 
 # 设置 Windows 异步I/O策略
@@ -286,7 +287,10 @@ async def main():
             # 创建文件分析器
             file_analyzer = FileAnalyzer(
                 config['paths']['metadata_dir'], 
-                config['paths']['videos_dir']
+                config['paths']['videos_dir'],
+                use_manifest=config.get('dataset', {}).get('file_manifest', True),
+                index_backend=config.get('dataset', {}).get('index_backend'),
+                index_file=config.get('dataset', {}).get('index_file')
             )
             
             if args.check_index:
@@ -380,91 +384,29 @@ async def main():
             else:
                 logger.info("所有已记录的视频文件都存在")
 
-            # 搜索视频
-            max_videos_per_keyword = args.limit
-            for keyword in keywords:
-                logger.info(f"正在搜索关键词: {keyword}")
-                video_results = await search_manager.search_videos(keyword, limit=max_videos_per_keyword)
-                
-                # 限制视频数量（双重保险）
-                if len(video_results) > max_videos_per_keyword:
-                    video_results = video_results[:max_videos_per_keyword]
-                
-                logger.info(f"找到 {len(video_results)} 个视频")
-                
-                # 爬取视频信息
-                for i, video_item in enumerate(video_results):
-                    bvid = video_item["bvid"]
-                    search_info = video_item["search_info"]
-                    
-                    logger.info(f"[{i+1}/{len(video_results)}] 处理视频: {bvid}")
-                    
-                    try:
-                        # 检查BV号是否有效
-                        if not bvid or not bvid.startswith('BV') or len(bvid) != 12:
-                            logger.warning(f"无效的BV号，跳过: '{bvid}'")
-                            continue
-                        
-                        # 检查是否已经爬取过
-                        if dataset_manager.has_video(bvid):
-                            logger.info(f"视频已存在于数据集中: {bvid}")
-                            continue
-                        
-                        # 爬取详细信息
-                        logger.info(f"正在爬取视频信息: {bvid}")
-                        video_info = await crawler.get_video_info(bvid)
-                        
-                        # 添加搜索信息到视频数据中
-                        video_info["search_info"] = search_info
-                        
-                        # 检查视频时长（在下载前过滤）
-                        video_duration = video_info.get('basic_info', {}).get('duration', 0)
-                        
-                        # 获取时长限制，如果指定了max_duration就启用过滤
-                        max_duration = None
-                        if hasattr(args, 'max_duration') and args.max_duration:
-                            max_duration = args.max_duration
-                        elif config.get('video_filter', {}).get('max_duration'):
-                            max_duration = config.get('video_filter', {}).get('max_duration')
-                        
-                        # 如果设置了时长限制，就进行过滤
-                        if max_duration and video_duration > max_duration:
-                            logger.info(f"视频时长 {video_duration}秒 超过限制 {max_duration}秒，完全跳过: {bvid}")
-                            # 完全跳过，不保存任何记录
-                            continue
-                        
-                        # 保存视频元数据
-                        metadata_file = dataset_manager.save_metadata(video_info)
-                        logger.info(f"视频元数据已保存: {metadata_file}")
-                        
-                        # 下载视频
-                        if args.download and not args.info_only:
-                            logger.info(f"正在下载视频: {bvid} (时长: {video_duration}秒)")
-                            try:
-                                save_path, file_size = await downloader.download_video(bvid)
-                                logger.info(f"视频下载成功: {save_path}, 大小: {file_size/1024/1024:.2f}MB")
-                                # 更新元数据中的下载状态
-                                dataset_manager.update_video_path(bvid, save_path)
-                            except Exception as e:
-                                logger.error(f"视频下载失败 {bvid}: {str(e)}")
-                        
-                        # 检查数据集大小限制
-                        total_videos = dataset_manager.count_videos()
-                        if total_videos >= args.max_videos:
-                            logger.info(f"已达到最大视频数量限制: {args.max_videos}")
-                            break
-                        
-                        # 增加延迟，避免请求过快
-                        await asyncio.sleep(args.interval)
-                        
-                    except Exception as e:
-                        logger.error(f"处理视频时出错 {bvid}: {str(e)}")
-                        continue
-                
-                # 检查数据集大小限制
-                if dataset_manager.count_videos() >= args.max_videos:
-                    logger.info(f"已达到最大视频数量限制: {args.max_videos}")
-                    break
+            # 搜索 → 爬取 → 下载 → 入库 流水线
+            # 获取时长限制，如果指定了max_duration就启用过滤
+            max_duration = None
+            if hasattr(args, 'max_duration') and args.max_duration:
+                max_duration = args.max_duration
+            elif config.get('video_filter', {}).get('max_duration'):
+                max_duration = config.get('video_filter', {}).get('max_duration')
+            
+            pipeline_config = dict(config.get('pipeline', {}))
+            pipeline_config.update({
+                "limit_per_keyword": args.limit,
+                "max_videos": args.max_videos,
+                "max_duration": max_duration,
+                "request_interval": args.interval,
+            })
+            pipeline = CrawlPipeline(
+                search_manager,
+                crawler,
+                downloader if args.download and not args.info_only else None,
+                dataset_manager,
+                pipeline_config,
+            )
+            await pipeline.run(keywords)
             
             # 生成数据集统计信息
             logger.info("正在生成数据集统计信息...")
@@ -500,6 +442,10 @@ def update_config_from_args(config, args):
     # 路径配置
     if args.metadata_dir:
         config['paths']['metadata_dir'] = args.metadata_dir
+        # 索引文件随元数据目录移动
+        dataset_config = config.setdefault('dataset', {})
+        index_name = os.path.basename(dataset_config.get('index_file') or 'index.json')
+        dataset_config['index_file'] = os.path.join(args.metadata_dir, index_name)
         logger.info(f"元数据保存目录已设置为: {args.metadata_dir}")
     
     if args.video_dir:
@@ -16,6 +16,11 @@ from .downloader import BiliDownloader
 from .dataset import DatasetManager
 from .video_filter import VideoFilter
 from .file_analyzer import FileAnalyzer
+from .pipeline import CrawlPipeline
+from .index_store import IndexStore, get_index_store
+from .search_index import SearchIndex, get_search_index, match_keyword
+from .file_manifest import FileManifest, get_file_manifest
+from .metadata_store import MetadataStore, get_metadata_store
 
 __all__ = [
     'BiliLogin',
@@ -25,4 +30,14 @@ __all__ = [
     'DatasetManager',
     'VideoFilter',
     'FileAnalyzer',
+    'CrawlPipeline',
+    'IndexStore',
+    'get_index_store',
+    'SearchIndex',
+    'get_search_index',
+    'match_keyword',
+    'FileManifest',
+    'get_file_manifest',
+    'MetadataStore',
+    'get_metadata_store',
 ] 
\ No newline at end of file
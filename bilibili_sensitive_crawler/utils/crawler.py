@@ -19,13 +19,13 @@ import random
 import logging
 import asyncio
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple, Union
+from typing import Dict, List, Any, Optional, Tuple, Union, Callable, Awaitable
 
 # 添加父目录到系统路径，以便导入bilibili_api库
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 # 导入bilibili_api库
-from bilibili_api import video, comment, sync
+from bilibili_api import video, comment, sync, bvid2aid
 from bilibili_api.utils.network import Credential
 
 
@@ -47,13 +47,28 @@ class BiliCrawler:
         self.config = {
             "include_comments": False,
             "include_danmaku": False,
-            "max_comments": 100,
+            "max_comments": 100,        # 0 或 None 表示不限制
+            "expand_sub_replies": True,  # 是否展开每条评论下的全部回复
             "rate_limit": {
                 "enable": True,
                 "interval": 1.5,
                 "random_offset": 0.5,
-            }
+                # 所有视频共享的子请求并发上限
+                "max_concurrent_requests": 4,
+            },
+            # 可选字段是否采集
+            "fields": {
+                "related": True,
+                "online": True,
+                "chargers": True,
+                "relation": True,
+                "ai_conclusion": True,
+                "pbp": True,
+                "subtitle": True,
+                "player_info": True,
+            },
         }
+        self._request_semaphore: Optional[asyncio.Semaphore] = None
         
         # 更新配置
         if config and isinstance(config, dict):
@@ -71,6 +86,13 @@ class BiliCrawler:
         """
         获取视频信息
         
+        请求按依赖关系分两轮并发执行：
+        1. 只依赖 bvid 的请求：get_detail（已包含 View/Tags/Related/分P信息）、用户关系、评论
+        2. 依赖 cid 或 UP主 mid 的请求：在线人数、充电用户、AI总结、高能进度条、播放器信息（含字幕）、弹幕
+        
+        所有子请求共享 rate_limit.max_concurrent_requests 并发上限，
+        可通过 fields 配置关闭不需要的字段。
+        
         Args:
             bvid: 视频BV号
             
@@ -90,93 +112,64 @@ class BiliCrawler:
             # 创建视频对象
             v = video.Video(bvid=bvid, credential=self.credential)
             
-            # 获取基本信息
-            info = await v.get_info()
-            
-            # 获取视频详细信息
-            detail = await v.get_detail()
-            
-            # 获取视频标签
-            tags = await v.get_tags()
-            
-            # 获取分P信息
-            pages = await v.get_pages()
-            
-            # 获取相关视频
-            try:
-                related = await v.get_related()
-                if isinstance(related, list):
-                    related = {"data": related}
-            except Exception as e:
-                self.logger.debug(f"获取相关视频失败: {e}")
-                related = {"data": []}
-            
-            # 获取实时在线人数
-            try:
-                online = await v.get_online()
-                if isinstance(online, (int, str)):
-                    online = {"count": online}
-            except Exception as e:
-                self.logger.debug(f"获取在线人数失败: {e}")
-                online = {"count": 0}
-            
-            # 获取充电用户
-            try:
-                chargers = await v.get_chargers()
-                if isinstance(chargers, list):
-                    chargers = {"list": chargers}
-            except Exception as e:
-                # 静默处理充电信息不可用的情况（错误码62001是正常的）
-                if "62001" not in str(e):
-                    self.logger.debug(f"获取充电用户失败: {e}")
-                chargers = {"list": []}
-            
-            # 获取用户关系
-            try:
-                relation = await v.get_relation()
-            except Exception as e:
-                self.logger.debug(f"获取用户关系失败: {e}")
-                relation = {}
+            # 第一轮：只依赖 bvid 的请求
+            detail, relation, comments = await asyncio.gather(
+                self._fetch("视频详细信息", v.get_detail, {}),
+                self._fetch_field("relation", "用户关系", v.get_relation, {}),
+                self._get_comments(bvid) if self.config["include_comments"] else self._skip(None),
+            )
             
-            # 获取需要cid的信息
-            ai_conclusion = {}
-            pbp = {}
-            subtitle_info = {}
-            player_info = {}
+            if detail.get("View"):
+                info = detail["View"]
+                pages = info.get("pages") or []
+            else:
+                # detail 不可用时退回到单独的接口，基本信息获取失败则直接抛出
+                async with self._get_request_semaphore():
+                    info = await v.get_info()
+                pages = info.get("pages") or await self._fetch("分P信息", v.get_pages, [])
+            
+            cid = pages[0].get("cid") if pages and isinstance(pages[0], dict) else None
+            up_mid = info.get("owner", {}).get("mid")
+            
+            # detail 中的标签不含使用次数时才单独请求
+            detail_tags = detail.get("Tags")
+            if detail_tags is not None and all("count" in tag for tag in detail_tags):
+                tags_coro = self._skip(detail_tags)
+            else:
+                tags_coro = self._fetch("视频标签", lambda: v.get_tags(cid=cid) if cid else v.get_tags(), [])
             
-            if pages and len(pages) > 0:
-                try:
-                    cid = pages[0].get("cid") if isinstance(pages[0], dict) else None
-                    if cid:
-                        # 获取AI总结
-                        try:
-                            ai_conclusion = await v.get_ai_conclusion(cid=cid)
-                        except Exception as e:
-                            self.logger.debug(f"获取AI总结失败: {e}")
-                            ai_conclusion = {}
-                        
-                        # 获取高能进度条
-                        try:
-                            pbp = await v.get_pbp(cid=cid)
-                        except Exception as e:
-                            self.logger.debug(f"获取高能进度条失败: {e}")
-                            pbp = {}
-                        
-                        # 获取字幕信息
-                        try:
-                            subtitle_info = await v.get_subtitle(cid)
-                        except Exception as e:
-                            self.logger.debug(f"获取字幕信息失败: {e}")
-                            subtitle_info = {}
-                        
-                        # 获取播放器信息
-                        try:
-                            player_info = await v.get_player_info(cid)
-                        except Exception as e:
-                            self.logger.debug(f"获取播放器信息失败: {e}")
-                            player_info = {}
-                except Exception as e:
-                    self.logger.debug(f"处理分P信息失败: {e}")
+            if isinstance(detail.get("Related"), list):
+                related_coro = self._skip(detail["Related"] if self._enabled("related") else [])
+            else:
+                related_coro = self._fetch_field("related", "相关视频", v.get_related, [])
+            
+            # 字幕信息包含在播放器信息中，两者共用一次请求
+            want_player = self._enabled("player_info") or self._enabled("subtitle")
+            
+            # 第二轮：依赖 cid / mid 的请求
+            (
+                tags, related, online, chargers,
+                ai_conclusion, pbp, player_info, danmaku,
+            ) = await asyncio.gather(
+                tags_coro,
+                related_coro,
+                self._fetch_field("online", "在线人数", lambda: v.get_online(cid=cid), {"count": 0}) if cid else self._skip({"count": 0}),
+                self._fetch_field("chargers", "充电用户", v.get_chargers, {"list": []}),
+                self._fetch_field("ai_conclusion", "AI总结", lambda: v.get_ai_conclusion(cid=cid, up_mid=up_mid), {}) if cid else self._skip({}),
+                self._fetch_field("pbp", "高能进度条", lambda: v.get_pbp(cid=cid), {}) if cid else self._skip({}),
+                self._fetch("播放器信息", lambda: v.get_player_info(cid=cid), {}) if cid and want_player else self._skip({}),
+                self._get_danmaku(v) if self.config["include_danmaku"] else self._skip(None),
+            )
+            
+            if isinstance(related, list):
+                related = {"data": related}
+            if isinstance(online, (int, str)):
+                online = {"count": online}
+            if isinstance(chargers, list):
+                chargers = {"list": chargers}
+            subtitle_info = (player_info.get("subtitle") or {}) if self._enabled("subtitle") else {}
+            if not self._enabled("player_info"):
+                player_info = {}
             
             # 组织数据 - 去除重复信息，优化结构
             result = {
@@ -272,21 +265,11 @@ class BiliCrawler:
                 "crawl_time": int(time.time()),
             }
             
-            # 获取视频评论
+            # 视频评论与弹幕
             if self.config["include_comments"]:
-                try:
-                    result["comments"] = await self._get_comments(bvid)
-                except Exception as e:
-                    self.logger.warning(f"获取视频评论失败: {e}")
-                    result["comments"] = []
-            
-            # 获取视频弹幕
+                result["comments"] = comments
             if self.config["include_danmaku"]:
-                try:
-                    result["danmaku"] = await self._get_danmaku(v)
-                except Exception as e:
-                    self.logger.warning(f"获取视频弹幕失败: {e}")
-                    result["danmaku"] = []
+                result["danmaku"] = danmaku
             
             self.logger.info(f"视频信息获取成功: {bvid}")
             return result
@@ -295,41 +278,96 @@ class BiliCrawler:
             self.logger.error(f"获取视频信息失败: {bvid}, 错误: {str(e)}")
             raise
             
+    def _enabled(self, field: str) -> bool:
+        """字段是否需要采集"""
+        return self.config["fields"].get(field, True)
+        
+    def _get_request_semaphore(self) -> asyncio.Semaphore:
+        """获取全局子请求并发限制"""
+        if self._request_semaphore is None:
+            self._request_semaphore = asyncio.Semaphore(
+                max(1, self.config["rate_limit"]["max_concurrent_requests"])
+            )
+        return self._request_semaphore
+        
+    async def _fetch(self, desc: str, func: Callable[[], Awaitable[Any]], default: Any) -> Any:
+        """
+        在全局并发限制下执行一个子请求
+        
+        Args:
+            desc: 请求描述，用于日志
+            func: 返回协程的函数
+            default: 请求失败时返回的默认值
+            
+        Returns:
+            Any: 请求结果
+        """
+        async with self._get_request_semaphore():
+            try:
+                return await func()
+            except Exception as e:
+                # 静默处理充电信息不可用的情况（错误码62001是正常的）
+                if "62001" not in str(e):
+                    self.logger.debug(f"获取{desc}失败: {e}")
+                return default
+                
+    async def _fetch_field(self, field: str, desc: str, func: Callable[[], Awaitable[Any]], default: Any) -> Any:
+        """按 fields 配置执行子请求，字段关闭时直接返回默认值"""
+        if not self._enabled(field):
+            return default
+        return await self._fetch(desc, func, default)
+        
+    async def _skip(self, value: Any) -> Any:
+        """不发起请求，直接返回给定值"""
+        return value
+            
     async def _get_comments(self, bvid: str, limit: int = None) -> List[Dict[str, Any]]:
-        """获取视频评论"""
+        """
+        获取视频评论
+        
+        按偏移量逐页获取评论，并发展开每条评论下的回复，
+        并发数与 rate_limit.max_concurrent_requests 相同。
+        
+        Args:
+            bvid: 视频BV号
+            limit: 最多获取的评论数（含回复），默认为 max_comments
+            
+        Returns:
+            List[Dict[str, Any]]: 评论列表，回复紧跟在所属评论之后；获取失败时返回已获取的部分
+        """
         if limit is None:
             limit = self.config["max_comments"]
             
         comments_list = []
-        page = 1
         
         try:
-            # 创建评论对象
-            comments = comment.get_comments(bvid, comment.ResourceType.VIDEO)
-            
-            # 获取第一页评论
-            comments_data = await comments.get_main(page=page)
-            
-            # 提取评论
-            for c in comments_data.get("replies", []):
-                if len(comments_list) >= limit:
-                    break
-                    
+            stream = comment.iter_all_comments(
+                bvid2aid(bvid),
+                comment.CommentResourceType.VIDEO,
+                credential=self.credential,
+                concurrency=max(1, self.config["rate_limit"]["max_concurrent_requests"]),
+                compact=True,
+                expand=self.config["expand_sub_replies"],
+                max_items=limit or None,
+            )
+            async for c in stream:
                 comments_list.append({
-                    "rpid": c.get("rpid", 0),  # 评论ID
-                    "mid": c.get("member", {}).get("mid", 0),  # 用户ID
-                    "uname": c.get("member", {}).get("uname", ""),  # 用户名
-                    "content": c.get("content", {}).get("message", ""),  # 评论内容
-                    "like": c.get("like", 0),  # 点赞数
-                    "ctime": c.get("ctime", 0),  # 发布时间戳
-                    "level": c.get("member", {}).get("level_info", {}).get("current_level", 0),  # 用户等级
+                    "rpid": c["rpid"],  # 评论ID
+                    "root": c["root"],  # 所属根评论ID，根评论为0
+                    "parent": c["parent"],  # 回复的评论ID，根评论为0
+                    "mid": c["mid"],  # 用户ID
+                    "uname": c["uname"],  # 用户名
+                    "content": c["message"],  # 评论内容
+                    "like": c["like"],  # 点赞数
+                    "ctime": c["ctime"],  # 发布时间戳
+                    "level": c["level"],  # 用户等级
                 })
             
             return comments_list
             
         except Exception as e:
             self.logger.warning(f"获取评论失败: {str(e)}")
-            return []
+            return comments_list
             
     async def _get_danmaku(self, v: video.Video) -> List[Dict[str, Any]]:
         """获取视频弹幕"""
@@ -29,6 +29,17 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.
 from bilibili_api import video, sync
 from bilibili_api.utils.network import Credential
 
+try:
+    from .index_store import get_index_store
+    from .search_index import get_search_index, match_keyword, FILTER_FIELDS
+    from .file_manifest import get_dataset_manifests, file_key
+    from .metadata_store import get_metadata_store, find_metadata_store, DEFAULT_SHARD_SIZE
+except ImportError:
+    from index_store import get_index_store
+    from search_index import get_search_index, match_keyword, FILTER_FIELDS
+    from file_manifest import get_dataset_manifests, file_key
+    from metadata_store import get_metadata_store, find_metadata_store, DEFAULT_SHARD_SIZE
+
 
 class DatasetManager:
     """数据集管理类"""
@@ -56,6 +67,13 @@ class DatasetManager:
             "json_filename_format": "{bvid}.json",
             "index_fields": ["bvid", "title", "duration", "pubdate", "owner_name", "view", "like", "tags"],
             "update_index_on_save": True,
+            "index_backend": "jsonl",  # 索引后端: json / jsonl / sqlite
+            "search_index": True,  # 是否维护全文检索索引
+            "file_manifest": True,  # 是否使用文件清单代替遍历目录
+            "manifest_watch": False,  # 是否监听目录变化(Linux inotify)
+            "metadata_backend": None,  # 视频信息存储: files(每个视频一个JSON) / shards(压缩分片)，None 时自动判断
+            "metadata_codec": "zstd",  # 分片压缩格式: zstd / gzip
+            "metadata_shard_size": DEFAULT_SHARD_SIZE,  # 单个分片的最大字节数
         }
         
         # 更新配置
@@ -63,22 +81,75 @@ class DatasetManager:
             for key, value in config.items():
                 if key in self.config:
                     self.config[key] = value
+            # 完整配置中的 dataset 部分
+            dataset_config = config.get("dataset")
+            if isinstance(dataset_config, dict):
+                for key in ("index_file", "index_backend", "search_index", "file_manifest", "manifest_watch",
+                            "metadata_backend", "metadata_codec", "metadata_shard_size"):
+                    if key in dataset_config:
+                        self.config[key] = dataset_config[key]
+        
+        # 索引存储，与 VideoFilter、FileAnalyzer 共享
+        self.index_store = get_index_store(json_dir, self.config["index_backend"], self.config["index_file"])
+        
+        # 全文检索索引，随索引存储的修改增量更新
+        self.search_index = None
+        if self.config["search_index"]:
+            try:
+                self.search_index = get_search_index(self.index_store)
+            except Exception as e:
+                self.logger.warning(f"全文检索索引不可用，将逐个扫描索引: {str(e)}")
+        
+        # 文件清单，与 VideoFilter、FileAnalyzer 共享
+        self.json_manifest = None
+        self.video_manifest = None
+        if self.config["file_manifest"]:
+            try:
+                self.json_manifest, self.video_manifest = get_dataset_manifests(
+                    json_dir, video_dir, watch=self.config["manifest_watch"],
+                    exclude=[os.path.basename(self.config["index_file"])])
+            except Exception as e:
+                self.logger.warning(f"文件清单不可用，将直接遍历目录: {str(e)}")
+        
+        # 视频信息分片存储，未迁移的JSON文件仍可读取
+        self.metadata_store = None
+        metadata_backend = self.config["metadata_backend"]
+        if metadata_backend is None:
+            # 已有分片时使用分片存储
+            self.metadata_store = find_metadata_store(json_dir, self.config["metadata_codec"],
+                                                      shard_size=self.config["metadata_shard_size"])
+        elif metadata_backend == "shards":
+            self.metadata_store = get_metadata_store(json_dir, self.config["metadata_codec"],
+                                                     shard_size=self.config["metadata_shard_size"])
+        elif metadata_backend != "files":
+            raise ValueError(f"不支持的视频信息存储: {self.config['metadata_backend']}")
     
     def save_video_info(self, video_info: Dict[str, Any]) -> str:
         """
-        保存视频信息到JSON文件
+        保存视频信息到JSON文件，使用分片存储时写入分片
         
         Args:
             video_info: 视频信息字典
             
         Returns:
-            str: 保存的文件路径
+            str: 保存的文件路径（分片存储时为分片文件路径）
         """
         # 获取视频BV号
         bvid = video_info.get("basic_info", {}).get("bvid")
         if not bvid:
             raise ValueError("视频信息缺少BV号")
         
+        if self.metadata_store is not None:
+            try:
+                file_path = self.metadata_store.save(video_info)
+                self.logger.info(f"视频信息已保存到: {file_path}")
+                if self.config["update_index_on_save"]:
+                    self.update_index(video_info)
+                return file_path
+            except Exception as e:
+                self.logger.error(f"保存视频信息失败: {str(e)}")
+                raise
+        
         # 格式化文件名
         filename = self.config["json_filename_format"].format(bvid=bvid)
         file_path = os.path.join(self.json_dir, filename)
@@ -90,6 +161,10 @@ class DatasetManager:
             
             self.logger.info(f"视频信息已保存到: {file_path}")
             
+            # 覆盖已有文件时目录修改时间不变，需要告知文件清单
+            if self.json_manifest is not None:
+                self.json_manifest.mark_dirty([filename])
+            
             # 更新索引
             if self.config["update_index_on_save"]:
                 self.update_index(video_info)
@@ -110,6 +185,15 @@ class DatasetManager:
         Returns:
             Optional[Dict[str, Any]]: 视频信息字典，如果文件不存在则返回None
         """
+        if self.metadata_store is not None:
+            try:
+                video_info = self.metadata_store.load(bvid)
+                if video_info is not None:
+                    return video_info
+            except Exception as e:
+                self.logger.error(f"加载视频信息失败: {str(e)}")
+                return None
+        
         # 格式化文件名
         filename = self.config["json_filename_format"].format(bvid=bvid)
         file_path = os.path.join(self.json_dir, filename)
@@ -175,6 +259,33 @@ class DatasetManager:
             
         return sanitized
     
+    def _build_index_record(self, video_info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        从视频信息中提取索引记录
+        
+        Args:
+            video_info: 视频信息
+            
+        Returns:
+            Dict[str, Any]: 索引记录
+        """
+        basic_info = video_info.get("basic_info", {})
+        owner = video_info.get("owner", {})
+        stat = video_info.get("stat", {})
+        
+        return {
+            "bvid": basic_info.get("bvid", ""),
+            "title": basic_info.get("title", ""),
+            "duration": basic_info.get("duration", 0),
+            "pubdate": basic_info.get("pubdate", 0),
+            "owner_name": owner.get("name", ""),
+            "desc": basic_info.get("desc", ""),
+            "view": stat.get("view", 0),
+            "like": stat.get("like", 0),
+            "tags": [tag.get("tag_name", "") for tag in video_info.get("tags", [])],
+            "indexed_at": int(time.time()),
+        }
+    
     def update_index(self, video_info: Dict[str, Any]) -> None:
         """
         更新索引文件
@@ -182,115 +293,159 @@ class DatasetManager:
         Args:
             video_info: 要添加到索引的视频信息
         """
-        try:
-            # 加载现有索引
-            index_data = self.load_index()
-            
-            # 提取索引所需字段
-            basic_info = video_info.get("basic_info", {})
-            owner = video_info.get("owner", {})
-            stat = video_info.get("stat", {})
-            
-            # 构建索引记录
-            index_record = {
-                "bvid": basic_info.get("bvid", ""),
-                "title": basic_info.get("title", ""),
-                "duration": basic_info.get("duration", 0),
-                "pubdate": basic_info.get("pubdate", 0),
-                "owner_name": owner.get("name", ""),
-                "view": stat.get("view", 0),
-                "like": stat.get("like", 0),
-                "tags": [tag.get("tag_name", "") for tag in video_info.get("tags", [])],
-                "indexed_at": int(time.time()),
-            }
-            
-            # 更新索引
-            bvid = index_record["bvid"]
-            index_data["videos"][bvid] = index_record
-            index_data["stats"]["total_videos"] = len(index_data["videos"])
-            index_data["stats"]["last_updated"] = int(time.time())
-            
-            # 保存索引
-            self._save_index(index_data)
+        self.update_index_many([video_info])
+    
+    def update_index_many(self, video_infos: List[Dict[str, Any]]) -> int:
+        """
+        批量更新索引，所有记录只写入一次
+        
+        Args:
+            video_infos: 要添加到索引的视频信息列表
             
+        Returns:
+            int: 写入的记录数
+        """
+        try:
+            return self.index_store.upsert_many(self._build_index_record(info) for info in video_infos)
         except Exception as e:
             self.logger.error(f"更新索引失败: {str(e)}")
+            return 0
     
     def load_index(self) -> Dict[str, Any]:
         """
-        加载索引文件
+        加载索引
         
         Returns:
             Dict[str, Any]: 索引数据
         """
-        index_file = self.config["index_file"]
-        
-        # 检查索引文件是否存在
-        if not os.path.exists(index_file):
-            # 创建空索引
-            return {
-                "metadata": {
-                    "dataset_name": "Bilibili Sensitive Videos Dataset",
-                    "created_at": int(time.time()),
-                },
-                "stats": {
-                    "total_videos": 0,
-                    "last_updated": int(time.time()),
-                },
-                "videos": {},
-            }
-        
-        try:
-            # 加载索引文件
-            with open(index_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-                
-        except Exception as e:
-            self.logger.error(f"加载索引失败: {str(e)}")
-            # 返回空索引
-            return {
-                "metadata": {
-                    "dataset_name": "Bilibili Sensitive Videos Dataset",
-                    "created_at": int(time.time()),
-                },
-                "stats": {
-                    "total_videos": 0,
-                    "last_updated": int(time.time()),
-                },
-                "videos": {},
-            }
+        return self.index_store.load()
     
     def _save_index(self, index_data: Dict[str, Any]) -> None:
         """
-        保存索引文件
+        用完整索引替换现有索引
         
         Args:
             index_data: 索引数据
         """
-        index_file = self.config["index_file"]
-        
         try:
-            # 确保目录存在
-            os.makedirs(os.path.dirname(index_file), exist_ok=True)
+            self.index_store.replace(index_data)
+        except Exception as e:
+            self.logger.error(f"保存索引失败: {str(e)}")
+    
+    def _video_files_by_bvid(self) -> Optional[Dict[str, List[Tuple[str, int]]]]:
+        """
+        从文件清单中获取视频文件，按BV号分组
+        
+        Returns:
+            Optional[Dict[str, List[Tuple[str, int]]]]: BV号 -> [(文件名, 大小), ...]，未启用文件清单时返回None
+        """
+        if self.video_manifest is None:
+            return None
+        self.video_manifest.refresh()
+        groups = {}
+        for bvid, files in self.video_manifest.files_by_key().items():
+            files = [(name, size) for name, size in files if name.endswith(".mp4")]
+            if files:
+                groups[bvid] = files
+        return groups
+    
+    def _video_file_size(self, bvid: str, video_files: Optional[Dict[str, List[Tuple[str, int]]]]) -> Optional[int]:
+        """
+        获取视频文件大小
+        
+        Args:
+            bvid: 视频BV号
+            video_files: _video_files_by_bvid 的结果，为None时直接检查文件
             
-            # 保存索引文件
-            with open(index_file, "w", encoding="utf-8") as f:
-                json.dump(index_data, f, ensure_ascii=False, indent=4)
-                
-            self.logger.info(f"索引已更新: {index_file}")
+        Returns:
+            Optional[int]: 文件大小，视频文件不存在时返回None
+        """
+        if video_files is not None:
+            files = video_files.get(bvid)
+            return min(files)[1] if files else None
+        video_path = self.get_video_path(bvid)
+        if video_path and os.path.exists(video_path):
+            return os.path.getsize(video_path)
+        return None
+    
+    def _read_index_record(self, filename: str, video_bvids: Optional[set]) -> Optional[Dict[str, Any]]:
+        """
+        读取JSON文件并生成索引记录
+        
+        Args:
+            filename: JSON文件名
+            video_bvids: 有视频文件的BV号集合，为None时逐个检查视频文件
             
+        Returns:
+            Optional[Dict[str, Any]]: 索引记录，读取失败时返回None
+        """
+        try:
+            with open(os.path.join(self.json_dir, filename), "r", encoding="utf-8") as f:
+                video_info = json.load(f)
         except Exception as e:
-            self.logger.error(f"保存索引失败: {str(e)}")
+            self.logger.error(f"处理文件 {filename} 时出错: {str(e)}")
+            return None
+        return self._index_record_with_video(video_info, video_bvids)
+    
+    def _index_record_with_video(self, video_info: Dict[str, Any], video_bvids: Optional[set]) -> Dict[str, Any]:
+        """
+        生成索引记录并检查视频文件是否存在
+        
+        Args:
+            video_info: 视频信息
+            video_bvids: 有视频文件的BV号集合，为None时逐个检查视频文件
+            
+        Returns:
+            Dict[str, Any]: 索引记录
+        """
+        index_record = self._build_index_record(video_info)
+        bvid = index_record["bvid"]
+        
+        # 检查视频文件是否存在
+        if video_bvids is not None:
+            index_record["has_video"] = bvid in video_bvids
+        else:
+            index_record["has_video"] = self.get_video_path(bvid) is not None
+        return index_record
     
-    def generate_index(self) -> Dict[str, Any]:
+    def generate_index(self, full: bool = False) -> Dict[str, Any]:
         """
         生成完整索引
         
+        启用文件清单时，只重新读取上次生成索引之后新增或修改的JSON文件，
+        并根据视频文件的增删更新 has_video。使用分片存储时读取全部分片。
+        
+        Args:
+            full: 是否重新读取所有JSON文件
+        
         Returns:
             Dict[str, Any]: 索引数据
         """
         self.logger.info("开始生成数据集索引...")
         
+        cursors = []
+        video_files = self._video_files_by_bvid()
+        video_bvids = set(video_files) if video_files is not None else None
+        if self.json_manifest is not None:
+            self.json_manifest.refresh()
+            changed, removed, version = self.json_manifest.changes_since("dataset_index")
+            video_changed, video_removed, video_version = self.video_manifest.changes_since("dataset_index")
+            cursors = [(self.json_manifest, version), (self.video_manifest, video_version)]
+            
+            if (not full and self.metadata_store is None and changed is not None and video_changed is not None
+                    and self.index_store.count() > 0):
+                processed = self._update_index_incremental(changed, removed, video_changed + video_removed, video_bvids)
+                for manifest, v in cursors:
+                    manifest.commit("dataset_index", v)
+                index_data = self.load_index()
+                self._sum_index_stats(index_data)
+                self.logger.info(f"索引增量更新完成，共处理 {processed} 个视频")
+                return index_data
+            
+            filenames = self.json_manifest.names()
+        else:
+            filenames = [f for f in os.listdir(self.json_dir) if f.endswith(".json") and f != "index.json"]
+        
         # 创建新索引
         index_data = {
             "metadata": {
@@ -307,63 +462,69 @@ class DatasetManager:
             "videos": {},
         }
         
-        # 遍历JSON文件目录
-        processed = 0
+        # 分片中的视频信息优先于未迁移的同名JSON文件
+        if self.metadata_store is not None:
+            for video_info in self.metadata_store.iter_all():
+                index_record = self._index_record_with_video(video_info, video_bvids)
+                index_data["videos"][index_record["bvid"]] = index_record
         
-        for filename in os.listdir(self.json_dir):
-            if not filename.endswith(".json") or filename == "index.json":
+        # 遍历JSON文件
+        for filename in filenames:
+            if file_key(filename) in index_data["videos"]:
                 continue
-                
-            try:
-                # 加载视频信息
-                filepath = os.path.join(self.json_dir, filename)
-                with open(filepath, "r", encoding="utf-8") as f:
-                    video_info = json.load(f)
-                
-                # 提取索引所需字段
-                basic_info = video_info.get("basic_info", {})
-                owner = video_info.get("owner", {})
-                stat = video_info.get("stat", {})
-                
-                bvid = basic_info.get("bvid", "")
-                
-                # 构建索引记录
-                index_record = {
-                    "bvid": bvid,
-                    "title": basic_info.get("title", ""),
-                    "duration": basic_info.get("duration", 0),
-                    "pubdate": basic_info.get("pubdate", 0),
-                    "owner_name": owner.get("name", ""),
-                    "view": stat.get("view", 0),
-                    "like": stat.get("like", 0),
-                    "tags": [tag.get("tag_name", "") for tag in video_info.get("tags", [])],
-                    "indexed_at": int(time.time()),
-                }
-                
-                # 检查视频文件是否存在
-                video_path = self.get_video_path(bvid)
-                index_record["has_video"] = video_path is not None
-                
-                # 更新索引
-                index_data["videos"][bvid] = index_record
-                
-                # 更新统计数据
-                index_data["stats"]["total_videos"] += 1
-                index_data["stats"]["total_duration"] += index_record["duration"]
-                index_data["stats"]["total_view"] += index_record["view"]
-                index_data["stats"]["total_like"] += index_record["like"]
-                
-                processed += 1
-                
-            except Exception as e:
-                self.logger.error(f"处理文件 {filename} 时出错: {str(e)}")
+            index_record = self._read_index_record(filename, video_bvids)
+            if index_record is not None:
+                index_data["videos"][index_record["bvid"]] = index_record
+        
+        # 更新统计数据
+        self._sum_index_stats(index_data)
         
         # 保存索引
         self._save_index(index_data)
+        for manifest, v in cursors:
+            manifest.commit("dataset_index", v)
         
-        self.logger.info(f"索引生成完成，共处理 {processed} 个视频")
+        self.logger.info(f"索引生成完成，共处理 {len(index_data['videos'])} 个视频")
         return index_data
     
+    def _update_index_incremental(self, changed: List[str], removed: List[str], video_changes: List[str],
+                                  video_bvids: set) -> int:
+        """
+        根据文件清单的变更增量更新索引
+        
+        Args:
+            changed: 新增或修改的JSON文件名
+            removed: 删除的JSON文件名
+            video_changes: 新增、修改或删除的视频文件名
+            video_bvids: 有视频文件的BV号集合
+            
+        Returns:
+            int: 更新的记录数
+        """
+        records = [r for r in (self._read_index_record(name, video_bvids) for name in changed) if r is not None]
+        updated = {r["bvid"] for r in records}
+        removed_bvids = {file_key(name) for name in removed} - updated
+        
+        # 视频文件增删只需要更新 has_video，不重新读取JSON
+        for bvid in {file_key(name) for name in video_changes} - updated - removed_bvids:
+            record = self.index_store.get(bvid)
+            if record is not None and record.get("has_video") != (bvid in video_bvids):
+                records.append(dict(record, has_video=bvid in video_bvids))
+        
+        self.index_store.upsert_many(records)
+        self.index_store.remove(removed_bvids)
+        return len(records) + len(removed_bvids)
+    
+    def _sum_index_stats(self, index_data: Dict[str, Any]) -> None:
+        """汇总索引中的总时长、总播放量和总点赞数"""
+        videos = index_data["videos"].values()
+        index_data["stats"].update({
+            "total_videos": len(index_data["videos"]),
+            "total_duration": sum(v.get("duration", 0) for v in videos),
+            "total_view": sum(v.get("view", 0) for v in videos),
+            "total_like": sum(v.get("like", 0) for v in videos),
+        })
+    
     def check_dataset_integrity(self) -> Dict[str, Any]:
         """
         检查数据集完整性
@@ -385,18 +546,27 @@ class DatasetManager:
             "missing_video": [],
         }
         
+        # 从文件清单中获取已有的文件，不逐个检查
+        video_files = self._video_files_by_bvid()
+        if self.json_manifest is not None:
+            self.json_manifest.refresh()
+        
         # 检查每个视频
         for bvid, info in index_data["videos"].items():
             # 检查JSON文件
-            json_path = os.path.join(self.json_dir, f"{bvid}.json")
-            if os.path.exists(json_path):
+            if self.metadata_store is not None and self.metadata_store.contains(bvid):
+                has_json = True
+            elif self.json_manifest is not None:
+                has_json = self.json_manifest.contains(f"{bvid}.json")
+            else:
+                has_json = os.path.exists(os.path.join(self.json_dir, f"{bvid}.json"))
+            if has_json:
                 result["videos_with_json"] += 1
             else:
                 result["missing_json"].append(bvid)
             
             # 检查视频文件
-            video_path = self.get_video_path(bvid)
-            if video_path:
+            if self._video_file_size(bvid, video_files) is not None:
                 result["videos_with_file"] += 1
             else:
                 result["missing_video"].append(bvid)
@@ -540,40 +710,51 @@ class DatasetManager:
         
         return stats
     
-    def search_videos(self, keyword: str, search_in: List[str] = None) -> List[str]:
+    def search_videos(self, keyword: str = "", search_in: List[str] = None, prefix: bool = False,
+                      match_all: bool = True, filters: Optional[Dict[str, Tuple[Optional[int], Optional[int]]]] = None,
+                      limit: Optional[int] = None) -> List[str]:
         """
         搜索视频
         
         Args:
-            keyword: 搜索关键词
-            search_in: 要搜索的字段列表，默认为["title", "tags"]
+            keyword: 搜索关键词，多个词用空格分隔，为空时只按过滤条件筛选
+            search_in: 要搜索的字段列表，可选 title / tags / owner_name / desc，默认为["title", "tags"]
+            prefix: 是否将最后一个词作为前缀匹配
+            match_all: True 时要求匹配全部关键词，False 时匹配任意一个即可
+            filters: 范围过滤，支持 view / like / duration，如 {"view": (1000, None), "duration": (None, 600)}
+            limit: 最大结果数量，None 表示不限制
             
         Returns:
-            List[str]: 匹配的视频BV号列表
+            List[str]: 匹配的视频BV号列表，按相关度排序
         """
         if search_in is None:
             search_in = ["title", "tags"]
-            
-        results = []
         
-        # 加载索引
-        index_data = self.load_index()
+        if self.search_index is not None:
+            return self.search_index.search(keyword, search_in, prefix=prefix, match_all=match_all,
+                                            filters=filters, limit=limit)
         
-        # 搜索每个视频
-        for bvid, info in index_data["videos"].items():
-            # 搜索标题
-            if "title" in search_in and keyword.lower() in info.get("title", "").lower():
-                results.append(bvid)
+        # 检索索引不可用时逐个扫描，匹配规则与检索索引相同，但不按相关度排序
+        for field in filters or {}:
+            if field not in FILTER_FIELDS:
+                raise ValueError(f"不支持的过滤字段: {field}")
+        videos = self.index_store.load()["videos"]
+        results = []
+        for bvid, info in videos.items():
+            if any(not (low is None or info.get(field, 0) >= low) or not (high is None or info.get(field, 0) <= high)
+                   for field, (low, high) in (filters or {}).items()):
                 continue
-                
-            # 搜索标签
-            if "tags" in search_in:
-                for tag in info.get("tags", []):
-                    if keyword.lower() in tag.lower():
-                        results.append(bvid)
-                        break
+            texts = []
+            for field in search_in:
+                value = info.get(field) or ""
+                texts.extend(value if isinstance(value, list) else [value])
+            if match_keyword(keyword, texts, prefix=prefix, match_all=match_all):
+                results.append(bvid)
         
-        return results
+        if not keyword.strip():
+            # 与检索索引一致，没有检索词时按播放量排序
+            results.sort(key=lambda bvid: videos[bvid].get("view", 0), reverse=True)
+        return results if limit is None else results[:limit]
     
     def get_dataset_stats(self) -> Dict[str, Any]:
         """
@@ -615,11 +796,15 @@ class DatasetManager:
         all_tags = []
         like_view_ratios = []
         
+        video_files = self._video_files_by_bvid()
+        total_size = 0
+        
         for bvid, info in videos.items():
             # 检查视频文件是否存在
-            video_path = self.get_video_path(bvid)
-            if video_path:
+            size = self._video_file_size(bvid, video_files)
+            if size is not None:
                 stats["video_with_files"] += 1
+                total_size += size
             
             # 按发布日期统计
             pubdate = info.get("pubdate", 0)
@@ -673,13 +858,7 @@ class DatasetManager:
         minutes, seconds = divmod(remainder, 60)
         stats["total_duration_formatted"] = f"{int(hours)}:{int(minutes):02d}:{int(seconds):02d}"
         
-        # 统计数据集总大小
-        total_size = 0
-        for bvid in videos.keys():
-            video_path = self.get_video_path(bvid)
-            if video_path and os.path.exists(video_path):
-                total_size += os.path.getsize(video_path)
-        
+        # 数据集总大小
         stats["total_size_bytes"] = total_size
         stats["total_size_mb"] = total_size / (1024 * 1024)
         stats["total_size_gb"] = total_size / (1024 * 1024 * 1024)
@@ -792,6 +971,8 @@ class DatasetManager:
         Returns:
             bool: 如果存在元数据文件则返回True，否则返回False
         """
+        if self.metadata_store is not None and self.metadata_store.contains(bvid):
+            return True
         filename = self.config["json_filename_format"].format(bvid=bvid)
         file_path = os.path.join(self.json_dir, filename)
         return os.path.exists(file_path)
@@ -803,12 +984,66 @@ class DatasetManager:
         Returns:
             int: 视频数量
         """
+        if self.metadata_store is not None:
+            bvids = set(self.metadata_store.bvids())
+            if self.json_manifest is not None:
+                self.json_manifest.refresh()
+                filenames = self.json_manifest.names()
+            else:
+                filenames = [f for f in os.listdir(self.json_dir) if f.endswith('.json') and f != 'index.json']
+            return len(bvids | {file_key(f) for f in filenames})
+        if self.json_manifest is not None:
+            self.json_manifest.refresh()
+            return self.json_manifest.count()
         count = 0
         for filename in os.listdir(self.json_dir):
             if filename.endswith('.json') and filename != 'index.json':
                 count += 1
         return count
     
+    def migrate_metadata(self, remove_files: bool = False, batch_size: int = 500) -> int:
+        """
+        将JSON文件中的视频信息导入分片存储
+        
+        Args:
+            remove_files: 导入后是否删除JSON文件
+            batch_size: 每批导入的文件数
+            
+        Returns:
+            int: 导入的视频数量
+        """
+        if self.metadata_store is None:
+            raise ValueError("未启用分片存储 (metadata_backend 不是 shards)")
+        
+        if self.json_manifest is not None:
+            self.json_manifest.refresh()
+            filenames = self.json_manifest.names()
+        else:
+            filenames = [f for f in os.listdir(self.json_dir) if f.endswith(".json") and f != "index.json"]
+        
+        migrated = 0
+        for start in range(0, len(filenames), batch_size):
+            batch, paths = [], []
+            for filename in filenames[start:start + batch_size]:
+                path = os.path.join(self.json_dir, filename)
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        video_info = json.load(f)
+                except Exception as e:
+                    self.logger.error(f"读取文件 {filename} 时出错: {str(e)}")
+                    continue
+                if video_info.get("basic_info", {}).get("bvid"):
+                    batch.append(video_info)
+                    paths.append(path)
+            self.metadata_store.save_many(batch)
+            migrated += len(batch)
+            if remove_files:
+                for path in paths:
+                    os.remove(path)
+            self.logger.info(f"已导入 {migrated}/{len(filenames)} 个视频信息")
+        
+        return migrated
+    
     def save_metadata(self, video_info: Dict[str, Any]) -> str:
         """
         保存视频元数据（save_video_info的别名）
@@ -870,11 +1105,8 @@ class DatasetManager:
             total_duration = sum(video.get("duration", 0) for video in videos.values())
             
             # 计算总文件大小
-            total_size = 0
-            for bvid in videos.keys():
-                video_path = self.get_video_path(bvid)
-                if video_path and os.path.exists(video_path):
-                    total_size += os.path.getsize(video_path)
+            video_files = self._video_files_by_bvid()
+            total_size = sum(self._video_file_size(bvid, video_files) or 0 for bvid in videos.keys())
             
             # 格式化时长
             hours = total_duration // 3600
@@ -914,11 +1146,11 @@ class DatasetManager:
             videos = index_data.get("videos", {})
             
             missing_bvids = []
+            video_files = self._video_files_by_bvid()
             
             for bvid in videos.keys():
                 # 检查视频文件是否存在
-                video_path = self.get_video_path(bvid)
-                if not video_path or not os.path.exists(video_path):
+                if self._video_file_size(bvid, video_files) is None:
                     missing_bvids.append(bvid)
             
             self.logger.info(f"检查完成，发现 {len(missing_bvids)} 个缺失的视频文件")
@@ -943,6 +1175,8 @@ if __name__ == "__main__":
     parser.add_argument("--report", type=str, help="统计报告输出路径")
     parser.add_argument("--increment", type=str, help="增量更新源目录")
     parser.add_argument("--force", action="store_true", help="强制更新已存在的视频")
+    parser.add_argument("--migrate-shards", action="store_true", help="将JSON文件导入压缩分片存储")
+    parser.add_argument("--remove-json", action="store_true", help="导入分片后删除JSON文件")
     parser.add_argument("--debug", action="store_true", help="显示调试日志")
     args = parser.parse_args()
     
@@ -951,9 +1185,16 @@ if __name__ == "__main__":
     logging.basicConfig(level=log_level, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     
     # 初始化数据集管理器
-    dataset = DatasetManager(args.json_dir, args.video_dir)
+    dataset = DatasetManager(args.json_dir, args.video_dir,
+                             {"metadata_backend": "shards"} if args.migrate_shards else None)
+    
+    if args.migrate_shards:
+        # 导入分片存储
+        count = dataset.migrate_metadata(remove_files=args.remove_json)
+        print(f"已导入 {count} 个视频信息到 {dataset.metadata_store.directory}")
+        print(f"  {dataset.metadata_store.stats()}")
     
-    if args.check:
+    elif args.check:
         # 检查数据集完整性
         result = dataset.check_dataset_integrity()
         print(f"数据集完整性检查结果:")
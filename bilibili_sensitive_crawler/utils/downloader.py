@@ -17,12 +17,12 @@ import re
 import time
 import asyncio
 import logging
-import aiohttp
 import aiofiles
 import subprocess
 import random
 import socket
 import shutil
+import tempfile
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Any, Union, Set
 import traceback
@@ -31,7 +31,12 @@ import traceback
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 from bilibili_api import video, sync
-from bilibili_api.utils.network import Credential
+from bilibili_api.utils.network import Credential, get_client
+
+try:
+    from .remux import DashRemuxer, RemuxError
+except ImportError:
+    from remux import DashRemuxer, RemuxError
 
 
 class DownloadException(Exception):
@@ -155,7 +160,10 @@ class BiliDownloader:
             "concurrent_limit": 3,  # 并发下载数量
             "retry_times": 5,  # 下载失败重试次数
             "timeout": 60,  # 下载超时时间(秒)
-            "chunk_size": 1024 * 1024,  # 分块下载大小(字节)
+            "chunk_size": 1024 * 1024,  # 分块写入大小(字节)
+            "read_size": 256 * 1024,  # 每次读取的最大字节数，读取超时按每次读取计算
+            "progress_interval": 5,  # 下载进度日志的最小间隔(秒)
+            "progress_bytes": 16 * 1024 * 1024,  # 每下载多少字节至少输出一次进度
             "filename_format": "{bvid}.mp4",  # 文件命名格式
             "aria2c_args": [
                 "--max-concurrent-downloads=3",
@@ -168,6 +176,11 @@ class BiliDownloader:
             ],
             "use_external_downloader": False,  # 是否使用外部下载器
             "external_downloader": "aria2c",  # 外部下载器命令
+            "merge_method": "native",  # 音视频合并方式: native=直接封装(不依赖FFmpeg), ffmpeg=调用FFmpeg
+            "remux_interval": 0.5,  # 边下载边封装的检查间隔(秒)
+            "ffmpeg_path": "ffmpeg",  # FFmpeg可执行文件路径
+            "ffmpeg_concurrency": 2,  # 同时运行的FFmpeg进程数
+            "ffmpeg_timeout": 300,  # FFmpeg合并超时时间(秒)
             "check_network_before_download": True,  # 下载前检查网络连接
             "network_test_timeout": 10,  # 网络检测超时时间(秒)
             "test_servers": [  # 网络测试服务器
@@ -182,9 +195,18 @@ class BiliDownloader:
                 "jitter": 0.1  # 随机抖动系数
             },
             "error_tracking": {
-                "track_failed_hosts": True,  # 记录失败的主机
-                "host_recovery_time": 300,  # 主机恢复时间(秒)
-                "failed_hosts": {}  # 记录失败的主机及失败时间
+                "track_host_health": True,  # 记录各主机的健康分数，选择镜像时优先使用健康的主机
+                "host_recovery_time": 300,  # 主机失败后分数恢复到满分所需时间(秒)
+                "host_health": {}  # 各主机的健康分数、平均速度、成功和失败次数
+            },
+            "mirror_selection": {
+                "race": True,  # 同时请求主地址和备用地址，使用最先返回数据的地址
+                "race_count": 3,  # 同时请求的地址数量
+                "switch_on_slow": True,  # 下载速度骤降时切换到其他地址继续下载
+                "slow_window": 5,  # 计算下载速度的时间窗口(秒)
+                "slow_ratio": 0.2,  # 窗口速度低于峰值速度的比例时视为骤降
+                "min_speed": 32 * 1024,  # 窗口速度低于该值(字节/秒)时视为骤降
+                "max_switches": 3  # 每次请求最多切换地址的次数
             },
             "download_stats": {
                 "enable": True,  # 启用下载统计
@@ -206,9 +228,13 @@ class BiliDownloader:
         
         # 并发锁
         self.semaphore = asyncio.Semaphore(self.config["concurrent_limit"])
+        self.ffmpeg_semaphore = asyncio.Semaphore(self.config["ffmpeg_concurrency"])
         
-        # 失败主机集合
-        self.failed_hosts = self.config["error_tracking"]["failed_hosts"]
+        # FFmpeg版本信息，只在第一次使用FFmpeg时检查
+        self._ffmpeg_version: Optional[str] = None
+        
+        # 主机健康分数
+        self.host_health = self.config["error_tracking"]["host_health"]
         
         # 下载统计
         self.download_stats = self.config["download_stats"]["stats"]
@@ -472,6 +498,8 @@ class BiliDownloader:
                 
                 video_url = streams[0].url
                 audio_url = None  # FLV/MP4流已包含音频
+                video_urls = [video_url] + getattr(streams[0], "backup_urls", [])
+                audio_urls = None
                 
                 self.logger.info(f"检测到FLV/MP4流 - 质量: {getattr(streams[0], 'video_quality', '未知')}")
             else:
@@ -483,6 +511,9 @@ class BiliDownloader:
                 
                 video_url = streams[0].url
                 audio_url = streams[1].url if self.config["with_audio"] and len(streams) > 1 and streams[1] else None
+                # 备用地址用于镜像竞速和下载中途切换
+                video_urls = [video_url] + getattr(streams[0], "backup_urls", [])
+                audio_urls = [audio_url] + getattr(streams[1], "backup_urls", []) if audio_url else None
                 
                 self.logger.info(f"检测到DASH流 - 视频: {getattr(streams[0], 'video_quality', '未知')}, 音频: {getattr(streams[1], 'audio_quality', '未知') if audio_url else '无'}")
             
@@ -502,30 +533,28 @@ class BiliDownloader:
                             self.download_stats[bvid]["end_time"] = time.time()
                         return save_path, size
                 else:
-                    # 下载视频流
-                    try:
-                        await self._download_stream(video_url, temp_video, bvid=bvid)
-                    except Exception as e:
-                        self.logger.error(f"下载视频流失败 ({bvid}): {str(e)}")
-                        if self.config["download_stats"]["enable"]:
-                            self.download_stats[bvid]["error"] = f"视频流下载失败: {str(e)}"
-                        raise VideoStreamError(f"视频流下载失败: {str(e)}", bvid) from e
+                    # DASH流：下载的同时在线程中封装已下载完整的分片
+                    remuxer = None
+                    remux_task = None
+                    if not detecter.check_flv_mp4_stream() and audio_url and self.config["merge_method"] == "native":
+                        remuxer = DashRemuxer(temp_video, temp_audio, save_path)
+                        remux_task = asyncio.create_task(self._follow_downloads(remuxer))
                     
-                    # 下载音频流
-                    if audio_url:
-                        try:
-                            await self._download_stream(audio_url, temp_audio, bvid=bvid)
-                        except Exception as e:
-                            self.logger.error(f"下载音频流失败 ({bvid}): {str(e)}")
-                            if self.config["download_stats"]["enable"]:
-                                self.download_stats[bvid]["error"] = f"音频流下载失败: {str(e)}"
-                            raise AudioStreamError(f"音频流下载失败: {str(e)}", bvid) from e
+                    try:
+                        await self._download_streams(video_urls, temp_video, audio_urls, temp_audio, bvid)
+                    except Exception:
+                        if remuxer:
+                            remuxer.abort()
+                        raise
+                    finally:
+                        if remux_task:
+                            remux_task.cancel()
                     
                     # 处理不同类型的流
                     if not detecter.check_flv_mp4_stream() and audio_url:
                         # DASH流：需要合并视频和音频
                         try:
-                            await self._merge_video_audio(temp_video, temp_audio, save_path, bvid=bvid)
+                            await self._merge_video_audio(temp_video, temp_audio, save_path, bvid=bvid, remuxer=remuxer)
                         except MergeError as me: # 捕获特定的 MergeError
                             self.logger.error(f"合并视频和音频失败 ({bvid}): {str(me)}")
                             if self.config["download_stats"]["enable"]:
@@ -576,139 +605,456 @@ class BiliDownloader:
                 self.download_stats[bvid]["end_time"] = time.time()
             raise
     
-    async def _download_stream(self, url: str, filepath: str, bvid: Optional[str] = None) -> None:
+    async def _download_streams(self, video_urls: List[str], temp_video: str, audio_urls: Optional[List[str]],
+                                temp_audio: Optional[str], bvid: str) -> None:
+        """
+        同时下载视频流和音频流到临时文件，任一流失败时取消另一个
+        
+        Args:
+            video_urls: 视频流URL列表，第一个为主地址，其余为备用地址
+            temp_video: 视频临时文件路径
+            audio_urls: 音频流URL列表，为None时不下载音频
+            temp_audio: 音频临时文件路径
+            bvid: 视频BV号
+        """
+        async def fetch(urls: List[str], filepath: str, name: str, error_class: type) -> None:
+            try:
+                await self._download_stream(urls, filepath, bvid=bvid)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"下载{name}失败 ({bvid}): {str(e)}")
+                if self.config["download_stats"]["enable"]:
+                    self.download_stats[bvid]["error"] = f"{name}下载失败: {str(e)}"
+                raise error_class(f"{name}下载失败: {str(e)}", bvid) from e
+        
+        tasks = [asyncio.create_task(fetch(video_urls, temp_video, "视频流", VideoStreamError))]
+        if audio_urls:
+            tasks.append(asyncio.create_task(fetch(audio_urls, temp_audio, "音频流", AudioStreamError)))
+        
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+    
+    async def _follow_downloads(self, remuxer: DashRemuxer) -> None:
+        """
+        下载过程中定期封装已下载完整的分片，在线程中执行，不阻塞事件循环
+        
+        Args:
+            remuxer: 封装器
+        """
+        loop = asyncio.get_event_loop()
+        while True:
+            await asyncio.sleep(self.config["remux_interval"])
+            try:
+                await loop.run_in_executor(None, remuxer.pump)
+            except RemuxError:
+                # 错误已记录在封装器中，下载完成后改用FFmpeg合并
+                return
+    
+    async def _download_stream(self, urls: Union[str, List[str]], filepath: str, bvid: Optional[str] = None) -> None:
         """
         下载流到文件
         
+        使用bilibili-api的共享请求客户端，连接在多次下载之间复用。
+        每次请求都带上 Range 头，从响应的 Content-Range 中获取文件总大小，不再单独发送 HEAD 请求。
+        传入多个镜像地址时，同时请求并使用最先返回数据的地址，下载速度骤降时从当前位置切换到其他地址继续下载。
+        
         Args:
-            url: 下载URL
+            urls: 下载URL，或镜像URL列表(第一个为主地址)
             filepath: 保存路径
+            bvid: 视频BV号
             
         Raises:
-            NetworkError: 网络连接错误
             RetryExceededError: 超过最大重试次数
         """
-        # 从URL提取主机名
-        host = self._extract_host_from_url(url)
+        urls = [urls] if isinstance(urls, str) else [url for url in urls if url]
         
         # 应用反爬虫延迟
         await self._apply_request_delay()
         
-        # 检查主机是否在失败列表中
-        if self.config["error_tracking"]["track_failed_hosts"] and host in self.failed_hosts:
-            failure_time = self.failed_hosts[host]
-            recovery_time = self.config["error_tracking"]["host_recovery_time"]
-            elapsed = time.time() - failure_time
-            
-            if elapsed < recovery_time:
-                wait_time = recovery_time - elapsed
-                self.logger.warning(f"主机 {host} 最近下载失败，等待 {wait_time:.0f} 秒后重试")
-                await asyncio.sleep(min(wait_time, 10))  # 最多等待10秒
-        
-        headers = {
-            "User-Agent": self._get_current_user_agent(),
-            "Referer": "https://www.bilibili.com",
-        }
-        
         # 创建临时文件的目录
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
-        # 获取文件大小信息
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.head(url, headers=headers) as response:
-                    total_size = int(response.headers.get("content-length", 0))
-        except Exception as e:
-            raise NetworkError(f"无法获取文件大小信息: {str(e)}", bvid=bvid, host=host)
-                
-        # 检查是否支持断点续传
-        resume_size = 0
-        if os.path.exists(filepath):
-            resume_size = os.path.getsize(filepath)
-            if resume_size >= total_size:
-                self.logger.info(f"文件已完整下载: {filepath}")
-                return
-        
-        # 设置断点续传的头部
-        if resume_size > 0:
-            headers["Range"] = f"bytes={resume_size}-"
-            self.logger.info(f"断点续传: {filepath}, 已下载: {resume_size/1024/1024:.2f}MB, 总大小: {total_size/1024/1024:.2f}MB")
-        
         # 下载文件
         retry_count = 0
         last_error = None
         
         while retry_count < self.config["retry_times"]:
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url, headers=headers, timeout=self.config["timeout"]) as response:
-                        if response.status != 200 and response.status != 206:
-                            self.logger.warning(f"下载失败，状态码: {response.status}，尝试重试...")
-                            retry_count += 1
-                            await self._wait_before_retry(retry_count)
-                            continue
-                        
-                        # 打开文件进行写入
-                        async with aiofiles.open(filepath, "ab" if resume_size > 0 else "wb") as f:
-                            # 计算进度
-                            downloaded = resume_size
-                            chunk_size = self.config["chunk_size"]
-                            
-                            # 分块下载
-                            async for chunk in response.content.iter_chunked(chunk_size):
-                                await f.write(chunk)
-                                downloaded += len(chunk)
-                                
-                                # 打印进度
-                                if total_size > 0:
-                                    progress = downloaded / total_size * 100
-                                    self.logger.debug(f"下载进度: {progress:.2f}%, {downloaded/1024/1024:.2f}MB/{total_size/1024/1024:.2f}MB")
-                        
-                        # 下载完成
-                        if host in self.failed_hosts:
-                            del self.failed_hosts[host]  # 移除失败记录
-                        return
+                if await self._fetch_range(urls, filepath, bvid):
+                    return
+                # 连接提前断开，下次从已下载的位置继续
+                raise NetworkError("连接提前断开，文件未下载完整", bvid=bvid)
                         
             except asyncio.TimeoutError as e:
                 self.logger.warning(f"下载超时，尝试重试...")
                 last_error = e
-                retry_count += 1
-                # 记录失败的主机
-                if self.config["error_tracking"]["track_failed_hosts"] and host:
-                    self.failed_hosts[host] = time.time()
-                
-                # 如果是ContentLengthError，增加额外延迟
-                if "ContentLengthError" in str(e) or "Not enough data" in str(e):
-                    extra_delay = random.uniform(5.0, 15.0)
-                    self.logger.warning(f"检测到ContentLengthError，增加额外延迟: {extra_delay:.2f}秒")
-                    await asyncio.sleep(extra_delay)
-                
-                await self._wait_before_retry(retry_count)
-                continue
                 
             except Exception as e:
                 self.logger.error(f"下载出错: {str(e)}，尝试重试...")
                 last_error = e
-                retry_count += 1
-                # 记录失败的主机
-                if self.config["error_tracking"]["track_failed_hosts"] and host:
-                    self.failed_hosts[host] = time.time()
-                
-                # 如果是ContentLengthError，增加额外延迟
-                if "ContentLengthError" in str(e) or "Not enough data" in str(e):
-                    extra_delay = random.uniform(5.0, 15.0)
-                    self.logger.warning(f"检测到ContentLengthError，增加额外延迟: {extra_delay:.2f}秒")
-                    await asyncio.sleep(extra_delay)
                 
-                await self._wait_before_retry(retry_count)
-                continue
+            retry_count += 1
+            
+            # 如果是ContentLengthError，增加额外延迟
+            if "ContentLengthError" in str(last_error) or "Not enough data" in str(last_error):
+                extra_delay = random.uniform(5.0, 15.0)
+                self.logger.warning(f"检测到ContentLengthError，增加额外延迟: {extra_delay:.2f}秒")
+                await asyncio.sleep(extra_delay)
+            
+            await self._wait_before_retry(retry_count)
+        
+        error_msg = f"下载失败，已达到最大重试次数: {self.config['retry_times']}"
+        if last_error:
+            error_msg += f", 最后错误: {str(last_error)}"
+        raise RetryExceededError(error_msg, bvid=bvid, retry_count=self.config["retry_times"])
+    
+    async def _fetch_range(self, urls: List[str], filepath: str, bvid: Optional[str] = None) -> bool:
+        """
+        从文件已有的大小处继续下载一次，速度骤降时切换镜像继续
+        
+        Args:
+            urls: 镜像URL列表
+            filepath: 保存路径
+            bvid: 视频BV号
+            
+        Returns:
+            bool: 是否已下载完整
+            
+        Raises:
+            NetworkError: 所有镜像都无法连接
+            asyncio.TimeoutError: 读取数据超时
+        """
+        timeout = self.config["timeout"]
+        mirror_config = self.config["mirror_selection"]
+        chunk_size = self.config["chunk_size"]
+        read_size = self.config["read_size"]
+        progress_interval = self.config["progress_interval"]
+        progress_bytes = self.config["progress_bytes"]
+        client = get_client()
+        
+        resume_size = os.path.getsize(filepath) if os.path.exists(filepath) else 0
+        url, dwn_id, start, total_size, chunk = await self._open_fastest(urls, resume_size, bvid)
+        if dwn_id is None:
+            # 请求范围超出文件大小，说明已下载完整，否则重新下载
+            if resume_size > 0 and resume_size == total_size:
+                self.logger.info(f"文件已完整下载: {filepath}")
+                return True
+            url, dwn_id, start, total_size, chunk = await self._open_fastest(urls, 0, bvid)
+            if dwn_id is None:
+                raise NetworkError(f"服务器拒绝了下载请求: {filepath}", bvid=bvid)
+        
+        if start > 0:
+            self.logger.info(f"断点续传: {filepath}, 已下载: {start/1024/1024:.2f}MB, 总大小: {total_size/1024/1024:.2f}MB")
+        
+        abandoned: Set[str] = set()
+        downloaded = start
+        buffer = bytearray()
+        last_report_time = time.monotonic()
+        last_report_size = downloaded
+        
+        async with aiofiles.open(filepath, "ab" if start > 0 else "wb") as f:
+            try:
+                while True:
+                    host = self._extract_host_from_url(url)
+                    host_start_time = time.monotonic()
+                    host_start_size = downloaded
+                    window_start_time = host_start_time
+                    window_start_size = downloaded
+                    peak_speed = 0.0
+                    switch = False
+                    
+                    while True:
+                        if chunk:
+                            buffer += chunk
+                            downloaded += len(chunk)
+                        
+                        # 攒够一块再写入，减少文件写入次数
+                        if buffer and (len(buffer) >= chunk_size or not chunk):
+                            await f.write(bytes(buffer))
+                            buffer.clear()
+                        if not chunk or (total_size > 0 and downloaded >= total_size):
+                            break
+                        
+                        now = time.monotonic()
+                        
+                        # 按时间或字节数间隔输出进度
+                        if now - last_report_time >= progress_interval or downloaded - last_report_size >= progress_bytes:
+                            last_report_time = now
+                            last_report_size = downloaded
+                            if total_size > 0 and self.logger.isEnabledFor(logging.DEBUG):
+                                self.logger.debug(f"下载进度: {downloaded / total_size * 100:.2f}%, "
+                                                  f"{downloaded/1024/1024:.2f}MB/{total_size/1024/1024:.2f}MB")
+                        
+                        # 按时间窗口计算速度，低于峰值的一定比例或低于最低速度时视为骤降
+                        if now - window_start_time >= mirror_config["slow_window"]:
+                            speed = (downloaded - window_start_size) / (now - window_start_time)
+                            peak_speed = max(peak_speed, speed)
+                            window_start_time = now
+                            window_start_size = downloaded
+                            if (mirror_config["switch_on_slow"] and len(abandoned) < mirror_config["max_switches"]
+                                    and (speed < peak_speed * mirror_config["slow_ratio"] or speed < mirror_config["min_speed"])
+                                    and any(u != url and u not in abandoned for u in urls)):
+                                self.logger.warning(f"主机 {host} 下载速度骤降至 {speed/1024:.0f}KB/s，切换镜像继续下载")
+                                switch = True
+                                break
+                        
+                        try:
+                            chunk = await asyncio.wait_for(client.download_chunk(dwn_id, read_size), timeout)
+                        except StopAsyncIteration:
+                            chunk = b""
+                    
+                    elapsed = time.monotonic() - host_start_time
+                    await client.download_close(dwn_id)
+                    dwn_id = None
+                    
+                    if not switch:
+                        self._record_host_success(host, downloaded - host_start_size, elapsed)
+                        break
+                    
+                    # 写入已收到的数据，再从当前位置向其他镜像请求剩余部分
+                    self._record_host_slow(host, downloaded - host_start_size, elapsed)
+                    abandoned.add(url)
+                    if buffer:
+                        await f.write(bytes(buffer))
+                        buffer.clear()
+                    candidates = [u for u in urls if u not in abandoned]
+                    url, dwn_id, start, new_total, chunk = await self._open_fastest(candidates, downloaded, bvid)
+                    if dwn_id is None or start != downloaded or (total_size > 0 and new_total != total_size):
+                        # 新镜像不支持从当前位置继续，等待下次重试
+                        if dwn_id is not None:
+                            await client.download_close(dwn_id)
+                            dwn_id = None
+                        return False
+            finally:
+                # 连接中断时也写入已收到的数据，重试时从这里继续
+                if buffer:
+                    await f.write(bytes(buffer))
+                if dwn_id is not None:
+                    self._record_host_failure(self._extract_host_from_url(url))
+                    await client.download_close(dwn_id)
+        
+        return total_size <= 0 or downloaded >= total_size
+    
+    async def _open_fastest(self, urls: List[str], start: int,
+                            bvid: Optional[str] = None) -> Tuple[str, Optional[int], int, int, bytes]:
+        """
+        同时向多个镜像发起请求，使用最先返回数据的镜像，关闭其余连接
+        
+        镜像按主机健康分数排序，只请求排在前面的几个。断点续传时优先使用支持
+        Range 的镜像，只有所有镜像都从头返回时才从头下载。
+        
+        Args:
+            urls: 镜像URL列表
+            start: 起始字节位置
+            bvid: 视频BV号
+            
+        Returns:
+            Tuple[str, Optional[int], int, int, bytes]: (URL, 下载编号, 实际起始位置, 文件总大小, 第一块数据)，
+            所有镜像都返回416时下载编号为None
+            
+        Raises:
+            NetworkError: 所有镜像都请求失败
+        """
+        mirror_config = self.config["mirror_selection"]
+        race_count = mirror_config["race_count"] if mirror_config["race"] else 1
+        # 分数相同时保持原有顺序，主地址优先
+        candidates = sorted(urls, key=lambda u: -self._host_score(self._extract_host_from_url(u)))[:max(1, race_count)]
+        
+        tasks = {asyncio.create_task(self._open_range(url, start, bvid)): url for url in candidates}
+        pending = set(tasks)
+        winner = None
+        full = None
+        not_satisfiable = None
+        last_error = None
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    url = tasks[task]
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        self._record_host_failure(self._extract_host_from_url(url))
+                        continue
+                    result = (url,) + task.result()
+                    if result[1] is None:
+                        not_satisfiable = result
+                    elif start > 0 and result[2] == 0:
+                        # 从头返回会丢弃已下载的部分，等待其他镜像
+                        if full is None:
+                            full = result
+                        else:
+                            await get_client().download_close(result[1])
+                    elif winner is None:
+                        winner = result
+                    else:
+                        await get_client().download_close(result[1])
+            if winner is None and not_satisfiable is None:
+                winner, full = full, None
+        finally:
+            if full is not None:
+                await get_client().download_close(full[1])
+            for task in pending:
+                task.cancel()
+            for task in pending:
+                try:
+                    result = await task
+                except BaseException:
+                    continue
+                if result[0] is not None:
+                    await get_client().download_close(result[0])
+        
+        if winner is not None:
+            if len(candidates) > 1:
+                self.logger.debug(f"镜像竞速选中: {self._extract_host_from_url(winner[0])}")
+            return winner
+        if not_satisfiable is not None:
+            return not_satisfiable
+        raise NetworkError(f"所有镜像都请求失败: {str(last_error)}", bvid=bvid,
+                           host=self._extract_host_from_url(candidates[0]))
+    
+    async def _open_range(self, url: str, start: int,
+                          bvid: Optional[str] = None) -> Tuple[Optional[int], int, int, bytes]:
+        """
+        从指定位置请求文件并读取第一块数据
+        
+        Args:
+            url: 下载URL
+            start: 起始字节位置
+            bvid: 视频BV号
+            
+        Returns:
+            Tuple[Optional[int], int, int, bytes]: (下载编号, 实际起始位置, 文件总大小, 第一块数据)，
+            服务器返回416时下载编号为None
+            
+        Raises:
+            NetworkError: 响应状态码异常
+            asyncio.TimeoutError: 连接或读取超时
+        """
+        timeout = self.config["timeout"]
+        read_size = self.config["read_size"]
+        headers = {
+            "User-Agent": self._get_current_user_agent(),
+            "Referer": "https://www.bilibili.com",
+            "Range": f"bytes={start}-",
+        }
+        client = get_client()
+        dwn_id = await asyncio.wait_for(client.download_create(url, headers), timeout)
+        try:
+            status = client.download_status(dwn_id)
+            total_size = self._parse_content_range(client.download_headers(dwn_id).get("content-range", ""))
+            if status == 416:
+                await client.download_close(dwn_id)
+                return None, start, total_size, b""
+            if status == 200:
+                # 服务器不支持断点续传，从头下载
+                start = 0
+                total_size = client.download_content_length(dwn_id)
+            elif status != 206:
+                raise NetworkError(f"下载失败，状态码: {status}", bvid=bvid, host=self._extract_host_from_url(url))
+            try:
+                chunk = await asyncio.wait_for(client.download_chunk(dwn_id, read_size), timeout)
+            except StopAsyncIteration:
+                chunk = b""
+            return dwn_id, start, total_size, chunk
+        except BaseException:
+            await client.download_close(dwn_id)
+            raise
+    
+    def _host_score(self, host: Optional[str]) -> float:
+        """
+        获取主机健康分数
+        
+        分数在0~1之间，失败或速度骤降时降低，距离上次失败越久越接近1。
+        
+        Args:
+            host: 主机名
+            
+        Returns:
+            float: 健康分数
+        """
+        if not self.config["error_tracking"]["track_host_health"] or host not in self.host_health:
+            return 1.0
+        health = self.host_health[host]
+        recovery_time = self.config["error_tracking"]["host_recovery_time"]
+        recovered = min(1.0, (time.time() - health["last_failure"]) / recovery_time) if recovery_time > 0 else 1.0
+        return health["score"] + (1.0 - health["score"]) * recovered
+    
+    def _host_entry(self, host: str) -> Dict[str, Any]:
+        """获取主机的健康记录，不存在时创建"""
+        if host not in self.host_health:
+            self.host_health[host] = {"score": 1.0, "throughput": 0.0, "successes": 0, "failures": 0,
+                                      "last_failure": 0.0}
+        return self.host_health[host]
+    
+    def _record_host_success(self, host: Optional[str], size: int, elapsed: float) -> None:
+        """
+        记录主机下载成功，更新平均速度并提高健康分数
+        
+        Args:
+            host: 主机名
+            size: 下载的字节数
+            elapsed: 耗时(秒)
+        """
+        if not host or not self.config["error_tracking"]["track_host_health"]:
+            return
+        health = self._host_entry(host)
+        health["score"] = self._host_score(host) * 0.5 + 0.5
+        health["successes"] += 1
+        if elapsed > 0 and size > 0:
+            speed = size / elapsed
+            health["throughput"] = speed if not health["throughput"] else health["throughput"] * 0.7 + speed * 0.3
+    
+    def _record_host_slow(self, host: Optional[str], size: int, elapsed: float) -> None:
+        """
+        记录主机下载速度骤降，适当降低健康分数
+        
+        Args:
+            host: 主机名
+            size: 下载的字节数
+            elapsed: 耗时(秒)
+        """
+        if not host or not self.config["error_tracking"]["track_host_health"]:
+            return
+        health = self._host_entry(host)
+        health["score"] = self._host_score(host) * 0.7
+        health["last_failure"] = time.time()
+        if elapsed > 0 and size > 0:
+            speed = size / elapsed
+            health["throughput"] = speed if not health["throughput"] else health["throughput"] * 0.7 + speed * 0.3
+    
+    def _record_host_failure(self, host: Optional[str]) -> None:
+        """
+        记录主机请求失败，健康分数减半
+        
+        Args:
+            host: 主机名
+        """
+        if not host or not self.config["error_tracking"]["track_host_health"]:
+            return
+        health = self._host_entry(host)
+        health["score"] = self._host_score(host) * 0.5
+        health["failures"] += 1
+        health["last_failure"] = time.time()
+    
+    @staticmethod
+    def _parse_content_range(value: str) -> int:
+        """
+        从 Content-Range 响应头中解析文件总大小
         
-        # 检查是否下载成功
-        if retry_count >= self.config["retry_times"]:
-            error_msg = f"下载失败，已达到最大重试次数: {self.config['retry_times']}"
-            if last_error:
-                error_msg += f", 最后错误: {str(last_error)}"
-            raise RetryExceededError(error_msg, bvid=bvid, retry_count=self.config["retry_times"])
+        Args:
+            value: 响应头的值，如 "bytes 0-1023/4096" 或 "bytes */4096"
+            
+        Returns:
+            int: 文件总大小，未知时返回0
+        """
+        match = re.match(r"\s*bytes\s+(?:\d+-\d+|\*)/(\d+)", value or "")
+        return int(match.group(1)) if match else 0
     
     async def _wait_before_retry(self, retry_count: int) -> None:
         """
@@ -843,82 +1189,74 @@ class BiliDownloader:
             self.logger.error(f"外部下载器出错 ({bvid}): {str(e)}")
             raise ExternalToolError(f"外部下载器出错: {str(e)}", bvid=bvid, tool=self.config['external_downloader'])
     
-    async def _merge_video_audio(self, video_path: str, audio_path: str, output_path: str, bvid: Optional[str] = None) -> None:
+    async def _merge_video_audio(self, video_path: str, audio_path: str, output_path: str, bvid: Optional[str] = None,
+                                 remuxer: Optional[DashRemuxer] = None) -> None:
         """
         合并视频和音频
         
+        默认直接将DASH分片封装为MP4（不重新编码，在线程中执行），
+        无法封装或配置为 ffmpeg 时调用FFmpeg。
+        
         Args:
             video_path: 视频文件路径
             audio_path: 音频文件路径
             output_path: 输出文件路径
             bvid: BV号，用于日志和异常记录
+            remuxer: 下载时已在使用的封装器
             
         Raises:
             MergeError: 合并错误
             ExternalToolError: 外部工具错误
         """
-        cmd_to_log_str = "ffmpeg merge command" # 用于记录实际执行的命令的字符串形式
-        ffmpeg_executable = r"D:\Program\ffmpeg-7.1.1-full_build\bin\ffmpeg.exe" # FFmpeg 可执行文件完整路径
-        try:
-            # 检查输入文件是否存在
-            if not os.path.exists(video_path):
-                raise MergeError(f"视频文件不存在: {video_path}", bvid=bvid)
-            if not os.path.exists(audio_path):
-                raise MergeError(f"音频文件不存在: {audio_path}", bvid=bvid)
-
-            video_size = os.path.getsize(video_path)
-            audio_size = os.path.getsize(audio_path)
-            # self.logger.info(f"输入文件大小 ({bvid}) - 视频: {video_size/1024/1024:.2f}MB, 音频: {audio_size/1024/1024:.2f}MB")
-
-            if video_size == 0:
-                raise MergeError(f"视频文件为空: {video_path}", bvid=bvid)
-            if audio_size == 0:
-                raise MergeError(f"音频文件为空: {audio_path}", bvid=bvid)
-
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-            ffmpeg_version_info = "(version not checked)"
-            version_check_failed = False
+        # 检查输入文件是否存在
+        if not os.path.exists(video_path):
+            raise MergeError(f"视频文件不存在: {video_path}", bvid=bvid)
+        if not os.path.exists(audio_path):
+            raise MergeError(f"音频文件不存在: {audio_path}", bvid=bvid)
+        if os.path.getsize(video_path) == 0:
+            raise MergeError(f"视频文件为空: {video_path}", bvid=bvid)
+        if os.path.getsize(audio_path) == 0:
+            raise MergeError(f"音频文件为空: {audio_path}", bvid=bvid)
+        
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        
+        if self.config["merge_method"] == "native":
+            remuxer = remuxer or DashRemuxer(video_path, audio_path, output_path)
             try:
-                # 使用同步subprocess避免Windows上的NotImplementedError
-                import subprocess
-                proc_version = subprocess.run(
-                    [ffmpeg_executable, "-version"],
-                    capture_output=True, text=True, timeout=10
-                )
-                if proc_version.returncode == 0:
-                    ffmpeg_version_info = proc_version.stdout.split('\n')[0].strip()
-                else:
-                    ffmpeg_version_info = f"(failed to get version: exit code {proc_version.returncode}, stderr: {proc_version.stderr.strip()})"
-                    self.logger.warning(f"FFmpeg version check failed for BVID {bvid}: {ffmpeg_version_info}")
-                    version_check_failed = True
-            except FileNotFoundError:
-                self.logger.error(f"FFmpeg command '{ffmpeg_executable}' not found during version check for BVID {bvid}. Ensure FFmpeg is installed and '{ffmpeg_executable}' is in your system PATH.")
-                raise ExternalToolError(f"FFmpeg command '{ffmpeg_executable}' not found. Please ensure FFmpeg is installed and in your system PATH.", bvid=bvid, tool=ffmpeg_executable, cmd=f"{ffmpeg_executable} -version")
-            except Exception as ve:
-                self.logger.warning(f"FFmpeg version check encountered an error for BVID {bvid}: {str(ve)} (type: {type(ve).__name__})")
-                self.logger.debug(f"Full traceback: {traceback.format_exc()}")
-                ffmpeg_version_info = f"(error checking version: {str(ve)})"
-                version_check_failed = True
-
-            # self.logger.info(f"Using FFmpeg {ffmpeg_version_info} for merging ({bvid})")
-            # 如果版本检查失败，记录警告但继续尝试合并
-            if version_check_failed:
-                self.logger.warning(f"FFmpeg version check failed, but will attempt merge operation for BVID {bvid}")
-
-            # self.logger.info(f"FFmpeg input files ({bvid}): Video='{video_path}', Audio='{audio_path}'")
-            # self.logger.info(f"FFmpeg output target ({bvid}): '{output_path}'")
-
-            import tempfile
-            from pathlib import Path # 确保 Path 被导入
+                loop = asyncio.get_event_loop()
+                await loop.run_in_executor(None, remuxer.finish)
+                return
+            except RemuxError as e:
+                self.logger.warning(f"无法直接封装，改用FFmpeg合并 ({bvid}): {str(e)}")
+        elif remuxer:
+            remuxer.abort()
+        
+        await self._merge_with_ffmpeg(video_path, audio_path, output_path, bvid)
+    
+    async def _merge_with_ffmpeg(self, video_path: str, audio_path: str, output_path: str, bvid: Optional[str] = None) -> None:
+        """
+        使用FFmpeg合并视频和音频，同时运行的FFmpeg进程数受 ffmpeg_concurrency 限制
+        
+        Args:
+            video_path: 视频文件路径
+            audio_path: 音频文件路径
+            output_path: 输出文件路径
+            bvid: BV号，用于日志和异常记录
+            
+        Raises:
+            MergeError: 合并错误
+            ExternalToolError: 外部工具错误
+        """
+        ffmpeg_executable = self.config["ffmpeg_path"]
+        await self._check_ffmpeg(bvid)
+        
+        async with self.ffmpeg_semaphore:
             with tempfile.TemporaryDirectory(prefix=f"bili_merge_{bvid}_") as temp_dir:
-                temp_output_filename = f"merged_{Path(output_path).name}"
-                temp_output = os.path.join(temp_dir, temp_output_filename)
-                # self.logger.info(f"FFmpeg temporary output ({bvid}): '{temp_output}'")
-
+                temp_output = os.path.join(temp_dir, f"merged_{Path(output_path).name}")
+                
                 # 构建FFmpeg命令
                 cmd = [
-                    ffmpeg_executable,  # 使用完整路径
+                    ffmpeg_executable,
                     "-i", video_path,
                     "-i", audio_path,
                     "-c", "copy",
@@ -926,43 +1264,86 @@ class BiliDownloader:
                     "-loglevel", "error",  # 只显示错误信息
                     temp_output
                 ]
-                cmd_to_log_str = " ".join(cmd)  # 更新为实际命令
-
-                # self.logger.info(f"合并命令 ({bvid}): {cmd_to_log_str}")
-
-                # 使用同步subprocess避免Windows上的NotImplementedError
+                cmd_str = " ".join(cmd)
+                timeout = self.config["ffmpeg_timeout"]
+                
                 try:
-                    process = subprocess.run(
-                        cmd,
-                        capture_output=True, text=True, timeout=300  # 5分钟超时
-                    )
-                    stdout_text = process.stdout.strip() if process.stdout else "(stdout was None)"
-                    stderr_text = process.stderr.strip() if process.stderr else "(stderr was None)"
-                except subprocess.TimeoutExpired:
-                    raise MergeError(f"FFmpeg合并超时 (超过300秒)", bvid=bvid)
+                    returncode, _, stderr = await self._run_command(cmd, timeout)
+                except (asyncio.TimeoutError, subprocess.TimeoutExpired):
+                    raise MergeError(f"FFmpeg合并超时 (超过{timeout}秒)", bvid=bvid)
                 except Exception as e:
-                    raise ExternalToolError(f"执行FFmpeg命令时出错: {str(e)}", bvid=bvid, tool="ffmpeg", cmd=cmd_to_log_str) from e
-
+                    raise ExternalToolError(f"执行FFmpeg命令时出错: {str(e)}", bvid=bvid, tool="ffmpeg", cmd=cmd_str) from e
+                
+                if returncode != 0:
+                    raise MergeError(f"FFmpeg合并失败 (退出码 {returncode}): {stderr.decode(errors='replace').strip()}", bvid=bvid)
                 if not os.path.exists(temp_output):
                     raise MergeError(f"FFmpeg执行成功但未生成输出文件: {temp_output}", bvid=bvid)
-
-                output_size = os.path.getsize(temp_output)
-                if output_size == 0:
+                if os.path.getsize(temp_output) == 0:
                     raise MergeError(f"FFmpeg生成的输出文件为空: {temp_output}", bvid=bvid)
-
-                # self.logger.info(f"合并成功 ({bvid})，临时输出文件大小: {output_size/1024/1024:.2f}MB")
-
+                
                 shutil.move(temp_output, output_path)
-                # self.logger.info(f"视频合并完成 ({bvid}): {output_path}")
-
-        except MergeError:
-            raise
-        except ExternalToolError:
-            raise
+    
+    async def _check_ffmpeg(self, bvid: Optional[str] = None) -> None:
+        """
+        检查FFmpeg是否可用，只在第一次调用时执行
+        
+        Raises:
+            ExternalToolError: 找不到FFmpeg
+        """
+        if self._ffmpeg_version is not None:
+            return
+        
+        ffmpeg_executable = self.config["ffmpeg_path"]
+        try:
+            returncode, stdout, stderr = await self._run_command([ffmpeg_executable, "-version"], 10)
+        except FileNotFoundError:
+            self.logger.error(f"FFmpeg command '{ffmpeg_executable}' not found. Ensure FFmpeg is installed or set ffmpeg_path.")
+            raise ExternalToolError(f"FFmpeg command '{ffmpeg_executable}' not found. Please ensure FFmpeg is installed and in your system PATH.", bvid=bvid, tool=ffmpeg_executable, cmd=f"{ffmpeg_executable} -version")
         except Exception as e:
-            self.logger.error(f"合并视频和音频时发生意外错误 ({bvid}): {str(e)}")
-            self.logger.debug(traceback.format_exc())
-            raise ExternalToolError(f"合并视频和音频时发生意外错误 ({bvid}): {str(e)}", bvid=bvid, tool="ffmpeg", cmd=cmd_to_log_str) from e
+            # 版本检查失败时仍尝试合并
+            self.logger.warning(f"FFmpeg version check encountered an error: {str(e)}")
+            self._ffmpeg_version = f"(error checking version: {str(e)})"
+            return
+        
+        if returncode == 0:
+            self._ffmpeg_version = stdout.decode(errors="replace").split("\n")[0].strip()
+            self.logger.info(f"Using {self._ffmpeg_version}")
+        else:
+            self._ffmpeg_version = f"(failed to get version: exit code {returncode})"
+            self.logger.warning(f"FFmpeg version check failed: {stderr.decode(errors='replace').strip()}")
+    
+    async def _run_command(self, cmd: List[str], timeout: float) -> Tuple[int, bytes, bytes]:
+        """
+        异步执行外部命令
+        
+        Args:
+            cmd: 命令及参数
+            timeout: 超时时间(秒)
+            
+        Returns:
+            Tuple[int, bytes, bytes]: (退出码, 标准输出, 标准错误)
+        """
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except NotImplementedError:
+            # Windows的SelectorEventLoop不支持子进程，改为在线程中执行
+            loop = asyncio.get_event_loop()
+            result = await loop.run_in_executor(
+                None, lambda: subprocess.run(cmd, capture_output=True, timeout=timeout)
+            )
+            return result.returncode, result.stdout, result.stderr
+        
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+        return process.returncode, stdout, stderr
     
     def _clean_temp_files(self, *filepaths: str) -> None:
         """
@@ -1015,7 +1396,8 @@ class BiliDownloader:
             "exists": 0,
             "total_size_mb": 0,
             "avg_time_success": 0,
-            "details": self.download_stats
+            "details": self.download_stats,
+            "hosts": self.host_health
         }
         
         success_time = 0
@@ -1058,13 +1440,6 @@ class BiliDownloader:
         """
         self.logger.info(f"开始批量下载 {len(bvids)} 个视频")
         
-        tasks = []
-        for bvid in bvids:
-            task = asyncio.create_task(self._safe_download(bvid))
-            tasks.append(task)
-            
-        results = await asyncio.gather(*tasks)
-        
         # 统计结果
         stats = {
             "total": len(bvids),
@@ -1075,19 +1450,27 @@ class BiliDownloader:
             "failed_bvids": []
         }
         
-        for result in results:
-            if result["status"] == "success":
-                stats["success"] += 1
-                stats["total_size_mb"] += result["size"] / 1024 / 1024
-            elif result["status"] == "exists":
-                stats["exists"] += 1
-                stats["total_size_mb"] += result["size"] / 1024 / 1024
-            elif result["status"] == "failed":
-                stats["failed"] += 1
-                stats["failed_bvids"].append({
-                    "bvid": result["bvid"],
-                    "error": result["error"]
-                })
+        # 固定数量的工作协程共享同一个迭代器，避免为每个BV号都创建任务
+        pending = iter(bvids)
+        
+        async def worker():
+            for bvid in pending:
+                result = await self._safe_download(bvid)
+                if result["status"] == "success":
+                    stats["success"] += 1
+                    stats["total_size_mb"] += result["size"] / 1024 / 1024
+                elif result["status"] == "exists":
+                    stats["exists"] += 1
+                    stats["total_size_mb"] += result["size"] / 1024 / 1024
+                elif result["status"] == "failed":
+                    stats["failed"] += 1
+                    stats["failed_bvids"].append({
+                        "bvid": result["bvid"],
+                        "error": result["error"]
+                    })
+        
+        workers = max(1, min(self.config["concurrent_limit"], len(bvids)))
+        await asyncio.gather(*(worker() for _ in range(workers)))
                 
         self.logger.info(f"批量下载完成，成功: {stats['success']}，已存在: {stats['exists']}，失败: {stats['failed']}")
         return stats
@@ -18,52 +18,69 @@ import os
 import json
 import logging
 from pathlib import Path
-from typing import List, Dict, Tuple, Set
+from typing import List, Dict, Tuple, Set, Optional
 from datetime import datetime
-import time
+
+try:
+    from .index_store import get_index_store
+    from .file_manifest import get_dataset_manifests
+    from .metadata_store import find_metadata_store
+except ImportError:
+    from index_store import get_index_store
+    from file_manifest import get_dataset_manifests
+    from metadata_store import find_metadata_store
 
 
 class FileAnalyzer:
     """文件匹配分析器"""
     
-    def __init__(self, metadata_dir: str, videos_dir: str):
+    def __init__(self, metadata_dir: str, videos_dir: str, use_manifest: bool = True, watch: bool = False,
+                 index_backend: Optional[str] = None, index_file: Optional[str] = None):
         """
         初始化文件分析器
         
         Args:
             metadata_dir: 元数据目录路径
             videos_dir: 视频文件目录路径
+            use_manifest: 是否使用文件清单代替遍历目录
+            watch: 是否监听目录变化(Linux inotify)
+            index_backend: 索引后端 (json / jsonl / sqlite)，应与 DatasetManager 一致，None 时自动判断
+            index_file: index.json 路径，默认为元数据目录下的 index.json
         """
         self.metadata_dir = Path(metadata_dir)
         self.videos_dir = Path(videos_dir)
         self.logger = logging.getLogger("bili_crawler.file_analyzer")
         
         # index.json文件路径
-        self.index_file = self.metadata_dir / "index.json"
+        self.index_file = Path(index_file) if index_file else self.metadata_dir / "index.json"
+        self.index_store = get_index_store(str(self.metadata_dir), index_backend, str(self.index_file))
+        
+        # 文件清单，与 DatasetManager、VideoFilter 共享
+        self.json_manifest = None
+        self.video_manifest = None
+        if use_manifest and self.metadata_dir.exists() and self.videos_dir.exists():
+            try:
+                self.json_manifest, self.video_manifest = get_dataset_manifests(
+                    str(self.metadata_dir), str(self.videos_dir), watch=watch,
+                    exclude=[self.index_file.name])
+            except Exception as e:
+                self.logger.warning(f"文件清单不可用，将直接遍历目录: {str(e)}")
+        
+        # 保存在压缩分片中的视频信息，视为已有JSON
+        self.metadata_store = find_metadata_store(str(self.metadata_dir)) if self.metadata_dir.exists() else None
     
     def load_index(self) -> Dict:
-        """加载index.json文件"""
-        if not self.index_file.exists():
-            self.logger.warning(f"索引文件不存在: {self.index_file}")
-            return {"metadata": {}, "stats": {"total_videos": 0}, "videos": {}}
-        
+        """加载索引（通过与 DatasetManager 共享的索引存储）"""
         try:
-            with open(self.index_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return self.index_store.load()
         except Exception as e:
             self.logger.error(f"加载索引文件失败: {str(e)}")
             return {"metadata": {}, "stats": {"total_videos": 0}, "videos": {}}
     
     def save_index(self, index_data: Dict) -> bool:
-        """保存index.json文件"""
+        """用完整索引替换现有索引"""
         try:
-            # 更新统计信息
-            index_data["stats"]["total_videos"] = len(index_data.get("videos", {}))
-            index_data["stats"]["last_updated"] = int(time.time())
-            
-            with open(self.index_file, 'w', encoding='utf-8') as f:
-                json.dump(index_data, f, ensure_ascii=False, indent=4)
-            
+            self.index_store.replace(index_data)
             self.logger.info(f"索引文件已更新: {self.index_file}")
             return True
         except Exception as e:
@@ -72,9 +89,7 @@ class FileAnalyzer:
     
     def get_index_videos(self) -> Set[str]:
         """获取索引中记录的所有视频BV号"""
-        index_data = self.load_index()
-        videos = index_data.get("videos", {})
-        return set(videos.keys())
+        return set(self.index_store.bvids())
     
     def get_video_files(self) -> Set[str]:
         """获取所有视频文件的BV号"""
@@ -84,10 +99,15 @@ class FileAnalyzer:
             self.logger.warning(f"视频目录不存在: {self.videos_dir}")
             return video_files
         
-        for video_file in self.videos_dir.glob("*.mp4"):
+        if self.video_manifest is not None:
+            self.video_manifest.refresh()
             # 从文件名提取BV号 (例如: BV1234567890.mp4 -> BV1234567890)
-            bv_id = video_file.stem
-            video_files.add(bv_id)
+            video_files = {name[:-4] for name in self.video_manifest.names() if name.endswith(".mp4")}
+        else:
+            for video_file in self.videos_dir.glob("*.mp4"):
+                # 从文件名提取BV号 (例如: BV1234567890.mp4 -> BV1234567890)
+                bv_id = video_file.stem
+                video_files.add(bv_id)
         
         self.logger.info(f"找到 {len(video_files)} 个视频文件")
         return video_files
@@ -100,14 +120,22 @@ class FileAnalyzer:
             self.logger.warning(f"元数据目录不存在: {self.metadata_dir}")
             return json_files
         
-        for json_file in self.metadata_dir.glob("*.json"):
-            # 跳过index.json
-            if json_file.name == "index.json":
-                continue
-            
-            # 从文件名提取BV号 (例如: BV1234567890.json -> BV1234567890)
-            bv_id = json_file.stem
-            json_files.add(bv_id)
+        if self.json_manifest is not None:
+            # 清单中不包含index.json
+            self.json_manifest.refresh()
+            json_files = {name[:-5] for name in self.json_manifest.names()}
+        else:
+            for json_file in self.metadata_dir.glob("*.json"):
+                # 跳过index.json
+                if json_file.name == "index.json":
+                    continue
+                
+                # 从文件名提取BV号 (例如: BV1234567890.json -> BV1234567890)
+                bv_id = json_file.stem
+                json_files.add(bv_id)
+        
+        if self.metadata_store is not None:
+            json_files.update(self.metadata_store.bvids())
         
         self.logger.info(f"找到 {len(json_files)} 个JSON文件")
         return json_files
@@ -234,22 +262,21 @@ class FileAnalyzer:
             
             for bvid in index_orphans:
                 if bvid in videos:
-                    if not dry_run:
-                        del videos[bvid]
                     sync_result["removed_from_index"].append(bvid)
                     self.logger.debug(f"{'[试运行] ' if dry_run else ''}从索引中删除: {bvid}")
             
             sync_result["removed_count"] = len(sync_result["removed_from_index"])
             # 修复计算逻辑
-            if dry_run:
-                sync_result["kept_in_index"] = original_count - sync_result["removed_count"]
-            else:
-                sync_result["kept_in_index"] = len(videos)
+            sync_result["kept_in_index"] = original_count - sync_result["removed_count"]
         
-        # 保存更新后的索引
+        # 删除孤立记录（只写入被删除的记录，不重写整个索引）
         if not dry_run and sync_result["removed_count"] > 0:
-            index_data["videos"] = videos
-            sync_result["success"] = self.save_index(index_data)
+            try:
+                self.index_store.remove(sync_result["removed_from_index"])
+                self.logger.info(f"索引文件已更新: {self.index_file}")
+                sync_result["success"] = True
+            except Exception as e:
+                self.logger.error(f"保存索引文件失败: {str(e)}")
         else:
             sync_result["success"] = True  # 试运行或无需更新时标记为成功
         
@@ -305,7 +332,20 @@ class FileAnalyzer:
             
             for bv_id in analysis_result['orphan_jsons']:
                 json_path = self.metadata_dir / f"{bv_id}.json"
-                if json_path.exists():
+                if self.metadata_store is not None and self.metadata_store.contains(bv_id):
+                    if not dry_run:
+                        try:
+                            self.metadata_store.remove([bv_id])
+                            self.logger.info(f"已从分片中删除孤立视频信息: {bv_id}")
+                            cleaned_jsons.append(bv_id)
+                        except Exception as e:
+                            self.logger.error(f"删除分片中的视频信息失败 {bv_id}: {e}")
+                    else:
+                        self.logger.info(f"[试运行] 将从分片中删除孤立视频信息: {bv_id}")
+                        cleaned_jsons.append(bv_id)
+                    if json_path.exists() and not dry_run:
+                        json_path.unlink()
+                elif json_path.exists():
                     if not dry_run:
                         try:
                             json_path.unlink()
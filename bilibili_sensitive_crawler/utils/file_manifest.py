@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件清单模块
+
+为数据集目录维护一份持久化的文件清单（文件名、大小、修改时间、内容哈希），
+FileAnalyzer、DatasetManager、VideoFilter 查询清单，不再每次遍历整个目录。
+
+- 清单保存在目录下的 .manifest/ 中（sqlite），重启后继续使用
+- 目录的修改时间没有变化时不扫描目录，有变化时用 os.scandir 扫描一次，只重新计算有变化的文件的哈希
+- 本进程内写入的文件可以通过 mark_dirty 告知清单，原地修改的文件也能被发现
+- 可选的监听模式（Linux inotify），开启后只处理发生变化的文件，不再扫描目录
+- 每次变更都有递增的版本号，使用方可以记录自己的游标，只处理游标之后的变更
+
+注意：原地修改文件内容不会改变目录的修改时间，未开启监听模式时，
+外部程序原地修改的文件需要调用 refresh(verify=True) 才能发现。
+"""
+
+import os
+import sys
+import stat
+import select
+import struct
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Iterable, Tuple, Set, Callable
+
+
+MANIFEST_DIRNAME = ".manifest"
+
+# 大文件只对开头和结尾各取一段计算哈希
+HASH_SAMPLE_SIZE = 64 * 1024
+HASH_MODES = ("full", "sample", "none")
+
+
+def file_key(name: str) -> str:
+    """
+    从文件名中提取BV号，如 BV1xx411c7mD.json、BV1xx411c7mD_标题.mp4 -> BV1xx411c7mD
+
+    Args:
+        name: 文件名
+
+    Returns:
+        str: BV号
+    """
+    return name.split(".", 1)[0].split("_", 1)[0]
+
+
+def content_hash(path: str, size: int, mode: str = "full") -> Optional[str]:
+    """
+    计算文件内容哈希
+
+    Args:
+        path: 文件路径
+        size: 文件大小
+        mode: full=完整内容, sample=大文件只取开头和结尾各 64KB 并加上文件大小, none=不计算
+
+    Returns:
+        Optional[str]: 哈希值，不计算或读取失败时返回 None
+    """
+    if mode == "none":
+        return None
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, "rb") as f:
+            if mode == "sample" and size > 2 * HASH_SAMPLE_SIZE:
+                h.update(size.to_bytes(8, "little"))
+                h.update(f.read(HASH_SAMPLE_SIZE))
+                f.seek(-HASH_SAMPLE_SIZE, os.SEEK_END)
+                h.update(f.read(HASH_SAMPLE_SIZE))
+            else:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(block)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+class _InotifyWatcher:
+    """通过 ctypes 调用 Linux inotify，在后台线程中监听目录内文件的变化"""
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+                  | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, directory: str, on_change: Callable[[Optional[str]], None]):
+        """
+        Args:
+            directory: 监听的目录
+            on_change: 回调，参数为变化的文件名，为 None 时表示需要完整扫描（事件溢出或目录被移走）
+
+        Raises:
+            OSError: 当前系统不支持 inotify 或创建监听失败
+        """
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify 仅支持 Linux")
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"无法监听目录: {directory}")
+
+        self._on_change = on_change
+        self._stop_r, self._stop_w = os.pipe()
+        self._thread = threading.Thread(target=self._run, name=f"manifest-watch:{directory}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止监听"""
+        os.write(self._stop_w, b"x")
+        self._thread.join()
+        for fd in (self._fd, self._stop_r, self._stop_w):
+            os.close(fd)
+
+    def _run(self) -> None:
+        while True:
+            readable, _, _ = select.select([self._fd, self._stop_r], [], [])
+            if self._stop_r in readable:
+                return
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            offset = 0
+            while offset + self._EVENT.size <= len(data):
+                _, mask, _, length = self._EVENT.unpack_from(data, offset)
+                offset += self._EVENT.size
+                name = data[offset:offset + length].split(b"\0", 1)[0]
+                offset += length
+                if mask & (self.IN_Q_OVERFLOW | self.IN_DELETE_SELF | self.IN_MOVE_SELF | self.IN_IGNORED):
+                    self._on_change(None)
+                elif name:
+                    self._on_change(os.fsdecode(name))
+
+
+class FileManifest:
+    """单个目录（不含子目录）的持久化文件清单"""
+
+    def __init__(self, directory: str, suffixes: Optional[Iterable[str]] = None, exclude: Iterable[str] = (),
+                 hash_mode: str = "full", db_file: Optional[str] = None):
+        """
+        Args:
+            directory: 目录路径
+            suffixes: 只记录这些后缀的文件，如 [".json"]，None 表示记录所有带后缀的文件
+            exclude: 不记录的文件名
+            hash_mode: 内容哈希方式: full / sample / none
+            db_file: 清单数据库路径，默认为 <directory>/.manifest/files.sqlite3
+        """
+        if hash_mode not in HASH_MODES:
+            raise ValueError(f"不支持的哈希方式: {hash_mode}")
+        self.directory = os.path.abspath(directory)
+        self.suffixes = tuple(s.lower() for s in suffixes) if suffixes else None
+        self.exclude = set(exclude)
+        self.hash_mode = hash_mode
+        self.db_file = db_file or os.path.join(self.directory, MANIFEST_DIRNAME, "files.sqlite3")
+        self.logger = logging.getLogger("bili_crawler.file_manifest")
+        self._lock = threading.RLock()
+
+        # 待检查的文件名（mark_dirty 或监听事件），以及是否需要完整扫描
+        self._pending: Set[str] = set()
+        self._pending_full = False
+        self._pending_lock = threading.Lock()
+        self._watcher: Optional[_InotifyWatcher] = None
+
+        # 文件名 -> (大小, 修改时间)，首次刷新时从数据库加载
+        self._cache: Optional[Dict[str, Tuple[int, int]]] = None
+
+        os.makedirs(os.path.dirname(self.db_file) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS files (name TEXT PRIMARY KEY, key TEXT NOT NULL, size INTEGER, "
+                "mtime_ns INTEGER, hash TEXT, version INTEGER NOT NULL, deleted INTEGER NOT NULL DEFAULT 0)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS files_key ON files(key)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS files_version ON files(version)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._purge(self.exclude)
+
+    def close(self) -> None:
+        """停止监听并关闭数据库"""
+        self.unwatch()
+        with self._lock:
+            self._db.close()
+
+    def _accept(self, name: str) -> bool:
+        if name.startswith(".") or name in self.exclude or "." not in name:
+            return False
+        return self.suffixes is None or name.lower().endswith(self.suffixes)
+
+    def add_exclude(self, names: Iterable[str]) -> None:
+        """
+        追加不记录的文件名，已记录的这些文件视为删除
+
+        Args:
+            names: 文件名列表
+        """
+        with self._lock:
+            names = set(names) - self.exclude
+            if names:
+                self.exclude |= names
+                self._purge(names)
+
+    def _purge(self, names: Iterable[str]) -> None:
+        """将已记录的文件标记为删除（文件名被排除后）"""
+        names = list(names)
+        if not names:
+            return
+        placeholders = ", ".join("?" * len(names))
+        purged = [row[0] for row in self._db.execute(
+            f"SELECT name FROM files WHERE deleted = 0 AND name IN ({placeholders})", names)]
+        if not purged:
+            return
+        with self._db:
+            version = int(self._get_meta("version") or 0) + 1
+            self._set_meta("version", version)
+            self._db.executemany("UPDATE files SET deleted = 1, version = ? WHERE name = ?",
+                                 [(version, n) for n in purged])
+        if self._cache is not None:
+            for name in purged:
+                self._cache.pop(name, None)
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: Any) -> None:
+        self._db.execute("REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+
+    def _load_cache(self) -> Dict[str, Tuple[int, int]]:
+        if self._cache is None:
+            self._cache = {name: (size, mtime_ns) for name, size, mtime_ns in
+                           self._db.execute("SELECT name, size, mtime_ns FROM files WHERE deleted = 0")}
+        return self._cache
+
+    def mark_dirty(self, names: Iterable[str]) -> None:
+        """
+        标记需要重新检查的文件，下次刷新时处理（用于本进程内写入的文件）
+
+        Args:
+            names: 文件名列表
+        """
+        with self._pending_lock:
+            self._pending.update(names)
+
+    def _on_watch_event(self, name: Optional[str]) -> None:
+        with self._pending_lock:
+            if name is None:
+                self._pending_full = True
+            else:
+                self._pending.add(name)
+
+    def watch(self) -> bool:
+        """
+        开启监听模式（Linux inotify），之后的刷新只处理发生变化的文件
+
+        Returns:
+            bool: 是否成功开启
+        """
+        with self._lock:
+            if self._watcher is not None:
+                return True
+            try:
+                self._watcher = _InotifyWatcher(self.directory, self._on_watch_event)
+            except (OSError, AttributeError) as e:
+                self.logger.warning(f"无法监听目录 {self.directory}，将按目录修改时间增量扫描: {str(e)}")
+                return False
+            # 开启监听前的变化需要完整扫描一次
+            with self._pending_lock:
+                self._pending_full = True
+            return True
+
+    def unwatch(self) -> None:
+        """停止监听"""
+        with self._lock:
+            if self._watcher is not None:
+                self._watcher.stop()
+                self._watcher = None
+
+    @property
+    def watching(self) -> bool:
+        """是否处于监听模式"""
+        return self._watcher is not None
+
+    def refresh(self, verify: bool = False) -> Dict[str, List[str]]:
+        """
+        增量更新清单
+
+        Args:
+            verify: 是否忽略目录修改时间，重新检查所有文件的大小和修改时间
+
+        Returns:
+            Dict[str, List[str]]: {"added": [...], "modified": [...], "removed": [...]}
+        """
+        with self._lock:
+            cache = self._load_cache()
+            with self._pending_lock:
+                pending, self._pending = self._pending, set()
+                full, self._pending_full = self._pending_full, False
+
+            try:
+                dir_mtime = os.stat(self.directory).st_mtime_ns
+            except FileNotFoundError:
+                dir_mtime = None
+
+            if dir_mtime is None:
+                seen = {}
+                full = True
+            elif verify or full or (self._watcher is None and self._get_meta("dir_mtime_ns") != str(dir_mtime)):
+                seen = self._scan()
+                full = True
+            else:
+                seen = {}
+                for name in pending:
+                    if not self._accept(name):
+                        continue
+                    try:
+                        st = os.stat(os.path.join(self.directory, name))
+                    except FileNotFoundError:
+                        continue
+                    if stat.S_ISREG(st.st_mode):
+                        seen[name] = (st.st_size, st.st_mtime_ns)
+
+            checked = set(cache) if full else {n for n in pending if n in cache} | set(seen)
+            added = [n for n in seen if n not in cache]
+            modified = [n for n in seen if n in cache and cache[n] != seen[n]]
+            removed = [n for n in checked if n not in seen]
+
+            changed = added + modified
+            hashes = self._hash_files(changed, seen)
+            with self._db:
+                if changed or removed:
+                    version = int(self._get_meta("version") or 0) + 1
+                    self._set_meta("version", version)
+                    self._db.executemany(
+                        "REPLACE INTO files (name, key, size, mtime_ns, hash, version, deleted) VALUES (?, ?, ?, ?, ?, ?, 0)",
+                        [(n, file_key(n), seen[n][0], seen[n][1], hashes.get(n), version) for n in changed],
+                    )
+                    self._db.executemany("UPDATE files SET deleted = 1, version = ? WHERE name = ?",
+                                         [(version, n) for n in removed])
+                if full and dir_mtime is not None:
+                    self._set_meta("dir_mtime_ns", dir_mtime)
+
+            for name in changed:
+                cache[name] = seen[name]
+            for name in removed:
+                cache.pop(name, None)
+
+        if changed or removed:
+            self.logger.debug(f"文件清单已更新 ({self.directory}): 新增 {len(added)} 个, "
+                              f"修改 {len(modified)} 个, 删除 {len(removed)} 个")
+        return {"added": added, "modified": modified, "removed": removed}
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """扫描目录，返回 文件名 -> (大小, 修改时间)"""
+        seen = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not self._accept(entry.name):
+                    continue
+                try:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                seen[entry.name] = (st.st_size, st.st_mtime_ns)
+        return seen
+
+    def _hash_files(self, names: List[str], seen: Dict[str, Tuple[int, int]]) -> Dict[str, Optional[str]]:
+        """计算文件哈希，文件较多时在线程池中并行读取"""
+        if self.hash_mode == "none" or not names:
+            return {}
+
+        def compute(name: str) -> Optional[str]:
+            return content_hash(os.path.join(self.directory, name), seen[name][0], self.hash_mode)
+
+        if len(names) < 64:
+            return {name: compute(name) for name in names}
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+            return dict(zip(names, executor.map(compute, names)))
+
+    def count(self) -> int:
+        """文件数量"""
+        with self._lock:
+            return len(self._load_cache())
+
+    def names(self) -> List[str]:
+        """所有文件名"""
+        with self._lock:
+            return list(self._load_cache())
+
+    def keys(self) -> Set[str]:
+        """所有文件对应的BV号"""
+        with self._lock:
+            return {file_key(name) for name in self._load_cache()}
+
+    def contains(self, name: str) -> bool:
+        """是否包含指定文件"""
+        with self._lock:
+            return name in self._load_cache()
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        获取文件记录
+
+        Args:
+            name: 文件名
+
+        Returns:
+            Optional[Dict[str, Any]]: {"name", "key", "size", "mtime_ns", "hash"}，不存在时返回 None
+        """
+        with self._lock:
+            row = self._db.execute("SELECT name, key, size, mtime_ns, hash FROM files WHERE name = ? AND deleted = 0",
+                                   (name,)).fetchone()
+        return dict(zip(("name", "key", "size", "mtime_ns", "hash"), row)) if row else None
+
+    def files_by_key(self) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        按BV号分组的文件列表
+
+        Returns:
+            Dict[str, List[Tuple[str, int]]]: BV号 -> [(文件名, 大小), ...]
+        """
+        groups: Dict[str, List[Tuple[str, int]]] = {}
+        with self._lock:
+            for name, (size, _) in self._load_cache().items():
+                groups.setdefault(file_key(name), []).append((name, size))
+        return groups
+
+    def changes_since(self, cursor: str) -> Tuple[Optional[List[str]], List[str], int]:
+        """
+        获取使用方游标之后的变更
+
+        Args:
+            cursor: 游标名称，如 "dataset_index"
+
+        Returns:
+            Tuple[Optional[List[str]], List[str], int]: (新增或修改的文件名, 删除的文件名, 当前版本号)，
+            游标不存在时第一项为 None，表示使用方需要完整处理
+        """
+        with self._lock:
+            version = int(self._get_meta("version") or 0)
+            last = self._get_meta(f"cursor:{cursor}")
+            if last is None:
+                return None, [], version
+            changed, removed = [], []
+            for name, deleted in self._db.execute("SELECT name, deleted FROM files WHERE version > ?", (int(last),)):
+                (removed if deleted else changed).append(name)
+            return changed, removed, version
+
+    def commit(self, cursor: str, version: int) -> None:
+        """
+        记录使用方已处理到的版本号，并清理所有游标都已处理过的删除记录
+
+        Args:
+            cursor: 游标名称
+            version: changes_since 返回的版本号
+        """
+        with self._lock, self._db:
+            self._set_meta(f"cursor:{cursor}", version)
+            oldest = self._db.execute(
+                "SELECT MIN(CAST(value AS INTEGER)) FROM meta WHERE key LIKE 'cursor:%'").fetchone()[0]
+            self._db.execute("DELETE FROM files WHERE deleted = 1 AND version <= ?", (oldest,))
+
+
+# 同一进程内同一目录共享一份清单
+_manifests: Dict[str, FileManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def get_file_manifest(directory: str, suffixes: Optional[Iterable[str]] = None, exclude: Iterable[str] = (),
+                      hash_mode: str = "full", state_dir: Optional[str] = None,
+                      watch: bool = False) -> FileManifest:
+    """
+    获取目录的文件清单，同一目录在进程内只打开一次
+
+    同一目录的所有调用者共享一份清单，排除的文件名取所有调用者的并集，
+    因此结果与调用顺序无关。
+
+    Args:
+        directory: 目录路径
+        suffixes: 只记录这些后缀的文件，None 表示记录所有带后缀的文件
+        exclude: 不记录的文件名
+        hash_mode: 内容哈希方式: full / sample / none
+        state_dir: 清单数据库所在目录，默认为 directory 本身
+        watch: 是否开启监听模式
+
+    Returns:
+        FileManifest: 文件清单
+    """
+    directory = os.path.abspath(directory)
+    with _manifests_lock:
+        manifest = _manifests.get(directory)
+        if manifest is None:
+            db_file = None
+            if state_dir is not None:
+                digest = hashlib.sha1(directory.encode("utf-8")).hexdigest()[:8]
+                db_file = os.path.join(os.path.abspath(state_dir), MANIFEST_DIRNAME,
+                                       f"{os.path.basename(directory) or 'root'}-{digest}.sqlite3")
+            manifest = FileManifest(directory, suffixes, exclude, hash_mode, db_file)
+            _manifests[directory] = manifest
+        else:
+            manifest.add_exclude(exclude)
+        if watch:
+            manifest.watch()
+        return manifest
+
+
+def get_dataset_manifests(metadata_dir: str, videos_dir: str, watch: bool = False,
+                          exclude: Iterable[str] = ()) -> Tuple[FileManifest, FileManifest]:
+    """
+    获取数据集元数据目录和视频目录的文件清单
+
+    元数据目录只记录JSON文件（不含索引文件）并计算完整哈希；
+    视频目录记录所有带后缀的文件，只对开头和结尾取样计算哈希，清单保存在元数据目录下。
+
+    Args:
+        metadata_dir: 元数据目录
+        videos_dir: 视频目录
+        watch: 是否开启监听模式
+        exclude: 元数据目录中额外排除的文件名
+
+    Returns:
+        Tuple[FileManifest, FileManifest]: (元数据清单, 视频清单)
+    """
+    json_manifest = get_file_manifest(metadata_dir, [".json"], {"index.json", *exclude}, "full", watch=watch)
+    video_manifest = get_file_manifest(videos_dir, None, (), "sample", state_dir=metadata_dir, watch=watch)
+    return json_manifest, video_manifest
@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据集索引存储模块
+
+为 DatasetManager、VideoFilter、FileAnalyzer 提供统一的索引读写后端，
+避免每保存一个视频就完整解析并重写一次 index.json。
+
+支持三种后端：
+1. json   - 兼容旧版的单个 index.json 文件，写入改为原子替换
+2. jsonl  - index.json 作为快照，新的修改追加写入 index.jsonl 日志，日志过长时自动合并（默认）
+3. sqlite - index.sqlite3 数据库（WAL 模式）
+
+所有后端都在内存中缓存索引，并在文件被其他进程修改时自动重新加载。
+jsonl 后端的写入在 index.jsonl 的独占文件锁下进行，多个进程的写入不会交错。
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Iterable, Tuple, Callable, IO, Iterator
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+
+INDEX_FILENAME = "index.json"
+LOG_FILENAME = "index.jsonl"
+SQLITE_FILENAME = "index.sqlite3"
+
+# Windows 下锁定的字节位置，远离文件内容以免影响读取
+_LOCK_OFFSET = 0x7FFFFFFF
+
+DEFAULT_METADATA = {
+    "dataset_name": "Bilibili Sensitive Videos Dataset",
+}
+
+
+def _empty_index() -> Dict[str, Any]:
+    """创建空索引"""
+    now = int(time.time())
+    return {
+        "metadata": dict(DEFAULT_METADATA, created_at=now),
+        "stats": {
+            "total_videos": 0,
+            "last_updated": now,
+        },
+        "videos": {},
+    }
+
+
+def _atomic_write_json(path: str, data: Any, indent: Optional[int] = None) -> None:
+    """先写入临时文件再替换，避免写入中途崩溃导致文件损坏"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """文件的 (修改时间, 大小)，文件不存在时返回 None"""
+    try:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+    except FileNotFoundError:
+        return None
+
+
+@contextmanager
+def _locked_append(path: str) -> Iterator[IO[bytes]]:
+    """以追加模式打开文件并加独占锁（fcntl/msvcrt），锁在关闭文件时释放"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "ab") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(_LOCK_OFFSET)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK 重试 10 秒后仍未获得锁
+                    continue
+        try:
+            yield f
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(_LOCK_OFFSET)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class IndexStore(ABC):
+    """
+    索引存储抽象基类，子类实现 _refresh 与 _write_* 方法
+
+    索引结构与 index.json 一致：{"metadata": {...}, "stats": {...}, "videos": {bvid: 记录}}
+    """
+
+    backend = ""
+
+    def __init__(self, metadata_dir: str, index_file: Optional[str] = None):
+        """
+        Args:
+            metadata_dir: 元数据目录
+            index_file: index.json 路径，默认为元数据目录下的 index.json
+        """
+        self.metadata_dir = metadata_dir
+        self.index_file = index_file or os.path.join(metadata_dir, INDEX_FILENAME)
+        self.logger = logging.getLogger("bili_crawler.index_store")
+        self._lock = threading.RLock()
+        self._metadata: Dict[str, Any] = {}
+        self._stats: Dict[str, Any] = {}
+        self._videos: Dict[str, Dict[str, Any]] = {}
+        self._listeners: List[Callable[["IndexStore", str, List[Any]], None]] = []
+
+    def add_listener(self, listener: Callable[["IndexStore", str, List[Any]], None]) -> None:
+        """
+        注册修改监听器，每次写入后调用 listener(store, op, items)
+
+        op 为 "upsert"（items 为记录列表）、"remove"（items 为BV号列表）
+        或 "replace"（items 为替换后的全部记录）。
+
+        Args:
+            listener: 监听函数
+        """
+        self._listeners.append(listener)
+
+    def stats(self) -> Dict[str, Any]:
+        """索引统计信息"""
+        with self._lock:
+            self._refresh()
+            return dict(self._stats, total_videos=len(self._videos))
+
+    def load(self) -> Dict[str, Any]:
+        """
+        获取完整索引（副本，修改后需调用 replace 才会保存）
+
+        Returns:
+            Dict[str, Any]: 索引数据
+        """
+        with self._lock:
+            self._refresh()
+            return {
+                "metadata": dict(self._metadata),
+                "stats": dict(self._stats, total_videos=len(self._videos)),
+                "videos": dict(self._videos),
+            }
+
+    def get(self, bvid: str) -> Optional[Dict[str, Any]]:
+        """获取单个视频的索引记录"""
+        with self._lock:
+            self._refresh()
+            return self._videos.get(bvid)
+
+    def contains(self, bvid: str) -> bool:
+        """索引中是否存在该视频"""
+        return self.get(bvid) is not None
+
+    def bvids(self) -> List[str]:
+        """索引中的所有BV号"""
+        with self._lock:
+            self._refresh()
+            return list(self._videos.keys())
+
+    def count(self) -> int:
+        """索引中的视频数量"""
+        with self._lock:
+            self._refresh()
+            return len(self._videos)
+
+    def upsert(self, record: Dict[str, Any]) -> None:
+        """
+        添加或更新单个视频记录
+
+        Args:
+            record: 索引记录，必须包含 bvid
+        """
+        self.upsert_many([record])
+
+    def upsert_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        批量添加或更新视频记录，只写入一次
+
+        Args:
+            records: 索引记录列表
+
+        Returns:
+            int: 写入的记录数
+        """
+        records = [r for r in records if r.get("bvid")]
+        if not records:
+            return 0
+        with self._lock:
+            self._refresh()
+            for record in records:
+                self._videos[record["bvid"]] = record
+            self._touch()
+            self._write_upserts(records)
+            self._notify("upsert", records)
+        return len(records)
+
+    def remove(self, bvids: Iterable[str]) -> int:
+        """
+        批量删除视频记录
+
+        Args:
+            bvids: BV号列表
+
+        Returns:
+            int: 实际删除的记录数
+        """
+        with self._lock:
+            self._refresh()
+            removed = [bvid for bvid in bvids if self._videos.pop(bvid, None) is not None]
+            if removed:
+                self._touch()
+                self._write_removes(removed)
+                self._notify("remove", removed)
+            return len(removed)
+
+    def replace(self, index_data: Dict[str, Any]) -> None:
+        """
+        用完整索引替换现有内容（重新生成索引时使用）
+
+        Args:
+            index_data: 索引数据
+        """
+        with self._lock:
+            self._metadata = dict(index_data.get("metadata") or DEFAULT_METADATA)
+            self._stats = dict(index_data.get("stats") or {})
+            self._videos = dict(index_data.get("videos") or {})
+            self._touch()
+            self._write_all()
+            self._notify("replace", list(self._videos.values()))
+
+    def compact(self) -> None:
+        """合并写入日志（仅 jsonl 后端有实际作用）"""
+
+    def close(self) -> None:
+        """关闭后端持有的资源"""
+
+    def _notify(self, op: str, items: List[Any]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(self, op, items)
+            except Exception as e:
+                self.logger.error(f"索引监听器执行失败: {str(e)}")
+
+    def _touch(self) -> None:
+        self._stats["total_videos"] = len(self._videos)
+        self._stats["last_updated"] = int(time.time())
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {"metadata": self._metadata, "stats": self._stats, "videos": self._videos}
+
+    def _load_snapshot(self) -> None:
+        """从 index.json 加载，文件不存在或损坏时为空索引"""
+        data = None
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as e:
+                self.logger.error(f"加载索引失败: {str(e)}")
+        data = data or _empty_index()
+        self._metadata = data.get("metadata", {})
+        self._stats = data.get("stats", {})
+        self._videos = data.get("videos", {})
+
+    @abstractmethod
+    def _refresh(self) -> None:
+        """文件或数据库被其他实例修改时重新加载内存中的索引"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _write_upserts(self, records: List[Dict[str, Any]]) -> None:
+        """持久化新增或更新的记录"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _write_removes(self, bvids: List[str]) -> None:
+        """持久化删除的记录"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _write_all(self) -> None:
+        """持久化完整索引"""
+        raise NotImplementedError
+
+
+class JsonIndexStore(IndexStore):
+    """单个 index.json 文件，每次修改都原子地完整重写"""
+
+    backend = "json"
+
+    def __init__(self, metadata_dir: str, index_file: Optional[str] = None):
+        super().__init__(metadata_dir, index_file)
+        self._signature: Any = False
+
+    def _refresh(self) -> None:
+        signature = _file_signature(self.index_file)
+        if signature != self._signature:
+            self._load_snapshot()
+            self._signature = signature
+
+    def _write_all(self) -> None:
+        _atomic_write_json(self.index_file, self._snapshot(), indent=4)
+        self._signature = _file_signature(self.index_file)
+        self.logger.info(f"索引已更新: {self.index_file}")
+
+    def _write_upserts(self, records: List[Dict[str, Any]]) -> None:
+        self._write_all()
+
+    def _write_removes(self, bvids: List[str]) -> None:
+        self._write_all()
+
+
+class JsonlIndexStore(IndexStore):
+    """
+    index.json 快照 + index.jsonl 追加日志
+
+    每次修改只向日志追加一行，日志条数超过快照记录数（且不少于 compact_min_ops）时
+    将当前索引写入新快照并清空日志。读取时先加载快照再重放日志，
+    遇到末尾不完整的行（其他进程正在写入）时停止，下次读取时继续。
+
+    写入都在日志文件的独占锁下进行：先重放其他进程已追加的日志，
+    截断崩溃留下的不完整行，再追加本次修改。
+    """
+
+    backend = "jsonl"
+
+    def __init__(self, metadata_dir: str, index_file: Optional[str] = None, compact_min_ops: int = 1000):
+        """
+        Args:
+            metadata_dir: 元数据目录
+            index_file: index.json 路径
+            compact_min_ops: 触发合并的最少日志条数
+        """
+        super().__init__(metadata_dir, index_file)
+        self.log_file = os.path.join(os.path.dirname(self.index_file) or ".", LOG_FILENAME)
+        self.compact_min_ops = compact_min_ops
+        self._snapshot_signature: Any = False
+        self._log_offset = 0
+        self._log_ops = 0
+
+    def compact(self) -> None:
+        with self._lock, _locked_append(self.log_file) as log:
+            self._refresh()
+            self._write_snapshot(log)
+
+    def _refresh(self) -> None:
+        signature = _file_signature(self.index_file)
+        log_size = os.path.getsize(self.log_file) if os.path.exists(self.log_file) else 0
+        if signature != self._snapshot_signature or log_size < self._log_offset:
+            # 快照被替换（其他实例合并过日志），完整重新加载
+            self._load_snapshot()
+            self._snapshot_signature = signature
+            self._log_offset = 0
+            self._log_ops = 0
+        if log_size > self._log_offset:
+            self._replay()
+
+    def _replay(self) -> None:
+        """重放日志中尚未读取的部分"""
+        with open(self.log_file, "rb") as f:
+            f.seek(self._log_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # 不完整的行可能正在被其他进程写入，只由写入方在加锁后截断
+                    break
+                self._log_offset += len(line)
+                try:
+                    self._apply(json.loads(line))
+                    self._log_ops += 1
+                except Exception as e:
+                    self.logger.warning(f"跳过无法解析的索引日志: {str(e)}")
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        op = entry.get("op")
+        if op == "put":
+            record = entry["record"]
+            self._videos[record["bvid"]] = record
+        elif op == "del":
+            self._videos.pop(entry["bvid"], None)
+        if "time" in entry:
+            self._stats["last_updated"] = entry["time"]
+        self._stats["total_videos"] = len(self._videos)
+
+    def _append(self, entries: List[Dict[str, Any]]) -> None:
+        now = int(time.time())
+        entries = [dict(e, time=now) for e in entries]
+        data = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries).encode("utf-8")
+        with _locked_append(self.log_file) as log:
+            # 加锁前其他进程可能追加了日志，重放后按日志顺序重新应用本次修改
+            self._refresh()
+            for entry in entries:
+                self._apply(entry)
+            size = os.fstat(log.fileno()).st_size
+            if size > self._log_offset:
+                # 持有锁时没有其他写入方，剩余的不完整行来自写入中途崩溃
+                self.logger.warning(f"丢弃索引日志末尾的不完整记录: {self.log_file}")
+                os.ftruncate(log.fileno(), self._log_offset)
+            log.write(data)
+            log.flush()
+            os.fsync(log.fileno())
+            self._log_offset += len(data)
+            self._log_ops += len(entries)
+            if self._log_ops >= max(self.compact_min_ops, len(self._videos)):
+                self._write_snapshot(log)
+
+    def _write_upserts(self, records: List[Dict[str, Any]]) -> None:
+        self._append([{"op": "put", "record": r} for r in records])
+
+    def _write_removes(self, bvids: List[str]) -> None:
+        self._append([{"op": "del", "bvid": b} for b in bvids])
+
+    def _write_all(self) -> None:
+        with _locked_append(self.log_file) as log:
+            self._write_snapshot(log)
+
+    def _write_snapshot(self, log: IO[bytes]) -> None:
+        """写入快照并清空日志，调用方需持有日志的文件锁"""
+        # 先写快照再清空日志；两步之间崩溃时重放旧日志也是幂等的
+        _atomic_write_json(self.index_file, self._snapshot())
+        os.ftruncate(log.fileno(), 0)
+        self._snapshot_signature = _file_signature(self.index_file)
+        self._log_offset = 0
+        self._log_ops = 0
+        self.logger.info(f"索引已合并: {self.index_file}")
+
+
+class SqliteIndexStore(IndexStore):
+    """sqlite 数据库（WAL 模式），首次使用时自动导入已有的 index.json"""
+
+    backend = "sqlite"
+
+    def __init__(self, metadata_dir: str, index_file: Optional[str] = None):
+        super().__init__(metadata_dir, index_file)
+        self.db_file = os.path.join(os.path.dirname(self.index_file) or ".", SQLITE_FILENAME)
+        os.makedirs(os.path.dirname(self.db_file) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS videos (bvid TEXT PRIMARY KEY, record TEXT NOT NULL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._db.commit()
+        self._data_version = None
+
+        if self._db.execute("SELECT COUNT(*) FROM meta").fetchone()[0] == 0:
+            # 从 index.json 迁移
+            self._load_snapshot()
+            self._write_all()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _refresh(self) -> None:
+        # data_version 在其他连接提交修改后变化
+        version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        meta = dict(self._db.execute("SELECT key, value FROM meta"))
+        self._metadata = json.loads(meta.get("metadata", "{}"))
+        self._stats = json.loads(meta.get("stats", "{}"))
+        self._videos = {bvid: json.loads(record) for bvid, record in self._db.execute("SELECT bvid, record FROM videos")}
+        self._data_version = version
+
+    def _write_meta(self) -> None:
+        self._db.executemany(
+            "REPLACE INTO meta VALUES (?, ?)",
+            [("metadata", json.dumps(self._metadata, ensure_ascii=False)),
+             ("stats", json.dumps(self._stats, ensure_ascii=False))],
+        )
+
+    def _write_upserts(self, records: List[Dict[str, Any]]) -> None:
+        with self._db:
+            self._db.executemany(
+                "REPLACE INTO videos VALUES (?, ?)",
+                [(r["bvid"], json.dumps(r, ensure_ascii=False)) for r in records],
+            )
+            self._write_meta()
+
+    def _write_removes(self, bvids: List[str]) -> None:
+        with self._db:
+            self._db.executemany("DELETE FROM videos WHERE bvid = ?", [(b,) for b in bvids])
+            self._write_meta()
+
+    def _write_all(self) -> None:
+        with self._db:
+            self._db.execute("DELETE FROM videos")
+            self._db.executemany(
+                "INSERT INTO videos VALUES (?, ?)",
+                [(bvid, json.dumps(r, ensure_ascii=False)) for bvid, r in self._videos.items()],
+            )
+            self._write_meta()
+
+
+BACKENDS = {
+    "json": JsonIndexStore,
+    "jsonl": JsonlIndexStore,
+    "sqlite": SqliteIndexStore,
+}
+
+# 同一进程内同一索引文件共享一个实例，以共享缓存
+_stores: Dict[str, IndexStore] = {}
+_stores_lock = threading.Lock()
+
+
+def detect_backend(metadata_dir: str, index_file: Optional[str] = None) -> str:
+    """
+    根据索引目录中已有的文件判断索引后端
+
+    只有 index.json、没有 index.jsonl 和 index.sqlite3 时为 json 后端，
+    什么都没有时为默认的 jsonl 后端。
+
+    Args:
+        metadata_dir: 元数据目录
+        index_file: index.json 路径，默认为元数据目录下的 index.json
+
+    Returns:
+        str: 后端名称
+    """
+    index_file = index_file or os.path.join(metadata_dir, INDEX_FILENAME)
+    directory = os.path.dirname(index_file) or "."
+    if os.path.exists(os.path.join(directory, SQLITE_FILENAME)):
+        return "sqlite"
+    if os.path.exists(os.path.join(directory, LOG_FILENAME)):
+        return "jsonl"
+    if os.path.exists(index_file):
+        return "json"
+    return "jsonl"
+
+
+def get_index_store(metadata_dir: str, backend: Optional[str] = None,
+                    index_file: Optional[str] = None) -> IndexStore:
+    """
+    获取元数据目录对应的索引存储
+
+    Args:
+        metadata_dir: 元数据目录
+        backend: 后端名称 (json / jsonl / sqlite)，为 None 时沿用已打开的后端或自动判断
+        index_file: index.json 路径，默认为元数据目录下的 index.json
+
+    已打开其他后端时切换为新后端，监听器随之转移到新实例并按新内容重建；
+    旧实例不会被关闭，但之后的修改不再通知监听器。
+
+    Returns:
+        IndexStore: 索引存储
+    """
+    metadata_dir = str(metadata_dir)
+    if backend is not None and backend not in BACKENDS:
+        raise ValueError(f"不支持的索引后端: {backend}")
+    index_file = str(index_file or os.path.join(metadata_dir, INDEX_FILENAME))
+    key = os.path.abspath(index_file)
+
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is not None and (backend is None or store.backend == backend):
+            return store
+        new_store = BACKENDS[backend or detect_backend(metadata_dir, index_file)](metadata_dir, index_file)
+        if store is not None:
+            logging.getLogger("bili_crawler.index_store").warning(
+                f"索引后端由 {store.backend} 切换为 {new_store.backend}: {index_file}")
+            new_store._listeners, store._listeners = store._listeners, []
+            if new_store._listeners:
+                # 新后端的内容可能不同，让监听器按新内容重建
+                new_store._notify("replace", list(new_store.load()["videos"].values()))
+        _stores[key] = new_store
+        return new_store
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+视频元数据分片存储模块
+
+每个视频一个 JSON 文件在数据集变大后会产生大量小文件，本模块将视频信息
+压缩后追加写入分片文件，并用 sqlite 记录每个BV号所在的分片、偏移和长度，
+支持按BV号随机读取。
+
+- 每条记录是一行紧凑的 JSON，单独压缩为一个 zstd 帧或 gzip 成员，
+  因此分片文件本身就是合法的 .jsonl.zst / .jsonl.gz 文件，可以直接用 zstdcat / zcat 查看
+- 未安装 zstandard 时使用标准库 gzip
+- 更新和删除只修改偏移索引，旧数据在分片中失效，失效比例过高的分片在切换分片时自动压缩
+- 偏移索引只在数据写入后提交，写入中途崩溃时未提交的数据会在下次打开时截断
+
+同一目录同一时间只应有一个进程写入。
+"""
+
+import os
+import gzip
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple, BinaryIO
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+SHARDS_DIRNAME = "shards"
+INDEX_DB_FILENAME = "index.sqlite3"
+
+# 压缩格式 -> 分片文件后缀
+CODECS = {
+    "zstd": ".jsonl.zst",
+    "gzip": ".jsonl.gz",
+}
+DEFAULT_LEVELS = {
+    "zstd": 3,
+    "gzip": 6,
+}
+
+DEFAULT_SHARD_SIZE = 64 * 1024 * 1024
+
+# 分片中失效数据超过该比例时压缩
+COMPACT_DEAD_RATIO = 0.5
+
+
+def _encode(video_info: Dict[str, Any]) -> bytes:
+    return json.dumps(video_info, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class MetadataStore:
+    """视频元数据分片存储"""
+
+    def __init__(self, directory: str, codec: str = "zstd", level: Optional[int] = None,
+                 shard_size: int = DEFAULT_SHARD_SIZE, fsync: bool = False):
+        """
+        Args:
+            directory: 分片目录
+            codec: 新写入数据的压缩格式 (zstd / gzip)，未安装 zstandard 时使用 gzip
+            level: 压缩级别，默认 zstd 为 3、gzip 为 6
+            shard_size: 单个分片的最大字节数
+            fsync: 每次写入后是否同步到磁盘
+        """
+        self.logger = logging.getLogger("bili_crawler.metadata_store")
+        if codec not in CODECS:
+            raise ValueError(f"不支持的压缩格式: {codec}")
+        if codec == "zstd" and zstandard is None:
+            self.logger.warning("未安装 zstandard，元数据分片改用 gzip 压缩")
+            codec = "gzip"
+        self.directory = directory
+        self.codec = codec
+        self.level = DEFAULT_LEVELS[codec] if level is None else level
+        self.shard_size = shard_size
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._readers: Dict[int, BinaryIO] = {}
+        self._writer: Optional[BinaryIO] = None
+        self._writer_shard: Optional[int] = None
+        self._compact_pending = False
+        self._compressor = zstandard.ZstdCompressor(level=self.level) if codec == "zstd" else None
+
+        os.makedirs(directory, exist_ok=True)
+        self.db_file = os.path.join(directory, INDEX_DB_FILENAME)
+        self._db = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS records (bvid TEXT PRIMARY KEY, shard INTEGER NOT NULL, "
+                "offset INTEGER NOT NULL, length INTEGER NOT NULL, size INTEGER NOT NULL, saved_at INTEGER NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS shards (id INTEGER PRIMARY KEY, codec TEXT NOT NULL, "
+                "size INTEGER NOT NULL, live INTEGER NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS records_shard ON records(shard, offset)")
+
+    def close(self) -> None:
+        """关闭分片文件和偏移索引"""
+        with self._lock:
+            self._close_writer()
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
+            self._db.close()
+
+    def shard_path(self, shard: int, codec: Optional[str] = None) -> str:
+        """
+        获取分片文件路径
+
+        Args:
+            shard: 分片编号
+            codec: 分片的压缩格式，默认从偏移索引中读取
+
+        Returns:
+            str: 分片文件路径
+        """
+        if codec is None:
+            row = self._db.execute("SELECT codec FROM shards WHERE id = ?", (shard,)).fetchone()
+            codec = row[0] if row else self.codec
+        return os.path.join(self.directory, f"shard-{shard:05d}{CODECS[codec]}")
+
+    def count(self) -> int:
+        """已保存的视频数量"""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def bvids(self) -> List[str]:
+        """已保存的BV号列表"""
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT bvid FROM records")]
+
+    def contains(self, bvid: str) -> bool:
+        """是否已保存指定视频"""
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM records WHERE bvid = ?", (bvid,)).fetchone() is not None
+
+    def stats(self) -> Dict[str, int]:
+        """
+        存储统计
+
+        Returns:
+            Dict[str, int]: 记录数、分片数、分片总字节数、有效字节数和未压缩字节数
+        """
+        with self._lock:
+            records, raw_size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM records").fetchone()
+            shards, size, live = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(live), 0) FROM shards").fetchone()
+        return {"records": records, "shards": shards, "size": size, "live": live, "raw_size": raw_size}
+
+    def save(self, video_info: Dict[str, Any]) -> str:
+        """
+        保存视频信息，已存在时覆盖
+
+        Args:
+            video_info: 视频信息字典
+
+        Returns:
+            str: 所在分片文件路径
+        """
+        return self.save_many([video_info])[0]
+
+    def save_many(self, video_infos: Iterable[Dict[str, Any]]) -> List[str]:
+        """
+        批量保存视频信息，只提交一次偏移索引
+
+        Args:
+            video_infos: 视频信息列表
+
+        Returns:
+            List[str]: 每条记录所在的分片文件路径
+        """
+        with self._lock:
+            rows = []
+            for video_info in video_infos:
+                bvid = video_info.get("basic_info", {}).get("bvid")
+                if not bvid:
+                    raise ValueError("视频信息缺少BV号")
+                data = _encode(video_info)
+                shard, offset, length = self._append(self._compress(data))
+                rows.append((bvid, shard, offset, length, len(data)))
+            self._commit(rows)
+            paths = [self.shard_path(row[1], self.codec) for row in rows]
+            # 切换分片后检查旧分片是否需要压缩
+            if self._compact_pending:
+                self._compact_pending = False
+                self.compact()
+            return paths
+
+    def load(self, bvid: str) -> Optional[Dict[str, Any]]:
+        """
+        按BV号读取视频信息
+
+        Args:
+            bvid: 视频BV号
+
+        Returns:
+            Optional[Dict[str, Any]]: 视频信息，不存在时返回None
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT r.shard, r.offset, r.length, s.codec FROM records r JOIN shards s ON s.id = r.shard "
+                "WHERE r.bvid = ?", (bvid,)).fetchone()
+            if row is None:
+                return None
+            frame = self._read(*row[:3])
+        return json.loads(self._decompress(frame, row[3]))
+
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        """
+        按分片顺序读取所有视频信息
+
+        Returns:
+            Iterator[Dict[str, Any]]: 视频信息
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT r.shard, r.offset, r.length, s.codec FROM records r JOIN shards s ON s.id = r.shard "
+                "ORDER BY r.shard, r.offset").fetchall()
+        for shard, offset, length, codec in rows:
+            with self._lock:
+                try:
+                    frame = self._read(shard, offset, length)
+                except (OSError, ValueError) as e:
+                    # 迭代期间分片被压缩
+                    self.logger.debug(f"分片 {shard} 已变化，跳过: {str(e)}")
+                    continue
+            yield json.loads(self._decompress(frame, codec))
+
+    def remove(self, bvids: Iterable[str]) -> int:
+        """
+        删除视频信息
+
+        Args:
+            bvids: BV号列表
+
+        Returns:
+            int: 删除的记录数
+        """
+        count = 0
+        with self._lock, self._db:
+            for bvid in bvids:
+                row = self._db.execute("SELECT shard, length FROM records WHERE bvid = ?", (bvid,)).fetchone()
+                if row:
+                    self._db.execute("UPDATE shards SET live = live - ? WHERE id = ?", (row[1], row[0]))
+                    self._db.execute("DELETE FROM records WHERE bvid = ?", (bvid,))
+                    count += 1
+        return count
+
+    def compact(self, dead_ratio: float = COMPACT_DEAD_RATIO) -> int:
+        """
+        将失效数据比例超过阈值的分片中的有效记录复制到当前分片，并删除旧分片
+
+        Args:
+            dead_ratio: 失效数据比例阈值
+
+        Returns:
+            int: 释放的字节数
+        """
+        freed = 0
+        with self._lock:
+            candidates = self._db.execute(
+                "SELECT id, size, live FROM shards WHERE size > 0 AND (size - live) >= size * ?",
+                (dead_ratio,)).fetchall()
+            for shard, size, live in candidates:
+                if shard == self._writer_shard:
+                    continue
+                records = self._db.execute(
+                    "SELECT bvid, offset, length, size FROM records WHERE shard = ? ORDER BY offset",
+                    (shard,)).fetchall()
+                codec = self._shard_codec(shard)
+                rows = []
+                for bvid, offset, length, raw_size in records:
+                    frame = self._read(shard, offset, length)
+                    if codec != self.codec:
+                        frame = self._compress(self._decompress(frame, codec))
+                    new_shard, new_offset, new_length = self._append(frame)
+                    rows.append((bvid, new_shard, new_offset, new_length, raw_size))
+                self._commit(rows)
+                path = self.shard_path(shard, codec)
+                reader = self._readers.pop(shard, None)
+                if reader is not None:
+                    reader.close()
+                with self._db:
+                    self._db.execute("DELETE FROM shards WHERE id = ?", (shard,))
+                if os.path.exists(path):
+                    os.remove(path)
+                freed += size - live
+                self.logger.info(f"已压缩元数据分片 {os.path.basename(path)}，释放 {(size - live) / 1024 / 1024:.1f}MB")
+        return freed
+
+    def _shard_codec(self, shard: int) -> str:
+        row = self._db.execute("SELECT codec FROM shards WHERE id = ?", (shard,)).fetchone()
+        return row[0] if row else self.codec
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            return self._compressor.compress(data)
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def _decompress(self, frame: bytes, codec: str) -> bytes:
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("读取 zstd 分片需要安装 zstandard")
+            return zstandard.ZstdDecompressor().decompress(frame)
+        return gzip.decompress(frame)
+
+    def _read(self, shard: int, offset: int, length: int) -> bytes:
+        reader = self._readers.get(shard)
+        if reader is None:
+            reader = open(self.shard_path(shard), "rb")
+            self._readers[shard] = reader
+        reader.seek(offset)
+        frame = reader.read(length)
+        if len(frame) != length:
+            raise ValueError(f"分片 {shard} 在偏移 {offset} 处数据不完整")
+        return frame
+
+    def _open_writer(self) -> None:
+        """打开最后一个分片继续写入，截断上次崩溃时未提交的数据；已满或格式不同时新建分片"""
+        row = self._db.execute("SELECT id, codec, size FROM shards ORDER BY id DESC LIMIT 1").fetchone()
+        if row and row[1] == self.codec and row[2] < self.shard_size:
+            shard, size = row[0], row[2]
+            path = self.shard_path(shard, self.codec)
+            mode = "r+b" if os.path.exists(path) else "w+b"
+            self._writer = open(path, mode)
+            self._writer.truncate(size)
+            self._writer.seek(size)
+        else:
+            shard = (row[0] + 1) if row else 0
+            with self._db:
+                self._db.execute("INSERT INTO shards (id, codec, size, live) VALUES (?, ?, 0, 0)", (shard, self.codec))
+            self._writer = open(self.shard_path(shard, self.codec), "wb")
+        self._writer_shard = shard
+
+    def _close_writer(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._writer_shard = None
+
+    def _append(self, frame: bytes) -> Tuple[int, int, int]:
+        """追加写入一帧，返回 (分片编号, 偏移, 长度)"""
+        if self._writer is None:
+            self._open_writer()
+        offset = self._writer.tell()
+        if offset > 0 and offset + len(frame) > self.shard_size:
+            # 当前分片已满，记录其大小后新建分片
+            self._writer.flush()
+            with self._db:
+                self._db.execute("UPDATE shards SET size = ? WHERE id = ?", (offset, self._writer_shard))
+                self._db.execute("INSERT INTO shards (id, codec, size, live) VALUES (?, ?, 0, 0)",
+                                 (self._writer_shard + 1, self.codec))
+            self._close_writer()
+            self._open_writer()
+            offset = 0
+            self._compact_pending = True
+        self._writer.write(frame)
+        return self._writer_shard, offset, len(frame)
+
+    def _commit(self, rows: List[Tuple[str, int, int, int, int]]) -> None:
+        """数据写入后提交偏移索引"""
+        if not rows:
+            return
+        self._writer.flush()
+        if self.fsync:
+            os.fsync(self._writer.fileno())
+        now = int(time.time())
+        with self._db:
+            for bvid, shard, offset, length, size in rows:
+                old = self._db.execute("SELECT shard, length FROM records WHERE bvid = ?", (bvid,)).fetchone()
+                if old:
+                    self._db.execute("UPDATE shards SET live = live - ? WHERE id = ?", (old[1], old[0]))
+                self._db.execute("REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?)",
+                                 (bvid, shard, offset, length, size, now))
+                self._db.execute("UPDATE shards SET live = live + ? WHERE id = ?", (length, shard))
+            self._db.execute("UPDATE shards SET size = ? WHERE id = ?", (self._writer.tell(), self._writer_shard))
+
+
+# 同一进程内同一目录共享一个存储
+_stores: Dict[str, MetadataStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_metadata_store(metadata_dir: str, codec: str = "zstd", level: Optional[int] = None,
+                       shard_size: int = DEFAULT_SHARD_SIZE) -> MetadataStore:
+    """
+    获取元数据目录对应的分片存储，分片保存在元数据目录下的 shards/ 中
+
+    Args:
+        metadata_dir: 元数据目录
+        codec: 新写入数据的压缩格式 (zstd / gzip)
+        level: 压缩级别
+        shard_size: 单个分片的最大字节数
+
+    Returns:
+        MetadataStore: 分片存储
+    """
+    key = os.path.abspath(os.path.join(str(metadata_dir), SHARDS_DIRNAME))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = MetadataStore(key, codec, level, shard_size)
+            _stores[key] = store
+        return store
+
+
+def find_metadata_store(metadata_dir: str, codec: str = "zstd", level: Optional[int] = None,
+                        shard_size: int = DEFAULT_SHARD_SIZE) -> Optional[MetadataStore]:
+    """
+    获取元数据目录中已有的分片存储，不存在时返回None，不会创建分片目录
+
+    Args:
+        metadata_dir: 元数据目录
+        codec: 新写入数据的压缩格式 (zstd / gzip)
+        level: 压缩级别
+        shard_size: 单个分片的最大字节数
+
+    Returns:
+        Optional[MetadataStore]: 分片存储
+    """
+    key = os.path.abspath(os.path.join(str(metadata_dir), SHARDS_DIRNAME))
+    with _stores_lock:
+        store = _stores.get(key)
+    if store is None and os.path.exists(os.path.join(key, INDEX_DB_FILENAME)):
+        store = get_metadata_store(metadata_dir, codec, level, shard_size)
+    return store
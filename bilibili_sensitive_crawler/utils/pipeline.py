@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流水线采集模块
+
+将搜索、信息爬取、视频下载和数据集写入拆分为四个阶段，
+阶段之间通过有界队列连接，每个阶段有独立的并发数、背压和进度计数，
+使网络、磁盘和CPU工作相互重叠，且内存占用不随视频总数增长。
+
+    搜索 → 信息爬取 → 视频下载 → 数据集写入
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, List, Any, Optional, Callable, Awaitable
+
+from .search import BiliSearch
+from .crawler import BiliCrawler
+from .downloader import BiliDownloader
+from .dataset import DatasetManager
+
+
+# 队列结束标记
+_STOP = object()
+
+
+class StageStats:
+    """单个阶段的进度计数"""
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: 阶段名称
+        """
+        self.name = name
+        self.received = 0  # 已接收
+        self.done = 0  # 已完成
+        self.skipped = 0  # 已跳过
+        self.failed = 0  # 失败
+        self.active = 0  # 正在处理
+
+    def to_dict(self) -> Dict[str, int]:
+        """转换为字典"""
+        return {
+            "received": self.received,
+            "done": self.done,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "active": self.active,
+        }
+
+    def __str__(self) -> str:
+        return (f"{self.name}: 完成 {self.done}, 跳过 {self.skipped}, "
+                f"失败 {self.failed}, 处理中 {self.active}")
+
+
+class CrawlPipeline:
+    """搜索 → 爬取 → 下载 → 入库 流水线"""
+
+    def __init__(self, search_manager: BiliSearch, crawler: BiliCrawler,
+                 downloader: Optional[BiliDownloader], dataset_manager: DatasetManager,
+                 config: Optional[Dict[str, Any]] = None):
+        """
+        初始化流水线
+
+        Args:
+            search_manager: 搜索器
+            crawler: 视频信息爬取器
+            downloader: 下载器，为None时只采集元数据
+            dataset_manager: 数据集管理器
+            config: 流水线配置，如果不提供则使用默认配置
+        """
+        self.search_manager = search_manager
+        self.crawler = crawler
+        self.downloader = downloader
+        self.dataset_manager = dataset_manager
+        self.logger = logging.getLogger("bili_crawler.pipeline")
+
+        # 默认配置
+        self.config = {
+            "queue_size": 100,  # 阶段之间队列的容量
+            "metadata_workers": 2,  # 信息爬取并发数
+            "download_workers": 3,  # 下载并发数
+            "request_interval": 1.0,  # 每个爬取任务完成后的等待时间(秒)
+            "progress_interval": 30,  # 进度日志间隔(秒)，0表示不输出
+            "limit_per_keyword": 100,  # 每个关键词的视频数量限制
+            "max_videos": 1000,  # 数据集最大视频数量
+            "max_duration": None,  # 最大视频时长(秒)，超过则跳过
+        }
+
+        # 更新配置
+        if config and isinstance(config, dict):
+            for key, value in config.items():
+                if key in self.config:
+                    self.config[key] = value
+
+        self.stats = {
+            name: StageStats(name)
+            for name in ("search", "metadata", "download", "index")
+        }
+        self._seen = set()
+        self._stop_event: Optional[asyncio.Event] = None
+        self._admitted = 0
+
+    async def run(self, keywords: List[str]) -> Dict[str, Any]:
+        """
+        运行流水线
+
+        Args:
+            keywords: 搜索关键词列表
+
+        Returns:
+            Dict[str, Any]: 各阶段的进度统计
+        """
+        self._stop_event = asyncio.Event()
+        self._admitted = self.dataset_manager.count_videos()
+        if self._admitted >= self.config["max_videos"]:
+            self.logger.info(f"已达到最大视频数量限制: {self.config['max_videos']}")
+            return self.get_stats()
+
+        size = self.config["queue_size"]
+        metadata_queue: asyncio.Queue = asyncio.Queue(maxsize=size)
+        download_queue: asyncio.Queue = asyncio.Queue(maxsize=size)
+        index_queue: asyncio.Queue = asyncio.Queue(maxsize=size)
+
+        # 不下载时信息爬取阶段直接连接入库阶段
+        after_metadata = download_queue if self.downloader else index_queue
+
+        stages = [
+            self._run_stage(1, lambda: self._search(keywords, metadata_queue), [metadata_queue],
+                            self.config["metadata_workers"]),
+            self._run_stage(self.config["metadata_workers"],
+                            lambda: self._worker(metadata_queue, after_metadata, self._fetch_metadata, "metadata"),
+                            [after_metadata], self.config["download_workers"] if self.downloader else 1),
+            self._run_stage(1, lambda: self._worker(index_queue, None, self._write_index, "index"),
+                            [], 0),
+        ]
+        if self.downloader:
+            stages.append(self._run_stage(
+                self.config["download_workers"],
+                lambda: self._worker(download_queue, index_queue, self._download, "download"),
+                [index_queue], 1,
+            ))
+
+        reporter = asyncio.create_task(self._report_progress())
+        try:
+            await asyncio.gather(*stages)
+        finally:
+            reporter.cancel()
+
+        self.logger.info("流水线完成 - " + "; ".join(str(s) for s in self.stats.values()))
+        return self.get_stats()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取各阶段的进度统计
+
+        Returns:
+            Dict[str, Any]: 阶段名称 -> 计数
+        """
+        return {name: stage.to_dict() for name, stage in self.stats.items()}
+
+    async def _run_stage(self, workers: int, factory: Callable[[], Awaitable[None]],
+                         outboxes: List[asyncio.Queue],
+                         downstream_workers: int) -> None:
+        """
+        运行一个阶段的所有工作协程，全部结束后向下游发送结束标记
+
+        Args:
+            workers: 工作协程数量
+            factory: 创建工作协程的函数
+            outboxes: 下游队列
+            downstream_workers: 下游阶段的工作协程数量
+        """
+        try:
+            await asyncio.gather(*(factory() for _ in range(max(1, workers))))
+        finally:
+            for outbox in outboxes:
+                for _ in range(max(1, downstream_workers)):
+                    await outbox.put(_STOP)
+
+    async def _search(self, keywords: List[str], outbox: asyncio.Queue) -> None:
+        """搜索阶段：按关键词搜索并将结果放入爬取队列"""
+        stats = self.stats["search"]
+        limit = self.config["limit_per_keyword"]
+        for keyword in keywords:
+            if self._stop_event.is_set():
+                break
+            stats.received += 1
+            stats.active += 1
+            try:
+                self.logger.info(f"正在搜索关键词: {keyword}")
+                results = await self.search_manager.search_videos(keyword, limit=limit)
+                stats.done += 1
+            except Exception as e:
+                self.logger.error(f"搜索关键词失败 {keyword}: {str(e)}")
+                stats.failed += 1
+                continue
+            finally:
+                stats.active -= 1
+
+            self.logger.info(f"关键词 {keyword} 找到 {len(results)} 个视频")
+            for item in results[:limit]:
+                if self._stop_event.is_set():
+                    break
+                await outbox.put(item)
+
+    async def _worker(self, inbox: asyncio.Queue, outbox: Optional[asyncio.Queue],
+                      handler: Callable[[Any], Awaitable[Any]], stage: str) -> None:
+        """
+        通用工作协程：从输入队列取出任务处理后放入下游队列
+
+        handler 返回 None 表示跳过该任务，返回的字典中含 error 时计为失败但仍交给下游。
+        已达到数量上限后信息爬取阶段只消费不处理，已占用名额的任务继续完成下载和入库。
+        """
+        stats = self.stats[stage]
+        while True:
+            item = await inbox.get()
+            if item is _STOP:
+                return
+            stats.received += 1
+            if self._stop_event.is_set() and stage == "metadata":
+                stats.skipped += 1
+                continue
+            stats.active += 1
+            try:
+                result = await handler(item)
+            except Exception as e:
+                stats.failed += 1
+                self.logger.error(f"[{stage}] 处理失败: {str(e)}")
+                continue
+            finally:
+                stats.active -= 1
+            if result is None:
+                stats.skipped += 1
+                continue
+            if result.get("error"):
+                # 失败但仍需交给下游（如下载失败时保留元数据）
+                stats.failed += 1
+            else:
+                stats.done += 1
+            if outbox is not None:
+                await outbox.put(result)
+
+    async def _fetch_metadata(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """信息爬取阶段：获取视频信息并按时长过滤"""
+        bvid = item.get("bvid")
+
+        # 检查BV号是否有效
+        if not bvid or not bvid.startswith('BV') or len(bvid) != 12:
+            self.logger.warning(f"无效的BV号，跳过: '{bvid}'")
+            return None
+
+        # 同一次运行中不同关键词可能搜到同一视频
+        if bvid in self._seen or self.dataset_manager.has_video(bvid):
+            self.logger.info(f"视频已存在于数据集中: {bvid}")
+            return None
+        self._seen.add(bvid)
+
+        try:
+            self.logger.info(f"正在爬取视频信息: {bvid}")
+            video_info = await self.crawler.get_video_info(bvid)
+            video_info["search_info"] = item.get("search_info")
+
+            # 检查视频时长（在下载前过滤）
+            video_duration = video_info.get('basic_info', {}).get('duration', 0)
+            max_duration = self.config["max_duration"]
+            if max_duration and video_duration > max_duration:
+                self.logger.info(f"视频时长 {video_duration}秒 超过限制 {max_duration}秒，完全跳过: {bvid}")
+                return None
+
+            # 在交给下游前占用数据集名额，保证最终数量不超过上限
+            if self._admitted >= self.config["max_videos"]:
+                return None
+            self._admitted += 1
+            if self._admitted >= self.config["max_videos"]:
+                self.logger.info(f"已达到最大视频数量限制: {self.config['max_videos']}")
+                self._stop_event.set()
+
+            return {"bvid": bvid, "video_info": video_info}
+        finally:
+            # 增加延迟，避免请求过快
+            await asyncio.sleep(self.config["request_interval"])
+
+    async def _download(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """下载阶段：下载视频，失败时仍保留元数据"""
+        bvid = item["bvid"]
+        try:
+            save_path, file_size = await self.downloader.download_video(bvid)
+            self.logger.info(f"视频下载成功: {save_path}, 大小: {file_size/1024/1024:.2f}MB")
+            item["video_path"] = save_path
+        except Exception as e:
+            self.logger.error(f"视频下载失败 {bvid}: {str(e)}")
+            item["error"] = str(e)
+        return item
+
+    async def _write_index(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """入库阶段：保存元数据（含下载结果）并更新索引"""
+        video_info = item["video_info"]
+        video_path = item.get("video_path")
+        if video_path:
+            video_info["video_path"] = video_path
+            video_info["has_video_file"] = True
+            video_info["video_file_size"] = os.path.getsize(video_path) if os.path.exists(video_path) else 0
+
+        # 写文件与索引放到线程中执行，不阻塞其他阶段
+        loop = asyncio.get_event_loop()
+        metadata_file = await loop.run_in_executor(None, self.dataset_manager.save_metadata, video_info)
+        self.logger.info(f"视频元数据已保存: {metadata_file}")
+        return {"bvid": item["bvid"], "metadata_file": metadata_file}
+
+    async def _report_progress(self) -> None:
+        """定期输出各阶段进度"""
+        interval = self.config["progress_interval"]
+        if not interval:
+            return
+        start = time.time()
+        while True:
+            await asyncio.sleep(interval)
+            self.logger.info(f"[{int(time.time() - start)}s] " + "; ".join(str(s) for s in self.stats.values()))
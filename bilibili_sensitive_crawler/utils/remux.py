@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DASH 音视频封装模块
+
+B站 DASH 流的视频和音频分别是只含一条轨道的分片 MP4（m4s）：
+ftyp + moov（含 mvex/trex）+ 若干 moof/mdat 分片。
+本模块将两者无损地封装为一个含两条轨道的分片 MP4，不重新编码、不依赖FFmpeg：
+
+- 合并两个 moov，视频为轨道1、音频为轨道2
+- 依次复制 moof/mdat，改写 tfhd 中的轨道号和 mfhd 中的序号
+- 结束时根据分片中的样本时长回填 mvhd / mehd 中的总时长
+
+DashRemuxer 以追加读取的方式跟随两个正在下载的临时文件，
+可以在下载过程中反复调用 pump()，下载完成后调用 finish() 得到最终文件。
+"""
+
+import os
+import struct
+import threading
+from typing import List, Tuple, Optional, BinaryIO
+
+
+# 复制 mdat 时每次读取的大小
+_COPY_CHUNK = 1024 * 1024
+
+# 单位矩阵
+_UNITY_MATRIX = struct.pack(">9I", 0x00010000, 0, 0, 0, 0x00010000, 0, 0, 0, 0x40000000)
+
+# 文件开头允许出现的 box
+_LEADING_BOXES = (b"ftyp", b"styp", b"moov", b"free", b"skip")
+
+
+class RemuxError(Exception):
+    """无法直接封装（输入不是分片 MP4、结构不支持或文件不完整）"""
+
+
+def _box(kind: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def _children(data: bytes, start: int, end: int) -> List[Tuple[bytes, int, int, int]]:
+    """
+    解析 [start, end) 范围内的子 box
+
+    Returns:
+        [(类型, box起始位置, 内容起始位置, box结束位置)]
+    """
+    boxes = []
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", data, pos)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            raise RemuxError(f"box 结构错误: {kind!r}")
+        boxes.append((kind, pos, pos + header, pos + size))
+        pos += size
+    return boxes
+
+
+def _find(data: bytes, path: List[bytes], start: int, end: int) -> Optional[Tuple[int, int, int]]:
+    """按路径查找 box，返回 (box起始位置, 内容起始位置, box结束位置)"""
+    for kind, box_start, payload, box_end in _children(data, start, end):
+        if kind == path[0]:
+            if len(path) == 1:
+                return box_start, payload, box_end
+            return _find(data, path[1:], payload, box_end)
+    return None
+
+
+class _Track:
+    """单个输入文件（一条轨道）的读取状态"""
+
+    def __init__(self, path: str, track_id: int, handler: bytes):
+        self.path = path
+        self.track_id = track_id  # 输出中的轨道号
+        self.handler = handler  # 轨道类型: vide / soun
+        self.file: Optional[BinaryIO] = None
+        self.pos = 0  # 已处理到的位置
+        self.ftyp: Optional[bytes] = None
+        self.trak: Optional[bytearray] = None
+        self.trex: Optional[bytearray] = None
+        self.source_track_id = 0
+        self.movie_timescale = 0  # 输入 mvhd 的时间刻度
+        self.timescale = 0  # 轨道 mdhd 的时间刻度
+        self.movie_fields: List[Tuple[int, int]] = []  # trak 中以 mvhd 时间刻度计的字段 (偏移, 宽度)
+        self.default_duration = 0  # trex 中的默认样本时长
+        self.end_time = 0  # 已写入分片的结束时间（轨道时间刻度）
+
+    @property
+    def ready(self) -> bool:
+        return self.trak is not None
+
+    def size(self) -> int:
+        return os.fstat(self.file.fileno()).st_size
+
+    def read(self, pos: int, size: int) -> bytes:
+        self.file.seek(pos)
+        return self.file.read(size)
+
+    def header(self, pos: int, available: int) -> Optional[Tuple[bytes, int]]:
+        """读取 pos 处的 box 头，返回 (类型, box大小)，数据不足时返回 None"""
+        if pos + 8 > available:
+            return None
+        size, kind = struct.unpack(">I4s", self.read(pos, 8))
+        if size == 1:
+            if pos + 16 > available:
+                return None
+            size = struct.unpack(">Q", self.read(pos + 8, 8))[0]
+        elif size == 0:
+            raise RemuxError(f"不支持延伸到文件末尾的 box: {kind!r}")
+        if size < 8:
+            raise RemuxError(f"box 大小错误: {kind!r}")
+        return kind, size
+
+
+class DashRemuxer:
+    """将 DASH 的视频和音频分片 MP4 无损封装为一个分片 MP4"""
+
+    def __init__(self, video_path: str, audio_path: str, output_path: str):
+        """
+        Args:
+            video_path: 视频流文件路径（可以仍在下载中）
+            audio_path: 音频流文件路径（可以仍在下载中）
+            output_path: 输出文件路径，封装过程中写入 output_path + ".mux.temp"
+        """
+        self.output_path = output_path
+        self.temp_path = f"{output_path}.mux.temp"
+        self._tracks = [_Track(video_path, 1, b"vide"), _Track(audio_path, 2, b"soun")]
+        self._out: Optional[BinaryIO] = None
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._timescale = 0
+        self._duration_fields: List[Tuple[int, int]] = []  # 输出中需回填总时长的 (位置, 宽度)
+        self.error: Optional[RemuxError] = None
+
+    def pump(self) -> None:
+        """处理两个输入文件中已经完整的部分"""
+        with self._lock:
+            self._run(self._pump)
+
+    def finish(self) -> int:
+        """
+        处理剩余数据，回填时长并生成最终文件（输入文件必须已下载完成）
+
+        Returns:
+            int: 输出文件大小
+
+        Raises:
+            RemuxError: 无法封装
+        """
+        with self._lock:
+            self._run(self._finish)
+            return os.path.getsize(self.output_path)
+
+    def abort(self) -> None:
+        """放弃封装并删除临时输出"""
+        with self._lock:
+            if self.error is None:
+                self.error = RemuxError("封装已取消")
+            self._close()
+            if os.path.exists(self.temp_path):
+                os.remove(self.temp_path)
+
+    def _run(self, func) -> None:
+        if self.error is not None:
+            raise self.error
+        try:
+            func()
+        except (RemuxError, OSError, struct.error) as e:
+            self.error = e if isinstance(e, RemuxError) else RemuxError(str(e))
+            self._close()
+            if os.path.exists(self.temp_path):
+                os.remove(self.temp_path)
+            raise self.error from e
+
+    def _close(self) -> None:
+        for track in self._tracks:
+            if track.file:
+                track.file.close()
+                track.file = None
+        if self._out:
+            self._out.close()
+            self._out = None
+
+    def _pump(self) -> None:
+        for track in self._tracks:
+            if track.file is None:
+                if not os.path.exists(track.path):
+                    continue
+                track.file = open(track.path, "rb")
+            if not track.ready:
+                self._read_init(track)
+        if not all(track.ready for track in self._tracks):
+            return
+        if self._out is None:
+            self._write_header()
+        for track in self._tracks:
+            self._copy_fragments(track)
+
+    def _finish(self) -> None:
+        self._pump()
+        for track in self._tracks:
+            if not track.ready:
+                raise RemuxError(f"未找到初始化信息: {track.path}")
+            if track.pos != track.size():
+                raise RemuxError(f"文件不完整: {track.path}")
+
+        duration = max(track.end_time * self._timescale // track.timescale for track in self._tracks)
+        for pos, width in self._duration_fields:
+            self._out.seek(pos)
+            self._out.write(duration.to_bytes(width, "big"))
+        self._out.flush()
+        os.fsync(self._out.fileno())
+        self._close()
+        os.replace(self.temp_path, self.output_path)
+
+    def _read_init(self, track: _Track) -> None:
+        """读取 ftyp 和 moov"""
+        available = track.size()
+        while True:
+            header = track.header(track.pos, available)
+            if header is None:
+                return
+            kind, size = header
+            if track.pos == 0 and kind not in _LEADING_BOXES:
+                raise RemuxError(f"不是分片 MP4 文件: {track.path}")
+            if kind in (b"moof", b"mdat"):
+                raise RemuxError(f"moov 之前出现媒体数据: {track.path}")
+            if track.pos + size > available:
+                return
+            if kind == b"ftyp":
+                track.ftyp = track.read(track.pos, size)
+            elif kind == b"moov":
+                self._parse_moov(track, bytearray(track.read(track.pos, size)))
+            track.pos += size
+            if track.ready:
+                return
+
+    def _parse_moov(self, track: _Track, moov: bytearray) -> None:
+        """从输入的 moov 中取出轨道信息，并改写轨道号"""
+        payload = 16 if struct.unpack_from(">I", moov)[0] == 1 else 8
+        boxes = _children(moov, payload, len(moov))
+
+        mvhd = _find(moov, [b"mvhd"], payload, len(moov))
+        if mvhd is None:
+            raise RemuxError("缺少 mvhd")
+        version = moov[mvhd[1]]
+        track.movie_timescale = struct.unpack_from(">I", moov, mvhd[1] + (20 if version == 1 else 12))[0]
+
+        traks = [(start, end) for kind, start, _, end in boxes if kind == b"trak"]
+        if len(traks) != 1:
+            raise RemuxError(f"输入应只包含一条轨道，实际为 {len(traks)} 条")
+        trak = bytearray(moov[traks[0][0]:traks[0][1]])
+        hdlr = _find(trak, [b"mdia", b"hdlr"], 8, len(trak))
+        if hdlr is None or bytes(trak[hdlr[1] + 8:hdlr[1] + 12]) != track.handler:
+            raise RemuxError(f"轨道类型不是 {track.handler.decode()}: {track.path}")
+
+        # tkhd: 轨道号和以 mvhd 时间刻度计的时长
+        tkhd = _find(trak, [b"tkhd"], 8, len(trak))
+        if tkhd is None:
+            raise RemuxError("缺少 tkhd")
+        version = trak[tkhd[1]]
+        id_offset = tkhd[1] + (20 if version == 1 else 12)
+        track.source_track_id = struct.unpack_from(">I", trak, id_offset)[0]
+        struct.pack_into(">I", trak, id_offset, track.track_id)
+        track.movie_fields = [(id_offset + 8, 8 if version == 1 else 4)]
+
+        # elst: 编辑段时长同样以 mvhd 时间刻度计
+        elst = _find(trak, [b"edts", b"elst"], 8, len(trak))
+        if elst is not None:
+            version = trak[elst[1]]
+            count = struct.unpack_from(">I", trak, elst[1] + 4)[0]
+            width = 8 if version == 1 else 4
+            for i in range(count):
+                track.movie_fields.append((elst[1] + 8 + i * (width * 2 + 4), width))
+
+        mdhd = _find(trak, [b"mdia", b"mdhd"], 8, len(trak))
+        if mdhd is None:
+            raise RemuxError("缺少 mdhd")
+        version = trak[mdhd[1]]
+        track.timescale = struct.unpack_from(">I", trak, mdhd[1] + (20 if version == 1 else 12))[0]
+
+        mvex = _find(moov, [b"mvex"], payload, len(moov))
+        if mvex is None:
+            raise RemuxError("不是分片 MP4（缺少 mvex）")
+        for kind, start, body, end in _children(moov, mvex[1], mvex[2]):
+            if kind == b"trex" and struct.unpack_from(">I", moov, body + 4)[0] == track.source_track_id:
+                trex = bytearray(moov[start:end])
+                struct.pack_into(">I", trex, 12, track.track_id)
+                track.default_duration = struct.unpack_from(">I", trex, 20)[0]
+                track.trex = trex
+        if track.trex is None or not track.timescale:
+            raise RemuxError("缺少 trex 或时间刻度")
+        track.trak = trak
+
+    def _write_header(self) -> None:
+        """写入 ftyp 和合并后的 moov，总时长稍后回填"""
+        video = self._tracks[0]
+        self._timescale = video.movie_timescale or 1000
+
+        traks = []
+        for track in self._tracks:
+            if track.movie_timescale and track.movie_timescale != self._timescale:
+                for offset, width in track.movie_fields:
+                    value = int.from_bytes(track.trak[offset:offset + width], "big")
+                    if value != (1 << width * 8) - 1:
+                        value = value * self._timescale // track.movie_timescale
+                        track.trak[offset:offset + width] = value.to_bytes(width, "big")
+            traks.append(bytes(track.trak))
+
+        mvhd = _box(b"mvhd", b"\x01\x00\x00\x00" + struct.pack(">QQIQIH", 0, 0, self._timescale, 0, 0x00010000, 0x0100)
+                    + bytes(10) + _UNITY_MATRIX + bytes(24) + struct.pack(">I", len(self._tracks) + 1))
+        mehd = _box(b"mehd", b"\x01\x00\x00\x00" + bytes(8))
+        mvex = _box(b"mvex", mehd + b"".join(bytes(track.trex) for track in self._tracks))
+        moov = _box(b"moov", mvhd + b"".join(traks) + mvex)
+        ftyp = video.ftyp or _box(b"ftyp", b"isom" + struct.pack(">I", 512) + b"isomiso6mp41")
+
+        moov_start = len(ftyp)
+        mehd_start = moov_start + 8 + len(mvhd) + sum(map(len, traks)) + 8
+        self._duration_fields = [(moov_start + 8 + 32, 8), (mehd_start + 12, 8)]
+
+        self._out = open(self.temp_path, "wb")
+        self._out.write(ftyp + moov)
+
+    def _copy_fragments(self, track: _Track) -> None:
+        """复制已完整下载的 moof/mdat"""
+        available = track.size()
+        while True:
+            header = track.header(track.pos, available)
+            if header is None:
+                return
+            kind, size = header
+            if track.pos + size > available:
+                return
+            if kind == b"mdat":
+                raise RemuxError("mdat 之前缺少 moof")
+            if kind != b"moof":
+                # sidx / styp / free 等，sidx 中的字节偏移在新文件中无效，直接丢弃
+                track.pos += size
+                continue
+
+            mdat = track.header(track.pos + size, available)
+            if mdat is None:
+                return
+            if mdat[0] != b"mdat":
+                raise RemuxError("moof 之后不是 mdat")
+            if track.pos + size + mdat[1] > available:
+                return
+
+            moof = bytearray(track.read(track.pos, size))
+            self._patch_moof(track, moof, self._out.tell() - track.pos)
+            self._out.write(moof)
+
+            remaining = mdat[1]
+            track.file.seek(track.pos + size)
+            while remaining > 0:
+                chunk = track.file.read(min(_COPY_CHUNK, remaining))
+                if not chunk:
+                    raise RemuxError(f"读取 mdat 失败: {track.path}")
+                self._out.write(chunk)
+                remaining -= len(chunk)
+            track.pos += size + mdat[1]
+
+    def _patch_moof(self, track: _Track, moof: bytearray, delta: int) -> None:
+        """
+        改写 moof 的序号、轨道号和绝对数据偏移，并累计轨道时长
+
+        Args:
+            track: 所属轨道
+            moof: moof 内容（原地修改）
+            delta: 输出位置与输入位置之差
+        """
+        payload = 16 if struct.unpack_from(">I", moof)[0] == 1 else 8
+        for kind, _, body, end in _children(moof, payload, len(moof)):
+            if kind == b"mfhd":
+                self._sequence += 1
+                struct.pack_into(">I", moof, body + 4, self._sequence)
+            elif kind == b"traf":
+                self._patch_traf(track, moof, body, end, delta)
+
+    def _patch_traf(self, track: _Track, moof: bytearray, start: int, end: int, delta: int) -> None:
+        default_duration = track.default_duration
+        decode_time = track.end_time
+        duration = 0
+        for kind, _, body, _ in _children(moof, start, end):
+            flags = int.from_bytes(moof[body + 1:body + 4], "big")
+            if kind == b"tfhd":
+                if struct.unpack_from(">I", moof, body + 4)[0] != track.source_track_id:
+                    raise RemuxError("分片中的轨道号与 moov 不一致")
+                struct.pack_into(">I", moof, body + 4, track.track_id)
+                pos = body + 8
+                if flags & 0x000001:  # base-data-offset-present: 绝对偏移需要随位置调整
+                    base = struct.unpack_from(">Q", moof, pos)[0]
+                    struct.pack_into(">Q", moof, pos, base + delta)
+                    pos += 8
+                if flags & 0x000002:
+                    pos += 4
+                if flags & 0x000008:
+                    default_duration = struct.unpack_from(">I", moof, pos)[0]
+            elif kind == b"tfdt":
+                if moof[body] == 1:
+                    decode_time = struct.unpack_from(">Q", moof, body + 4)[0]
+                else:
+                    decode_time = struct.unpack_from(">I", moof, body + 4)[0]
+            elif kind == b"trun":
+                count = struct.unpack_from(">I", moof, body + 4)[0]
+                pos = body + 8 + (4 if flags & 0x000001 else 0) + (4 if flags & 0x000004 else 0)
+                if flags & 0x000100:
+                    step = 4 * bin(flags & 0x000F00).count("1")
+                    duration += sum(struct.unpack_from(">I", moof, pos + i * step)[0] for i in range(count))
+                else:
+                    duration += count * default_duration
+        track.end_time = max(track.end_time, decode_time + duration)
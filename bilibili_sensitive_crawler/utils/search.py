@@ -25,6 +25,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.
 # 导入bilibili_api库
 from bilibili_api import search, sync
 from bilibili_api.utils.network import Credential
+from bilibili_api.utils.paginate import PageAdapter, paginate
 
 
 class BiliSearch:
@@ -101,88 +102,95 @@ class BiliSearch:
         
         # 存储搜索结果
         video_ids = []
-        total_count = 0
         
         # 清除已搜索集合(仅保留当前搜索会话中的去重)
         if self.config["duplicate_check"]:
             self.searched_videos.clear()
         
-        # 分页搜索
-        for page in range(1, self.config["max_pages"] + 1):
-            # 调用进度回调
-            if progress_callback:
-                progress_callback(page, self.config["max_pages"], len(video_ids))
-                
-            # 添加随机延迟，避免请求频率过高
-            interval = self.config["page_interval"]
-            await asyncio.sleep(random.uniform(interval[0], interval[1]))
-            
-            # 尝试搜索，支持重试
-            retry_count = 0
-            success = False
-            
-            while not success and retry_count < self.config["max_retries"]:
-                try:
-                    # 执行搜索
-                    search_result = await search.search_by_type(
-                        keyword,
-                        search_type=search.SearchObjectType.VIDEO,
-                        page=page,
-                        page_size=self.config["page_size"],
-                        order_type=search.OrderVideo.TOTALRANK  # 使用综合排序
-                    )
-                    
-                    success = True
-                    
-                except Exception as e:
-                    retry_count += 1
-                    self.logger.warning(f"搜索页面 {page} 失败 (尝试 {retry_count}/{self.config['max_retries']}): {str(e)}")
-                    await asyncio.sleep(retry_count * 2)  # 指数退避
-            
-            if not success:
-                self.logger.error(f"搜索页面 {page} 失败，达到最大重试次数，跳过此页")
-                continue
-                
-            # 检查搜索结果
-            if not search_result or "result" not in search_result:
-                self.logger.warning(f"页面 {page} 未返回搜索结果")
-                break
-                
-            # 获取结果列表
-            results = search_result.get("result", [])
-            
-            # 调试：打印搜索结果的结构
-            if results and self.logger.level <= logging.DEBUG:
-                self.logger.debug(f"搜索结果示例: {results[0] if results else 'None'}")
+        # 分页搜索，处理当前页时预取下一页
+        page_size = self.config["page_size"]
+        adapter = PageAdapter(
+            fetch=lambda page: self._fetch_search_page(keyword, page),
+            items=lambda data: data["result"],
+            # 失败的页跳过，不足一页说明已到达最后一页
+            has_more=lambda data: data["failed"] or len(data["result"]) >= page_size,
+        )
+        pager = paginate(adapter, max_pages=self.config["max_pages"])
+        current_page = 0
+        try:
+            async for item in pager:
+                page = pager.checkpoint()["page"]
+                if page != current_page:
+                    if current_page:
+                        self.logger.info(f"页面 {current_page}: 累计 {len(video_ids)} 个符合条件的视频")
+                    current_page = page
+                    # 调用进度回调
+                    if progress_callback:
+                        progress_callback(page, self.config["max_pages"], len(video_ids))
+
+                # 提取并预过滤视频ID
+                video_ids.extend(await self._filter_page_results([item], keyword))
+
+                # 检查是否达到数量限制
+                if limit and len(video_ids) >= limit:
+                    self.logger.info(f"已达到视频数量限制: {limit}")
+                    video_ids = video_ids[:limit]
+                    break
+        finally:
+            await pager.aclose()
+
+        self.logger.info(f"搜索完成，共找到 {len(video_ids)} 个符合条件的视频")
+        return video_ids
+        
+    async def _fetch_search_page(self, keyword: str, page: int) -> Dict[str, Any]:
+        """
+        获取一页搜索结果，支持重试
+        
+        Args:
+            keyword: 搜索关键词
+            page: 页码
             
-            if not results:
-                self.logger.info(f"页面 {page} 没有更多结果")
+        Returns:
+            Dict[str, Any]: result 为结果列表，failed 表示达到最大重试次数
+        """
+        # 添加随机延迟，避免请求频率过高
+        interval = self.config["page_interval"]
+        await asyncio.sleep(random.uniform(interval[0], interval[1]))
+        
+        for retry_count in range(1, self.config["max_retries"] + 1):
+            try:
+                # 执行搜索
+                search_result = await search.search_by_type(
+                    keyword,
+                    search_type=search.SearchObjectType.VIDEO,
+                    page=page,
+                    page_size=self.config["page_size"],
+                    order_type=search.OrderVideo.TOTALRANK  # 使用综合排序
+                )
                 break
-                
-            # 提取并预过滤视频ID
-            page_ids = await self._filter_page_results(results, keyword)
-            
-            # 添加到搜索结果
-            video_ids.extend(page_ids)
-            
-            # 更新计数
-            new_count = len(page_ids)
-            total_count += new_count
-            self.logger.info(f"页面 {page}: 获取并过滤后得到 {new_count} 个视频，累计: {len(video_ids)}")
+            except Exception as e:
+                self.logger.warning(f"搜索页面 {page} 失败 (尝试 {retry_count}/{self.config['max_retries']}): {str(e)}")
+                await asyncio.sleep(retry_count * 2)  # 指数退避
+        else:
+            self.logger.error(f"搜索页面 {page} 失败，达到最大重试次数，跳过此页")
+            return {"result": [], "failed": True}
+        
+        # 检查搜索结果
+        if not search_result or "result" not in search_result:
+            self.logger.warning(f"页面 {page} 未返回搜索结果")
+            return {"result": [], "failed": False}
             
-            # 检查是否达到最后一页
-            if len(results) < self.config["page_size"]:
-                self.logger.info("已到达最后一页，搜索完成")
-                break
-                
-            # 检查是否达到数量限制
-            if limit and len(video_ids) >= limit:
-                self.logger.info(f"已达到视频数量限制: {limit}")
-                video_ids = video_ids[:limit]
-                break
-                
-        self.logger.info(f"搜索完成，共找到 {len(video_ids)} 个符合条件的视频")
-        return video_ids
+        results = search_result.get("result") or []
+        
+        # 调试：打印搜索结果的结构
+        if results and self.logger.level <= logging.DEBUG:
+            self.logger.debug(f"搜索结果示例: {results[0]}")
+        
+        if not results:
+            self.logger.info(f"页面 {page} 没有更多结果")
+        elif len(results) < self.config["page_size"]:
+            self.logger.info("已到达最后一页，搜索完成")
+        return {"result": results, "failed": False}
         
     async def _filter_page_results(self, results: List[Dict[str, Any]], keyword: str) -> List[Dict[str, Any]]:
         """
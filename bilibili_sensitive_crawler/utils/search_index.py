@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据集全文检索模块
+
+基于 sqlite FTS5 为数据集索引建立倒排索引，检索字段为标题、标签、UP主名称和简介。
+
+- 中日韩文字按相邻两字切分（二元分词），每段末尾的单字也会保留，以支持单字前缀检索
+- 其他文字按单词切分，转为小写并去除变音符号
+- 按 bm25 排序，标题权重最高
+- 支持前缀检索，以及播放量、点赞数、时长的范围过滤
+
+倒排索引保存在元数据目录下的 search_index.sqlite3 中，
+通过监听索引存储的修改增量更新，打开时会与索引存储对账。
+"""
+
+import os
+import re
+import json
+import sqlite3
+import logging
+import threading
+import unicodedata
+from typing import Dict, List, Any, Optional, Tuple, Iterable
+
+try:
+    from .index_store import IndexStore
+except ImportError:
+    from index_store import IndexStore
+
+
+SEARCH_INDEX_FILENAME = "search_index.sqlite3"
+
+# 检索字段及其 bm25 权重
+FIELDS = ("title", "tags", "owner_name", "desc")
+FIELD_WEIGHTS = (3.0, 2.0, 1.5, 1.0)
+
+# 可用于范围过滤的字段
+FILTER_FIELDS = ("view", "like", "duration")
+
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_TOKEN_RE = re.compile(rf"[{_CJK}]+|[^\W_{_CJK}]+")
+_CJK_RE = re.compile(rf"[{_CJK}]")
+
+
+def _runs(text: str) -> Iterable[Tuple[str, bool]]:
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    for match in _TOKEN_RE.finditer(text):
+        run = match.group()
+        if _CJK_RE.match(run):
+            yield run, True
+        else:
+            # 与 FTS5 unicode61 分词器一致地去除变音符号
+            yield "".join(c for c in unicodedata.normalize("NFKD", run) if not unicodedata.combining(c)), False
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    将文本切分为索引词
+
+    Args:
+        text: 文本
+
+    Returns:
+        List[str]: 索引词列表
+    """
+    tokens = []
+    for run, cjk in _runs(text):
+        if cjk and len(run) > 1:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            tokens.append(run[-1])
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def _query_tokens(keyword: str, prefix: bool) -> List[Tuple[str, bool]]:
+    """将检索词转换为 (索引词, 是否前缀匹配) 列表"""
+    terms = []
+    runs = list(_runs(keyword))
+    for i, (run, cjk) in enumerate(runs):
+        if cjk and len(run) > 1:
+            terms.extend((run[j:j + 2], False) for j in range(len(run) - 1))
+        elif cjk or (prefix and i == len(runs) - 1):
+            # 单个汉字匹配以它开头的二元词和段末单字
+            terms.append((run, True))
+        else:
+            terms.append((run, False))
+    return terms
+
+
+def _query_terms(keyword: str, prefix: bool) -> List[str]:
+    """将检索词转换为 FTS5 查询项"""
+    return [f'"{token}"*' if is_prefix else f'"{token}"' for token, is_prefix in _query_tokens(keyword, prefix)]
+
+
+def match_keyword(keyword: str, texts: Iterable[str], prefix: bool = False, match_all: bool = True) -> bool:
+    """
+    按与 SearchIndex.search 相同的分词和匹配规则判断文本是否匹配检索词，
+    供检索索引不可用时逐个扫描使用
+
+    Args:
+        keyword: 检索词，为空时总是匹配
+        texts: 检索字段的文本
+        prefix: 是否将最后一个词作为前缀匹配
+        match_all: True 时要求包含全部检索词，False 时包含任意一个即可
+
+    Returns:
+        bool: 是否匹配
+    """
+    terms = _query_tokens(keyword, prefix)
+    if not terms:
+        # 检索词中没有可索引的字符时不匹配任何视频
+        return not keyword.strip()
+    tokens = set()
+    for text in texts:
+        tokens.update(tokenize(text))
+    matched = (any(t.startswith(token) for t in tokens) if is_prefix else token in tokens
+               for token, is_prefix in terms)
+    return all(matched) if match_all else any(matched)
+
+
+class SearchIndex:
+    """数据集全文检索索引"""
+
+    def __init__(self, metadata_dir: str, db_file: Optional[str] = None):
+        """
+        Args:
+            metadata_dir: 元数据目录
+            db_file: 数据库路径，默认为元数据目录下的 search_index.sqlite3
+        """
+        self.db_file = db_file or os.path.join(metadata_dir, SEARCH_INDEX_FILENAME)
+        self.logger = logging.getLogger("bili_crawler.search_index")
+        self._lock = threading.RLock()
+
+        os.makedirs(os.path.dirname(self.db_file) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS videos (id INTEGER PRIMARY KEY, bvid TEXT UNIQUE NOT NULL, "
+                "view INTEGER, like INTEGER, duration INTEGER, indexed_at INTEGER)"
+            )
+            self._db.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS fts USING fts5({', '.join(FIELDS)})")
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            for field in FILTER_FIELDS:
+                self._db.execute(f"CREATE INDEX IF NOT EXISTS videos_{field} ON videos({field})")
+
+    def close(self) -> None:
+        """关闭数据库"""
+        with self._lock:
+            self._db.close()
+
+    def count(self) -> int:
+        """已索引的视频数量"""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+    def add_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        添加或更新视频记录
+
+        Args:
+            records: 索引记录列表
+
+        Returns:
+            int: 写入的记录数
+        """
+        count = 0
+        with self._lock, self._db:
+            for record in records:
+                bvid = record.get("bvid")
+                if not bvid:
+                    continue
+                values = (record.get("view", 0), record.get("like", 0),
+                          record.get("duration", 0), record.get("indexed_at", 0))
+                row = self._db.execute("SELECT id FROM videos WHERE bvid = ?", (bvid,)).fetchone()
+                if row:
+                    doc_id = row[0]
+                    self._db.execute("UPDATE videos SET view = ?, like = ?, duration = ?, indexed_at = ? WHERE id = ?",
+                                     values + (doc_id,))
+                    self._db.execute("DELETE FROM fts WHERE rowid = ?", (doc_id,))
+                else:
+                    doc_id = self._db.execute(
+                        "INSERT INTO videos (bvid, view, like, duration, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                        (bvid,) + values,
+                    ).lastrowid
+                tags = record.get("tags") or []
+                texts = [record.get("title", ""), " ".join(tags), record.get("owner_name", ""), record.get("desc", "")]
+                self._db.execute(
+                    f"INSERT INTO fts (rowid, {', '.join(FIELDS)}) VALUES (?, ?, ?, ?, ?)",
+                    [doc_id] + [" ".join(tokenize(t)) for t in texts],
+                )
+                count += 1
+        return count
+
+    def remove_many(self, bvids: Iterable[str]) -> int:
+        """
+        删除视频记录
+
+        Args:
+            bvids: BV号列表
+
+        Returns:
+            int: 删除的记录数
+        """
+        count = 0
+        with self._lock, self._db:
+            for bvid in bvids:
+                row = self._db.execute("SELECT id FROM videos WHERE bvid = ?", (bvid,)).fetchone()
+                if row:
+                    self._db.execute("DELETE FROM fts WHERE rowid = ?", (row[0],))
+                    self._db.execute("DELETE FROM videos WHERE id = ?", (row[0],))
+                    count += 1
+        return count
+
+    def clear(self) -> None:
+        """清空索引"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM fts")
+            self._db.execute("DELETE FROM videos")
+
+    def search(self, keyword: str = "", fields: Optional[List[str]] = None, prefix: bool = False,
+               match_all: bool = True, filters: Optional[Dict[str, Tuple[Optional[int], Optional[int]]]] = None,
+               limit: Optional[int] = None, offset: int = 0) -> List[str]:
+        """
+        检索视频
+
+        Args:
+            keyword: 检索词，为空时只按过滤条件筛选并按播放量排序
+            fields: 检索字段，默认为全部字段
+            prefix: 是否将最后一个词作为前缀匹配
+            match_all: True 时要求包含全部检索词，False 时包含任意一个即可
+            filters: 范围过滤，如 {"view": (1000, None), "duration": (None, 600)}，边界包含在内
+            limit: 最大结果数量，None 表示不限制
+            offset: 跳过的结果数量
+
+        Returns:
+            List[str]: 按相关度排序的BV号列表
+        """
+        where, params = [], []
+        for field, (low, high) in (filters or {}).items():
+            if field not in FILTER_FIELDS:
+                raise ValueError(f"不支持的过滤字段: {field}")
+            if low is not None:
+                where.append(f"v.{field} >= ?")
+                params.append(low)
+            if high is not None:
+                where.append(f"v.{field} <= ?")
+                params.append(high)
+
+        terms = _query_terms(keyword, prefix)
+        if terms:
+            fields = [f for f in (fields or FIELDS) if f in FIELDS]
+            if not fields:
+                return []
+            query = (" AND " if match_all else " OR ").join(terms)
+            where.insert(0, "fts MATCH ?")
+            params.insert(0, f"{{{' '.join(fields)}}} : ({query})")
+            sql = (f"SELECT v.bvid FROM fts JOIN videos v ON v.id = fts.rowid WHERE {' AND '.join(where)} "
+                   f"ORDER BY bm25(fts, {', '.join(map(str, FIELD_WEIGHTS))})")
+        elif keyword.strip():
+            # 检索词中没有可索引的字符
+            return []
+        else:
+            sql = "SELECT v.bvid FROM videos v"
+            if where:
+                sql += f" WHERE {' AND '.join(where)}"
+            sql += " ORDER BY v.view DESC"
+
+        sql += " LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+        with self._lock:
+            return [row[0] for row in self._db.execute(sql, params)]
+
+    def attach(self, store: IndexStore) -> None:
+        """
+        与索引存储对账，并监听其后续修改
+
+        Args:
+            store: 索引存储
+        """
+        self.sync(store)
+
+        def on_change(store: IndexStore, op: str, items: List[Any]) -> None:
+            if op == "upsert":
+                self.add_many(items)
+            elif op == "remove":
+                self.remove_many(items)
+            else:
+                self.clear()
+                self.add_many(items)
+            self._mark_synced(store)
+
+        store.add_listener(on_change)
+
+    def sync(self, store: IndexStore) -> int:
+        """
+        与索引存储对账，补充新增或更新的记录、删除已不存在的记录
+
+        Args:
+            store: 索引存储
+
+        Returns:
+            int: 变更的记录数
+        """
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'synced'").fetchone()
+            if row and row[0] == self._sync_marker(store):
+                return 0
+
+            videos = store.load()["videos"]
+            indexed = dict(self._db.execute("SELECT bvid, indexed_at FROM videos"))
+            changed = [r for bvid, r in videos.items() if indexed.get(bvid, -1) != r.get("indexed_at", 0)]
+            removed = [bvid for bvid in indexed if bvid not in videos]
+            self.add_many(changed)
+            self.remove_many(removed)
+            self._mark_synced(store)
+
+        if changed or removed:
+            self.logger.info(f"检索索引已同步: 更新 {len(changed)} 个, 删除 {len(removed)} 个")
+        return len(changed) + len(removed)
+
+    def _sync_marker(self, store: IndexStore) -> str:
+        stats = store.stats()
+        return json.dumps([stats.get("total_videos"), stats.get("last_updated")])
+
+    def _mark_synced(self, store: IndexStore) -> None:
+        with self._lock, self._db:
+            self._db.execute("REPLACE INTO meta VALUES ('synced', ?)", (self._sync_marker(store),))
+
+
+# 同一进程内同一索引存储共享一个检索索引
+_indexes: Dict[str, SearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(store: IndexStore) -> SearchIndex:
+    """
+    获取索引存储对应的检索索引，首次获取时对账并开始监听修改
+
+    Args:
+        store: 索引存储
+
+    Returns:
+        SearchIndex: 检索索引
+    """
+    key = os.path.abspath(store.index_file)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = SearchIndex(os.path.dirname(key))
+            index.attach(store)
+            _indexes[key] = index
+        return index
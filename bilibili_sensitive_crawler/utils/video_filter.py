@@ -22,7 +22,88 @@ from typing import List, Dict, Tuple, Optional
 import subprocess
 import shutil
 from datetime import datetime
-import time
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from .index_store import get_index_store
+    from .file_manifest import get_dataset_manifests
+    from .metadata_store import find_metadata_store, DEFAULT_SHARD_SIZE
+except ImportError:
+    from index_store import get_index_store
+    from file_manifest import get_dataset_manifests
+    from metadata_store import find_metadata_store, DEFAULT_SHARD_SIZE
+
+
+# 视频时长缓存文件名（不以 .json 结尾，避免被当作元数据文件）
+DURATION_CACHE_FILENAME = ".duration_cache"
+
+# MP4 文件开头可能出现的顶层 box
+_MP4_TOP_LEVEL_BOXES = (b"ftyp", b"moov", b"mdat", b"free", b"skip", b"wide", b"pnot")
+
+
+def _find_mp4_box(f, box_type: bytes, start: int, end: int) -> Optional[Tuple[int, int]]:
+    """
+    在 [start, end) 范围内查找指定类型的 box
+    
+    Returns:
+        (内容起始位置, box结束位置)，未找到返回None
+    """
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        size, kind = struct.unpack(">I4s", f.read(8))
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - pos
+        if size < header_size:
+            return None
+        if kind == box_type:
+            return pos + header_size, pos + size
+        pos += size
+    return None
+
+
+def read_mp4_duration(video_file: Path) -> Optional[float]:
+    """
+    读取 MP4 文件 moov/mvhd 中记录的时长，无需启动 FFprobe
+    
+    Args:
+        video_file: 视频文件路径
+        
+    Returns:
+        视频时长（秒），不是 MP4 文件或未记录时长时返回None
+    """
+    try:
+        with open(video_file, "rb") as f:
+            file_size = os.fstat(f.fileno()).st_size
+            if f.read(8)[4:] not in _MP4_TOP_LEVEL_BOXES:
+                return None
+            moov = _find_mp4_box(f, b"moov", 0, file_size)
+            if moov is None:
+                return None
+            mvhd = _find_mp4_box(f, b"mvhd", moov[0], min(moov[1], file_size))
+            if mvhd is None:
+                return None
+            f.seek(mvhd[0])
+            version = f.read(4)[0]
+            if version == 1:
+                f.seek(16, os.SEEK_CUR)
+                timescale, duration = struct.unpack(">IQ", f.read(12))
+            else:
+                f.seek(8, os.SEEK_CUR)
+                timescale, duration = struct.unpack(">II", f.read(8))
+    except (OSError, struct.error, IndexError):
+        return None
+    
+    # 分片 MP4 的 mvhd 中时长为 0，全 1 表示未知
+    if not timescale or not duration or duration in (0xFFFFFFFF, 0xFFFFFFFFFFFFFFFF):
+        return None
+    return duration / timescale
 
 
 class VideoFilter:
@@ -47,31 +128,51 @@ class VideoFilter:
         self.videos_dir.mkdir(parents=True, exist_ok=True)
         
         # index.json文件路径
-        self.index_file = self.metadata_dir / "index.json"
+        # 索引后端与 DatasetManager 使用同一配置
+        dataset_config = self.config.get("dataset") or {}
+        index_file = dataset_config.get("index_file")
+        self.index_file = Path(index_file) if index_file else self.metadata_dir / "index.json"
+        self.index_store = get_index_store(str(self.metadata_dir), dataset_config.get("index_backend"),
+                                           str(self.index_file))
+        
+        # 视频时长缓存: 路径 -> [文件大小, 修改时间, 时长]
+        self.duration_cache_file = self.metadata_dir / DURATION_CACHE_FILENAME
+        self._duration_cache: Optional[Dict[str, list]] = None
+        self._duration_cache_lock = threading.Lock()
+        
+        # FFprobe 最大并发数
+        filter_config = self.config.get("video_filter") or {}
+        self.probe_workers = filter_config.get("probe_workers") or min(8, os.cpu_count() or 1)
+        
+        # 文件清单，避免每次遍历视频目录
+        self.json_manifest = None
+        self.video_manifest = None
+        if dataset_config.get("file_manifest", True):
+            try:
+                self.json_manifest, self.video_manifest = get_dataset_manifests(
+                    str(self.metadata_dir), str(self.videos_dir),
+                    watch=dataset_config.get("manifest_watch", False),
+                    exclude=[self.index_file.name])
+            except Exception as e:
+                self.logger.warning(f"文件清单不可用，将直接遍历目录: {str(e)}")
+        
+        # 保存在压缩分片中的视频信息，与 DatasetManager、FileAnalyzer 共享
+        self.metadata_store = find_metadata_store(
+            str(self.metadata_dir), dataset_config.get("metadata_codec", "zstd"),
+            shard_size=dataset_config.get("metadata_shard_size", DEFAULT_SHARD_SIZE))
     
     def load_index(self) -> Dict:
-        """加载index.json文件"""
-        if not self.index_file.exists():
-            self.logger.warning(f"索引文件不存在: {self.index_file}")
-            return {"metadata": {}, "stats": {"total_videos": 0}, "videos": {}}
-        
+        """加载索引（通过与 DatasetManager 共享的索引存储）"""
         try:
-            with open(self.index_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return self.index_store.load()
         except Exception as e:
             self.logger.error(f"加载索引文件失败: {str(e)}")
             return {"metadata": {}, "stats": {"total_videos": 0}, "videos": {}}
     
     def save_index(self, index_data: Dict) -> bool:
-        """保存index.json文件"""
+        """用完整索引替换现有索引"""
         try:
-            # 更新统计信息
-            index_data["stats"]["total_videos"] = len(index_data.get("videos", {}))
-            index_data["stats"]["last_updated"] = int(time.time())
-            
-            with open(self.index_file, 'w', encoding='utf-8') as f:
-                json.dump(index_data, f, ensure_ascii=False, indent=4)
-            
+            self.index_store.replace(index_data)
             self.logger.info(f"索引文件已更新: {self.index_file}")
             return True
         except Exception as e:
@@ -83,25 +184,17 @@ class VideoFilter:
         if not bvids:
             return True
         
-        index_data = self.load_index()
-        videos = index_data.get("videos", {})
-        
-        removed_count = 0
-        for bvid in bvids:
-            if bvid in videos:
-                del videos[bvid]
-                removed_count += 1
-                self.logger.debug(f"从索引中删除视频记录: {bvid}")
+        try:
+            removed_count = self.index_store.remove(bvids)
+        except Exception as e:
+            self.logger.error(f"保存索引文件失败: {str(e)}")
+            return False
         
         if removed_count > 0:
-            index_data["videos"] = videos
-            success = self.save_index(index_data)
-            if success:
-                self.logger.info(f"已从索引中删除 {removed_count} 个视频记录")
-            return success
+            self.logger.info(f"已从索引中删除 {removed_count} 个视频记录")
         else:
             self.logger.info("没有需要从索引中删除的视频记录")
-            return True
+        return True
     
     def get_video_duration_from_metadata(self, json_file: Path) -> Optional[int]:
         """
@@ -117,43 +210,49 @@ class VideoFilter:
             with open(json_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
-            # 尝试从不同字段获取时长信息
-            duration = None
-            
-            # 方法1: 从basic_info中获取（最常见的位置）
-            if 'basic_info' in data and 'duration' in data['basic_info']:
-                duration = data['basic_info']['duration']
-            
-            # 方法2: 从根级duration字段获取
-            elif 'duration' in data:
-                duration = data['duration']
-            
-            # 方法3: 从video_info中获取
-            elif 'video_info' in data and 'duration' in data['video_info']:
-                duration = data['video_info']['duration']
-            
-            # 方法4: 从页面信息中获取
-            elif 'pages' in data and len(data['pages']) > 0:
-                # 取第一个分P的时长
-                duration = data['pages'][0].get('duration', None)
-            
-            # 方法5: 从stat信息中获取（某些情况下可能存在）
-            elif 'stat' in data and 'duration' in data['stat']:
-                duration = data['stat']['duration']
-            
+            duration = self._duration_from_info(data)
             if duration is not None:
-                return int(duration)
+                return duration
             
             self.logger.warning(f"无法从元数据中获取视频时长: {json_file}")
             return None
-            
+                
         except Exception as e:
             self.logger.error(f"读取元数据文件失败 {json_file}: {str(e)}")
             return None
     
+    @staticmethod
+    def _duration_from_info(data: Dict) -> Optional[int]:
+        """从视频信息中获取时长（秒），没有时长时返回None"""
+        # 尝试从不同字段获取时长信息
+        duration = None
+        
+        # 方法1: 从basic_info中获取（最常见的位置）
+        if 'basic_info' in data and 'duration' in data['basic_info']:
+            duration = data['basic_info']['duration']
+        
+        # 方法2: 从根级duration字段获取
+        elif 'duration' in data:
+            duration = data['duration']
+        
+        # 方法3: 从video_info中获取
+        elif 'video_info' in data and 'duration' in data['video_info']:
+            duration = data['video_info']['duration']
+        
+        # 方法4: 从页面信息中获取
+        elif 'pages' in data and len(data['pages']) > 0:
+            # 取第一个分P的时长
+            duration = data['pages'][0].get('duration', None)
+        
+        # 方法5: 从stat信息中获取（某些情况下可能存在）
+        elif 'stat' in data and 'duration' in data['stat']:
+            duration = data['stat']['duration']
+        
+        return int(duration) if duration is not None else None
+    
     def get_video_duration_from_file(self, video_file: Path) -> Optional[int]:
         """
-        使用FFprobe从视频文件直接获取时长
+        从视频文件获取时长（结果会被缓存）
         
         Args:
             video_file: 视频文件路径
@@ -161,6 +260,68 @@ class VideoFilter:
         Returns:
             视频时长（秒），如果获取失败返回None
         """
+        return self.get_video_durations_from_files([video_file]).get(str(video_file))
+    
+    def get_video_durations_from_files(self, video_files: List[Path]) -> Dict[str, Optional[int]]:
+        """
+        批量获取视频文件时长
+        
+        按 (路径, 文件大小, 修改时间) 命中缓存的直接返回，其余文件并发探测，
+        同时运行的 FFprobe 进程数不超过 probe_workers。
+        
+        Args:
+            video_files: 视频文件路径列表
+            
+        Returns:
+            文件路径 -> 视频时长（秒），获取失败为None
+        """
+        cache = self._load_duration_cache()
+        results: Dict[str, Optional[int]] = {}
+        pending = []
+        
+        for video_file in video_files:
+            key = str(video_file)
+            try:
+                st = os.stat(video_file)
+            except OSError:
+                results[key] = None
+                continue
+            signature = [st.st_size, st.st_mtime_ns]
+            cached = cache.get(key)
+            if cached and cached[:2] == signature:
+                results[key] = cached[2]
+            else:
+                pending.append((key, signature))
+        
+        if not pending:
+            return results
+        
+        self.logger.info(f"正在探测 {len(pending)} 个视频文件的时长...")
+        with ThreadPoolExecutor(max_workers=min(self.probe_workers, len(pending))) as pool:
+            durations = pool.map(self.probe_video_duration, [Path(key) for key, _ in pending])
+            for (key, signature), duration in zip(pending, durations):
+                results[key] = duration
+                if duration is not None:
+                    with self._duration_cache_lock:
+                        cache[key] = signature + [duration]
+        
+        self._save_duration_cache()
+        return results
+    
+    def probe_video_duration(self, video_file: Path) -> Optional[int]:
+        """
+        探测视频文件时长：优先读取 MP4 的 mvhd，失败时使用FFprobe
+        
+        Args:
+            video_file: 视频文件路径
+            
+        Returns:
+            视频时长（秒），如果获取失败返回None
+        """
+        duration = read_mp4_duration(video_file)
+        if duration is not None:
+            return int(duration)
+        
         try:
             # 使用ffprobe获取视频时长
             cmd = [
@@ -189,6 +350,63 @@ class VideoFilter:
             self.logger.error(f"使用FFprobe获取视频时长失败 {video_file}: {str(e)}")
             return None
     
+    def _load_duration_cache(self) -> Dict[str, list]:
+        """加载视频时长缓存"""
+        if self._duration_cache is None:
+            self._duration_cache = {}
+            if self.duration_cache_file.exists():
+                try:
+                    with open(self.duration_cache_file, 'r', encoding='utf-8') as f:
+                        self._duration_cache = json.load(f)
+                except Exception as e:
+                    self.logger.warning(f"加载视频时长缓存失败: {str(e)}")
+        return self._duration_cache
+    
+    def _save_duration_cache(self) -> None:
+        """保存视频时长缓存（先写临时文件再替换）"""
+        tmp_file = self.duration_cache_file.with_name(self.duration_cache_file.name + ".tmp")
+        try:
+            with self._duration_cache_lock:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self._duration_cache, f, ensure_ascii=False)
+            os.replace(tmp_file, self.duration_cache_file)
+        except Exception as e:
+            self.logger.warning(f"保存视频时长缓存失败: {str(e)}")
+    
+    def list_video_files(self) -> Dict[str, List[Path]]:
+        """
+        扫描一次视频目录，按BV号分组
+        
+        Returns:
+            BV号 -> 视频文件路径列表
+        """
+        video_files: Dict[str, List[Path]] = {}
+        if self.video_manifest is not None:
+            self.video_manifest.refresh()
+            for name in self.video_manifest.names():
+                video_files.setdefault(name.split(".", 1)[0], []).append(self.videos_dir / name)
+        else:
+            with os.scandir(self.videos_dir) as entries:
+                for entry in entries:
+                    if entry.name.startswith(".") or "." not in entry.name:
+                        continue
+                    video_files.setdefault(entry.name.split(".", 1)[0], []).append(Path(entry.path))
+        for paths in video_files.values():
+            paths.sort()
+        return video_files
+    
+    def list_json_files(self) -> List[Path]:
+        """
+        列出元数据目录中的JSON文件（不含索引文件，不含分片中的视频信息）
+        
+        Returns:
+            JSON文件路径列表
+        """
+        if self.json_manifest is not None:
+            self.json_manifest.refresh()
+            return [self.metadata_dir / name for name in sorted(self.json_manifest.names())]
+        return [f for f in self.metadata_dir.glob("*.json") if f.name != self.index_file.name]
+    
     def find_videos_by_duration(self, max_duration: int = 30) -> List[Dict]:
         """
         查找超出指定时长的视频
@@ -202,27 +420,43 @@ class VideoFilter:
         self.logger.info(f"开始查找超出 {max_duration} 秒的视频...")
         
         long_videos = []
-        json_files = list(self.metadata_dir.glob("*.json"))
+        json_files = {f.stem: f for f in self.list_json_files()}
+        video_files_map = self.list_video_files()
         
         self.logger.info(f"找到 {len(json_files)} 个元数据文件")
         
-        for json_file in json_files:
+        # 获取视频时长，分片中的视频信息优先（与 DatasetManager 读取顺序一致），
+        # 元数据中没有时长的视频统一从视频文件探测
+        durations = {}
+        sharded = set()
+        if self.metadata_store is not None:
+            for info in self.metadata_store.iter_all():
+                bvid = (info.get("basic_info") or {}).get("bvid")
+                if not bvid:
+                    continue
+                sharded.add(bvid)
+                try:
+                    durations[bvid] = self._duration_from_info(info)
+                except (TypeError, ValueError) as e:
+                    self.logger.error(f"读取分片中的视频信息失败 {bvid}: {str(e)}")
+                    durations[bvid] = None
+            self.logger.info(f"找到 {len(sharded)} 个分片中的视频信息")
+        for bvid, json_file in json_files.items():
+            if bvid not in sharded:
+                durations[bvid] = self.get_video_duration_from_metadata(json_file)
+        
+        missing = [bvid for bvid, duration in durations.items() if duration is None and video_files_map.get(bvid)]
+        if missing:
+            probed = self.get_video_durations_from_files([video_files_map[bvid][0] for bvid in missing])
+            for bvid in missing:
+                durations[bvid] = probed.get(str(video_files_map[bvid][0]))
+        
+        for bvid, duration in sorted(durations.items()):
+            json_file = json_files.get(bvid, self.metadata_dir / f"{bvid}.json")
             try:
-                # 从文件名提取BV号
-                bvid = json_file.stem
-                
-                # 获取视频时长
-                duration = self.get_video_duration_from_metadata(json_file)
-                
-                if duration is None:
-                    # 如果从元数据获取失败，尝试从视频文件获取
-                    video_files = list(self.videos_dir.glob(f"{bvid}.*"))
-                    if video_files:
-                        duration = self.get_video_duration_from_file(video_files[0])
-                
                 if duration is not None and duration > max_duration:
                     # 查找对应的视频文件
-                    video_files = list(self.videos_dir.glob(f"{bvid}.*"))
+                    video_files = video_files_map.get(bvid, [])
                     
                     video_info = {
                         'bvid': bvid,
@@ -230,6 +464,7 @@ class VideoFilter:
                         'json_file': str(json_file),
                         'video_files': [str(vf) for vf in video_files],
                         'json_exists': json_file.exists(),
+                        'in_shards': bvid in sharded,
                         'video_exists': len(video_files) > 0
                     }
                     
@@ -317,6 +552,23 @@ class VideoFilter:
                             'duration': duration
                         })
                 
+                # 删除分片中的视频信息
+                if video_info.get('in_shards') and self.metadata_store is not None:
+                    if not dry_run:
+                        self.metadata_store.remove([bvid])
+                        self.logger.info(f"已从分片中删除视频信息: {bvid}")
+                    else:
+                        self.logger.info(f"[试运行] 将从分片中删除视频信息: {bvid}")
+                    
+                    stats['deleted_json'] += 1
+                    stats['deleted_files'].append({
+                        'type': 'shard',
+                        'path': self.metadata_store.directory,
+                        'size': 0,
+                        'bvid': bvid,
+                        'duration': duration
+                    })
+                
                 # 删除JSON元数据文件
                 json_file = Path(video_info['json_file'])
                 if json_file.exists():
@@ -328,7 +580,9 @@ class VideoFilter:
                     else:
                         self.logger.info(f"[试运行] 将删除元数据文件: {json_file}")
                     
-                    stats['deleted_json'] += 1
+                    if not video_info.get('in_shards'):
+                        # 同时在分片中的视频信息只计一次
+                        stats['deleted_json'] += 1
                     stats['total_size_freed'] += file_size
                     stats['deleted_files'].append({
                         'type': 'json',
@@ -447,6 +701,8 @@ class VideoFilter:
                 status_parts.append(f"视频文件: {len(video_info['video_files'])}个")
             if video_info['json_exists']:
                 status_parts.append("元数据: 存在")
+            if video_info.get('in_shards'):
+                status_parts.append("元数据: 分片")
             
             if status_parts:
                 self.logger.info(f"     状态: {', '.join(status_parts)}")
@@ -0,0 +1,62 @@
+# 专栏内容解析基准测试
+#
+# 比较 article 模块的流式解析与 BeautifulSoup 建树 (旧实现的第一步) 的耗时与内存峰值。
+#
+# $ python scripts/bench_article_parse.py [段落数]
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.abspath(os.path.dirname(__file__)), ".."))
+
+from lxml import etree
+
+from bilibili_api.article import _ArticleContentTarget
+
+PARAGRAPH = (
+    '<p style="text-align: center;">第 {i} 段 <strong>粗体</strong>'
+    '<span class="color-blue-01">彩色文字</span>普通文字'
+    '<span style="text-decoration: line-through;">删除线</span></p>'
+    '<figure class="img-box"><img data-src="//i0.hdslb.com/bfs/article/{i}.png">'
+    "<figcaption>图片说明</figcaption></figure>"
+    "<ul><li>列表一</li><li>列表二</li></ul>"
+)
+
+
+def measure(name: str, func) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    cost = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{name:<24}{cost:>8.3f} s{peak / 1024 / 1024:>10.1f} MB")
+
+
+def stream_parse(content: str) -> None:
+    parser = etree.HTMLParser(target=_ArticleContentTarget())
+    parser.feed(f"<div>{content}</div>")
+    parser.close()
+
+
+def soup_parse(content: str) -> None:
+    from bs4 import BeautifulSoup
+
+    BeautifulSoup(f"<div>{content}</div>", "lxml")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    content = "".join(PARAGRAPH.format(i=i) for i in range(count))
+    print(f"{count} 段, {len(content.encode()) / 1024 / 1024:.1f} MB")
+    measure("stream (target parser)", lambda: stream_parse(content))
+    try:
+        measure("BeautifulSoup tree only", lambda: soup_parse(content))
+    except ImportError:
+        print("未安装 beautifulsoup4，跳过对比")
+
+
+if __name__ == "__main__":
+    main()
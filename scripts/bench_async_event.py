@@ -0,0 +1,69 @@
+# AsyncEvent 发布事件基准测试
+#
+# 测量发布一次事件的平均耗时：没有监听器、同步监听器、协程监听器（新任务 / 依次等待），
+# 以及有无 __ALL__ 监听器的情况。协程监听器的耗时包括任务运行完毕的时间。
+#
+# $ python scripts/bench_async_event.py [发布次数]
+
+import os
+import sys
+import time
+import asyncio
+
+sys.path.append(os.path.join(os.path.abspath(os.path.dirname(__file__)), ".."))
+
+from bilibili_api.utils.AsyncEvent import AsyncEvent
+
+
+def sync_handler(data: dict) -> None:
+    pass
+
+
+async def async_handler(data: dict) -> None:
+    pass
+
+
+async def bench(name: str, event: AsyncEvent, count: int, use_emit: bool) -> None:
+    data = {"cmd": "DANMU_MSG"}
+    start = time.perf_counter()
+    if use_emit:
+        for _ in range(count):
+            await event.emit("DANMU_MSG", data)
+    else:
+        for _ in range(count):
+            event.dispatch("DANMU_MSG", data)
+    tasks = event.get_pending_tasks()
+    if tasks:
+        await asyncio.wait(tasks)
+    cost = time.perf_counter() - start
+    print(f"{name:<28}{cost / count * 1e6:>10.2f} us")
+
+
+def make(handler=None, all_handler=None, inline: bool = False) -> AsyncEvent:
+    event = AsyncEvent()
+    if handler is not None:
+        event.add_event_listener("DANMU_MSG", handler)
+    if all_handler is not None:
+        event.add_event_listener("__ALL__", all_handler)
+    event.set_inline(inline)
+    return event
+
+
+async def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"发布 {count} 次事件，每次平均耗时")
+    cases = [
+        ("无监听器", make(), False),
+        ("同步监听器", make(sync_handler), False),
+        ("同步监听器 + __ALL__", make(sync_handler, sync_handler), False),
+        ("协程监听器", make(async_handler), False),
+        ("协程监听器 + __ALL__", make(async_handler, async_handler), False),
+        ("协程监听器 依次等待", make(async_handler, inline=True), True),
+        ("协程监听器 + __ALL__ 依次等待", make(async_handler, async_handler, True), True),
+    ]
+    for name, event, use_emit in cases:
+        await bench(name, event, count, use_emit)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,145 @@
+# 多直播间弹幕连接基准测试
+#
+# 使用进程内模拟的弹幕服务器（不访问网络），比较每个直播间单独使用 LiveDanmaku
+# 与使用 LiveDanmakuHub 统一管理时，每个直播间的内存占用、事件循环任务数，
+# 以及空闲（只有心跳）时每个直播间的 CPU 占用。
+#
+# $ python scripts/bench_live_hub.py [直播间数] [观察秒数] [心跳间隔秒数]
+
+import os
+import sys
+import json
+import time
+import struct
+import asyncio
+import logging
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.abspath(os.path.dirname(__file__)), ".."))
+
+from bilibili_api import live
+from bilibili_api.utils.network import BiliWsMsgType, Credential
+
+CONF = {
+    "token": "token",
+    "host_list": [
+        {"host": f"host{i}.example.com", "wss_port": 443} for i in range(3)
+    ],
+}
+
+
+def pack(body: bytes, protocol_version: int, datapack_type: int) -> bytes:
+    return struct.pack(">IHHII", len(body) + 16, 16, protocol_version, datapack_type, 1) + body
+
+
+class FakeClient:
+    """
+    模拟弹幕服务器：回应认证与心跳包
+    """
+
+    def __init__(self) -> None:
+        self.queues = {}
+        self.counter = 0
+        self.heartbeats = 0
+
+    async def ws_create(self, url: str = "", params: dict = {}, headers: dict = {}) -> int:
+        self.counter += 1
+        self.queues[self.counter] = asyncio.Queue()
+        return self.counter
+
+    async def ws_send(self, cnt: int, data: bytes) -> None:
+        datapack_type = struct.unpack(">I", data[8:12])[0]
+        if datapack_type == live.LiveDanmaku.DATAPACK_TYPE_VERIFY:
+            reply = pack(json.dumps({"code": 0}).encode(), 1, 8)
+        else:
+            self.heartbeats += 1
+            reply = pack(struct.pack(">I", 1), 1, 3)
+        self.queues[cnt].put_nowait((reply, BiliWsMsgType.BINARY))
+
+    async def ws_recv(self, cnt: int):
+        return await self.queues[cnt].get()
+
+    async def ws_close(self, cnt: int) -> None:
+        queue = self.queues.get(cnt)
+        if queue is not None:
+            queue.put_nowait((b"", BiliWsMsgType.CLOSED))
+
+
+async def get_room_play_info(self) -> dict:
+    return {"room_id": self.room_display_id}
+
+
+async def get_danmu_info(self) -> dict:
+    return CONF
+
+
+async def send_web_heartbeat(room_display_id: int) -> None:
+    pass
+
+
+async def wait_established(rooms, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while any(r.get_status() != live.LiveDanmaku.STATUS_ESTABLISHED for r in rooms):
+        if time.monotonic() > deadline:
+            raise TimeoutError("连接超时")
+        await asyncio.sleep(0.05)
+
+
+async def bench(name: str, count: int, seconds: float, use_hub: bool) -> None:
+    client = FakeClient()
+    live.get_client = lambda: client
+    credential = Credential(dedeuserid="1")
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    if use_hub:
+        hub = live.LiveDanmakuHub(
+            range(1, count + 1), credential=credential, connect_interval=0
+        )
+        runner = asyncio.create_task(hub.connect())
+        rooms = hub.get_rooms()
+    else:
+        rooms = [live.LiveDanmaku(i, credential=credential) for i in range(1, count + 1)]
+        runner = asyncio.gather(*[r.connect() for r in rooms])
+    await wait_established(rooms)
+    await asyncio.sleep(0.5)
+    memory = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    tasks = len(asyncio.all_tasks()) - 1
+
+    heartbeats = client.heartbeats
+    cpu = time.process_time()
+    await asyncio.sleep(seconds)
+    cpu = time.process_time() - cpu
+    heartbeats = client.heartbeats - heartbeats
+
+    if use_hub:
+        await hub.disconnect()
+    else:
+        for r in rooms:
+            await r.disconnect()
+    await runner
+
+    print(
+        f"{name:<14}{memory / count / 1024:>10.1f} KB{tasks / count:>10.2f}"
+        f"{cpu / seconds / count * 1e6:>14.1f} us/s{heartbeats:>10}"
+    )
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    live.HEARTBEAT_INTERVAL = float(sys.argv[3]) if len(sys.argv) > 3 else 2
+    live.LiveRoom.get_room_play_info = get_room_play_info
+    live.LiveRoom.get_danmu_info = get_danmu_info
+    live._send_web_heartbeat = send_web_heartbeat
+    logging.disable(logging.CRITICAL)
+
+    print(f"{count} 个直播间, 观察 {seconds} 秒, 心跳间隔 {live.HEARTBEAT_INTERVAL} 秒")
+    print(f"{'':<14}{'内存/间':>9}{'任务数/间':>8}{'CPU/间':>14}{'心跳包':>8}")
+    asyncio.run(bench("LiveDanmaku", count, seconds, False))
+    asyncio.run(bench("LiveDanmakuHub", count, seconds, True))
+
+
+if __name__ == "__main__":
+    main()
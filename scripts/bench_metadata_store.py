@@ -0,0 +1,130 @@
+# 视频元数据存储基准测试
+#
+# 比较每个视频一个 JSON 文件 (DatasetManager 默认的 indent=4 格式) 与压缩分片存储
+# 的磁盘占用、写入、按 BV 号随机读取和全量顺序读取的速度。
+#
+# $ python scripts/bench_metadata_store.py [视频数] [每个视频的评论数]
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+
+sys.path.append(os.path.join(os.path.abspath(os.path.dirname(__file__)), "..", "bilibili_sensitive_crawler"))
+
+from utils.metadata_store import MetadataStore, zstandard
+
+
+def make_video_info(i: int, comments: int) -> dict:
+    bvid = f"BV1{i:09d}"
+    return {
+        "basic_info": {
+            "bvid": bvid,
+            "aid": 100000 + i,
+            "title": f"第 {i} 个测试视频 标题",
+            "desc": "视频简介，" * 20,
+            "duration": random.randint(10, 600),
+            "pubdate": 1700000000 + i,
+        },
+        "owner": {"mid": 1000 + i % 50, "name": f"UP主{i % 50}"},
+        "stat": {"view": random.randint(0, 10 ** 6), "like": random.randint(0, 10 ** 4)},
+        "tags": [{"tag_id": j, "tag_name": f"标签{j}"} for j in range(8)],
+        "comments": [
+            {"rpid": i * 1000 + j, "mid": random.randint(1, 10 ** 8), "uname": f"用户{j}",
+             "message": "这是一条评论内容，" * random.randint(1, 6), "like": random.randint(0, 500),
+             "ctime": 1700000000 + j}
+            for j in range(comments)
+        ],
+        "danmaku": [
+            {"dm_time": round(random.uniform(0, 600), 2), "text": f"弹幕{j} 哈哈哈", "mode": 1, "color": 16777215}
+            for j in range(comments * 2)
+        ],
+    }
+
+
+def dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total
+
+
+def file_count(path: str) -> int:
+    return sum(len(files) for _, _, files in os.walk(path))
+
+
+def report(name: str, path: str, count: int, write: float, read: float, scan: float, reads: int) -> None:
+    print(f"{name:<14}{dir_size(path) / 1024 / 1024:>10.1f} MB{file_count(path):>9}"
+          f"{count / write:>12.0f}{reads / read:>12.0f}{count / scan:>12.0f}")
+
+
+def bench_files(root: str, infos: list, sample: list) -> None:
+    path = os.path.join(root, "files")
+    os.makedirs(path)
+    start = time.perf_counter()
+    for info in infos:
+        with open(os.path.join(path, f"{info['basic_info']['bvid']}.json"), "w", encoding="utf-8") as f:
+            json.dump(info, f, ensure_ascii=False, indent=4)
+    write = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for bvid in sample:
+        with open(os.path.join(path, f"{bvid}.json"), "r", encoding="utf-8") as f:
+            json.load(f)
+    read = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in os.listdir(path):
+        with open(os.path.join(path, name), "r", encoding="utf-8") as f:
+            json.load(f)
+    scan = time.perf_counter() - start
+    report("json files", path, len(infos), write, read, scan, len(sample))
+
+
+def bench_shards(root: str, codec: str, infos: list, sample: list) -> None:
+    path = os.path.join(root, codec)
+    store = MetadataStore(path, codec)
+    start = time.perf_counter()
+    for info in infos:
+        store.save(info)
+    write = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for bvid in sample:
+        store.load(bvid)
+    read = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in store.iter_all():
+        pass
+    scan = time.perf_counter() - start
+    store.close()
+    report(f"shards ({codec})", path, len(infos), write, read, scan, len(sample))
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    comments = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    random.seed(0)
+    infos = [make_video_info(i, comments) for i in range(count)]
+    sample = [random.choice(infos)["basic_info"]["bvid"] for _ in range(min(count, 1000))]
+
+    root = tempfile.mkdtemp(prefix="bench_metadata_")
+    try:
+        print(f"{count} 个视频, 每个 {comments} 条评论 / {comments * 2} 条弹幕")
+        print(f"{'':<14}{'磁盘占用':>11}{'文件数':>7}{'写入/s':>10}{'随机读/s':>9}{'全量读/s':>9}")
+        bench_files(root, infos, sample)
+        bench_shards(root, "gzip", infos, sample)
+        if zstandard is not None:
+            bench_shards(root, "zstd", infos, sample)
+        else:
+            print("未安装 zstandard，跳过 zstd")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -59,3 +59,9 @@ async def test_g_ArticleList_get_article_list():
 
 async def test_h_get_article_rank():
     return await article.get_article_rank()
+
+
+async def test_i_Article_get_images():
+    pics = await ar.get_images()
+    assert len(pics) == len(await ar.get_images_raw_info())
+    return pics
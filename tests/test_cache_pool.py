@@ -0,0 +1,71 @@
+# bilibili_api.utils.cache_pool
+
+import os
+import time
+import asyncio
+import tempfile
+
+from bilibili_api.utils.cache_pool import CachePool
+
+
+async def test_a_ttl_expire():
+    pool = CachePool(ttl=0.1)
+    pool["a"] = 1
+    pool.set("b", 2, ttl=None)
+    if pool.get("a") != 1:
+        raise Exception("未过期的项读取失败")
+    await asyncio.sleep(0.15)
+    if "a" in pool or pool.get("a") is not None:
+        raise Exception("过期的项仍然存在")
+    if len(pool) != 1 or list(pool) != ["b"]:
+        raise Exception(f"长度或迭代包含过期的项: {len(pool)} {list(pool)}")
+    return pool.get_stats()
+
+
+async def test_b_lru_evict():
+    pool = CachePool(maxsize=2)
+    pool["a"] = 1
+    pool["b"] = 2
+    pool.get("a")
+    pool["c"] = 3
+    if "b" in pool or "a" not in pool or "c" not in pool:
+        raise Exception(f"没有淘汰最久未使用的项: {list(pool)}")
+    return pool.get_stats()
+
+
+async def test_c_stats():
+    pool = CachePool(maxsize=1)
+    pool["a"] = 1
+    pool.get("a")
+    pool.get("x")
+    # in 不计入命中统计，也不改变淘汰顺序
+    _ = "a" in pool
+    _ = "x" in pool
+    pool["b"] = 2
+    stats = pool.get_stats()
+    expected = {"size": 1, "maxsize": 1, "hits": 1, "misses": 1, "evictions": 1, "expirations": 0}
+    if stats != expected:
+        raise Exception(f"统计错误: {stats}")
+    return stats
+
+
+async def test_d_persist():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cache.sqlite3")
+        pool = CachePool(maxsize=2, persist=path)
+        pool["a"] = {"x": 1}
+        pool.set("b", [1, 2], ttl=0.1)
+        pool["c"] = "c"
+        pool.flush()
+        pool.set_persist(None)
+
+        time.sleep(0.15)
+        pool = CachePool(maxsize=2, persist=path)
+        if pool.get("c") != "c":
+            raise Exception("持久化的项读取失败")
+        if pool.get("a") is not None:
+            raise Exception("被淘汰的项仍在数据库中")
+        if pool.get("b") is not None:
+            raise Exception("过期的项仍可读取")
+        pool.set_persist(None)
+        return pool.get_stats()
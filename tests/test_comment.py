@@ -20,6 +20,23 @@ async def test_a_get_comments():
     return result
 
 
+async def test_aa_iter_comments():
+    pager = comment.iter_comments(
+        oid=AID, type_=comment.CommentResourceType.VIDEO, max_items=30
+    )
+    replies = await pager.collect()
+    return {"replies": len(replies), "checkpoint": pager.checkpoint()}
+
+
+async def test_ab_iter_all_comments():
+    stream = comment.iter_all_comments(
+        oid=AID, type_=comment.CommentResourceType.VIDEO, compact=True, max_items=100
+    )
+    records = await stream.collect()
+    assert len({record["rpid"] for record in records}) == len(records)
+    return {"records": len(records), "checkpoint": stream.checkpoint()}
+
+
 comment_id = None
 
 
@@ -0,0 +1,17 @@
+# bilibili_api.dynamic_feed
+
+from bilibili_api import dynamic_feed
+
+UID = 660303135
+
+feed = dynamic_feed.DynamicFeed([UID], emit_initial=True)
+
+
+async def test_a_poll():
+    return await feed.poll(UID)
+
+
+async def test_b_poll_again():
+    # 高水位之后没有新动态时只请求第一页
+    new = await feed.poll(UID)
+    return {"new": len(new), "state": await feed.store.get(UID)}
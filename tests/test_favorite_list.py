@@ -126,3 +126,12 @@ async def test_get_favorite_collected_1():
 async def test_get_favorite_collected_2():
     data = await favorite_list.get_favorite_collected(uid, 1, 20, credential)
     return data
+
+
+async def test_q_export_content():
+    fl = favorite_list.FavoriteList(media_id=default_media_id, credential=credential)
+    export = fl.export_content()
+    medias = await export.collect()
+    state = export.get_state()
+    assert await fl.export_content(state=state).collect() == []
+    return {"medias": len(medias), "fav_time": state["fav_time"]}
@@ -2,9 +2,11 @@
 
 import time
 import random
+import asyncio
 
 from bilibili_api import live
 from bilibili_api.utils.danmaku import Danmaku
+from bilibili_api.utils.event_sink import EventSink
 from bilibili_api.exceptions import ResponseCodeException
 
 from .common import get_credential
@@ -195,3 +197,39 @@ async def test_zh_get_emoticons():
 
 async def test_zi_send_emoticon():
     return await l.send_danmaku(Danmaku("official_147"))
+
+
+async def test_zj_live_danmaku_hub_prefetch():
+    hub = live.LiveDanmakuHub([22544798, 21452505], credential=get_credential())
+    await hub.prefetch()
+    return hub.get_stats()
+
+
+async def test_zk_live_danmaku_stream():
+    danmaku = live.LiveDanmaku(22544798, credential=get_credential())
+    sink = danmaku.stream(["VIEW"])
+    task = asyncio.create_task(danmaku.connect())
+    event = await asyncio.wait_for(sink.get(), 60)
+    await danmaku.disconnect()
+    await task
+    return event
+
+
+async def test_zl_cmd_pattern():
+    # 嵌套对象中的 cmd 不是消息类型
+    raw = b'{"data":{"cmd":"FAKE"},"cmd":"DANMU_MSG"}'
+    if live.CMD_PATTERN.match(raw) is not None:
+        raise Exception("匹配到了嵌套的 cmd")
+    match = live.CMD_PATTERN.match(b'{"cmd":"SEND_GIFT","data":{}}')
+    return match.group(1).decode()
+
+
+async def test_zm_event_sink_spill():
+    sink = EventSink(maxsize=2, policy="spill")
+    for i in range(5):
+        sink.put_nowait(i)
+    sink.close()
+    items = [item async for item in sink]
+    if items != list(range(5)):
+        raise Exception(f"溢出的事件顺序错误: {items}")
+    return sink.get_stats()
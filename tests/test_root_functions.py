@@ -1,6 +1,8 @@
 # bilibili_api.__init__
 
-from bilibili_api import parse_link, get_real_url
+import asyncio
+
+from bilibili_api import parse_link, get_real_url, AsyncEvent
 
 from .common import get_credential
 
@@ -62,3 +64,20 @@ async def test_a_parse_link():
 
 async def test_b_get_real_url():
     return await get_real_url("https://b23.tv/mx00St")
+
+
+async def test_c_async_event_emit():
+    event = AsyncEvent()
+    result = []
+
+    @event.on("TEST")
+    async def on_test(data):
+        result.append(data)
+
+    event.add_event_listener("__ALL__", lambda data: result.append(data["name"]))
+    event.dispatch("TEST", 1)
+    await asyncio.wait(event.get_pending_tasks())
+    event.set_inline(True)
+    await event.emit("test", 2)
+    assert result == ["TEST", 1, 2, "TEST"]
+    return result
@@ -1,5 +1,7 @@
 # bilibili_api.session
 
+import asyncio
+
 from bilibili_api import ResponseCodeException, session
 
 from .common import get_credential
@@ -50,3 +52,39 @@ async def test_i_get_session_configs():
 
 async def test_j_get_session_detail():
     return await session.get_session_detail(get_credential(), 12076317, 1)
+
+
+async def test_k_session_poll():
+    s = session.Session(get_credential())
+    poller = session.SessionPoller()
+    await s.run(poller=poller)
+    count = await s.poll()
+    s.close()
+    return {"count": count, "interval": s.get_interval()}
+
+
+async def test_l_session_poller_readd():
+    class FakeSession:
+        polls = 0
+
+        async def poll(self):
+            self.polls += 1
+            await asyncio.sleep(0.05)
+
+        def get_interval(self):
+            return 0.2
+
+    s = FakeSession()
+    poller = session.SessionPoller()
+    task = asyncio.create_task(poller.run())
+    poller.add(s)
+    await asyncio.sleep(0.01)
+    # 轮询中移除再添加，旧的调度不应再次轮询
+    poller.remove(s)
+    poller.add(s)
+    await asyncio.sleep(0.5)
+    poller.stop()
+    await task
+    if s.polls > 4:
+        raise Exception(f"会话被重复轮询: {s.polls}")
+    return {"polls": s.polls}
@@ -295,3 +295,20 @@ async def test_zza_get_moral_log():
 
 async def test_zzb_get_exp_log():
     return await user.get_self_experience_log(credential)
+
+async def test_zzc_get_access_id_cached():
+    first = await u.get_access_id()
+    assert await u.get_access_id() == first
+    return first
+
+async def test_zzd_iter_videos():
+    pager = u.iter_videos(ps=5, max_items=12)
+    videos = [video async for video in pager]
+    assert len({video["bvid"] for video in videos}) == len(videos)
+    return {"videos": len(videos), "checkpoint": pager.checkpoint()}
+
+async def test_zze_resolve_names():
+    names = await user.resolve_uids([UID, UID2], credential=credential)
+    uids = await user.resolve_names(list(names.values()), credential=credential)
+    assert uids[names[UID]] == UID
+    return {"names": names, "uids": uids}
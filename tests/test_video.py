@@ -254,3 +254,32 @@ async def test_zj_get_relation():
 
 async def test_zk_get_online():
     return await video.get_online()
+
+
+async def test_zl_prefill_pages_cache():
+    detail = await video.get_detail()
+    count = video_m.prefill_pages_cache([detail["View"]])
+    assert count == 1, "应写入一个视频的分 P 信息"
+    return await video_m.Video(bvid=BVID).get_cid(0)
+
+
+async def test_zm_detect_backup_urls():
+    detecter = video_m.VideoDownloadURLDataDetecter(
+        {
+            "dash": {
+                "video": [
+                    {
+                        "id": 32,
+                        "baseUrl": "https://a/v.m4s",
+                        "backupUrl": ["https://b/v.m4s", "https://c/v.m4s"],
+                        "codecs": "avc1.64001F",
+                    }
+                ],
+                "audio": [{"id": 30280, "base_url": "https://a/a.m4s"}],
+            }
+        }
+    )
+    streams = detecter.detect_best_streams()
+    assert streams[0].backup_urls == ["https://b/v.m4s", "https://c/v.m4s"]
+    assert streams[1].backup_urls == []
+    return streams